@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import json
-import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
@@ -11,12 +10,21 @@ from app.domain.chat.models import ConversationKey
 from app.domain.chat.schemas import (
 	DeliveryAckRequest,
 	DeliveryAckResponse,
+	InboxResponse,
 	MessageListResponse,
 	MessageResponse,
 	OutboxResponse,
 	SendMessageRequest,
 )
-from app.domain.chat.service import acknowledge_delivery, delete_conversation, get_message, list_messages, load_outbox, send_message
+from app.domain.chat.service import (
+	acknowledge_delivery,
+	delete_conversation,
+	get_message,
+	list_inbox,
+	list_messages,
+	load_outbox,
+	send_message,
+)
 from app.infra.auth import AuthenticatedUser, get_current_user
 from app.api.pagination import decode_cursor
 from app.api.request_id import get_request_id
@@ -34,19 +42,21 @@ async def send_message_endpoint(
 	auth_user: AuthenticatedUser = Depends(get_current_user),
 ) -> MessageResponse:
 	request_id = get_request_id(request)
-	key = getattr(request.state, "idem_key", None) or str(uuid.uuid4())
+	key = idempotency.client_key(request)
 	try:
 		payload_body = payload.model_dump(mode="json")  # type: ignore[attr-defined]
 	except AttributeError:
 		payload_body = payload.dict()
 	serialized = json.dumps(payload_body, sort_keys=True)
-	try:
-		payload_hash = idempotency.hash_payload(serialized)
-		existing = await idempotency.begin(key, "messages.send", payload_hash=payload_hash)
-	except IdempotencyUnavailableError:
-		raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
-	except IdempotencyConflictError:
-		raise HTTPException(status.HTTP_409_CONFLICT, detail="idempotency_conflict", headers={"X-Request-Id": request_id}) from None
+	payload_hash = idempotency.hash_payload(serialized)
+	existing = None
+	if key is not None:
+		try:
+			existing = await idempotency.begin(key, "messages.send", payload_hash=payload_hash)
+		except IdempotencyUnavailableError:
+			raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
+		except IdempotencyConflictError:
+			raise HTTPException(status.HTTP_409_CONFLICT, detail="idempotency_conflict", headers={"X-Request-Id": request_id}) from None
 	if existing:
 		try:
 			message = await get_message(auth_user, existing["result_id"])
@@ -59,10 +69,11 @@ async def send_message_endpoint(
 		result = await send_message(auth_user, payload)
 	except ValueError as exc:
 		raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(exc), headers={"X-Request-Id": request_id}) from exc
-	try:
-		await idempotency.complete(key, "messages.send", result.message_id)
-	except IdempotencyUnavailableError:
-		raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
+	if key is not None:
+		try:
+			await idempotency.complete(key, "messages.send", result.message_id, payload_hash=payload_hash)
+		except IdempotencyUnavailableError:
+			raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
 	response.status_code = status.HTTP_201_CREATED
 	response.headers["X-Request-Id"] = request_id
 	return result
@@ -87,6 +98,23 @@ async def list_messages_endpoint(
 	return await list_messages(auth_user, user_id, cursor=decoded_cursor, limit=bounded_limit)
 
 
+@router.get("/inbox", response_model=InboxResponse)
+async def list_inbox_endpoint(
+	*,
+	cursor: str | None = Query(default=None),
+	limit: int = Query(default=50, ge=1, le=200),
+	request: Request,
+	auth_user: AuthenticatedUser = Depends(get_current_user),
+) -> InboxResponse:
+	decoded_cursor = None
+	if cursor:
+		try:
+			decoded_cursor = decode_cursor(cursor)
+		except Exception:
+			raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="invalid_cursor", headers={"X-Request-Id": get_request_id(request)}) from None
+	return await list_inbox(auth_user, cursor=decoded_cursor, limit=limit)
+
+
 @router.post("/conversations/{user_id}/deliveries", response_model=DeliveryAckResponse)
 async def acknowledge_delivery_endpoint(
 	user_id: str,
@@ -26,8 +26,11 @@ class IdempotencyMiddleware:
             return
 
         request = Request(scope)
-        key = request.headers.get("Idempotency-Key") or str(uuid.uuid4())
+        client_key = request.headers.get("Idempotency-Key")
+        key = client_key or str(uuid.uuid4())
         request.state.idem_key = key
+        # Minted keys are never replayed, so handlers skip storing them.
+        request.state.idem_key_generated = client_key is None
 
         async def send_with_header(message: Message) -> None:
             if message["type"] == "http.response.start":
@@ -76,14 +76,16 @@ async def create_dm_room_endpoint(
 	except HTTPException as exc:
 		raise HTTPException(status.HTTP_403_FORBIDDEN, detail=exc.detail, headers={"X-Request-Id": request_id}) from exc
 	a, b = sorted((str(auth_user.id), peer_id))
-	key = getattr(request.state, "idem_key", None) or f"{a}:{b}"
-	try:
-		payload_hash = idempotency.hash_payload(f"{a}:{b}")
-		idem = await idempotency.begin(key, "rooms.dm", payload_hash=payload_hash)
-	except IdempotencyUnavailableError:
-		raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
-	except IdempotencyConflictError:
-		raise HTTPException(status.HTTP_409_CONFLICT, detail="idempotency_conflict", headers={"X-Request-Id": request_id}) from None
+	key = idempotency.client_key(request)
+	payload_hash = idempotency.hash_payload(f"{a}:{b}")
+	idem = None
+	if key is not None:
+		try:
+			idem = await idempotency.begin(key, "rooms.dm", payload_hash=payload_hash)
+		except IdempotencyUnavailableError:
+			raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
+		except IdempotencyConflictError:
+			raise HTTPException(status.HTTP_409_CONFLICT, detail="idempotency_conflict", headers={"X-Request-Id": request_id}) from None
 	room_id = f"dm:{a}:{b}"
 	idempotent_hit = False
 	if idem:
@@ -95,10 +97,11 @@ async def create_dm_room_endpoint(
 			conversation = await ensure_dm_conversation(auth_user, peer_id)
 		except ValueError as exc:
 			raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(exc), headers={"X-Request-Id": request_id}) from exc
-		try:
-			await idempotency.complete(key, "rooms.dm", conversation.conversation_id)
-		except IdempotencyUnavailableError:
-			raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
+		if key is not None:
+			try:
+				await idempotency.complete(key, "rooms.dm", conversation.conversation_id, payload_hash=payload_hash)
+			except IdempotencyUnavailableError:
+				raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
 		response.status_code = status.HTTP_201_CREATED
 		result = schemas.DMRoomResponse(room_id=room_id, conversation_id=conversation.conversation_id, participants=[a, b])
 	response.headers["X-Request-Id"] = request_id
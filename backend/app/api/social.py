@@ -5,7 +5,6 @@ from __future__ import annotations
 import json
 from typing import List, Optional
 from uuid import UUID
-import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
@@ -67,19 +66,21 @@ async def send_invite(
 	auth_user: AuthenticatedUser = Depends(get_current_user),
 ) -> InviteSummary:
 	request_id = get_request_id(request)
-	key = getattr(request.state, "idem_key", None) or str(uuid.uuid4())
+	key = idempotency.client_key(request)
 	try:
 		payload_body = payload.model_dump(mode="json")  # type: ignore[attr-defined]
 	except AttributeError:
 		payload_body = payload.dict()
 	serialized = json.dumps(payload_body, sort_keys=True)
-	try:
-		payload_hash = idempotency.hash_payload(serialized)
-		idempotent = await idempotency.begin(key, "invitations.create", payload_hash=payload_hash)
-	except IdempotencyUnavailableError:
-		raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
-	except IdempotencyConflictError:
-		raise HTTPException(status.HTTP_409_CONFLICT, detail="idempotency_conflict", headers={"X-Request-Id": request_id}) from None
+	payload_hash = idempotency.hash_payload(serialized)
+	idempotent = None
+	if key is not None:
+		try:
+			idempotent = await idempotency.begin(key, "invitations.create", payload_hash=payload_hash)
+		except IdempotencyUnavailableError:
+			raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
+		except IdempotencyConflictError:
+			raise HTTPException(status.HTTP_409_CONFLICT, detail="idempotency_conflict", headers={"X-Request-Id": request_id}) from None
 	if idempotent:
 		summary = await service.get_invite_summary(idempotent["result_id"])
 		response.status_code = status.HTTP_200_OK
@@ -98,10 +99,11 @@ async def send_invite(
 		raise _map_error(exc, request_id) from None
 	except InviteConflict as exc:
 		raise _map_error(exc, request_id) from None
-	try:
-		await idempotency.complete(key, "invitations.create", str(summary.id))
-	except IdempotencyUnavailableError:
-		raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
+	if key is not None:
+		try:
+			await idempotency.complete(key, "invitations.create", str(summary.id), payload_hash=payload_hash)
+		except IdempotencyUnavailableError:
+			raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="idempotency_unavailable", headers={"X-Request-Id": request_id}) from None
 	response.status_code = status.HTTP_201_CREATED
 	response.headers["X-Request-Id"] = request_id
 	return summary
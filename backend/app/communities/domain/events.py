@@ -12,6 +12,7 @@ def group_payload(group: models.Group) -> dict[str, Any]:
 		"id": str(group.id),
 		"name": group.name,
 		"slug": group.slug,
+		"description": group.description,
 		"visibility": group.visibility,
 		"campus_id": str(group.campus_id) if group.campus_id else None,
 		"tags": group.tags,
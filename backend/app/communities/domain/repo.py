@@ -1315,6 +1315,31 @@ class CommunitiesRepository:
 			ids,
 		)
 
+	async def fetch_outbox_since(
+		self,
+		*,
+		after_id: int,
+		aggregate_types: Sequence[str] | None = None,
+		limit: int = 500,
+	) -> list[models.OutboxEvent]:
+		"""Read outbox events past ``after_id`` without claiming them (for in-process followers)."""
+
+		pool = await get_pool()
+		async with pool.acquire() as conn:
+			rows = await conn.fetch(
+				"""
+				SELECT * FROM outbox_event
+				WHERE id > $1
+					AND ($2::text[] IS NULL OR aggregate_type = ANY($2::text[]))
+				ORDER BY id
+				LIMIT $3
+				""",
+				after_id,
+				list(aggregate_types) if aggregate_types else None,
+				limit,
+			)
+		return [models.OutboxEvent.model_validate(dict(row)) for row in rows]
+
 	# --- Feed operations -------------------------------------------------
 
 	async def list_member_ids(self, group_id: UUID) -> list[UUID]:
@@ -9,6 +9,7 @@ from typing import Awaitable, Callable, List, Tuple
 from app.communities.domain import repo as repo_module
 from app.communities.search import clients, exceptions, guards
 from app.communities.schemas import dto
+from app.domain.search import typeahead
 from app.infra.auth import AuthenticatedUser
 from app.obs import metrics as obs_metrics
 from app.settings import settings
@@ -72,12 +73,15 @@ class SearchService:
 
 		obs_metrics.SEARCH_QUERIES.labels(kind=_TYPEAHEAD_KIND).inc()
 		started = time.perf_counter()
-		items, backend_used = await self._resolve_hits(
-			lambda: self._client.typeahead_groups(campus_id=auth_user.campus_id, query=normalized, limit=limit),
-			auth_user=auth_user,
-			query=normalized,
-			limit=limit,
-		)
+		items = self._index_hits(auth_user, query=normalized, limit=limit)
+		backend_used = "memory"
+		if not items:
+			items, backend_used = await self._resolve_hits(
+				lambda: self._client.typeahead_groups(campus_id=auth_user.campus_id, query=normalized, limit=limit),
+				auth_user=auth_user,
+				query=normalized,
+				limit=limit,
+			)
 		duration = time.perf_counter() - started
 		obs_metrics.SEARCH_LATENCY.labels(kind=_TYPEAHEAD_KIND).observe(duration)
 		return dto.GroupTypeaheadResponse(
@@ -86,6 +90,24 @@ class SearchService:
 			took_ms=int(duration * 1000),
 		)
 
+	@staticmethod
+	def _index_hits(auth_user: AuthenticatedUser, *, query: str, limit: int) -> list[clients.GroupSearchHit]:
+		if not settings.search_typeahead_enabled:
+			return []
+		entries = typeahead.get_index().lookup(typeahead.KIND_GROUP, auth_user.campus_id, query, limit=limit) or []
+		return [
+			clients.GroupSearchHit(
+				id=entry.entity_id,
+				name=entry.label,
+				slug=entry.secondary or "",
+				description=entry.extra.get("description"),
+				tags=entry.extra.get("tags") or [],
+				score=entry.popularity,
+				backend="memory",
+			)
+			for entry in entries
+		]
+
 	async def _resolve_hits(
 		self,
 		client_call: Callable[[], Awaitable[List[clients.GroupSearchHit]]],
@@ -645,11 +645,12 @@ class ActivitiesService:
 	async def _award_game_played_xp(self, activity: models.Activity) -> None:
 		"""Award XP to both participants when a game starts."""
 		try:
-			from app.domain.xp.models import XPAction
+			from app.domain.xp.models import XPAction, XPAward
 			from app.domain.xp.service import XPService
-			xp_svc = XPService()
-			await xp_svc.award_xp(activity.user_a, XPAction.GAME_PLAYED, {"activity_id": activity.id, "target_id": activity.user_b, "game": activity.kind})
-			await xp_svc.award_xp(activity.user_b, XPAction.GAME_PLAYED, {"activity_id": activity.id, "target_id": activity.user_a, "game": activity.kind})
+			await XPService().award_many([
+				XPAward(activity.user_a, XPAction.GAME_PLAYED, {"activity_id": activity.id, "target_id": activity.user_b, "game": activity.kind}),
+				XPAward(activity.user_b, XPAction.GAME_PLAYED, {"activity_id": activity.id, "target_id": activity.user_a, "game": activity.kind}),
+			])
 		except Exception:
 			logger.exception("Failed to award GAME_PLAYED XP", extra={"activity_id": activity.id})
 
@@ -72,6 +72,20 @@ class DeliveryState:
 	delivered_seq: int
 
 
+@dataclass(slots=True)
+class InboxEntry:
+	"""One row of a user's conversation roster."""
+
+	conversation_id: str
+	peer_id: str
+	last_seq: int
+	last_message_id: str
+	last_sender_id: str
+	last_body: str
+	last_at: datetime
+	unread_count: int
+
+
 @dataclass(slots=True)
 class ConversationCursor:
 	conversation_id: str
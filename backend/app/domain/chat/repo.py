@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+from typing import Optional
 from uuid import UUID
 
 from app.infra.postgres import get_pool
 from app.domain.common.campus_guard import require_same_campus
-from app.domain.chat import models
+from app.domain.rooms import models
 
+_MESSAGE_COLUMNS = "id, room_id, seq, sender_id, client_msg_id, kind, content, media_key, media_mime, media_bytes, created_at"
 
-async def list_by_room(room_id: UUID, *, campus_id: UUID, limit: int = 50, offset: int = 0) -> list[models.Message]:
+
+async def list_by_room(
+    room_id: UUID,
+    *,
+    campus_id: UUID,
+    limit: int = 50,
+    before_seq: Optional[int] = None,
+) -> list[models.RoomMessage]:
     """Return latest messages for a room, bound to campus_id for safety.
 
-    If the room's campus differs from the requester's campus, raise via
-    `require_same_campus`.
+    Pages by keyset: pass the smallest ``seq`` already seen as ``before_seq``
+    to continue into older history. If the room's campus differs from the
+    requester's campus, raise via `require_same_campus`.
     """
     pool = await get_pool()
     async with pool.acquire() as conn:
@@ -19,11 +29,32 @@ async def list_by_room(room_id: UUID, *, campus_id: UUID, limit: int = 50, offse
         if not room:
             return []
         require_same_campus(str(campus_id), room.get("campus_id"))
-        rows = await conn.fetch(
-            "SELECT * FROM messages WHERE room_id = $1 AND campus_id = $2 AND deleted_at IS NULL ORDER BY created_at DESC LIMIT $3 OFFSET $4",
-            str(room_id),
-            str(campus_id),
-            limit,
-            offset,
-        )
-        return [models.Message.from_record(r) for r in rows]
+        if before_seq is None:
+            rows = await conn.fetch(
+                f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id = $1 AND deleted_at IS NULL ORDER BY seq DESC LIMIT $2",
+                str(room_id),
+                limit,
+            )
+        else:
+            rows = await conn.fetch(
+                f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id = $1 AND seq < $2 AND deleted_at IS NULL ORDER BY seq DESC LIMIT $3",
+                str(room_id),
+                before_seq,
+                limit,
+            )
+        return [
+            models.RoomMessage(
+                id=str(r["id"]),
+                room_id=str(r["room_id"]),
+                seq=int(r["seq"]),
+                sender_id=str(r["sender_id"]),
+                client_msg_id=str(r["client_msg_id"]),
+                kind=r["kind"],
+                content=r["content"],
+                media_key=r["media_key"],
+                media_mime=r["media_mime"],
+                media_bytes=r["media_bytes"],
+                created_at=r["created_at"],
+            )
+            for r in rows
+        ]
@@ -7,7 +7,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
-from .models import AttachmentMeta, ChatMessage
+from .models import AttachmentMeta, ChatMessage, InboxEntry
 
 
 class MessageAttachment(BaseModel):
@@ -85,3 +85,32 @@ class DeliveryAckResponse(BaseModel):
 class OutboxResponse(BaseModel):
 	items: List[MessageResponse]
 	reset_cursor: Optional[str] = None
+
+
+class InboxItem(BaseModel):
+	conversation_id: str
+	peer_id: str
+	last_seq: int
+	last_message_id: str
+	last_sender_id: str
+	last_body: str
+	last_at: datetime
+	unread_count: int
+
+	@classmethod
+	def from_model(cls, entry: InboxEntry) -> "InboxItem":
+		return cls(
+			conversation_id=entry.conversation_id,
+			peer_id=str(entry.peer_id),
+			last_seq=int(entry.last_seq),
+			last_message_id=str(entry.last_message_id),
+			last_sender_id=str(entry.last_sender_id),
+			last_body=entry.last_body,
+			last_at=entry.last_at,
+			unread_count=int(entry.unread_count),
+		)
+
+
+class InboxResponse(BaseModel):
+	items: List[InboxItem]
+	next: Optional[str] = None
@@ -7,26 +7,28 @@ import base64
 import json
 import os
 import re
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from dataclasses import asdict
 from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
 
 import ulid
 
-from . import attachments, delivery, outbox, sockets
+from . import attachments, delivery, outbox, side_effects, sockets
 from .models import (
 	AttachmentMeta,
 	ChatMessage,
 	ConversationCursor,
 	ConversationKey,
+	InboxEntry,
 	attach_iterable,
 )
-from .schemas import MessageListResponse, MessageResponse, OutboxResponse, SendMessageRequest
+from .schemas import InboxItem, InboxResponse, MessageListResponse, MessageResponse, OutboxResponse, SendMessageRequest
 from app.infra.auth import AuthenticatedUser
 from app.infra.postgres import get_pool
+from app.maintenance import cold_storage
 from app.obs import metrics as obs_metrics
 from app.api.pagination import encode_cursor
-from app.domain.leaderboards.service import LeaderboardService
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
 	from app.moderation.middleware.write_gate_v2 import WriteContext
@@ -34,6 +36,54 @@ if TYPE_CHECKING:  # pragma: no cover - typing only
 
 _EXTERNAL_LINK_RE = re.compile(r"https?://\S+", re.IGNORECASE)
 
+_INBOX_PREVIEW_CHARS = 280
+
+# Upserts the conversation, bumps its chat_seq counter, inserts the message and
+# refreshes both participants' chat_inbox rows in a single round trip. The
+# counter row lock serialises senders in a conversation, so inbox rows are
+# always overwritten in seq order.
+_CREATE_MESSAGE_SQL = f"""
+WITH conv AS (
+	INSERT INTO chat_conversations (conversation_id, user_a, user_b)
+	VALUES ($1, $2, $3)
+	ON CONFLICT (conversation_id) DO NOTHING
+),
+next_seq AS (
+	INSERT INTO chat_seq (conversation_id, last_seq)
+	VALUES ($1, 1)
+	ON CONFLICT (conversation_id) DO UPDATE SET last_seq = chat_seq.last_seq + 1
+	RETURNING last_seq
+),
+inbox AS (
+	INSERT INTO chat_inbox AS i (
+		user_id, conversation_id, peer_id, last_seq, last_message_id, last_sender_id, last_body, last_at, unread_count
+	)
+	SELECT p.user_id, $1, p.peer_id, next_seq.last_seq, $4::text, $6::uuid, LEFT($8::text, {_INBOX_PREVIEW_CHARS}), $10::timestamptz, p.unread
+	FROM next_seq, (VALUES ($6::uuid, $7::uuid, 0), ($7::uuid, $6::uuid, 1)) AS p(user_id, peer_id, unread)
+	ON CONFLICT (user_id, conversation_id) DO UPDATE SET
+		last_seq = EXCLUDED.last_seq,
+		last_message_id = EXCLUDED.last_message_id,
+		last_sender_id = EXCLUDED.last_sender_id,
+		last_body = EXCLUDED.last_body,
+		last_at = EXCLUDED.last_at,
+		unread_count = i.unread_count + EXCLUDED.unread_count
+)
+INSERT INTO chat_messages (
+	conversation_id,
+	seq,
+	message_id,
+	client_msg_id,
+	sender_id,
+	recipient_id,
+	body,
+	attachments,
+	created_at
+)
+SELECT $1, next_seq.last_seq, $4::text, $5::text, $6::uuid, $7::uuid, $8::text, $9::jsonb, $10::timestamptz
+FROM next_seq
+RETURNING seq
+"""
+
 
 def _strip_external_links(text: str) -> str:
 	return _EXTERNAL_LINK_RE.sub("[link removed]", text)
@@ -57,6 +107,7 @@ class _InMemoryStore:
 		self._lock = asyncio.Lock()
 		self._messages: dict[str, List[ChatMessage]] = {}
 		self._delivered: dict[tuple[str, str], int] = {}
+		self._acked: dict[tuple[str, str], int] = {}
 		self._load()
 
 	def _save(self) -> None:
@@ -156,10 +207,51 @@ class _InMemoryStore:
 
 	async def delete_conversation(self, conversation_id: str) -> None:
 		async with self._lock:
+			for key in [key for key in self._acked if key[0] == conversation_id]:
+				del self._acked[key]
 			if conversation_id in self._messages:
 				del self._messages[conversation_id]
 				self._save()
 
+	async def list_inbox(
+		self,
+		user_id: str,
+		*,
+		cursor: Tuple[datetime, str] | None,
+		limit: int,
+	) -> List[InboxEntry]:
+		async with self._lock:
+			entries: List[InboxEntry] = []
+			for conversation_id, messages in self._messages.items():
+				if not messages:
+					continue
+				last = messages[-1]
+				if not last.is_participant(user_id):
+					continue
+				acked = self._acked.get((conversation_id, user_id), 0)
+				entries.append(
+					InboxEntry(
+						conversation_id=conversation_id,
+						peer_id=last.recipient_id if last.sender_id == user_id else last.sender_id,
+						last_seq=last.seq,
+						last_message_id=last.message_id,
+						last_sender_id=last.sender_id,
+						last_body=last.body[:_INBOX_PREVIEW_CHARS],
+						last_at=last.created_at,
+						unread_count=sum(1 for m in messages if m.recipient_id == user_id and m.seq > acked),
+					)
+				)
+			entries.sort(key=lambda e: (e.last_at, e.conversation_id), reverse=True)
+			if cursor:
+				cursor_dt, cursor_id = cursor
+				entries = [e for e in entries if (e.last_at, e.conversation_id) < (cursor_dt, cursor_id)]
+			return entries[:limit]
+
+	async def ack_inbox(self, conversation_id: str, user_id: str, seq: int) -> None:
+		async with self._lock:
+			key = (conversation_id, user_id)
+			self._acked[key] = max(self._acked.get(key, 0), seq)
+
 	async def get_message(self, message_id: str) -> Optional[ChatMessage]:
 		async with self._lock:
 			for conversation_messages in self._messages.values():
@@ -234,58 +326,37 @@ class ChatRepository:
 				client_msg_id,
 				created_at,
 			)
+		conversation_id = conversation.conversation_id
+		user_a, user_b = conversation.participants()
+		attachments_json = [asdict(meta) for meta in attachments_meta]
+		message_id = str(ulid.new())
 		async with pool.acquire() as conn:
-			async with conn.transaction():
-				conversation_id = conversation.conversation_id
-				user_a, user_b = conversation.participants()
-				await conn.execute(
-					"""
-					INSERT INTO chat_conversations (conversation_id, user_a, user_b)
-					VALUES ($1, $2, $3)
-					ON CONFLICT (conversation_id) DO NOTHING
-					""",
-					conversation_id,
-					user_a,
-					user_b,
-				)
-				seq = await self._next_sequence(conn, conversation_id)
-				attachments_json = [asdict(meta) for meta in attachments_meta]
-				message_id = str(ulid.new())
-				await conn.execute(
-					"""
-					INSERT INTO chat_messages (
-						conversation_id,
-						seq,
-						message_id,
-						client_msg_id,
-						sender_id,
-						recipient_id,
-						body,
-						attachments,
-						created_at
-					) VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9)
-					""",
-					conversation_id,
-					seq,
-					message_id,
-					client_msg_id,
-					sender_id,
-					recipient_id,
-					body,
-					json.dumps(attachments_json),
-					created_at,
-				)
-				return ChatMessage(
-					message_id=message_id,
-					client_msg_id=client_msg_id,
-					conversation_id=conversation_id,
-					seq=seq,
-					sender_id=sender_id,
-					recipient_id=recipient_id,
-					body=body,
-					attachments=attach_iterable(attachments_meta),
-					created_at=created_at,
-				)
+			# One statement: the FK to chat_conversations is checked at statement end,
+			# and the chat_seq row lock is released as soon as the insert commits.
+			seq = await conn.fetchval(
+				_CREATE_MESSAGE_SQL,
+				conversation_id,
+				user_a,
+				user_b,
+				message_id,
+				client_msg_id,
+				sender_id,
+				recipient_id,
+				body,
+				json.dumps(attachments_json),
+				created_at,
+			)
+			return ChatMessage(
+				message_id=message_id,
+				client_msg_id=client_msg_id,
+				conversation_id=conversation_id,
+				seq=seq,
+				sender_id=sender_id,
+				recipient_id=recipient_id,
+				body=body,
+				attachments=attach_iterable(attachments_meta),
+				created_at=created_at,
+			)
 
 	async def list_messages(
 		self,
@@ -314,17 +385,125 @@ class ChatRepository:
 				+ f" ORDER BY created_at DESC, message_id DESC LIMIT ${len(params)}"
 			)
 			rows = await conn.fetch(query, *params)
-			return [self._row_to_message(str(row["conversation_id"]), row) for row in rows]
+			messages = [self._row_to_message(str(row["conversation_id"]), row) for row in rows]
+			if len(messages) < limit:
+				before = (messages[-1].created_at, messages[-1].message_id) if messages else cursor
+				messages.extend(await self._cold_messages(conn, conversation_id, before=before, limit=limit - len(messages)))
+			return messages
+
+	async def _cold_messages(
+		self,
+		conn,
+		conversation_id: str,
+		*,
+		before: Tuple[datetime, str] | None,
+		limit: int,
+	) -> List[ChatMessage]:
+		"""Continue a newest-first page into compacted segments (see maintenance.cold_storage)."""
+
+		found: List[ChatMessage] = []
+		where, params = "", ()
+		if before is not None:
+			# One day of slack so a month boundary in another time zone is never skipped.
+			where, params = "AND month <= $2", (before[0].date() + timedelta(days=1),)
+		while len(found) < limit:
+			loaded = await cold_storage.load_segments(conn, cold_storage.CHAT_TIER, conversation_id, where=where, params=params)
+			if not loaded:
+				break
+			segment, records = loaded[0]
+			candidates = [self._row_to_message(conversation_id, record) for record in records]
+			if before is not None:
+				candidates = [m for m in candidates if (m.created_at, m.message_id) < before]
+			candidates.sort(key=lambda m: (m.created_at, m.message_id), reverse=True)
+			found.extend(candidates[: limit - len(found)])
+			where, params = "AND month < $2", (segment["month"],)
+		return found
 
 	async def delete_conversation(self, conversation_id: str) -> None:
 		pool = await self._pool_or_none()
 		if pool is None:
 			await _MEMORY_STORE.delete_conversation(conversation_id)
 			return
+		async with pool.acquire() as conn:
+			async with conn.transaction():
+				await conn.execute(
+					"DELETE FROM chat_messages WHERE conversation_id = $1",
+					conversation_id,
+				)
+				await conn.execute(
+					"DELETE FROM chat_inbox WHERE conversation_id = $1",
+					conversation_id,
+				)
+				await conn.execute(
+					"DELETE FROM chat_message_segments WHERE conversation_id = $1",
+					conversation_id,
+				)
+
+	async def list_inbox(
+		self,
+		user_id: str,
+		*,
+		cursor: Tuple[datetime, str] | None,
+		limit: int,
+	) -> List[InboxEntry]:
+		pool = await self._pool_or_none()
+		if pool is None:
+			return await _MEMORY_STORE.list_inbox(user_id, cursor=cursor, limit=limit)
+		params: List[object] = [user_id]
+		where_clause = ""
+		if cursor:
+			params.extend([cursor[0], cursor[1]])
+			where_clause = " AND (last_at, conversation_id) < ($2, $3)"
+		params.append(limit)
+		query = (
+			"""
+			SELECT conversation_id, peer_id, last_seq, last_message_id, last_sender_id, last_body, last_at, unread_count
+			FROM chat_inbox
+			WHERE user_id = $1
+			"""
+			+ where_clause
+			+ f" ORDER BY last_at DESC, conversation_id DESC LIMIT ${len(params)}"
+		)
+		async with pool.acquire() as conn:
+			rows = await conn.fetch(query, *params)
+		return [
+			InboxEntry(
+				conversation_id=str(row["conversation_id"]),
+				peer_id=str(row["peer_id"]),
+				last_seq=int(row["last_seq"]),
+				last_message_id=str(row["last_message_id"]),
+				last_sender_id=str(row["last_sender_id"]),
+				last_body=row["last_body"],
+				last_at=row["last_at"],
+				unread_count=int(row["unread_count"]),
+			)
+			for row in rows
+		]
+
+	async def ack_inbox(self, conversation_id: str, user_id: str, seq: int) -> None:
+		"""Advance the user's read marker and recount what is still unread after it."""
+
+		pool = await self._pool_or_none()
+		if pool is None:
+			await _MEMORY_STORE.ack_inbox(conversation_id, user_id, seq)
+			return
 		async with pool.acquire() as conn:
 			await conn.execute(
-				"DELETE FROM chat_messages WHERE conversation_id = $1",
+				"""
+				UPDATE chat_inbox
+				SET acked_seq = GREATEST(acked_seq, $3),
+					unread_count = (
+						SELECT COUNT(*)
+						FROM chat_messages m
+						WHERE m.conversation_id = $1
+							AND m.recipient_id = $2
+							AND m.seq > GREATEST(chat_inbox.acked_seq, $3)
+					)
+				WHERE user_id = $2 AND conversation_id = $1
+				""",
 				conversation_id,
+				user_id,
+				seq,
 			)
 
 	async def get_message_by_id(self, message_id: str) -> Optional[ChatMessage]:
@@ -415,25 +594,6 @@ class ChatRepository:
 				seq,
 			)
 
-	async def _next_sequence(self, conn, conversation_id: str) -> int:
-		row = await conn.fetchrow(
-			"SELECT last_seq FROM chat_seq WHERE conversation_id = $1 FOR UPDATE",
-			conversation_id,
-		)
-		if row:
-			next_seq = int(row["last_seq"]) + 1
-			await conn.execute(
-				"UPDATE chat_seq SET last_seq = $2 WHERE conversation_id = $1",
-				conversation_id,
-				next_seq,
-			)
-			return next_seq
-		await conn.execute(
-			"INSERT INTO chat_seq (conversation_id, last_seq) VALUES ($1, 1)",
-			conversation_id,
-		)
-		return 1
-
 	def _row_to_message(self, conversation_id: str, row) -> ChatMessage:
 		attachments_raw = row["attachments"]
 		if isinstance(attachments_raw, str):
@@ -468,6 +628,7 @@ class ChatService:
 		)
 		client_msg_id = payload.client_msg_id or str(ulid.new())
 		created_at = datetime.now(timezone.utc)
+		started = time.perf_counter()
 		from app.moderation.domain.container import get_write_gate
 		from app.moderation.middleware.write_gate_v2 import WriteContext
 
@@ -489,53 +650,29 @@ class ChatService:
 			client_msg_id,
 			created_at,
 		)
-		
-		# Log to Activity Feed (Audit)
-		try:
-			from app.domain.identity import audit
-			await audit.log_event(
-				user_id=auth_user.id,
-				event="chat.sent",
-				meta={
-					"conversation_id": message.conversation_id,
-					"recipient_id": payload.to_user_id
-				}
-			)
-		except Exception:
-			pass # Non-critical
-			
 		obs_metrics.inc_chat_send()
 		moderation = _build_moderation_meta(ctx)
 		response = MessageResponse.from_model(message, moderation=moderation)
 		response_payload = response.model_dump(mode="json")
+		# Realtime fan-out stays on the request; delivery bookkeeping, audit,
+		# leaderboard and XP are handed to the side-effect workers.
+		pending = [
+			sockets.emit_echo(message.sender_id, response_payload),
+			side_effects.publish(
+				side_effects.MessageSent(
+					message_id=message.message_id,
+					conversation_id=message.conversation_id,
+					seq=message.seq,
+					sender_id=str(message.sender_id),
+					recipient_id=str(message.recipient_id),
+				),
+				self._repo,
+			),
+		]
 		if not ctx.shadow:
-			await sockets.emit_message(message.recipient_id, response_payload)
-		await sockets.emit_echo(message.sender_id, response_payload)
-		delivered_seq = await delivery.mark_delivered(
-			self._repo, message.conversation_id, message.recipient_id, message.seq
-		)
-		obs_metrics.inc_chat_delivered()
-		await sockets.emit_delivery(
-			message.sender_id,
-			{
-				"peer_id": message.recipient_id,
-				"conversation_id": message.conversation_id,
-				"delivered_seq": delivered_seq,
-				"source": "send",
-			},
-		)
-	# Track DM for leaderboard and XP (non-blocking, anti-cheat validated)
-		try:
-			lb_service = LeaderboardService()
-			is_valid = await lb_service.record_dm_sent(from_user_id=str(auth_user.id), to_user_id=str(payload.to_user_id))
-			if is_valid:
-				from app.domain.xp import XPService
-				from app.domain.xp.models import XPAction
-				# Fire and forget XP award slightly decoupled to not block response if possible, 
-				# but for now await is safer for consistency.
-				await XPService().award_xp(str(auth_user.id), XPAction.CHAT_SENT)
-		except Exception:
-			pass  # Non-critical, don't block message send
+			pending.append(sockets.emit_message(message.recipient_id, response_payload))
+		await asyncio.gather(*pending)
+		obs_metrics.CHAT_SEND_DURATION.observe(time.perf_counter() - started)
 		return response
 
 	async def delete_conversation(self, auth_user: AuthenticatedUser, peer_id: str) -> None:
@@ -577,6 +714,21 @@ class ChatService:
 			next_cursor = encode_cursor(last.created_at, last.message_id)
 		return MessageListResponse(items=items, next=next_cursor)
 
+	async def list_inbox(
+		self,
+		auth_user: AuthenticatedUser,
+		*,
+		cursor: Optional[Tuple[datetime, str]],
+		limit: int,
+	) -> InboxResponse:
+		rows = await self._repo.list_inbox(str(auth_user.id), cursor=cursor, limit=limit + 1)
+		page = rows[:limit]
+		next_cursor = None
+		if len(rows) > limit and page:
+			last = page[-1]
+			next_cursor = encode_cursor(last.last_at, last.conversation_id)
+		return InboxResponse(items=[InboxItem.from_model(entry) for entry in page], next=next_cursor)
+
 	async def acknowledge_delivery(
 		self,
 		auth_user: AuthenticatedUser,
@@ -588,6 +740,7 @@ class ChatService:
 		delivered = await delivery.mark_delivered(
 			self._repo, conversation.conversation_id, auth_user.id, delivered_seq
 		)
+		await self._repo.ack_inbox(conversation.conversation_id, auth_user.id, delivered)
 		obs_metrics.inc_chat_delivered()
 		await sockets.emit_delivery(
 			other_user_id,
@@ -626,6 +779,7 @@ class ChatService:
 			delivered_seq = await delivery.mark_delivered(
 				self._repo, conversation.conversation_id, auth_user.id, last.seq
 			)
+			await self._repo.ack_inbox(conversation.conversation_id, auth_user.id, delivered_seq)
 			await sockets.emit_delivery(
 				other_user_id,
 				{
@@ -659,6 +813,15 @@ async def get_message(auth_user: AuthenticatedUser, message_id: str) -> MessageR
 	return await _SERVICE.get_message(auth_user, message_id)
 
 
+async def list_inbox(
+	auth_user: AuthenticatedUser,
+	*,
+	cursor: Optional[Tuple[datetime, str]],
+	limit: int,
+) -> InboxResponse:
+	return await _SERVICE.list_inbox(auth_user, cursor=cursor, limit=limit)
+
+
 async def ensure_dm_conversation(auth_user: AuthenticatedUser, peer_id: str) -> ConversationKey:
 	return await _SERVICE.ensure_dm_conversation(auth_user, peer_id)
 
@@ -0,0 +1,316 @@
+"""Post-commit side effects for direct messages.
+
+``ChatService.send_message`` appends one entry per persisted message to a Redis
+stream; a pool of consumer-group workers drains it in batches and performs the
+bookkeeping that used to sit on the send path (delivery watermark + ack emit,
+activity audit, leaderboard and XP). Entries are acked only after every effect
+succeeded, so delivery is at-least-once; non-idempotent effects take a short
+per-message lock while running and leave a done marker once they succeed, so a
+retried entry does not double-count.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, Optional
+
+from app.domain.chat import delivery, sockets
+from app.infra.redis import redis_client
+from app.obs import metrics as obs_metrics
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STREAM = "x:chat.side_effects"
+DEAD_LETTER_STREAM = "x:chat.side_effects.dlq"
+GROUP = "chat-side-effects"
+_STREAM_MAXLEN = 200_000
+_DONE_TTL_SECONDS = 24 * 3600
+# Shorter than the worker's retry_idle_ms so a crashed attempt is retryable on reclaim.
+_LOCK_TTL_SECONDS = 20
+
+
+@dataclass(slots=True)
+class MessageSent:
+	message_id: str
+	conversation_id: str
+	seq: int
+	sender_id: str
+	recipient_id: str
+	entry_id: str = ""
+
+	def to_fields(self) -> dict[str, str]:
+		return {
+			"message_id": self.message_id,
+			"conversation_id": self.conversation_id,
+			"seq": str(self.seq),
+			"sender_id": self.sender_id,
+			"recipient_id": self.recipient_id,
+		}
+
+	@classmethod
+	def from_fields(cls, entry_id: str, fields: dict[str, str]) -> "MessageSent":
+		return cls(
+			message_id=fields["message_id"],
+			conversation_id=fields["conversation_id"],
+			seq=int(fields["seq"]),
+			sender_id=fields["sender_id"],
+			recipient_id=fields["recipient_id"],
+			entry_id=entry_id,
+		)
+
+
+async def publish(event: MessageSent, repo: delivery.DeliveryRepository) -> None:
+	"""Queue side effects for a persisted message; applies them inline if Redis refuses."""
+
+	if not settings.chat_side_effects_async:
+		await apply_batch([event], repo)
+		return
+	try:
+		await redis_client.xadd(STREAM, event.to_fields(), maxlen=_STREAM_MAXLEN, approximate=True)
+	except Exception:
+		logger.warning("chat.side_effects enqueue failed; applying inline", exc_info=True)
+		await apply_batch([event], repo)
+
+
+async def apply_batch(events: list[MessageSent], repo: delivery.DeliveryRepository) -> set[str]:
+	"""Run every effect for ``events``; returns the entry ids that fully succeeded."""
+
+	failed: set[str] = set()
+	await _apply_delivery(events, repo, failed)
+	for event in events:
+		if not await _run_once(event, "audit", lambda event=event: _apply_audit(event)):
+			failed.add(event.entry_id)
+		if not await _run_once(event, "engagement", lambda event=event: _apply_engagement(event)):
+			failed.add(event.entry_id)
+	return {event.entry_id for event in events} - failed
+
+
+async def _apply_delivery(events: list[MessageSent], repo: delivery.DeliveryRepository, failed: set[str]) -> None:
+	# Delivery watermarks are monotonic (GREATEST), so one write per recipient
+	# conversation covers the whole batch and replays are harmless.
+	latest: dict[tuple[str, str], MessageSent] = {}
+	members: dict[tuple[str, str], list[MessageSent]] = {}
+	for event in events:
+		key = (event.conversation_id, event.recipient_id)
+		members.setdefault(key, []).append(event)
+		current = latest.get(key)
+		if current is None or event.seq > current.seq:
+			latest[key] = event
+	for key, event in latest.items():
+		try:
+			delivered_seq = await delivery.mark_delivered(repo, event.conversation_id, event.recipient_id, event.seq)
+			obs_metrics.inc_chat_delivered()
+			await sockets.emit_delivery(
+				event.sender_id,
+				{
+					"peer_id": event.recipient_id,
+					"conversation_id": event.conversation_id,
+					"delivered_seq": delivered_seq,
+					"source": "send",
+				},
+			)
+			obs_metrics.CHAT_SIDE_EFFECTS.labels(effect="delivery", result="ok").inc()
+		except Exception:
+			logger.warning("chat.side_effects delivery failed conversation=%s", event.conversation_id, exc_info=True)
+			obs_metrics.CHAT_SIDE_EFFECTS.labels(effect="delivery", result="error").inc()
+			failed.update(member.entry_id for member in members[key])
+
+
+async def _run_once(event: MessageSent, effect: str, action: Callable[[], Awaitable[None]]) -> bool:
+	"""Run ``action`` unless it already completed for this message.
+
+	A short-lived lock keeps two consumers from running the effect at once; the
+	24h done marker is written only after the effect succeeded, so a worker that
+	dies mid-effect leaves no marker and the reclaimed entry runs it again.
+	"""
+
+	marker = f"chat:fx:{event.message_id}:{effect}"
+	lock = f"{marker}:lock"
+	locked = False
+	try:
+		locked = bool(await redis_client.set(lock, "1", nx=True, ex=_LOCK_TTL_SECONDS))
+		if not locked:
+			obs_metrics.CHAT_SIDE_EFFECTS.labels(effect=effect, result="busy").inc()
+			return False
+		if await redis_client.exists(marker):
+			obs_metrics.CHAT_SIDE_EFFECTS.labels(effect=effect, result="duplicate").inc()
+			await _release(lock)
+			return True
+	except Exception:
+		logger.warning("chat.side_effects marker check failed message=%s", event.message_id, exc_info=True)
+	try:
+		await action()
+	except Exception:
+		logger.warning("chat.side_effects %s failed message=%s", effect, event.message_id, exc_info=True)
+		obs_metrics.CHAT_SIDE_EFFECTS.labels(effect=effect, result="error").inc()
+		if locked:
+			await _release(lock)
+		return False
+	try:
+		await redis_client.set(marker, "1", ex=_DONE_TTL_SECONDS)
+	except Exception:
+		logger.warning("chat.side_effects done marker failed message=%s", event.message_id, exc_info=True)
+	if locked:
+		await _release(lock)
+	obs_metrics.CHAT_SIDE_EFFECTS.labels(effect=effect, result="ok").inc()
+	return True
+
+
+async def _release(lock: str) -> None:
+	try:
+		await redis_client.delete(lock)
+	except Exception:
+		pass
+
+
+async def _apply_audit(event: MessageSent) -> None:
+	from app.domain.identity import audit
+
+	await audit.log_event(
+		user_id=event.sender_id,
+		event="chat.sent",
+		meta={"conversation_id": event.conversation_id, "recipient_id": event.recipient_id},
+	)
+
+
+async def _apply_engagement(event: MessageSent) -> None:
+	from app.domain.leaderboards.service import LeaderboardService
+	from app.domain.xp import XPService
+	from app.domain.xp.models import XPAction
+
+	if await LeaderboardService().record_dm_sent(from_user_id=event.sender_id, to_user_id=event.recipient_id):
+		await XPService().award_xp(event.sender_id, XPAction.CHAT_SENT)
+
+
+class ChatSideEffectWorker:
+	"""One consumer in the ``chat-side-effects`` group."""
+
+	def __init__(
+		self,
+		*,
+		consumer: str,
+		repository: Optional[delivery.DeliveryRepository] = None,
+		batch_size: int = 100,
+		block_ms: int = 1000,
+		retry_idle_ms: int = 30_000,
+		max_attempts: int = 5,
+	) -> None:
+		from app.domain.chat.service import ChatRepository
+
+		self.consumer = consumer
+		self.repo = repository or ChatRepository()
+		self.batch_size = batch_size
+		self.block_ms = block_ms
+		self.retry_idle_ms = retry_idle_ms
+		self.max_attempts = max_attempts
+		self._group_ready = False
+		self._running = False
+
+	async def run_forever(self) -> None:
+		self._running = True
+		while self._running:
+			try:
+				await self.process_once()
+			except asyncio.CancelledError:
+				raise
+			except Exception:
+				logger.exception("chat.side_effects worker=%s failed", self.consumer)
+				await asyncio.sleep(1.0)
+
+	def stop(self) -> None:
+		self._running = False
+
+	async def process_once(self) -> int:
+		await self._ensure_group()
+		entries = await self._reclaim()
+		response = await redis_client.xreadgroup(
+			GROUP,
+			self.consumer,
+			{STREAM: ">"},
+			count=self.batch_size,
+			block=self.block_ms if not entries else None,
+		)
+		for _stream, stream_entries in response or []:
+			entries.extend(stream_entries)
+		if not entries:
+			return 0
+		events: list[MessageSent] = []
+		malformed: list[str] = []
+		for entry_id, fields in entries:
+			try:
+				events.append(MessageSent.from_fields(entry_id, fields))
+			except (KeyError, ValueError):
+				malformed.append(entry_id)
+		done = await apply_batch(events, self.repo) if events else set()
+		to_ack = [*done, *malformed]
+		if to_ack:
+			await redis_client.xack(STREAM, GROUP, *to_ack)
+		return len(entries)
+
+	async def _ensure_group(self) -> None:
+		if self._group_ready:
+			return
+		try:
+			await redis_client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+		except Exception as exc:
+			if "BUSYGROUP" not in str(exc):
+				raise
+		self._group_ready = True
+
+	async def _reclaim(self) -> list[tuple[str, dict[str, str]]]:
+		"""Take over entries left pending by failed attempts or dead consumers."""
+
+		result = await redis_client.xautoclaim(
+			STREAM,
+			GROUP,
+			self.consumer,
+			min_idle_time=self.retry_idle_ms,
+			start_id="0-0",
+			count=self.batch_size,
+		)
+		claimed = list(result[1]) if result and len(result) > 1 else []
+		if not claimed:
+			return []
+		pending = await redis_client.xpending_range(
+			STREAM,
+			GROUP,
+			min=claimed[0][0],
+			max=claimed[-1][0],
+			count=len(claimed),
+			consumername=self.consumer,
+		)
+		attempts = {item["message_id"]: int(item["times_delivered"]) for item in pending}
+		retry: list[tuple[str, dict[str, str]]] = []
+		for entry_id, fields in claimed:
+			if attempts.get(entry_id, 0) > self.max_attempts:
+				await self._dead_letter(entry_id, fields)
+			else:
+				retry.append((entry_id, fields))
+		return retry
+
+	async def _dead_letter(self, entry_id: str, fields: dict[str, str]) -> None:
+		logger.error("chat.side_effects giving up entry=%s message=%s", entry_id, fields.get("message_id"))
+		obs_metrics.CHAT_SIDE_EFFECTS.labels(effect="entry", result="dead_letter").inc()
+		await redis_client.xadd(DEAD_LETTER_STREAM, {**fields, "entry_id": entry_id}, maxlen=_STREAM_MAXLEN, approximate=True)
+		await redis_client.xack(STREAM, GROUP, entry_id)
+
+
+def spawn_workers(count: int | None = None) -> Iterable[ChatSideEffectWorker]:
+	total = count if count is not None else settings.chat_side_effect_workers
+	prefix = f"{socket.gethostname()}-{os.getpid()}"
+	for index in range(max(0, total)):
+		yield ChatSideEffectWorker(consumer=f"{prefix}-{index}")
+
+
+__all__ = [
+	"ChatSideEffectWorker",
+	"MessageSent",
+	"apply_batch",
+	"publish",
+	"spawn_workers",
+]
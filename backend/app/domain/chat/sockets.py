@@ -9,6 +9,7 @@ import socketio
 
 from app.domain.proximity import live_sessions
 from app.infra.auth import AuthenticatedUser, _parse_token as parse_access_token
+from app.infra.ephemeral import TypingDebouncer
 from app.infra.redis import redis_client
 from app.settings import settings
 from app.obs import metrics as obs_metrics
@@ -30,6 +31,7 @@ class ChatNamespace(socketio.AsyncNamespace):
 	def __init__(self) -> None:
 		super().__init__("/chat")
 		self._sessions: Dict[str, AuthenticatedUser] = {}
+		self._typing = TypingDebouncer("chat_typing", window_seconds=settings.socket_typing_debounce_ms / 1000.0)
 
 	async def on_connect(self, sid: str, environ: dict, auth: Optional[dict] = None) -> None:
 		obs_metrics.socket_connected(self.namespace)
@@ -57,7 +59,7 @@ class ChatNamespace(socketio.AsyncNamespace):
 			raise ConnectionRefusedError("unauthenticated")
 		payload = payload or {}
 		peer_id = str(payload.get("peer_id")) if payload.get("peer_id") is not None else ""
-		if not peer_id:
+		if not peer_id or not self._typing.admit(user.id, peer_id):
 			return
 		await self.emit(
 			"chat:typing",
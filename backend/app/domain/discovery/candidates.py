@@ -0,0 +1,217 @@
+"""Precomputed friend-of-friend and shared-course candidates for the discovery feed.
+
+Each user gets a Redis ZSET (``discovery:cand:<user_id>``) holding their top-N
+candidates scored the same way the old per-request campus scan did: +2 for a
+friend of a friend, +1 for a shared course, +5 for a verified account, +1
+base. Lists are built lazily on first read and rebuilt by
+:class:`CandidateIndexWorker` when friendships or course enrolments change,
+so ``list_feed`` only pays for the page it renders.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Iterable, Optional, Sequence
+
+import asyncpg
+
+from app.infra.postgres import get_pool
+from app.infra.redis import redis_client
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DIRTY_USERS_KEY = "discovery:cand:dirty"
+DIRTY_FRIEND_GRAPH_KEY = "discovery:cand:dirty:friends"
+DIRTY_COURSES_KEY = "discovery:cand:dirty:courses"
+# Members are only ever scored >= 1, so the marker that distinguishes "built,
+# no candidates" from "never built" sits below the read range.
+_BUILT_MARKER = "_"
+_BUILT_SCORE = -1
+
+_CANDIDATES_SQL = """
+WITH me AS (
+	SELECT id, campus_id FROM users WHERE id = $1 AND deleted_at IS NULL
+),
+my_friends AS (
+	SELECT friend_id FROM friendships WHERE user_id = $1 AND status = 'accepted'
+),
+fof AS (
+	SELECT DISTINCT f2.user_id AS id
+	FROM friendships f2
+	JOIN my_friends mf ON mf.friend_id = f2.friend_id
+	WHERE f2.status = 'accepted'
+),
+shared AS (
+	SELECT DISTINCT uc.user_id AS id
+	FROM user_courses uc
+	JOIN user_courses mine ON mine.course_code = uc.course_code AND mine.user_id = $1
+),
+related AS (
+	SELECT id FROM fof
+	UNION
+	SELECT id FROM shared
+)
+SELECT
+	u.id,
+	(CASE WHEN u.id IN (SELECT id FROM fof) THEN 2 ELSE 0 END)
+		+ (CASE WHEN u.id IN (SELECT id FROM shared) THEN 1 ELSE 0 END)
+		+ (CASE WHEN u.is_university_verified THEN 5 ELSE 0 END)
+		+ 1 AS score
+FROM related r
+JOIN users u ON u.id = r.id
+JOIN me ON me.campus_id = u.campus_id
+WHERE u.id <> $1
+	AND u.deleted_at IS NULL
+ORDER BY score DESC, u.id
+LIMIT $2
+"""
+
+
+def candidate_key(user_id: str) -> str:
+	return f"discovery:cand:{user_id}"
+
+
+async def rebuild_user(conn: asyncpg.Connection, user_id: str) -> int:
+	"""Recompute one user's candidate ZSET; returns the number of candidates stored."""
+
+	rows = await conn.fetch(_CANDIDATES_SQL, user_id, settings.discovery_candidates_top_n)
+	mapping = {str(row["id"]): float(row["score"]) for row in rows}
+	mapping[_BUILT_MARKER] = _BUILT_SCORE
+	key = candidate_key(str(user_id))
+	async with redis_client.pipeline(transaction=True) as pipe:
+		pipe.delete(key)
+		pipe.zadd(key, mapping)
+		pipe.expire(key, settings.discovery_candidates_ttl_seconds)
+		await pipe.execute()
+	return len(rows)
+
+
+async def read_candidates(user_id: str, *, limit: int) -> Optional[list[tuple[str, float]]]:
+	"""Top candidates by score, or ``None`` when the user's list has not been built."""
+
+	key = candidate_key(str(user_id))
+	async with redis_client.pipeline(transaction=False) as pipe:
+		pipe.exists(key)
+		pipe.zrevrangebyscore(key, "+inf", 0, start=0, num=limit, withscores=True)
+		exists, members = await pipe.execute()
+	if not exists:
+		return None
+	return [(str(member), float(score)) for member, score in members]
+
+
+async def load_candidates(pool: asyncpg.Pool, user_id: str, *, limit: int) -> list[tuple[str, float]]:
+	"""Read the index, building it inline the first time a user asks."""
+
+	cached = await read_candidates(user_id, limit=limit)
+	if cached is not None:
+		return cached
+	async with pool.acquire() as conn:
+		await rebuild_user(conn, user_id)
+	return await read_candidates(user_id, limit=limit) or []
+
+
+async def mark_friendship_changed(*user_ids: str) -> None:
+	"""Queue both ends of a friendship change; the worker also refreshes their friends."""
+
+	ids = [str(uid) for uid in user_ids if uid]
+	if ids:
+		await redis_client.sadd(DIRTY_FRIEND_GRAPH_KEY, *ids)
+
+
+async def mark_courses_changed(user_id: str, course_codes: Iterable[str]) -> None:
+	"""Queue a user whose enrolments changed plus the courses whose members now differ."""
+
+	await redis_client.sadd(DIRTY_USERS_KEY, str(user_id))
+	codes = [code for code in course_codes if code]
+	if codes:
+		await redis_client.sadd(DIRTY_COURSES_KEY, *codes)
+
+
+class CandidateIndexWorker:
+	"""Drains the dirty queues and rebuilds the affected candidate lists."""
+
+	def __init__(self, *, poll_interval: float = 2.0, batch_size: int = 200) -> None:
+		self.poll_interval = poll_interval
+		self.batch_size = batch_size
+		self._running = False
+
+	async def run_forever(self) -> None:
+		self._running = True
+		while self._running:
+			try:
+				processed = await self.process_once()
+			except asyncio.CancelledError:
+				raise
+			except Exception:
+				logger.exception("discovery.candidates.rebuild_failed")
+				processed = 0
+			if processed == 0:
+				await asyncio.sleep(self.poll_interval)
+
+	def stop(self) -> None:
+		self._running = False
+
+	async def process_once(self) -> int:
+		graph_ids = await self._pop(DIRTY_FRIEND_GRAPH_KEY)
+		course_codes = await self._pop(DIRTY_COURSES_KEY)
+		user_ids = set(await self._pop(DIRTY_USERS_KEY))
+		if not (graph_ids or course_codes or user_ids):
+			return 0
+		pool = await get_pool()
+		async with pool.acquire() as conn:
+			if graph_ids:
+				user_ids.update(graph_ids)
+				user_ids.update(await self._friends_of(conn, graph_ids))
+			if course_codes:
+				user_ids.update(await self._course_members(conn, course_codes))
+			for user_id in user_ids:
+				await rebuild_user(conn, user_id)
+		return len(user_ids)
+
+	async def _pop(self, key: str) -> list[str]:
+		members = await redis_client.spop(key, self.batch_size)
+		return [str(member) for member in members or []]
+
+	@staticmethod
+	async def _friends_of(conn: asyncpg.Connection, user_ids: Sequence[str]) -> list[str]:
+		rows = await conn.fetch(
+			"""
+			SELECT DISTINCT friend_id
+			FROM friendships
+			WHERE user_id = ANY($1::uuid[]) AND status = 'accepted'
+			""",
+			list(user_ids),
+		)
+		return [str(row["friend_id"]) for row in rows]
+
+	@staticmethod
+	async def _course_members(conn: asyncpg.Connection, codes: Sequence[str]) -> list[str]:
+		# Cap the fan-out per course; members beyond the cap pick up the change when
+		# their list expires (discovery_candidates_ttl_seconds).
+		rows = await conn.fetch(
+			"""
+			SELECT user_id
+			FROM (
+				SELECT user_id, ROW_NUMBER() OVER (PARTITION BY course_code ORDER BY user_id) AS rn
+				FROM user_courses
+				WHERE course_code = ANY($1::text[])
+			) ranked
+			WHERE rn <= $2
+			""",
+			list(codes),
+			settings.discovery_candidates_course_fanout,
+		)
+		return [str(row["user_id"]) for row in rows]
+
+
+__all__ = [
+	"CandidateIndexWorker",
+	"candidate_key",
+	"load_candidates",
+	"mark_courses_changed",
+	"mark_friendship_changed",
+	"read_candidates",
+	"rebuild_user",
+]
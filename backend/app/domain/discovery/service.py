@@ -9,6 +9,7 @@ from datetime import date
 from typing import Optional
 from uuid import UUID
 
+from app.domain.discovery import candidates
 from app.domain.discovery.schemas import (
 	DiscoveryCard,
 	DiscoveryFeedResponse,
@@ -28,7 +29,6 @@ from app.infra.redis import redis_client
 from app.infra.postgres import get_pool
 from app.domain.xp.service import XPService
 from app.domain.xp.models import XPAction
-from app.settings import settings
 
 
 
@@ -201,7 +201,7 @@ async def list_feed(
 
 
 async def _fetch_priority_candidates(auth_user: AuthenticatedUser, limit: int) -> list[DiscoveryCard]:
-	"""Fetch candidates based on social graph (FoF) and shared courses."""
+	"""Hydrate the top friend-of-friend / shared-course candidates from the precomputed index."""
 	pool = await get_pool()
 	if not pool:
 		return []
@@ -218,58 +218,34 @@ async def _fetch_priority_candidates(auth_user: AuthenticatedUser, limit: int) -
 	except:
 		return []
 
-	settings.is_dev()
 	try:
+		ranked = await candidates.load_candidates(pool, str(auth_user_uuid), limit=limit)
+		if not ranked:
+			return []
+		order = {candidate_id: idx for idx, (candidate_id, _score) in enumerate(ranked)}
 		async with pool.acquire() as conn:
 			rows = await conn.fetch(
 				"""
-				WITH my_courses AS (
-					SELECT course_code FROM user_courses WHERE user_id = $1
-				),
-				my_friends AS (
+				WITH my_friends AS (
 					SELECT friend_id FROM friendships WHERE user_id = $1 AND status = 'accepted'
-				),
-				candidates AS (
-					SELECT u.id, u.display_name, u.handle, u.avatar_url, u.major, u.graduation_year, u.passions, u.profile_gallery, u.is_university_verified,
-						   u.gender, u.birthday, u.hometown, u.languages, u.relationship_status, u.sexual_orientation, u.looking_for, u.height, u.lifestyle, u.profile_prompts,
-						   ARRAY(SELECT course_code FROM user_courses WHERE user_id = u.id) as courses,
-						   CASE 
-							   WHEN EXISTS (
-								   SELECT 1 FROM friendships f2 
-								   WHERE f2.user_id = u.id AND f2.friend_id IN (SELECT friend_id FROM my_friends)
-							   ) THEN true 
-							   ELSE false 
-						   END as is_fof,
-						   CASE 
-							   WHEN EXISTS (
-								   SELECT 1 FROM friendships f2 
-								   WHERE f2.user_id = u.id AND f2.friend_id IN (SELECT friend_id FROM my_friends)
-							   ) THEN 2 
-							   ELSE 0 
-						   END +
-						   CASE 
-							   WHEN EXISTS (
-								   SELECT 1 FROM user_courses uc 
-								   WHERE uc.user_id = u.id AND uc.course_code IN (SELECT course_code FROM my_courses)
-							   ) THEN 1 
-							   ELSE 0 
-						   END +
-						   CASE
-							   WHEN u.is_university_verified THEN 5
-							   ELSE 0
-						   END +
-						   1 as score
-					FROM users u
-					WHERE u.campus_id = $2
-					  AND u.id != $1
-					  AND u.deleted_at IS NULL
 				)
-				SELECT * FROM candidates WHERE score > 0 ORDER BY score DESC LIMIT $3
+				SELECT u.id, u.display_name, u.handle, u.avatar_url, u.major, u.graduation_year, u.passions, u.profile_gallery, u.is_university_verified,
+					   u.gender, u.birthday, u.hometown, u.languages, u.relationship_status, u.sexual_orientation, u.looking_for, u.height, u.lifestyle, u.profile_prompts,
+					   ARRAY(SELECT course_code FROM user_courses WHERE user_id = u.id) as courses,
+					   EXISTS (
+						   SELECT 1 FROM friendships f2
+						   WHERE f2.user_id = u.id AND f2.status = 'accepted' AND f2.friend_id IN (SELECT friend_id FROM my_friends)
+					   ) as is_fof
+				FROM users u
+				WHERE u.id = ANY($2::uuid[])
+				  AND u.campus_id = $3
+				  AND u.deleted_at IS NULL
 				""",
 				auth_user_uuid,
+				list(order),
 				campus_id,
-				limit,
 			)
+			rows = sorted(rows, key=lambda row: order.get(str(row["id"]), len(order)))
 			
 			cards: list[DiscoveryCard] = []
 			for row in rows:
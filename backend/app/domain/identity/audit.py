@@ -7,7 +7,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
-from app.domain.identity import models, policy
+from app.domain.identity import audit_writer, models, policy
 from app.infra.postgres import get_pool
 from app.infra.redis import redis_client
 from app.obs import metrics as obs_metrics
@@ -34,7 +34,8 @@ async def log_event(
 ) -> None:
 	"""Log an identity/security event.
 	
-	Writes to both Redis Stream (for real-time workers) and Postgres `audit_logs` (immutable record).
+	Writes to both Redis Stream (for real-time workers) and Postgres `audit_logs` (immutable record,
+	queued on the batched writer so callers never wait on the database).
 	"""
 	# 1. Stream Payload
 	payload: Dict[str, Any] = {"event": event, "ts": _now_iso()}
@@ -52,21 +53,15 @@ async def log_event(
 	except Exception:
 		logger.warning("failed to append identity audit stream event", exc_info=True)
 
-	# 2. Immutable DB Record (Phase 6 Hardening)
+	# 2. Immutable DB Record (Phase 6 Hardening). The batched writer owns the
+	# insert when it is running; otherwise (scripts, tests) write inline.
+	row = audit_writer.make_row(event, user_id=user_id, ip=ip, user_agent=user_agent, meta=meta)
+	writer = audit_writer.get_writer()
+	if writer.running:
+		writer.submit(row)
+		return
 	try:
-		pool = await get_pool()
-		async with pool.acquire() as conn:
-			await conn.execute(
-				"""
-				INSERT INTO audit_logs (user_id, event, ip_address, user_agent, meta)
-				VALUES ($1, $2, $3, $4, $5)
-				""",
-				user_id if user_id else None,
-				event,
-				ip,
-				user_agent,
-				json.dumps(meta or {}),
-			)
+		await audit_writer.copy_rows([row])
 	except Exception:
 		# Audit logging failure is CRITICAL in some regimes, but for MVP we shouldn't crash auth flow.
 		# Ideally, we'd have a fallback file logger.
@@ -0,0 +1,400 @@
+"""Buffered writer for the ``audit_logs`` table.
+
+``audit.log_event`` hands rows to :class:`AuditWriter` instead of borrowing a
+pool connection per event. The writer keeps a bounded in-process queue and
+flushes it with one ``COPY`` when ``AUDIT_WRITER_BATCH_SIZE`` rows are waiting
+or ``AUDIT_WRITER_FLUSH_MS`` has passed. Rows that cannot be queued (queue
+full) or written (COPY failed) are spilled to a Redis stream and re-copied on
+later flushes, so a slow database costs latency on the audit trail, not on
+callers. When the database rejects a batch because of its data (a dangling
+user_id, an over-long event), the batch is bisected so the good rows still
+land and each rejected row goes to a dead-letter stream instead of blocking
+the spill stream behind it. Every API process drains the spill stream, so
+drains read it through the ``audit-spill`` consumer group: each entry is handed
+to one writer, and is acked and deleted only after it has been written.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from asyncpg.exceptions import DataError, IntegrityConstraintViolationError
+from redis.exceptions import ResponseError
+
+from app.infra.postgres import get_pool
+from app.infra.redis import redis_client
+from app.obs import metrics as obs_metrics
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SPILL_STREAM = "x:identity.audit.spill"
+DEAD_LETTER_STREAM = "x:identity.audit.dead"
+SPILL_GROUP = "audit-spill"
+_SPILL_MAXLEN = 500_000
+_SPILL_POLL_SECONDS = 5.0
+# Entries left unacked this long by another writer (crashed mid-drain) are taken over.
+_SPILL_CLAIM_IDLE_MS = 60_000
+_COLUMNS = ("user_id", "event", "ip_address", "user_agent", "meta", "created_at")
+# Errors caused by a row's contents; anything else (connection loss, timeouts)
+# is treated as the database being unavailable.
+_ROW_ERRORS = (DataError, IntegrityConstraintViolationError)
+
+
+@dataclass(slots=True)
+class AuditRow:
+	event: str
+	user_id: Optional[str]
+	ip: Optional[str]
+	user_agent: Optional[str]
+	meta: str
+	created_at: datetime
+
+	def to_record(self) -> tuple:
+		return (self.user_id, self.event, self.ip, self.user_agent, self.meta, self.created_at)
+
+	def to_fields(self) -> dict[str, str]:
+		return {
+			"event": self.event,
+			"user_id": self.user_id or "",
+			"ip": self.ip or "",
+			"ua": self.user_agent or "",
+			"meta": self.meta,
+			"ts": self.created_at.isoformat(),
+		}
+
+	@classmethod
+	def from_fields(cls, fields: dict[str, str]) -> "AuditRow":
+		return cls(
+			event=fields["event"],
+			user_id=fields.get("user_id") or None,
+			ip=fields.get("ip") or None,
+			user_agent=fields.get("ua") or None,
+			meta=fields.get("meta") or "{}",
+			created_at=datetime.fromisoformat(fields["ts"]),
+		)
+
+
+def make_row(
+	event: str,
+	*,
+	user_id: Optional[str],
+	ip: Optional[str],
+	user_agent: Optional[str],
+	meta: Optional[dict],
+) -> AuditRow:
+	return AuditRow(
+		event=event,
+		user_id=str(user_id) if user_id else None,
+		ip=ip,
+		user_agent=user_agent,
+		meta=json.dumps(meta or {}),
+		created_at=datetime.now(timezone.utc),
+	)
+
+
+async def copy_rows(rows: list[AuditRow]) -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		await conn.copy_records_to_table("audit_logs", records=[row.to_record() for row in rows], columns=_COLUMNS)
+
+
+class CopyInterrupted(Exception):
+	"""The database became unavailable part way through an isolating copy."""
+
+	def __init__(self, remaining: list[AuditRow], rejected: list[tuple[AuditRow, Exception]]) -> None:
+		super().__init__(f"audit copy interrupted with {len(remaining)} rows unwritten")
+		self.remaining = remaining
+		self.rejected = rejected
+
+
+async def copy_isolating(rows: list[AuditRow]) -> list[tuple[AuditRow, Exception]]:
+	"""COPY ``rows``, bisecting around rows the database rejects.
+
+	Returns the rejected rows with their errors; every other row is written.
+	Raises :class:`CopyInterrupted` with the rows not yet written when a
+	non-data error occurs.
+	"""
+
+	rejected: list[tuple[AuditRow, Exception]] = []
+	pending = [rows]
+	while pending:
+		chunk = pending.pop()
+		try:
+			await copy_rows(chunk)
+		except _ROW_ERRORS as exc:
+			if len(chunk) == 1:
+				rejected.append((chunk[0], exc))
+				continue
+			middle = len(chunk) // 2
+			pending.extend((chunk[middle:], chunk[:middle]))
+		except Exception as exc:
+			remaining = chunk + [row for part in reversed(pending) for row in part]
+			raise CopyInterrupted(remaining, rejected) from exc
+	return rejected
+
+
+class AuditWriter:
+	"""Single flusher task draining a bounded queue of audit rows."""
+
+	def __init__(
+		self,
+		*,
+		max_queue: Optional[int] = None,
+		batch_size: Optional[int] = None,
+		flush_interval: Optional[float] = None,
+		consumer: Optional[str] = None,
+	) -> None:
+		self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+		self.batch_size = batch_size or settings.audit_writer_batch_size
+		self.flush_interval = flush_interval if flush_interval is not None else settings.audit_writer_flush_ms / 1000.0
+		self._queue: asyncio.Queue[AuditRow] = asyncio.Queue(maxsize=max_queue or settings.audit_writer_max_queue)
+		self._running = False
+		self._spill_tasks: set[asyncio.Task] = set()
+		self._next_spill_check = 0.0
+		self._spill_group_ready = False
+
+	@property
+	def running(self) -> bool:
+		return self._running
+
+	def submit(self, row: AuditRow) -> None:
+		"""Queue a row without waiting; overflow goes to the Redis spill stream."""
+
+		try:
+			self._queue.put_nowait(row)
+		except asyncio.QueueFull:
+			obs_metrics.AUDIT_WRITER_EVENTS.labels(result="overflow").inc()
+			task = asyncio.create_task(self._spill([row]))
+			self._spill_tasks.add(task)
+			task.add_done_callback(self._spill_tasks.discard)
+			return
+		obs_metrics.AUDIT_WRITER_EVENTS.labels(result="queued").inc()
+		obs_metrics.AUDIT_WRITER_QUEUE_DEPTH.set(self._queue.qsize())
+
+	async def run_forever(self) -> None:
+		self._running = True
+		try:
+			while self._running:
+				try:
+					batch = await self._next_batch()
+					if batch:
+						await self._write(batch)
+					if asyncio.get_running_loop().time() >= self._next_spill_check:
+						self._next_spill_check = asyncio.get_running_loop().time() + _SPILL_POLL_SECONDS
+						await self._drain_spill()
+				except asyncio.CancelledError:
+					raise
+				except Exception:
+					logger.exception("identity.audit_writer flush failed")
+					await asyncio.sleep(1.0)
+		finally:
+			self._running = False
+			await self.flush()
+
+	def stop(self) -> None:
+		self._running = False
+
+	async def flush(self) -> int:
+		"""Write everything currently queued; used on shutdown and in tests."""
+
+		written = 0
+		while not self._queue.empty():
+			batch = self._take(self.batch_size)
+			await self._write(batch)
+			written += len(batch)
+		return written
+
+	async def _next_batch(self) -> list[AuditRow]:
+		try:
+			first = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+		except asyncio.TimeoutError:
+			return []
+		batch = [first]
+		deadline = asyncio.get_running_loop().time() + self.flush_interval
+		while len(batch) < self.batch_size:
+			batch.extend(self._take(self.batch_size - len(batch)))
+			remaining = deadline - asyncio.get_running_loop().time()
+			if len(batch) >= self.batch_size or remaining <= 0:
+				break
+			try:
+				batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+			except asyncio.TimeoutError:
+				break
+		return batch
+
+	def _take(self, limit: int) -> list[AuditRow]:
+		rows: list[AuditRow] = []
+		while len(rows) < limit:
+			try:
+				rows.append(self._queue.get_nowait())
+			except asyncio.QueueEmpty:
+				break
+		return rows
+
+	async def _write(self, batch: list[AuditRow]) -> None:
+		obs_metrics.AUDIT_WRITER_QUEUE_DEPTH.set(self._queue.qsize())
+		try:
+			rejected = await copy_isolating(batch)
+		except CopyInterrupted as exc:
+			logger.warning(
+				"identity.audit_writer copy failed rows=%d; spilling to redis", len(exc.remaining), exc_info=True
+			)
+			await self._dead_letter(exc.rejected)
+			await self._spill(exc.remaining)
+			written = len(batch) - len(exc.remaining) - len(exc.rejected)
+		else:
+			await self._dead_letter(rejected)
+			written = len(batch) - len(rejected)
+		if written:
+			obs_metrics.AUDIT_WRITER_BATCH.observe(written)
+			obs_metrics.AUDIT_WRITER_EVENTS.labels(result="written").inc(written)
+
+	async def _spill(self, rows: list[AuditRow]) -> None:
+		try:
+			async with redis_client.pipeline(transaction=False) as pipe:
+				for row in rows:
+					pipe.xadd(SPILL_STREAM, row.to_fields(), maxlen=_SPILL_MAXLEN, approximate=True)
+				await pipe.execute()
+		except Exception:
+			logger.error("identity.audit_writer dropped %d audit rows", len(rows), exc_info=True)
+			obs_metrics.AUDIT_WRITER_EVENTS.labels(result="dropped").inc(len(rows))
+			return
+		obs_metrics.AUDIT_WRITER_EVENTS.labels(result="spilled").inc(len(rows))
+
+	async def _dead_letter(self, rejected: list[tuple[AuditRow, Exception]]) -> None:
+		if not rejected:
+			return
+		logger.warning("identity.audit_writer rejected %d audit rows; moving to dead letter", len(rejected))
+		try:
+			async with redis_client.pipeline(transaction=False) as pipe:
+				for row, exc in rejected:
+					fields = row.to_fields()
+					fields["error"] = f"{type(exc).__name__}: {exc}"[:500]
+					pipe.xadd(DEAD_LETTER_STREAM, fields, maxlen=_SPILL_MAXLEN, approximate=True)
+				await pipe.execute()
+		except Exception:
+			logger.error("identity.audit_writer dropped %d rejected audit rows", len(rejected), exc_info=True)
+			obs_metrics.AUDIT_WRITER_EVENTS.labels(result="dropped").inc(len(rejected))
+			return
+		obs_metrics.AUDIT_WRITER_EVENTS.labels(result="rejected").inc(len(rejected))
+
+	async def _drain_spill(self) -> int:
+		"""Re-copy spilled rows once the database accepts writes again.
+
+		Entries are acked and deleted once written or dead-lettered; if the
+		database goes away mid-drain, the unwritten entries stay pending for this
+		writer and are retried first on its next drain.
+		"""
+
+		entries = await self._read_spill()
+		if not entries:
+			return 0
+		rows: list[AuditRow] = []
+		entry_ids: dict[int, str] = {}
+		for entry_id, fields in entries:
+			try:
+				row = AuditRow.from_fields(fields)
+			except (KeyError, ValueError):
+				logger.warning("identity.audit_writer discarding malformed spill entry")
+				continue
+			rows.append(row)
+			entry_ids[id(row)] = entry_id
+		interrupted: CopyInterrupted | None = None
+		try:
+			rejected = await copy_isolating(rows) if rows else []
+		except CopyInterrupted as exc:
+			interrupted, rejected = exc, exc.rejected
+		await self._dead_letter(rejected)
+		unwritten = {entry_ids[id(row)] for row in interrupted.remaining} if interrupted else set()
+		done = [entry_id for entry_id, _ in entries if entry_id not in unwritten]
+		if done:
+			async with redis_client.pipeline(transaction=True) as pipe:
+				pipe.xack(SPILL_STREAM, SPILL_GROUP, *done)
+				pipe.xdel(SPILL_STREAM, *done)
+				await pipe.execute()
+		recovered = len(rows) - len(rejected) - (len(interrupted.remaining) if interrupted else 0)
+		if recovered:
+			obs_metrics.AUDIT_WRITER_EVENTS.labels(result="recovered").inc(recovered)
+		if interrupted is not None:
+			raise interrupted
+		return recovered
+
+	async def _read_spill(self) -> list[tuple[str, dict[str, str]]]:
+		"""This writer's unfinished entries, else abandoned ones, else new ones."""
+
+		await self._ensure_spill_group()
+		try:
+			entries = await self._live(await self._read_group("0"))
+			if not entries:
+				result = await redis_client.xautoclaim(
+					SPILL_STREAM,
+					SPILL_GROUP,
+					self.consumer,
+					min_idle_time=_SPILL_CLAIM_IDLE_MS,
+					start_id="0-0",
+					count=self.batch_size,
+				)
+				entries = await self._live(list(result[1]) if result and len(result) > 1 else [])
+			if not entries:
+				entries = await self._live(await self._read_group(">"))
+		except ResponseError as exc:
+			if "NOGROUP" not in str(exc):
+				raise
+			# The stream and its group went away, e.g. Redis restarted empty.
+			self._spill_group_ready = False
+			return []
+		return entries
+
+	async def _read_group(self, start: str) -> list[tuple[str, Optional[dict[str, str]]]]:
+		response = await redis_client.xreadgroup(SPILL_GROUP, self.consumer, {SPILL_STREAM: start}, count=self.batch_size)
+		return [entry for _stream, stream_entries in response or [] for entry in stream_entries]
+
+	async def _live(self, entries: list[tuple[str, Optional[dict[str, str]]]]) -> list[tuple[str, dict[str, str]]]:
+		"""Drop (and ack) pending entries whose data was already deleted from the stream."""
+
+		gone = [entry_id for entry_id, fields in entries if not fields]
+		if gone:
+			await redis_client.xack(SPILL_STREAM, SPILL_GROUP, *gone)
+		return [(entry_id, fields) for entry_id, fields in entries if fields]
+
+	async def _ensure_spill_group(self) -> None:
+		if self._spill_group_ready:
+			return
+		try:
+			await redis_client.xgroup_create(SPILL_STREAM, SPILL_GROUP, id="0", mkstream=True)
+		except ResponseError as exc:
+			if "BUSYGROUP" not in str(exc):
+				raise
+		self._spill_group_ready = True
+
+
+_WRITER: Optional[AuditWriter] = None
+
+
+def get_writer() -> AuditWriter:
+	global _WRITER
+	if _WRITER is None:
+		_WRITER = AuditWriter()
+	return _WRITER
+
+
+__all__ = [
+	"AuditRow",
+	"AuditWriter",
+	"CopyInterrupted",
+	"DEAD_LETTER_STREAM",
+	"SPILL_GROUP",
+	"SPILL_STREAM",
+	"copy_isolating",
+	"copy_rows",
+	"get_writer",
+	"make_row",
+]
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import logging
 from typing import List
 from uuid import UUID
 
+from app.domain.discovery import candidates as discovery_candidates
 from app.domain.identity import schemas
 from app.infra.postgres import get_pool
 
+logger = logging.getLogger(__name__)
+
 MCGILL_CAMPUS_ID = "c4f7d1ec-7b01-4f7b-a1cb-4ef0a1d57ae2"
 # Concordia campus ID - replace with actual UUID from your database
 # To find it: SELECT id FROM campuses WHERE name LIKE '%Concordia%';
@@ -174,15 +178,18 @@ async def set_user_courses(user_id: UUID, codes: List[str], visibility: str) ->
     async with pool.acquire() as conn:
         async with conn.transaction():
             # Delete existing courses
-            await conn.execute(
+            previous = await conn.fetch(
                 """
                 DELETE FROM user_courses
                 WHERE user_id = $1
+                RETURNING course_code
                 """,
                 user_id,
             )
-            
+            previous_codes = [row["course_code"] for row in previous]
+
             if not codes:
+                await _queue_candidate_refresh(user_id, previous_codes)
                 return []
 
             # Deduplicate and normalize course codes
@@ -206,5 +213,14 @@ async def set_user_courses(user_id: UUID, codes: List[str], visibility: str) ->
                     code,
                     visibility,
                 )
-                
+
+    await _queue_candidate_refresh(user_id, [*previous_codes, *unique_codes])
     return await get_user_courses(user_id)
+
+
+async def _queue_candidate_refresh(user_id: UUID, codes: List[str]) -> None:
+    """Shared-course discovery candidates depend on enrolments; queue a rebuild."""
+    try:
+        await discovery_candidates.mark_courses_changed(str(user_id), set(codes))
+    except Exception:
+        logger.warning("Failed to queue discovery candidate refresh", exc_info=True)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import logging
 import secrets
 from datetime import datetime, timezone
 from uuid import UUID
@@ -10,11 +11,15 @@ from uuid import UUID
 import asyncpg
 
 from app.domain.identity import audit, mailer, policy, schemas, sessions
+from app.domain.rooms import history_cache
 from app.infra.auth import AuthenticatedUser
 from app.infra.postgres import get_pool
 from app.infra.redis import redis_client
+from app.maintenance import cold_storage
 from app.obs import metrics as obs_metrics
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_PRIVACY = json.dumps(schemas.PrivacySettings().model_dump())
 
 
@@ -143,7 +148,13 @@ async def _apply_deletion(auth_user: AuthenticatedUser, mark_requested: bool, fo
 			await conn.execute("DELETE FROM meetups WHERE creator_user_id = $1", user_id)
 			
 			# Chat/messaging related (rooms must be deleted after meetups)
-			await conn.execute("DELETE FROM room_messages WHERE sender_id = $1", user_id)
+			await conn.execute("DELETE FROM chat_messages WHERE sender_id = $1", user_id)
+			touched_rooms = await conn.fetch(
+				"DELETE FROM room_messages WHERE sender_id = $1 RETURNING room_id", user_id
+			)
+			# Compacted history keeps the same messages in per-month segments
+			await cold_storage.purge_sender(conn, cold_storage.CHAT_TIER, user_id)
+			await cold_storage.purge_sender(conn, cold_storage.ROOM_TIER, user_id)
 			await conn.execute("DELETE FROM room_members WHERE user_id = $1", user_id)
 			await conn.execute("DELETE FROM rooms WHERE owner_id = $1", user_id)
 			
@@ -236,11 +247,24 @@ async def _apply_deletion(auth_user: AuthenticatedUser, mark_requested: bool, fo
 			# Hard delete the user - completely remove from database
 			await conn.execute("DELETE FROM users WHERE id = $1", user_id)
 	
+	await history_cache.invalidate(str(row["room_id"]) for row in touched_rooms)
 	if not force:
 		await redis_client.delete(_token_key(user_id))
 	await sessions.revoke_all_sessions(user_id)
 	obs_metrics.inc_identity_delete_confirm()
 	await audit.log_event("delete_hard_deleted", user_id=user_id, meta={"force": force})
+	try:
+		from app.domain.search.typeahead import publish_profile_change
+
+		await publish_profile_change(
+			user_id=str(user_id),
+			campus_id=str(auth_user.campus_id) if auth_user.campus_id else None,
+			handle=None,
+			display_name=None,
+			deleted=True,
+		)
+	except Exception:
+		logger.warning("Failed to publish typeahead profile removal", exc_info=True)
 	
 	# Return a synthetic status since user no longer exists
 	return schemas.DeletionStatus(
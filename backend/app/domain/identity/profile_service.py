@@ -455,6 +455,18 @@ async def patch_profile(auth_user: AuthenticatedUser, payload: schemas.ProfilePa
 	
 	# Invalidate profile cache after update
 	await _invalidate_profile_cache(str(auth_user.id))
+	if {"handle", "display_name", "campus_id"} & updates.keys():
+		try:
+			from app.domain.search.typeahead import publish_profile_change
+
+			await publish_profile_change(
+				user_id=str(user.id),
+				campus_id=str(user.campus_id) if user.campus_id else None,
+				handle=user.handle,
+				display_name=user.display_name,
+			)
+		except Exception:
+			logger.warning("Failed to publish typeahead profile change", exc_info=True)
 	
 	courses_for_profile = await courses_service.get_user_courses(user.id)
 	profile = _to_profile(user, [schemas.Course(code=row.code, name=row.code) for row in courses_for_profile])
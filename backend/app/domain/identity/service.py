@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import logging
 import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional
@@ -18,6 +19,8 @@ import string
 from app.settings import settings
 from app.obs import metrics as obs_metrics
 
+logger = logging.getLogger(__name__)
+
 HANDLE_ALLOWED_RE = re.compile(r"[^a-z0-9-]")
 
 VERIFICATION_TTL_SECONDS = 24 * 3600
@@ -291,6 +294,17 @@ async def register(payload: schemas.RegisterRequest, *, ip_address: str) -> sche
 			await policy.release_handle(handle)
 
 	_inc_metrics("inc_identity_register")
+	try:
+		from app.domain.search.typeahead import publish_profile_change
+
+		await publish_profile_change(
+			user_id=str(user_id),
+			campus_id=str(campus_id) if campus_id else None,
+			handle=handle,
+			display_name=display,
+		)
+	except Exception:
+		logger.warning("Failed to publish typeahead profile change", exc_info=True)
 	
 	# Send verification email
 	# if not settings.is_dev():
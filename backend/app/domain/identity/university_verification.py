@@ -157,5 +157,8 @@ async def confirm_code(user: AuthenticatedUser, code: str) -> bool:
 				"DELETE FROM university_verifications WHERE id = $1",
 				row["id"],
 			)
-			
+
+	from app.domain.xp.service import invalidate_verification
+
+	await invalidate_verification(user.id)
 	return True
@@ -25,7 +25,7 @@ from app.domain.leaderboards.schemas import LeaderboardResponseSchema, Leaderboa
 from app.infra.postgres import get_pool
 from app.infra.redis import redis_client
 from app.domain.xp.service import XPService
-from app.domain.xp.models import XPAction
+from app.domain.xp.models import XPAction, XPAward
 
 
 def _today_ymd() -> int:
@@ -160,6 +160,7 @@ class LeaderboardService:
 		# Points only accrue for users in `awarded`.
 		pool = await get_pool()
 		awarded_set = set(awarded)
+		xp_awards: list[XPAward] = []
 		async with pool.acquire() as conn:
 			for uid in user_ids:
 				try:
@@ -172,30 +173,15 @@ class LeaderboardService:
 				if uid in awarded_set:
 					points_inc = int(policy.W_ACT_PLAYED) + (int(policy.W_ACT_WON) if win_inc else 0)
 					
-					# Award XP
-					try:
-						xp_svc = XPService()
-						# GAME_PLAYED is already awarded at start in domain managers for immediate feedback
-						if win_inc:
-							await xp_svc.award_xp(user_uuid, XPAction.GAME_WON, metadata={"game": game_kind})
-							# #region agent log
-							import json as _json; open(r'c:\Users\shahb\myApplications\uniHood\.cursor\debug.log','a').write(_json.dumps({"hypothesisId":"D","location":"leaderboards/service.py:xp_won","message":"XP GAME_WON awarded","data":{"user_id":str(user_uuid),"game_kind":game_kind},"timestamp":__import__('time').time()*1000,"sessionId":"debug-session"})+'\n')
-							# #endregion
-						else:
-							# Award GAME_LOST for either a loss or a draw
-							is_draw = (winner_id is None)
-							meta = {"game": game_kind}
-							if is_draw:
-								meta["is_draw"] = True
-							await xp_svc.award_xp(user_uuid, XPAction.GAME_LOST, metadata=meta)
-							# #region agent log
-							import json as _json; open(r'c:\Users\shahb\myApplications\uniHood\.cursor\debug.log','a').write(_json.dumps({"hypothesisId":"D","location":"leaderboards/service.py:xp_lost","message":"XP GAME_LOST awarded","data":{"user_id":str(user_uuid),"game_kind":game_kind,"is_draw":is_draw},"timestamp":__import__('time').time()*1000,"sessionId":"debug-session"})+'\n')
-							# #endregion
-					except Exception as e:
-						logger.error(f"Failed to award XP for game: {e}")
-						# #region agent log
-						import json as _json; open(r'c:\Users\shahb\myApplications\uniHood\.cursor\debug.log','a').write(_json.dumps({"hypothesisId":"D","location":"leaderboards/service.py:xp_error","message":"XP award FAILED","data":{"user_id":str(user_uuid),"error":str(e)},"timestamp":__import__('time').time()*1000,"sessionId":"debug-session"})+'\n')
-						# #endregion
+					# GAME_PLAYED is already awarded at start in domain managers for immediate feedback
+					if win_inc:
+						xp_awards.append(XPAward(user_id=user_uuid, action=XPAction.GAME_WON, metadata={"game": game_kind}))
+					else:
+						# Award GAME_LOST for either a loss or a draw
+						meta = {"game": game_kind}
+						if winner_id is None:
+							meta["is_draw"] = True
+						xp_awards.append(XPAward(user_id=user_uuid, action=XPAction.GAME_LOST, metadata=meta))
 
 				logger.info(f"[record_activity_outcome] DB write: user={uid} game={game_kind} played=1 win={win_inc} points={points_inc}")
 				try:
@@ -230,6 +216,11 @@ class LeaderboardService:
 					import json as _json; open(r'c:\Users\shahb\myApplications\uniHood\.cursor\debug.log','a').write(_json.dumps({"hypothesisId":"C","location":"leaderboards/service.py:db_write_error","message":"user_game_stats INSERT error","data":{"user_id":str(user_uuid),"error":str(e)},"timestamp":__import__('time').time()*1000,"sessionId":"debug-session"})+'\n')
 					# #endregion
 
+		if xp_awards:
+			try:
+				await XPService().award_many(xp_awards)
+			except Exception as e:
+				logger.error(f"Failed to award XP for game: {e}")
 
 		return awarded
 
@@ -10,9 +10,11 @@ from typing import Dict, List, Optional, Sequence, Tuple
 import asyncpg
 import ulid
 
-from app.domain.rooms import attachments, models, outbox, policy, schemas, service, sockets
+from app.domain.rooms import attachments, history_cache, models, outbox, policy, receipts, schemas, service, sockets
 from app.infra.auth import AuthenticatedUser
 from app.infra.postgres import get_pool
+from app.maintenance import cold_storage
+from app.settings import settings
 
 
 class _MessageStore:
@@ -38,17 +40,19 @@ class _MessageStore:
 			return receipt
 
 	async def store_message(self, message: models.RoomMessage) -> models.RoomMessage:
+		"""Assign the next seq and append under one lock; replays return the original."""
+
 		async with self._lock:
+			key = (message.room_id, message.client_msg_id)
+			existing = self.client_index.get(key)
+			if existing is not None:
+				return existing
 			messages = self.messages.setdefault(message.room_id, [])
+			message.seq = messages[-1].seq + 1 if messages else 1
 			messages.append(message)
-			self.client_index[(message.room_id, message.client_msg_id)] = message
+			self.client_index[key] = message
 			return message
 
-	async def next_sequence(self, room_id: str) -> int:
-		async with self._lock:
-			messages = self.messages.get(room_id, [])
-			return messages[-1].seq + 1 if messages else 1
-
 	async def get_by_client(self, room_id: str, client_msg_id: str) -> Optional[models.RoomMessage]:
 		async with self._lock:
 			return self.client_index.get((room_id, client_msg_id))
@@ -72,9 +76,56 @@ class _MessageStore:
 	async def get_receipt(self, room_id: str, user_id: str) -> models.RoomReceipt:
 		return await self.get_or_create_receipt(room_id, user_id)
 
+	async def apply_receipts(self, updates: List[receipts.ReceiptUpdate]) -> List[receipts.ReceiptUpdate]:
+		applied: List[receipts.ReceiptUpdate] = []
+		for update in updates:
+			receipt = await self.get_or_create_receipt(update.room_id, update.user_id)
+			receipt.delivered_seq = max(receipt.delivered_seq, update.delivered_seq)
+			receipt.read_seq = max(receipt.read_seq, update.read_seq)
+			receipt.updated_at = datetime.now(timezone.utc)
+			applied.append(
+				receipts.ReceiptUpdate(
+					room_id=update.room_id,
+					user_id=update.user_id,
+					delivered_seq=receipt.delivered_seq,
+					read_seq=receipt.read_seq,
+				)
+			)
+		return applied
+
 
 _STORE = _MessageStore()
 
+_MESSAGE_COLUMNS = "id, room_id, seq, sender_id, client_msg_id, kind, content, media_key, media_mime, media_bytes, created_at"
+
+# History is read by keyset on (room_id, seq) only; see infra migration 0278.
+_HISTORY_SQL = {
+	("forward", False): f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id=$1 ORDER BY seq ASC LIMIT $2",
+	("forward", True): f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id=$1 AND seq>$3 ORDER BY seq ASC LIMIT $2",
+	("backward", False): f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id=$1 ORDER BY seq DESC LIMIT $2",
+	("backward", True): f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id=$1 AND seq<$3 ORDER BY seq DESC LIMIT $2",
+}
+
+_BY_CLIENT_SQL = f"SELECT {_MESSAGE_COLUMNS} FROM room_messages WHERE room_id=$1 AND client_msg_id=$2"
+
+# Bumps the room's counter and inserts in one statement. A client_msg_id that
+# lost a race returns no row (the burned seq leaves a harmless gap).
+_INSERT_MESSAGE_SQL = f"""
+WITH next_seq AS (
+	INSERT INTO room_seq (room_id, last_seq)
+	VALUES ($2, 1)
+	ON CONFLICT (room_id) DO UPDATE SET last_seq = room_seq.last_seq + 1
+	RETURNING last_seq
+)
+INSERT INTO room_messages (
+	id, room_id, seq, sender_id, client_msg_id, kind, content, media_key, media_mime, media_bytes
+)
+SELECT $1::text, $2::uuid, next_seq.last_seq, $3::uuid, $4::text, $5::text, $6::text, $7::text, $8::text, $9::int
+FROM next_seq
+ON CONFLICT (room_id, client_msg_id) DO NOTHING
+RETURNING {_MESSAGE_COLUMNS}
+"""
+
 
 def _encode_cursor(room_id: str, seq: int) -> str:
 	value = f"{room_id}:{seq}".encode()
@@ -133,14 +184,10 @@ class RoomChatRepository:
 	) -> models.RoomMessage:
 		pool = await self._get_pool()
 		if pool is None:
-			existing = await _STORE.get_by_client(room_id, payload.client_msg_id)
-			if existing:
-				return existing
-			seq = await _STORE.next_sequence(room_id)
 			message = models.RoomMessage(
 				id=str(ulid.new()),
 				room_id=room_id,
-				seq=seq,
+				seq=0,
 				sender_id=sender_id,
 				client_msg_id=payload.client_msg_id,
 				kind=payload.kind,
@@ -150,36 +197,30 @@ class RoomChatRepository:
 				media_bytes=payload.media_bytes,
 				created_at=datetime.now(timezone.utc),
 			)
-			await _STORE.store_message(message)
+			message = await _STORE.store_message(message)
 			for member in members:
 				await _STORE.get_or_create_receipt(room_id, member.user_id)
 			return message
 		async with pool.acquire() as conn:
+			existing = await conn.fetchrow(_BY_CLIENT_SQL, room_id, payload.client_msg_id)
+			if existing:
+				return _row_to_message(existing)
 			async with conn.transaction():
-				existing = await conn.fetchrow(
-					"SELECT * FROM room_messages WHERE room_id=$1 AND client_msg_id=$2",
-					room_id,
-					payload.client_msg_id,
-				)
-				if existing:
-					return _row_to_message(existing)
-				last_row = await conn.fetchrow(
-					"SELECT seq FROM room_messages WHERE room_id=$1 ORDER BY seq DESC LIMIT 1 FOR UPDATE",
-					room_id,
-				)
-				next_seq = int(last_row["seq"]) + 1 if last_row else 1
-				message_id = str(ulid.new())
-				row = await conn.fetchrow(
-					"""
-					INSERT INTO room_messages (
-						id, room_id, seq, sender_id, client_msg_id, kind, content, media_key, media_mime, media_bytes
+				if members:
+					await conn.execute(
+						"""
+						INSERT INTO room_receipts (room_id, user_id, delivered_seq, read_seq)
+						SELECT $1::uuid, member_id, 0, 0 FROM unnest($2::uuid[]) AS member_id
+						ON CONFLICT (room_id, user_id) DO NOTHING
+						""",
+						room_id,
+						[member.user_id for member in members],
 					)
-					VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10)
-					RETURNING *
-					""",
-					message_id,
+				# Allocate last so the room_seq row lock is held only until commit.
+				row = await conn.fetchrow(
+					_INSERT_MESSAGE_SQL,
+					str(ulid.new()),
 					room_id,
-					next_seq,
 					sender_id,
 					payload.client_msg_id,
 					payload.kind,
@@ -188,17 +229,13 @@ class RoomChatRepository:
 					payload.media_mime,
 					payload.media_bytes,
 				)
-				if members:
-					values = [(room_id, member.user_id) for member in members]
-					await conn.executemany(
-						"""
-						INSERT INTO room_receipts (room_id, user_id, delivered_seq, read_seq)
-						VALUES ($1,$2,0,0)
-						ON CONFLICT (room_id, user_id) DO NOTHING
-						""",
-						values,
-					)
-			return _row_to_message(row)
+			if row is None:
+				# A concurrent retry with the same client_msg_id won the insert.
+				row = await conn.fetchrow(_BY_CLIENT_SQL, room_id, payload.client_msg_id)
+				return _row_to_message(row)
+		message = _row_to_message(row)
+		await history_cache.append(message)
+		return message
 
 	async def fetch_messages(
 		self,
@@ -211,37 +248,79 @@ class RoomChatRepository:
 		pool = await self._get_pool()
 		if pool is None:
 			return await self._fetch_messages_memory(room_id, direction=direction, anchor=anchor, limit=limit)
+		cached = await history_cache.read(room_id, direction=direction, anchor=anchor, limit=limit)
+		if cached is not None:
+			return cached
+		# A miss on the newest page (room open) reads a full cache window and
+		# refills the hot tail so the next open is served from Redis.
+		refill = direction != "forward" and anchor is None
+		fetch_limit = max(limit, settings.room_history_cache_size) if refill else limit
+		version = await history_cache.version(room_id) if refill else None
 		async with pool.acquire() as conn:
 			if direction == "forward":
-				if anchor is None:
-					rows = await conn.fetch(
-						"SELECT * FROM room_messages WHERE room_id=$1 ORDER BY seq ASC LIMIT $2",
-						room_id,
-						limit,
-					)
-				else:
-					rows = await conn.fetch(
-						"SELECT * FROM room_messages WHERE room_id=$1 AND seq>$2 ORDER BY seq ASC LIMIT $3",
-						room_id,
-						anchor,
-						limit,
-					)
-			else:
-				if anchor is None:
-					rows = await conn.fetch(
-						"SELECT * FROM room_messages WHERE room_id=$1 ORDER BY seq DESC LIMIT $2",
-						room_id,
-						limit,
-					)
-				else:
-					rows = await conn.fetch(
-						"SELECT * FROM room_messages WHERE room_id=$1 AND seq<$2 ORDER BY seq DESC LIMIT $3",
-						room_id,
-						anchor,
-						limit,
-					)
-				rows = list(reversed(rows))
-		return [_row_to_message(row) for row in rows]
+				# Older months may have been compacted into segments; they precede
+				# every hot row, so read them first.
+				messages = await self._cold_forward(conn, room_id, after=anchor or 0, limit=limit)
+				if messages:
+					anchor = messages[-1].seq
+				remaining = limit - len(messages)
+				if remaining > 0:
+					sql = _HISTORY_SQL[("forward", anchor is not None)]
+					params: list[object] = [room_id, remaining]
+					if anchor is not None:
+						params.append(anchor)
+					messages.extend(_row_to_message(row) for row in await conn.fetch(sql, *params))
+				return messages
+			sql = _HISTORY_SQL[("backward", anchor is not None)]
+			params = [room_id, fetch_limit]
+			if anchor is not None:
+				params.append(anchor)
+			messages = [_row_to_message(row) for row in await conn.fetch(sql, *params)]
+			if len(messages) < fetch_limit:
+				before = messages[-1].seq if messages else anchor
+				messages.extend(await self._cold_backward(conn, room_id, before=before, limit=fetch_limit - len(messages)))
+		messages.reverse()
+		if refill:
+			await history_cache.fill(room_id, messages, version=version)
+		return messages[-limit:]
+
+	async def _cold_forward(self, conn: asyncpg.Connection, room_id: str, *, after: int, limit: int) -> List[models.RoomMessage]:
+		found: List[models.RoomMessage] = []
+		while len(found) < limit:
+			loaded = await cold_storage.load_segments(
+				conn, cold_storage.ROOM_TIER, room_id, where="AND last_seq > $2", params=(after,), order="last_seq ASC"
+			)
+			if not loaded:
+				break
+			segment, records = loaded[0]
+			found.extend(models.RoomMessage(**record) for record in records if record["seq"] > after)
+			found = found[:limit]
+			after = int(segment["last_seq"])
+		return found
+
+	async def _cold_backward(
+		self,
+		conn: asyncpg.Connection,
+		room_id: str,
+		*,
+		before: Optional[int],
+		limit: int,
+	) -> List[models.RoomMessage]:
+		"""Newest-first continuation into compacted segments."""
+
+		found: List[models.RoomMessage] = []
+		while len(found) < limit:
+			where, params = ("AND first_seq < $2", (before,)) if before is not None else ("", ())
+			loaded = await cold_storage.load_segments(
+				conn, cold_storage.ROOM_TIER, room_id, where=where, params=params, order="last_seq DESC"
+			)
+			if not loaded:
+				break
+			segment, records = loaded[0]
+			older = [models.RoomMessage(**record) for record in reversed(records) if before is None or record["seq"] < before]
+			found.extend(older[: limit - len(found)])
+			before = int(segment["first_seq"])
+		return found
 
 	async def _fetch_messages_memory(
 		self,
@@ -302,6 +381,49 @@ class RoomChatRepository:
 			return int(row["read_seq"]) if row else seq
 
 
+	async def apply_receipts(self, updates: List[receipts.ReceiptUpdate]) -> List[receipts.ReceiptUpdate]:
+		"""Upsert a coalesced batch of receipts (one row per room/user) in one statement."""
+
+		pool = await self._get_pool()
+		if pool is None:
+			return await _STORE.apply_receipts(updates)
+		async with pool.acquire() as conn:
+			rows = await conn.fetch(
+				"""
+				INSERT INTO room_receipts (room_id, user_id, delivered_seq, read_seq)
+				SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::bigint[], $4::bigint[])
+				ON CONFLICT (room_id, user_id)
+				DO UPDATE SET
+					delivered_seq = GREATEST(room_receipts.delivered_seq, EXCLUDED.delivered_seq),
+					read_seq = GREATEST(room_receipts.read_seq, EXCLUDED.read_seq)
+				RETURNING room_id, user_id, delivered_seq, read_seq
+				""",
+				[update.room_id for update in updates],
+				[update.user_id for update in updates],
+				[update.delivered_seq for update in updates],
+				[update.read_seq for update in updates],
+			)
+		return [
+			receipts.ReceiptUpdate(
+				room_id=str(row["room_id"]),
+				user_id=str(row["user_id"]),
+				delivered_seq=int(row["delivered_seq"]),
+				read_seq=int(row["read_seq"]),
+			)
+			for row in rows
+		]
+
+
+_RECEIPTS: Optional[receipts.ReceiptCoalescer] = None
+
+
+def get_receipt_coalescer() -> receipts.ReceiptCoalescer:
+	global _RECEIPTS
+	if _RECEIPTS is None:
+		_RECEIPTS = receipts.ReceiptCoalescer(RoomChatRepository().apply_receipts)
+	return _RECEIPTS
+
+
 class RoomChatService:
 	def __init__(self, *, room_service: service.RoomService | None = None) -> None:
 		self._room_service = room_service or service.RoomService()
@@ -326,12 +448,16 @@ class RoomChatService:
 			members=members,
 		)
 		await sockets.emit_message("room_msg_new", room_id, message.to_dict())
-		delivered = await self._repo.update_delivered(room_id, auth_user.id, message.seq)
-		await sockets.emit_user_event(
-			auth_user.id,
-			"room:msg:delivered",
-			{"room_id": room_id, "user_id": auth_user.id, "up_to_seq": delivered},
-		)
+		coalescer = get_receipt_coalescer()
+		if coalescer.running:
+			coalescer.record_delivered(room_id, auth_user.id, message.seq)
+		else:
+			delivered = await self._repo.update_delivered(room_id, auth_user.id, message.seq)
+			await sockets.emit_user_event(
+				auth_user.id,
+				"room:msg:delivered",
+				{"room_id": room_id, "user_id": auth_user.id, "up_to_seq": delivered},
+			)
 		await outbox.append_room_chat_event(
 			"msg_new",
 			room_id=room_id,
@@ -375,6 +501,10 @@ class RoomChatService:
 		payload: schemas.ReadRequest,
 	) -> None:
 		await self._room_service._require_member(room_id, auth_user.id)
+		coalescer = get_receipt_coalescer()
+		if coalescer.running:
+			coalescer.record_read(room_id, auth_user.id, payload.up_to_seq)
+			return
 		up_to = await self._repo.update_read(room_id, auth_user.id, payload.up_to_seq)
 		await sockets.emit_message(
 			"room_msg_read",
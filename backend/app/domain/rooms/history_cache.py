@@ -0,0 +1,177 @@
+"""Redis hot tail of recent room messages.
+
+Room opens and socket reconnects almost always ask for the newest page or for
+"everything after the seq I last saw". Both are answered from a per-room Redis
+list holding the last ``ROOM_HISTORY_CACHE_SIZE`` messages. The list is only
+created by a history read that missed (so idle rooms never occupy memory) and
+is extended on send with ``RPUSHX``. A cached window is only trusted when its
+seqs are contiguous; anything else falls back to Postgres and refills.
+
+Every append bumps a per-room version counter. A refill passes the version it
+saw before reading Postgres and is dropped if a send landed in between, so a
+slow refill never overwrites a message appended after its snapshot.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from redis.exceptions import WatchError
+
+from app.domain.rooms import models
+from app.infra.redis import redis_client
+from app.obs import metrics as obs_metrics
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _key(room_id: str) -> str:
+	return f"room:tail:{room_id}"
+
+
+def _version_key(room_id: str) -> str:
+	return f"room:tail:{room_id}:v"
+
+
+def _encode(message: models.RoomMessage) -> str:
+	return json.dumps(message.to_dict(), separators=(",", ":"))
+
+
+def _decode(raw: str) -> models.RoomMessage:
+	data = json.loads(raw)
+	data["created_at"] = datetime.fromisoformat(data["created_at"])
+	return models.RoomMessage(**data)
+
+
+async def append(message: models.RoomMessage) -> None:
+	"""Extend a room's cached tail; a room without one is left uncached."""
+
+	key = _key(message.room_id)
+	version_key = _version_key(message.room_id)
+	try:
+		async with redis_client.pipeline(transaction=True) as pipe:
+			pipe.incr(version_key)
+			pipe.expire(version_key, settings.room_history_cache_ttl_seconds)
+			pipe.rpushx(key, _encode(message))
+			pipe.ltrim(key, -settings.room_history_cache_size, -1)
+			pipe.expire(key, settings.room_history_cache_ttl_seconds)
+			await pipe.execute()
+	except Exception:
+		logger.warning("rooms.history_cache append failed room=%s", message.room_id, exc_info=True)
+
+
+async def version(room_id: str) -> Optional[str]:
+	"""Snapshot of the room's append counter; pass it to :func:`fill`."""
+
+	try:
+		return await redis_client.get(_version_key(room_id))
+	except Exception:
+		logger.warning("rooms.history_cache version read failed room=%s", room_id, exc_info=True)
+		return None
+
+
+async def fill(room_id: str, messages: Iterable[models.RoomMessage], *, version: Optional[str]) -> None:
+	"""Replace a room's cached tail with the newest messages read from Postgres.
+
+	Skipped when an append (or invalidation) happened since ``version`` was taken.
+	"""
+
+	encoded = [_encode(message) for message in sorted(messages, key=lambda m: m.seq)][-settings.room_history_cache_size :]
+	if not encoded:
+		return
+	key = _key(room_id)
+	version_key = _version_key(room_id)
+	try:
+		async with redis_client.pipeline(transaction=True) as pipe:
+			await pipe.watch(version_key)
+			if await pipe.get(version_key) != version:
+				obs_metrics.ROOM_HISTORY_CACHE.labels(result="fill_skipped").inc()
+				return
+			pipe.multi()
+			pipe.delete(key)
+			pipe.rpush(key, *encoded)
+			pipe.expire(key, settings.room_history_cache_ttl_seconds)
+			await pipe.execute()
+	except WatchError:
+		obs_metrics.ROOM_HISTORY_CACHE.labels(result="fill_skipped").inc()
+	except Exception:
+		logger.warning("rooms.history_cache fill failed room=%s", room_id, exc_info=True)
+
+
+async def invalidate(room_ids: Iterable[str]) -> None:
+	"""Drop cached tails (e.g. after messages were deleted) and void in-flight refills."""
+
+	rooms = sorted({str(room_id) for room_id in room_ids})
+	if not rooms:
+		return
+	try:
+		async with redis_client.pipeline(transaction=True) as pipe:
+			for room_id in rooms:
+				pipe.delete(_key(room_id))
+				pipe.incr(_version_key(room_id))
+				pipe.expire(_version_key(room_id), settings.room_history_cache_ttl_seconds)
+			await pipe.execute()
+	except Exception:
+		logger.warning("rooms.history_cache invalidate failed rooms=%d", len(rooms), exc_info=True)
+
+
+async def read(
+	room_id: str,
+	*,
+	direction: str,
+	anchor: Optional[int],
+	limit: int,
+) -> Optional[List[models.RoomMessage]]:
+	"""Answer a history page from the cached tail, or ``None`` when it can't."""
+
+	try:
+		raw = await redis_client.lrange(_key(room_id), 0, -1)
+	except Exception:
+		logger.warning("rooms.history_cache read failed room=%s", room_id, exc_info=True)
+		raw = []
+	cached: dict[int, models.RoomMessage] = {}
+	for item in raw:
+		try:
+			message = _decode(item)
+		except (KeyError, TypeError, ValueError):
+			cached = {}
+			break
+		cached[message.seq] = message
+	page = _select(sorted(cached.values(), key=lambda m: m.seq), direction=direction, anchor=anchor, limit=limit)
+	obs_metrics.ROOM_HISTORY_CACHE.labels(result="hit" if page is not None else "miss").inc()
+	return page
+
+
+def _select(
+	tail: List[models.RoomMessage],
+	*,
+	direction: str,
+	anchor: Optional[int],
+	limit: int,
+) -> Optional[List[models.RoomMessage]]:
+	if not tail:
+		return None
+	first_seq = tail[0].seq
+	if tail[-1].seq - first_seq + 1 != len(tail):
+		# A push was lost or landed out of order; the gap could hide messages.
+		return None
+	complete = first_seq == 1
+	if direction == "forward":
+		if anchor is None:
+			return tail[:limit] if complete else None
+		if anchor + 1 < first_seq:
+			return None
+		return [m for m in tail if m.seq > anchor][:limit]
+	if anchor is not None and anchor > tail[-1].seq + 1:
+		return None
+	older = [m for m in tail if anchor is None or m.seq < anchor]
+	if len(older) < limit and not complete:
+		return None
+	return older[-limit:]
+
+
+__all__ = ["append", "fill", "invalidate", "read", "version"]
@@ -0,0 +1,148 @@
+"""Coalesced room read/delivery receipts.
+
+Clients acknowledge reads as they scroll and every send bumps the sender's
+delivered watermark, so a busy room produces a receipt write and a broadcast
+per message per member. :class:`ReceiptCoalescer` keeps the highest pending
+seq per (room, user) and flushes every ``ROOM_RECEIPTS_FLUSH_MS`` with one
+upsert for the whole batch, then emits one ``room:msg:delivered`` and/or one
+``room_msg_read`` per key, for whichever kinds were recorded (a key with both
+pending gets both events). Older seqs for a key are superseded in place, and a
+full buffer triggers an early flush instead of growing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.domain.rooms import outbox, sockets
+from app.obs import metrics as obs_metrics
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ReceiptUpdate:
+	room_id: str
+	user_id: str
+	delivered_seq: int = 0
+	read_seq: int = 0
+
+
+ApplyReceipts = Callable[[List[ReceiptUpdate]], Awaitable[List[ReceiptUpdate]]]
+
+
+class ReceiptCoalescer:
+	"""Single flusher task for pending room receipts (max seq wins)."""
+
+	def __init__(
+		self,
+		apply: ApplyReceipts,
+		*,
+		flush_interval: Optional[float] = None,
+		max_pending: Optional[int] = None,
+	) -> None:
+		self._apply = apply
+		self.flush_interval = flush_interval if flush_interval is not None else settings.room_receipts_flush_ms / 1000.0
+		self.max_pending = max_pending or settings.room_receipts_max_pending
+		self._pending: Dict[Tuple[str, str], ReceiptUpdate] = {}
+		self._delivered: Set[Tuple[str, str]] = set()
+		self._wake = asyncio.Event()
+		self._running = False
+
+	@property
+	def running(self) -> bool:
+		return self._running
+
+	def record_read(self, room_id: str, user_id: str, seq: int) -> None:
+		update = self._entry(room_id, user_id, "read")
+		update.read_seq = max(update.read_seq, seq)
+		update.delivered_seq = max(update.delivered_seq, seq)
+
+	def record_delivered(self, room_id: str, user_id: str, seq: int) -> None:
+		update = self._entry(room_id, user_id, "delivered")
+		update.delivered_seq = max(update.delivered_seq, seq)
+		self._delivered.add((room_id, user_id))
+
+	def _entry(self, room_id: str, user_id: str, kind: str) -> ReceiptUpdate:
+		key = (room_id, user_id)
+		update = self._pending.get(key)
+		if update is None:
+			update = ReceiptUpdate(room_id=room_id, user_id=user_id)
+			self._pending[key] = update
+			obs_metrics.EPHEMERAL_EVENTS.labels(kind=f"room_{kind}", result="queued").inc()
+			if len(self._pending) >= self.max_pending:
+				self._wake.set()
+		else:
+			obs_metrics.EPHEMERAL_EVENTS.labels(kind=f"room_{kind}", result="merged").inc()
+		return update
+
+	async def run_forever(self) -> None:
+		self._running = True
+		try:
+			while self._running:
+				try:
+					await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+				except asyncio.TimeoutError:
+					pass
+				self._wake.clear()
+				try:
+					await self.flush()
+				except asyncio.CancelledError:
+					raise
+				except Exception:
+					logger.exception("rooms.receipts flush failed")
+		finally:
+			self._running = False
+			await self.flush()
+
+	def stop(self) -> None:
+		self._running = False
+		self._wake.set()
+
+	async def flush(self) -> int:
+		if not self._pending:
+			return 0
+		batch = list(self._pending.values())
+		self._pending = {}
+		delivered, self._delivered = self._delivered, set()
+		reads = {(u.room_id, u.user_id) for u in batch if u.read_seq}
+		try:
+			applied = await self._apply(batch)
+		except Exception:
+			# Requeue so the next flush retries; newer receipts still win.
+			for update in batch:
+				if update.read_seq:
+					self.record_read(update.room_id, update.user_id, update.read_seq)
+				if (update.room_id, update.user_id) in delivered:
+					self.record_delivered(update.room_id, update.user_id, update.delivered_seq)
+			raise
+		for update in applied:
+			key = (update.room_id, update.user_id)
+			if key in delivered:
+				await sockets.emit_user_event(
+					update.user_id,
+					"room:msg:delivered",
+					{"room_id": update.room_id, "user_id": update.user_id, "up_to_seq": update.delivered_seq},
+				)
+			if key in reads:
+				await sockets.emit_message(
+					"room_msg_read",
+					update.room_id,
+					{"room_id": update.room_id, "user_id": update.user_id, "up_to_seq": update.read_seq},
+				)
+				await outbox.append_room_chat_event(
+					"msg_read",
+					room_id=update.room_id,
+					msg_id="",
+					seq=update.read_seq,
+					user_id=update.user_id,
+				)
+		obs_metrics.EPHEMERAL_EVENTS.labels(kind="room_receipts", result="flushed").inc(len(applied))
+		return len(applied)
+
+
+__all__ = ["ApplyReceipts", "ReceiptCoalescer", "ReceiptUpdate"]
@@ -9,6 +9,7 @@ import socketio
 
 from app.domain.rooms import policy
 from app.infra.auth import AuthenticatedUser, _parse_token as parse_access_token
+from app.infra.ephemeral import TypingDebouncer
 from app.infra.redis import redis_client
 from app.settings import settings
 from app.obs import metrics as obs_metrics
@@ -30,6 +31,7 @@ class RoomsNamespace(socketio.AsyncNamespace):
 	def __init__(self) -> None:
 		super().__init__("/rooms")
 		self._sessions: Dict[str, AuthenticatedUser] = {}
+		self._typing = TypingDebouncer("room_typing", window_seconds=settings.socket_typing_debounce_ms / 1000.0)
 
 	async def on_connect(self, sid: str, environ: dict, auth: Optional[dict] = None) -> None:
 		obs_metrics.socket_connected(self.namespace)
@@ -77,6 +79,8 @@ class RoomsNamespace(socketio.AsyncNamespace):
 		if not room_id:
 			return
 		on_flag = bool(payload.get("on", True))
+		if not self._typing.admit(user.id, room_id, state=on_flag):
+			return
 		await policy.enforce_typing_limit(user.id)
 		await self.emit(
 			"room_typing",
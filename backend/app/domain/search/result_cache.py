@@ -0,0 +1,160 @@
+"""Two-tier (process LRU + Redis) cache for viewer-independent search results.
+
+Entries are keyed by result kind, campus, normalized query and ranking
+coefficient version, never by viewer, so callers must apply per-viewer state
+(blocks, friendship flags) after reading from the cache. Concurrent misses on
+the same key share a single loader task.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Mapping
+
+from app.infra.redis import redis_client
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT_LOCAL = "hit_local"
+CACHE_HIT_REDIS = "hit_redis"
+CACHE_COALESCED = "coalesced"
+CACHE_MISS = "miss"
+CACHE_BYPASS = "bypass"
+
+_NAMESPACE = "search:cache:v1"
+_MISSING = object()
+
+
+def normalize_query(value: str | None) -> str:
+	"""Collapse whitespace and case so equivalent queries share a cache entry."""
+
+	return " ".join((value or "").split()).casefold()
+
+
+def coefficient_version(coeff: Mapping[str, float]) -> str:
+	"""Short stable digest of ranking coefficients; a flag change rolls the key space."""
+
+	raw = ",".join(f"{key}={float(coeff[key]):.6g}" for key in sorted(coeff))
+	return hashlib.blake2b(raw.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def summarize(outcomes: list[str]) -> str:
+	"""Collapse per-part outcomes (e.g. multi-search buckets) into one label."""
+
+	if not outcomes:
+		return CACHE_BYPASS
+	if all(outcome in (CACHE_HIT_LOCAL, CACHE_HIT_REDIS, CACHE_COALESCED) for outcome in outcomes):
+		return CACHE_HIT_REDIS if CACHE_HIT_REDIS in outcomes else CACHE_HIT_LOCAL
+	if all(outcome == CACHE_BYPASS for outcome in outcomes):
+		return CACHE_BYPASS
+	return CACHE_MISS
+
+
+class SearchResultCache:
+	"""Short-TTL result cache; values must be JSON-serializable."""
+
+	def __init__(
+		self,
+		*,
+		max_entries: int | None = None,
+		local_ttl: float | None = None,
+		redis_ttl: float | None = None,
+	) -> None:
+		self.max_entries = max_entries if max_entries is not None else settings.search_cache_max_entries
+		self.local_ttl = local_ttl if local_ttl is not None else settings.search_cache_local_ttl_seconds
+		self.redis_ttl = redis_ttl if redis_ttl is not None else settings.search_cache_redis_ttl_seconds
+		self._local: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+		self._inflight: dict[str, asyncio.Task] = {}
+
+	@staticmethod
+	def make_key(kind: str, *parts: object) -> str:
+		raw = "\x1f".join("" if part is None else str(part) for part in parts)
+		digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+		return f"{kind}:{digest}"
+
+	async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> tuple[Any, str]:
+		"""Return ``(value, outcome)`` where outcome is one of the ``CACHE_*`` labels."""
+
+		if not settings.search_cache_enabled:
+			return await loader(), CACHE_BYPASS
+		value = self._get_local(key)
+		if value is not _MISSING:
+			return value, CACHE_HIT_LOCAL
+		task = self._inflight.get(key)
+		if task is not None:
+			value, _ = await asyncio.shield(task)
+			return value, CACHE_COALESCED
+		task = asyncio.create_task(self._load(key, loader))
+		self._inflight[key] = task
+		task.add_done_callback(lambda done: self._finish(key, done))
+		# Shielded so a caller hitting its deadline does not abort the shared load;
+		# the result still lands in the cache for the next request.
+		return await asyncio.shield(task)
+
+	def clear(self) -> None:
+		self._local.clear()
+
+	def _finish(self, key: str, task: asyncio.Task) -> None:
+		if self._inflight.get(key) is task:
+			self._inflight.pop(key, None)
+		if not task.cancelled():
+			task.exception()
+
+	def _get_local(self, key: str) -> Any:
+		entry = self._local.get(key)
+		if entry is None:
+			return _MISSING
+		expires_at, value = entry
+		if expires_at <= time.monotonic():
+			self._local.pop(key, None)
+			return _MISSING
+		self._local.move_to_end(key)
+		return value
+
+	def _put_local(self, key: str, value: Any) -> None:
+		if self.local_ttl <= 0 or self.max_entries <= 0:
+			return
+		self._local[key] = (time.monotonic() + self.local_ttl, value)
+		self._local.move_to_end(key)
+		while len(self._local) > self.max_entries:
+			self._local.popitem(last=False)
+
+	async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> tuple[Any, str]:
+		redis_key = f"{_NAMESPACE}:{key}"
+		if self.redis_ttl > 0:
+			try:
+				raw = await redis_client.get(redis_key)
+			except Exception:
+				logger.debug("search.cache redis read failed", exc_info=True)
+				raw = None
+			if raw:
+				value = json.loads(raw)
+				self._put_local(key, value)
+				return value, CACHE_HIT_REDIS
+		value = await loader()
+		self._put_local(key, value)
+		if self.redis_ttl > 0:
+			try:
+				await redis_client.set(redis_key, json.dumps(value), px=int(self.redis_ttl * 1000))
+			except Exception:
+				logger.debug("search.cache redis write failed", exc_info=True)
+		return value, CACHE_MISS
+
+
+__all__ = [
+	"CACHE_BYPASS",
+	"CACHE_COALESCED",
+	"CACHE_HIT_LOCAL",
+	"CACHE_HIT_REDIS",
+	"CACHE_MISS",
+	"SearchResultCache",
+	"coefficient_version",
+	"normalize_query",
+	"summarize",
+]
@@ -62,11 +62,13 @@ class RoomResult(BaseModel):
 class SearchBucket(BaseModel):
 	items: list[Any]
 	next: Optional[str] = None
+	partial: bool = Field(default=False, description="Bucket missed the request deadline or failed")
 
 
 class MultiSearchResponse(BaseModel):
 	q: str
 	buckets: dict[str, SearchBucket]
+	partial: bool = Field(default=False, description="At least one bucket is incomplete")
 
 
 T = TypeVar("T")
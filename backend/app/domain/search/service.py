@@ -10,17 +10,18 @@ import math
 import time
 from datetime import datetime, timezone
 from uuid import UUID
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from difflib import SequenceMatcher
 from typing import Iterable, Optional
 
 import asyncpg
 from app.domain.identity import flags as flag_service
-from app.domain.search import indexing, models, policy, ranking, schemas
+from app.domain.search import indexing, models, policy, ranking, result_cache, schemas, typeahead
 from app.infra.auth import AuthenticatedUser
 from app.infra.postgres import get_pool
 from app.infra.redis import redis_client
 from app.obs import metrics as obs_metrics
+from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,26 @@ class _BucketCursor:
 	entity_id: str
 
 
+@dataclass(slots=True)
+class _MultiSearchContext:
+	"""Per-request inputs shared by every multi-search bucket."""
+
+	query: str
+	campus_id: UUID | None
+	limit: int
+	coeff: dict[str, float]
+	blocked_ids: list[UUID]
+
+
+# Stored tsvector column per multi-search bucket, and the per-row expression it
+# is generated from (used until infra migration 0275 has added the column).
+_BUCKET_TSV = {
+	"people": ("u.search_tsv", "to_tsvector('english', coalesce(u.display_name, '') || ' ' || coalesce(u.bio, ''))"),
+	"rooms": ("r.search_tsv", "to_tsvector('english', coalesce(r.name, ''))"),
+	"posts": ("p.search_tsv", "to_tsvector('english', coalesce(p.body, ''))"),
+}
+
+
 def _similarity(a: str, b: str) -> float:
 	"""Approximate trigram similarity using SequenceMatcher for in-memory mode."""
 
@@ -318,6 +339,25 @@ class _MemorySearchStore:
 _MEMORY = _MemorySearchStore()
 
 
+def _typeahead_user_ids(campus_id: str, normalized: str, limit: int) -> Optional[list[str]]:
+	"""Prefix hits from the in-process index, or None when the caller should scan Postgres."""
+
+	if not settings.search_typeahead_enabled:
+		return None
+	hits = typeahead.get_index().lookup(typeahead.KIND_USER, campus_id, normalized, limit=limit)
+	if not hits:
+		return None
+	return [hit.entity_id for hit in hits]
+
+
+def _drop_blocked(bucket: str, items: list[dict[str, object]], blocked_ids: list[UUID]) -> list[dict[str, object]]:
+	if not blocked_ids or bucket == "rooms":
+		return list(items)
+	blocked = {str(other) for other in blocked_ids}
+	field = "id" if bucket == "people" else "author_id"
+	return [item for item in items if item.get(field) not in blocked]
+
+
 def _prepare_user_response(
 	candidates: Iterable[models.UserCandidate],
 	*,
@@ -480,6 +520,8 @@ class SearchService:
 		self._pool: Optional[asyncpg.Pool] = None
 		self._adapter = indexing.resolve_adapter()
 		self._search_coeff_cache: dict[str, tuple[float, dict[str, float]]] = {}
+		self._result_cache = result_cache.SearchResultCache()
+		self._tsv_missing: set[str] = set()
 
 	async def _load_flag_payload(self, key: str) -> dict[str, float]:
 		flag = await flag_service.get_flag(key)
@@ -531,6 +573,7 @@ class SearchService:
 		query: schemas.SearchUsersQuery,
 	) -> schemas.ListResponse[schemas.UserResult]:
 		start = time.perf_counter()
+		cache_outcome = result_cache.CACHE_BYPASS
 		try:
 			await policy.enforce_rate_limit(auth_user.id, kind="search", limit=policy.SEARCH_PER_MINUTE)
 			normalized = query.normalized_query()
@@ -556,14 +599,34 @@ class SearchService:
 				if pool is None:
 					candidates = await _MEMORY.search_users(me=user_id, campus_id=campus_id, query=normalized, limit=limit_prefetch)
 				else:
-					candidates = await self._search_users_postgres(pool, user_id, campus_id, normalized, limit_prefetch)
+					hit_ids = _typeahead_user_ids(campus_id, normalized, limit_prefetch)
+					if hit_ids is None or len(hit_ids) < limit_prefetch:
+						# Prefix hits alone would drop trigram matches (typos, mid-word
+						# overlaps), so the fuzzy match runs unless the index filled the
+						# page. It is viewer-independent; friendship, privacy and block
+						# state are hydrated per viewer below.
+						fuzzy_ids, cache_outcome = await self._result_cache.get_or_load(
+							self._result_cache.make_key("users", campus_id, result_cache.normalize_query(normalized), limit_prefetch),
+							lambda: self._match_user_ids(pool, campus_id, normalized, limit_prefetch + 1),
+						)
+						hit_ids = list(dict.fromkeys([*(hit_ids or []), *fuzzy_ids]))
+					candidates = []
+					if hit_ids:
+						candidates = await self._search_users_postgres(
+							pool,
+							user_id,
+							campus_id,
+							normalized,
+							limit_prefetch,
+							candidate_ids=hit_ids,
+						)
 
 			response = _prepare_user_response(candidates, limit=limit, cursor=cursor, normalized_query=normalized)
 			obs_metrics.inc_search_query("users")
 			logger.info("search.users campus=%s query=%s results=%d", campus_id, normalized[:24], len(response.items))
 			return response
 		finally:
-			obs_metrics.observe_search_latency("users", time.perf_counter() - start)
+			obs_metrics.observe_search_latency("users", time.perf_counter() - start, cache=cache_outcome)
 
 	async def discover_people(
 		self,
@@ -571,6 +634,7 @@ class SearchService:
 		query: schemas.DiscoverPeopleQuery,
 	) -> schemas.ListResponse[schemas.UserResult]:
 		start = time.perf_counter()
+		cache_outcome = result_cache.CACHE_BYPASS
 		try:
 			await policy.enforce_rate_limit(auth_user.id, kind="discover:people", limit=policy.DISCOVERY_PER_MINUTE)
 			limit = min(query.limit, 50)
@@ -583,14 +647,14 @@ class SearchService:
 			if pool is None:
 				candidates = await _MEMORY.discover_people(me=user_id, campus_id=campus_id, limit=limit_prefetch)
 			else:
-				candidates = await self._discover_people_postgres(pool, user_id, campus_id, limit_prefetch)
+				candidates, cache_outcome = await self._discover_people_postgres(pool, user_id, campus_id, limit_prefetch)
 
 			response = _prepare_people_response(candidates, limit=limit, cursor=cursor)
 			obs_metrics.inc_search_query("discover_people")
 			logger.info("discover.people campus=%s results=%d", campus_id, len(response.items))
 			return response
 		finally:
-			obs_metrics.observe_search_latency("discover_people", time.perf_counter() - start)
+			obs_metrics.observe_search_latency("discover_people", time.perf_counter() - start, cache=cache_outcome)
 
 	async def discover_rooms(
 		self,
@@ -598,6 +662,7 @@ class SearchService:
 		query: schemas.DiscoverRoomsQuery,
 	) -> schemas.ListResponse[schemas.RoomResult]:
 		start = time.perf_counter()
+		cache_outcome = result_cache.CACHE_BYPASS
 		try:
 			await policy.enforce_rate_limit(auth_user.id, kind="discover:rooms", limit=policy.DISCOVERY_PER_MINUTE)
 			limit = min(query.limit, 50)
@@ -611,14 +676,14 @@ class SearchService:
 				friends = await _MEMORY.friends_of(user_id)
 				candidates = await _MEMORY.discover_rooms(me=user_id, campus_id=campus_id, friends_of_me=friends, limit=limit_prefetch)
 			else:
-				candidates = await self._discover_rooms_postgres(pool, user_id, campus_id, limit_prefetch)
+				candidates, cache_outcome = await self._discover_rooms_postgres(pool, user_id, campus_id, limit_prefetch)
 
 			response = _prepare_room_response(candidates, limit=limit, cursor=cursor)
 			obs_metrics.inc_search_query("discover_rooms")
 			logger.info("discover.rooms campus=%s results=%d", campus_id, len(response.items))
 			return response
 		finally:
-			obs_metrics.observe_search_latency("discover_rooms", time.perf_counter() - start)
+			obs_metrics.observe_search_latency("discover_rooms", time.perf_counter() - start, cache=cache_outcome)
 
 	async def search_multi(
 		self,
@@ -626,6 +691,7 @@ class SearchService:
 		query: schemas.MultiSearchQuery,
 	) -> schemas.MultiSearchResponse:
 		start = time.perf_counter()
+		cache_outcomes: list[str] = []
 		try:
 			await policy.enforce_rate_limit(auth_user.id, kind="search:multi", limit=policy.SEARCH_PER_MINUTE)
 			normalized = query.q.strip()
@@ -643,43 +709,164 @@ class SearchService:
 				if len(types) != 1:
 					raise policy.SearchPolicyError("cursor_requires_single_type", status_code=400)
 				cursor_state = _decode_bucket_cursor(query.cursor)
-			coeff = await self._search_coefficients(user_id=str(auth_user.id), campus_id=campus_str)
-			buckets: dict[str, schemas.SearchBucket] = {}
-			for bucket in types:
-				bucket_cursor = cursor_state if cursor_state and len(types) == 1 else None
-				bucket_start = time.perf_counter()
-				if bucket == "people":
-					items, next_cursor = await self._search_people_bucket(
-						normalized,
-						campus_str,
-						limit_per_bucket,
-						bucket_cursor,
-						coeff,
-					)
-				elif bucket == "rooms":
-					items, next_cursor = await self._search_rooms_bucket(
-						normalized,
-						campus_str,
-						limit_per_bucket,
-						bucket_cursor,
-						coeff,
-					)
-				else:
-					items, next_cursor = await self._search_posts_bucket(
-						normalized,
-						campus_str,
-						limit_per_bucket,
-						bucket_cursor,
-						coeff,
-					)
-				duration_ms = (time.perf_counter() - bucket_start) * 1000.0
-				obs_metrics.SEARCH_QUERIES_V2.labels(type=bucket).inc()
-				obs_metrics.SEARCH_DURATION_V2.observe(duration_ms)
-				obs_metrics.SEARCH_RESULTS_AVG.labels(type=bucket).set(len(items))
-				buckets[bucket] = schemas.SearchBucket(items=items, next=next_cursor)
-			return schemas.MultiSearchResponse(q=query.q, buckets=buckets)
+			ctx = await self._multi_search_context(
+				user_id=str(auth_user.id),
+				query=normalized,
+				campus_id=campus_str,
+				limit=limit_per_bucket,
+			)
+			deadline = start + max(0.0, settings.search_multi_deadline_ms / 1000.0)
+			buckets = await self._run_buckets(types, ctx, cursor_state, deadline=deadline, cache_outcomes=cache_outcomes)
+			partial = any(bucket.partial for bucket in buckets.values())
+			return schemas.MultiSearchResponse(q=query.q, buckets=buckets, partial=partial)
 		finally:
-			obs_metrics.observe_search_latency("multi", time.perf_counter() - start)
+			obs_metrics.observe_search_latency(
+				"multi",
+				time.perf_counter() - start,
+				cache=result_cache.summarize(cache_outcomes),
+			)
+
+	async def _multi_search_context(
+		self,
+		*,
+		user_id: str,
+		query: str,
+		campus_id: str | None,
+		limit: int,
+	) -> _MultiSearchContext:
+		"""Resolve the lookups every bucket shares exactly once per request."""
+
+		campus_uuid: UUID | None = None
+		if campus_id:
+			try:
+				campus_uuid = UUID(campus_id)
+			except ValueError:
+				campus_uuid = None
+		pool = await self._pool_or_none()
+		if pool is None:
+			coeff = await self._search_coefficients(user_id=user_id, campus_id=campus_id)
+			blocked: set[str] = set()
+		else:
+			coeff, blocked = await asyncio.gather(
+				self._search_coefficients(user_id=user_id, campus_id=campus_id),
+				self._pool_block_ids(pool, user_id),
+			)
+		blocked_ids: list[UUID] = []
+		for other in blocked:
+			try:
+				blocked_ids.append(UUID(other))
+			except ValueError:
+				continue
+		return _MultiSearchContext(
+			query=query,
+			campus_id=campus_uuid,
+			limit=limit,
+			coeff=coeff,
+			blocked_ids=blocked_ids,
+		)
+
+	async def _run_buckets(
+		self,
+		types: list[str],
+		ctx: _MultiSearchContext,
+		cursor: _BucketCursor | None,
+		*,
+		deadline: float,
+		cache_outcomes: list[str] | None = None,
+	) -> dict[str, schemas.SearchBucket]:
+		"""Fan the bucket queries out concurrently and collect whatever finishes by the deadline."""
+
+		bucket_cursor = cursor if len(types) == 1 else None
+		tasks = {
+			bucket: asyncio.create_task(self._run_bucket(bucket, ctx, bucket_cursor, cache_outcomes=cache_outcomes))
+			for bucket in types
+		}
+		timeout = max(0.0, deadline - time.perf_counter())
+		_done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+		for task in pending:
+			task.cancel()
+		if pending:
+			await asyncio.gather(*pending, return_exceptions=True)
+		buckets: dict[str, schemas.SearchBucket] = {}
+		for bucket, task in tasks.items():
+			if task in pending:
+				obs_metrics.SEARCH_BUCKET_INCOMPLETE.labels(type=bucket, reason="timeout").inc()
+				logger.warning("search.multi bucket=%s timed out", bucket)
+				buckets[bucket] = schemas.SearchBucket(items=[], next=None, partial=True)
+				continue
+			exc = task.exception()
+			if exc is not None:
+				if isinstance(exc, policy.SearchPolicyError):
+					raise exc
+				obs_metrics.SEARCH_BUCKET_INCOMPLETE.labels(type=bucket, reason="error").inc()
+				logger.warning("search.multi bucket=%s failed", bucket, exc_info=exc)
+				buckets[bucket] = schemas.SearchBucket(items=[], next=None, partial=True)
+				continue
+			items, next_cursor = task.result()
+			buckets[bucket] = schemas.SearchBucket(items=items, next=next_cursor)
+		return buckets
+
+	async def _run_bucket(
+		self,
+		bucket: str,
+		ctx: _MultiSearchContext,
+		cursor: _BucketCursor | None,
+		*,
+		cache_outcomes: list[str] | None = None,
+	) -> tuple[list[dict[str, object]], Optional[str]]:
+		bucket_start = time.perf_counter()
+		pool = await self._pool_or_none()
+		if pool is None:
+			items, next_cursor = await self._dispatch_bucket(bucket, ctx, cursor)
+			outcome = result_cache.CACHE_BYPASS
+		else:
+			items, next_cursor, outcome = await self._cached_bucket(bucket, ctx, cursor)
+		if cache_outcomes is not None:
+			cache_outcomes.append(outcome)
+		duration_ms = (time.perf_counter() - bucket_start) * 1000.0
+		obs_metrics.SEARCH_QUERIES_V2.labels(type=bucket).inc()
+		obs_metrics.SEARCH_DURATION_V2.observe(duration_ms)
+		obs_metrics.SEARCH_RESULTS_AVG.labels(type=bucket).set(len(items))
+		return items, next_cursor
+
+	async def _dispatch_bucket(
+		self,
+		bucket: str,
+		ctx: _MultiSearchContext,
+		cursor: _BucketCursor | None,
+	) -> tuple[list[dict[str, object]], Optional[str]]:
+		if bucket == "people":
+			return await self._search_people_bucket(ctx, cursor)
+		if bucket == "rooms":
+			return await self._search_rooms_bucket(ctx, cursor)
+		return await self._search_posts_bucket(ctx, cursor)
+
+	async def _cached_bucket(
+		self,
+		bucket: str,
+		ctx: _MultiSearchContext,
+		cursor: _BucketCursor | None,
+	) -> tuple[list[dict[str, object]], Optional[str], str]:
+		"""Serve a bucket from the shared result cache, then drop the viewer's blocked authors."""
+
+		query = result_cache.normalize_query(ctx.query)
+		shared = replace(ctx, query=query, blocked_ids=[])
+		key = self._result_cache.make_key(
+			f"multi:{bucket}",
+			ctx.campus_id,
+			query,
+			ctx.limit,
+			result_cache.coefficient_version(ctx.coeff),
+			_encode_bucket_cursor(cursor) if cursor else "",
+		)
+
+		async def _load() -> dict[str, object]:
+			items, next_cursor = await self._dispatch_bucket(bucket, shared, cursor)
+			return {"items": items, "next": next_cursor}
+
+		payload, outcome = await self._result_cache.get_or_load(key, _load)
+		items = _drop_blocked(bucket, payload["items"], ctx.blocked_ids)
+		return items, payload["next"], outcome
 
 	@staticmethod
 	def _parse_bucket_types(type_param: str | None) -> list[str]:
@@ -695,153 +882,166 @@ class SearchService:
 
 	async def _search_people_bucket(
 		self,
-		query: str,
-		campus_id: str | None,
-		limit: int,
+		ctx: _MultiSearchContext,
 		cursor: _BucketCursor | None,
-		coeff: dict[str, float],
 	) -> tuple[list[dict[str, object]], Optional[str]]:
 		pool = await self._pool_or_none()
 		if pool is None:
 			return [], None
-		campus_uuid: UUID | None = None
-		if campus_id:
-			try:
-				campus_uuid = UUID(campus_id)
-			except ValueError:
-				campus_uuid = None
-		limit_prefetch = limit + 1
-		async with pool.acquire() as conn:
-			rows = await conn.fetch(
-				"""
-				WITH ranked AS (
-					SELECT
-						u.id,
-						u.handle,
-						u.display_name,
-						u.bio,
-						u.campus_id,
-						u.created_at,
-						ts_rank_cd(
-							to_tsvector('english', coalesce(u.display_name,'') || ' ' || coalesce(u.bio,'')),
-							websearch_to_tsquery('english', $1)
-						) AS ts_score,
-						GREATEST(similarity(u.handle, $1), similarity(u.display_name, $1)) AS trgm_score
-					FROM users u
-					WHERE ($2::uuid IS NULL OR u.campus_id = $2::uuid)
+		rows = await self._fetch_bucket_rows(
+			pool,
+			"people",
+			"""
+			SELECT
+				u.id,
+				u.handle,
+				u.display_name,
+				u.bio,
+				u.campus_id,
+				u.created_at,
+				ts_rank_cd({tsv}, websearch_to_tsquery('english', $1)) AS ts_score,
+				GREATEST(similarity(u.handle, $1), similarity(u.display_name, $1)) AS trgm_score
+			FROM users u
+			WHERE ($2::uuid IS NULL OR u.campus_id = $2::uuid)
+				AND NOT (u.id = ANY($4::uuid[]))
+				AND (
+					{tsv} @@ websearch_to_tsquery('english', $1)
+					OR u.handle % $1
+					OR u.display_name % $1
 				)
-				SELECT *
-				FROM ranked
-				WHERE ts_score > 0 OR trgm_score > 0.2
-				ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
-				LIMIT $3
-				""",
-				query,
-				campus_uuid,
-				limit_prefetch,
-			)
-		return self._finalize_bucket(rows, limit, cursor, coeff, payload_builder="people")
+			ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
+			LIMIT $3
+			""",
+			ctx.query,
+			ctx.campus_id,
+			ctx.limit + 1,
+			ctx.blocked_ids,
+		)
+		return self._finalize_bucket(rows, ctx.limit, cursor, ctx.coeff, payload_builder="people")
 
 	async def _search_rooms_bucket(
 		self,
-		query: str,
-		campus_id: str | None,
-		limit: int,
+		ctx: _MultiSearchContext,
 		cursor: _BucketCursor | None,
-		coeff: dict[str, float],
 	) -> tuple[list[dict[str, object]], Optional[str]]:
 		pool = await self._pool_or_none()
 		if pool is None:
 			return [], None
-		campus_uuid: UUID | None = None
-		if campus_id:
-			try:
-				campus_uuid = UUID(campus_id)
-			except ValueError:
-				campus_uuid = None
-		limit_prefetch = limit + 1
-		async with pool.acquire() as conn:
-			rows = await conn.fetch(
-				"""
-				WITH ranked AS (
-					SELECT
-						r.id,
-						r.name,
-						r.preset,
-						r.campus_id,
-						r.created_at,
-						ts_rank_cd(
-							to_tsvector('english', coalesce(r.name,'')),
-							websearch_to_tsquery('english', $1)
-						) AS ts_score,
-						similarity(r.name, $1) AS trgm_score,
-						(SELECT COUNT(*) FROM room_members rm WHERE rm.room_id = r.id) AS members_count,
-						(SELECT COUNT(*) FROM room_messages mm WHERE mm.room_id = r.id AND mm.created_at >= NOW() - INTERVAL '24 hours') AS msg_24h
-					FROM rooms r
-					WHERE ($2::uuid IS NULL OR r.campus_id = $2::uuid)
-				)
-				SELECT *
-				FROM ranked
-				WHERE ts_score > 0 OR trgm_score > 0.15
+		rows = await self._fetch_bucket_rows(
+			pool,
+			"rooms",
+			"""
+			WITH matched AS (
+				SELECT
+					r.id,
+					r.name,
+					r.preset,
+					r.campus_id,
+					r.created_at,
+					ts_rank_cd({tsv}, websearch_to_tsquery('english', $1)) AS ts_score,
+					similarity(r.name, $1) AS trgm_score
+				FROM rooms r
+				WHERE ($2::uuid IS NULL OR r.campus_id = $2::uuid)
+					AND ({tsv} @@ websearch_to_tsquery('english', $1) OR r.name % $1)
 				ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
 				LIMIT $3
-				""",
-				query,
-				campus_uuid,
-				limit_prefetch,
 			)
-		return self._finalize_bucket(rows, limit, cursor, coeff, payload_builder="rooms")
+			SELECT
+				m.*,
+				(SELECT COUNT(*) FROM room_members rm WHERE rm.room_id = m.id) AS members_count,
+				(SELECT COUNT(*) FROM room_messages mm WHERE mm.room_id = m.id AND mm.created_at >= NOW() - INTERVAL '24 hours') AS msg_24h
+			FROM matched m
+			ORDER BY m.ts_score DESC, m.trgm_score DESC, m.created_at DESC, m.id DESC
+			""",
+			ctx.query,
+			ctx.campus_id,
+			ctx.limit + 1,
+		)
+		return self._finalize_bucket(rows, ctx.limit, cursor, ctx.coeff, payload_builder="rooms")
 
 	async def _search_posts_bucket(
 		self,
-		query: str,
-		campus_id: str | None,
-		limit: int,
+		ctx: _MultiSearchContext,
 		cursor: _BucketCursor | None,
-		coeff: dict[str, float],
 	) -> tuple[list[dict[str, object]], Optional[str]]:
 		pool = await self._pool_or_none()
 		if pool is None:
 			return [], None
-		campus_uuid: UUID | None = None
-		if campus_id:
+		rows = await self._fetch_bucket_rows(
+			pool,
+			"posts",
+			"""
+			SELECT
+				p.id,
+				p.group_id,
+				p.author_id,
+				p.topic_tags,
+				p.created_at,
+				ts_rank_cd({tsv}, websearch_to_tsquery('english', $1)) AS ts_score,
+				similarity(p.body, $1) AS trgm_score
+			FROM post p
+			JOIN group_entity g ON g.id = p.group_id
+			WHERE p.deleted_at IS NULL
+				AND p.created_at >= NOW() - INTERVAL '7 days'
+				AND ($2::uuid IS NULL OR g.campus_id = $2::uuid)
+				AND NOT (p.author_id = ANY($4::uuid[]))
+				AND ({tsv} @@ websearch_to_tsquery('english', $1) OR p.body % $1)
+			ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
+			LIMIT $3
+			""",
+			ctx.query,
+			ctx.campus_id,
+			ctx.limit + 1,
+			ctx.blocked_ids,
+		)
+		return self._finalize_bucket(rows, ctx.limit, cursor, ctx.coeff, payload_builder="posts")
+
+	@staticmethod
+	def _trgm_threshold(bucket: str) -> float:
+		if bucket == "people":
+			return float(settings.search_trgm_threshold_people)
+		if bucket == "rooms":
+			return float(settings.search_trgm_threshold_rooms)
+		return float(settings.search_trgm_threshold_posts)
+
+	async def _fetch_bucket_rows(
+		self,
+		pool: asyncpg.Pool,
+		bucket: str,
+		sql: str,
+		*args: object,
+	) -> list[asyncpg.Record]:
+		"""Run a bucket query with the bucket's trigram threshold scoped to the transaction.
+
+		The `%` operator compares against ``pg_trgm.similarity_threshold``; setting it
+		locally keeps the predicate indexable while leaving other sessions untouched.
+		``{tsv}`` in ``sql`` is the bucket's stored tsvector column; if that column is
+		missing the bucket degrades to computing the tsvector per row.
+		"""
+
+		stored, computed = _BUCKET_TSV[bucket]
+		if bucket not in self._tsv_missing:
 			try:
-				campus_uuid = UUID(campus_id)
-			except ValueError:
-				campus_uuid = None
-		limit_prefetch = limit + 1
+				return await self._run_bucket_query(pool, bucket, sql.replace("{tsv}", stored), *args)
+			except asyncpg.UndefinedColumnError:
+				logger.warning("search_tsv missing for %s bucket; falling back to per-row to_tsvector", bucket)
+				self._tsv_missing.add(bucket)
+		return await self._run_bucket_query(pool, bucket, sql.replace("{tsv}", computed), *args)
+
+	async def _run_bucket_query(
+		self,
+		pool: asyncpg.Pool,
+		bucket: str,
+		sql: str,
+		*args: object,
+	) -> list[asyncpg.Record]:
 		async with pool.acquire() as conn:
-			rows = await conn.fetch(
-				"""
-				WITH ranked AS (
-					SELECT
-						p.id,
-						p.group_id,
-						p.author_id,
-						p.topic_tags,
-						p.created_at,
-						ts_rank_cd(
-							to_tsvector('english', coalesce(p.body,'')),
-							websearch_to_tsquery('english', $1)
-						) AS ts_score,
-						similarity(coalesce(p.body,''), $1) AS trgm_score
-					FROM post p
-					JOIN group_entity g ON g.id = p.group_id
-					WHERE p.deleted_at IS NULL
-						AND p.created_at >= NOW() - INTERVAL '7 days'
-						AND ($2::uuid IS NULL OR g.campus_id = $2::uuid)
+			async with conn.transaction():
+				await conn.execute(
+					"SELECT set_config('pg_trgm.similarity_threshold', $1, true)",
+					f"{self._trgm_threshold(bucket):.3f}",
 				)
-				SELECT *
-				FROM ranked
-				WHERE ts_score > 0 OR trgm_score > 0.1
-				ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
-				LIMIT $3
-				""",
-				query,
-				campus_uuid,
-				limit_prefetch,
-			)
-		return self._finalize_bucket(rows, limit, cursor, coeff, payload_builder="posts")
+				return await conn.fetch(sql, *args)
 
 	def _finalize_bucket(
 		self,
@@ -927,6 +1127,10 @@ class SearchService:
 			)
 		return items, next_cursor
 
+	async def _pool_block_ids(self, pool: asyncpg.Pool, user_id: str) -> set[str]:
+		async with pool.acquire() as conn:
+			return await self._load_block_ids(conn, user_id)
+
 	async def _load_block_ids(self, conn: asyncpg.Connection, user_id: str) -> set[str]:
 		rows = await conn.fetch(
 			"""
@@ -942,6 +1146,37 @@ class SearchService:
 		)
 		return {str(row["other"]) for row in rows}
 
+	async def _match_user_ids(
+		self,
+		pool: asyncpg.Pool,
+		campus_id: str,
+		normalized: str,
+		limit: int,
+	) -> list[str]:
+		"""Viewer-independent fuzzy handle/display-name match, cacheable across users."""
+
+		async with pool.acquire() as conn:
+			rows = await conn.fetch(
+				"""
+				SELECT u.id
+				FROM users u
+				WHERE u.campus_id = $1
+					AND (
+						u.handle ILIKE $3
+						OR u.display_name ILIKE $3
+						OR similarity(u.handle, $2) > 0.2
+						OR similarity(u.display_name, $2) > 0.2
+					)
+				ORDER BY GREATEST(similarity(u.handle, $2), similarity(u.display_name, $2)) DESC, u.id
+				LIMIT $4
+				""",
+				campus_id,
+				normalized,
+				normalized + "%",
+				limit,
+			)
+		return [str(row["id"]) for row in rows]
+
 	async def _search_users_postgres(
 		self,
 		pool: asyncpg.Pool,
@@ -949,11 +1184,26 @@ class SearchService:
 		campus_id: str,
 		normalized: str,
 		limit_prefetch: int,
+		*,
+		candidate_ids: Optional[list[str]] = None,
 	) -> list[models.UserCandidate]:
+		# With typeahead hits the scan collapses to a primary-key lookup that only
+		# hydrates friendship/privacy fields; otherwise fall back to the fuzzy match.
+		if candidate_ids:
+			match_clause = "u.id = ANY($5::uuid[])"
+			match_arg: object = candidate_ids
+		else:
+			match_clause = """(
+						u.handle ILIKE $5
+						OR u.display_name ILIKE $5
+						OR similarity(u.handle, $2) > 0.2
+						OR similarity(u.display_name, $2) > 0.2
+					)"""
+			match_arg = normalized + "%"
 		async with pool.acquire() as conn:
 			blocked = await self._load_block_ids(conn, user_id)
 			rows = await conn.fetch(
-				"""
+				f"""
 				WITH my_friends AS (
 					SELECT friend_id
 					FROM friendships
@@ -982,12 +1232,7 @@ class SearchService:
 				FROM users u
 				WHERE u.campus_id = $4
 					AND u.id <> $1
-					AND (
-						u.handle ILIKE $5
-						OR u.display_name ILIKE $5
-						OR similarity(u.handle, $2) > 0.2
-						OR similarity(u.display_name, $2) > 0.2
-					)
+					AND {match_clause}
 				ORDER BY GREATEST(similarity(u.handle, $2), similarity(u.display_name, $2)) DESC, u.id
 				LIMIT $6
 				""",
@@ -995,7 +1240,7 @@ class SearchService:
 				normalized,
 				normalized + "%",
 				campus_id,
-				normalized + "%",
+				match_arg,
 				limit_prefetch,
 			)
 		candidates: list[models.UserCandidate] = []
@@ -1025,9 +1270,53 @@ class SearchService:
 		user_id: str,
 		campus_id: str,
 		limit_prefetch: int,
-	) -> list[models.UserCandidate]:
+	) -> tuple[list[models.UserCandidate], str]:
+		# Mutual-friend ranking is per viewer, so the key carries the viewer; blocks
+		# and presence are still read fresh so a new block takes effect immediately.
+		rows, cache_outcome = await self._result_cache.get_or_load(
+			self._result_cache.make_key("discover_people", campus_id, user_id, limit_prefetch),
+			lambda: self._discover_people_rows(pool, user_id, campus_id, limit_prefetch),
+		)
+		blocked = await self._pool_block_ids(pool, user_id)
+		candidate_ids = [str(row["id"]) for row in rows]
+		presence = await self._presence_snapshot([user_id, *candidate_ids])
+		me_presence = presence.get(user_id, {})
+		me_bucket = (me_presence.get("venue_id") or "") if isinstance(me_presence, dict) else ""
+
+		candidates: list[models.UserCandidate] = []
+		for row in rows:
+			uid = str(row["id"])
+			presence_row = presence.get(uid, {}) if isinstance(presence.get(uid), dict) else {}
+			ts_raw = presence_row.get("ts") if isinstance(presence_row, dict) else None
+			last_seen = float(ts_raw) / 1000.0 if ts_raw else None
+			venue = presence_row.get("venue_id") if isinstance(presence_row, dict) else None
+			candidate = models.UserCandidate(
+				user_id=uid,
+				handle=row["handle"],
+				display_name=row["display_name"],
+				avatar_url=row["avatar_url"],
+				campus_id=str(row["campus_id"]),
+				visibility=str(row["visibility"] or "everyone"),
+				ghost_mode=bool(row["ghost_mode"]),
+				is_friend=bool(row["is_friend"]),
+				mutual_count=int(row["mutual_count"] or 0),
+				similarity_handle=0.0,
+				similarity_display=0.0,
+				blocked=uid in blocked,
+				recent_weight=_recent_weight(last_seen) if last_seen else 0.0,
+				nearby_weight=0.2 if me_bucket and venue and venue == me_bucket else 0.0,
+			)
+			candidates.append(candidate)
+		return candidates, cache_outcome
+
+	async def _discover_people_rows(
+		self,
+		pool: asyncpg.Pool,
+		user_id: str,
+		campus_id: str,
+		limit_prefetch: int,
+	) -> list[dict[str, object]]:
 		async with pool.acquire() as conn:
-			blocked = await self._load_block_ids(conn, user_id)
 			rows = await conn.fetch(
 				"""
 				WITH my_friends AS (
@@ -1061,53 +1350,74 @@ class SearchService:
 				campus_id,
 				limit_prefetch,
 			)
+		return [
+			{
+				"id": str(row["id"]),
+				"handle": row["handle"],
+				"display_name": row["display_name"],
+				"avatar_url": row["avatar_url"],
+				"campus_id": str(row["campus_id"]),
+				"visibility": str(row["visibility"] or "everyone"),
+				"ghost_mode": bool(row["ghost_mode"]),
+				"is_friend": bool(row["is_friend"]),
+				"mutual_count": int(row["mutual_count"] or 0),
+			}
+			for row in rows
+		]
 
-		candidate_ids = [str(row["id"]) for row in rows]
-		presence = await self._presence_snapshot([user_id, *candidate_ids])
-		me_presence = presence.get(user_id, {})
-		me_bucket = (me_presence.get("venue_id") or "") if isinstance(me_presence, dict) else ""
-
-		candidates: list[models.UserCandidate] = []
+	async def _discover_rooms_postgres(
+		self,
+		pool: asyncpg.Pool,
+		user_id: str,
+		campus_id: str,
+		limit_prefetch: int,
+	) -> tuple[list[models.RoomCandidate], str]:
+		# The campus room ranking is shared; only the friend overlap is per viewer.
+		rows, cache_outcome = await self._result_cache.get_or_load(
+			self._result_cache.make_key("discover_rooms", campus_id, limit_prefetch),
+			lambda: self._discover_room_rows(pool, campus_id, limit_prefetch),
+		)
+		overlap: dict[str, int] = {}
+		if rows:
+			async with pool.acquire() as conn:
+				overlap_rows = await conn.fetch(
+					"""
+					SELECT rm.room_id, COUNT(*) AS overlap_count
+					FROM room_members rm
+					JOIN friendships f
+						ON f.friend_id = rm.user_id AND f.user_id = $1 AND f.status = 'accepted'
+					WHERE rm.room_id = ANY($2::uuid[])
+					GROUP BY rm.room_id
+					""",
+					user_id,
+					[row["id"] for row in rows],
+				)
+			overlap = {str(row["room_id"]): int(row["overlap_count"] or 0) for row in overlap_rows}
+		candidates: list[models.RoomCandidate] = []
 		for row in rows:
-			uid = str(row["id"])
-			presence_row = presence.get(uid, {}) if isinstance(presence.get(uid), dict) else {}
-			ts_raw = presence_row.get("ts") if isinstance(presence_row, dict) else None
-			last_seen = float(ts_raw) / 1000.0 if ts_raw else None
-			venue = presence_row.get("venue_id") if isinstance(presence_row, dict) else None
-			candidate = models.UserCandidate(
-				user_id=uid,
-				handle=row["handle"],
-				display_name=row["display_name"],
-				avatar_url=row["avatar_url"],
-				campus_id=str(row["campus_id"]),
-				visibility=str(row["visibility"] or "everyone"),
-				ghost_mode=bool(row["ghost_mode"]),
-				is_friend=bool(row["is_friend"]),
-				mutual_count=int(row["mutual_count"] or 0),
-				similarity_handle=0.0,
-				similarity_display=0.0,
-				blocked=uid in blocked,
-				recent_weight=_recent_weight(last_seen) if last_seen else 0.0,
-				nearby_weight=0.2 if me_bucket and venue and venue == me_bucket else 0.0,
+			candidates.append(
+				models.RoomCandidate(
+					room_id=row["id"],
+					name=row["name"],
+					preset=row["preset"],
+					campus_id=row["campus_id"],
+					visibility=row["visibility"],
+					members_count=row["members_count"],
+					messages_24h=row["messages_24h"],
+					overlap_count=overlap.get(row["id"], 0),
+				)
 			)
-			candidates.append(candidate)
-		return candidates
+		return candidates, cache_outcome
 
-	async def _discover_rooms_postgres(
+	async def _discover_room_rows(
 		self,
 		pool: asyncpg.Pool,
-		user_id: str,
 		campus_id: str,
 		limit_prefetch: int,
-	) -> list[models.RoomCandidate]:
+	) -> list[dict[str, object]]:
 		async with pool.acquire() as conn:
 			rows = await conn.fetch(
 				"""
-				WITH my_friends AS (
-					SELECT friend_id
-					FROM friendships
-					WHERE user_id = $1 AND status = 'accepted'
-				)
 				SELECT
 					r.id,
 					r.name,
@@ -1119,36 +1429,27 @@ class SearchService:
 						SELECT COUNT(*)
 						FROM room_messages msg
 						WHERE msg.room_id = r.id AND msg.created_at >= NOW() - INTERVAL '24 hours'
-					) AS messages_24h,
-					(
-						SELECT COUNT(*)
-						FROM room_members rm
-						WHERE rm.room_id = r.id AND rm.user_id IN (SELECT friend_id FROM my_friends)
-					) AS overlap_count
+					) AS messages_24h
 				FROM rooms r
-				WHERE r.campus_id = $2 AND r.visibility = 'link'
+				WHERE r.campus_id = $1 AND r.visibility = 'link'
 				ORDER BY messages_24h DESC, members_count DESC, r.id
-				LIMIT $3
+				LIMIT $2
 				""",
-				user_id,
 				campus_id,
 				limit_prefetch,
 			)
-		candidates: list[models.RoomCandidate] = []
-		for row in rows:
-			candidates.append(
-				models.RoomCandidate(
-					room_id=str(row["id"]),
-					name=row["name"],
-					preset=row["preset"],
-					campus_id=str(row["campus_id"]),
-					visibility=str(row["visibility"] or "link"),
-					members_count=int(row["members_count"] or 0),
-					messages_24h=int(row["messages_24h"] or 0),
-					overlap_count=int(row["overlap_count"] or 0),
-				)
-			)
-		return candidates
+		return [
+			{
+				"id": str(row["id"]),
+				"name": row["name"],
+				"preset": row["preset"],
+				"campus_id": str(row["campus_id"]),
+				"visibility": str(row["visibility"] or "link"),
+				"members_count": int(row["members_count"] or 0),
+				"messages_24h": int(row["messages_24h"] or 0),
+			}
+			for row in rows
+		]
 
 	async def _presence_snapshot(self, user_ids: Iterable[str]) -> dict[str, dict[str, str]]:
 		ids = list({str(uid) for uid in user_ids})
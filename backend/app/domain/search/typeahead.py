@@ -0,0 +1,583 @@
+"""In-process, per-campus prefix index for typeahead lookups.
+
+Handles, display names and group names are stored as sorted composite keys
+(``"<normalized key>\\x00<entity id>"``) so a prefix maps to one contiguous
+``bisect`` range. Short prefixes (the ones typeahead bursts hammer) keep a
+precomputed top-k list ordered by popularity; longer prefixes scan their
+(small) range directly. Every process builds its own copy from Postgres at
+startup and follows the communities outbox plus the profile-change stream,
+with a periodic full rebuild to reconcile anything missed. Rebuilds bulk-load a
+fresh index in a worker thread (one sort per table) and swap it in, so they
+never hold the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+import asyncpg
+
+from app.infra.redis import redis_client
+from app.obs import metrics as obs_metrics
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KIND_USER = "user"
+KIND_GROUP = "group"
+PROFILE_STREAM = "search:typeahead:profiles"
+_PROFILE_STREAM_MAXLEN = 10_000
+_GLOBAL_CAMPUS = ""
+_SEP = "\x00"
+_MAX_CHAR = chr(0x10FFFF)
+# Rough CPython overhead per stored key (list slot + str header) and entry
+# (dataclass slots + dict slot); exact accounting is not worth the cost.
+_KEY_OVERHEAD = 64
+_ENTRY_OVERHEAD = 240
+
+
+def normalize(value: str | None) -> str:
+	return " ".join((value or "").casefold().split())
+
+
+def _word_keys(text: str) -> list[str]:
+	"""Return the full normalized text plus every suffix that starts at a word boundary."""
+
+	normalized = normalize(text)
+	if not normalized:
+		return []
+	words = normalized.split(" ")
+	return [" ".join(words[idx:]) for idx in range(len(words))]
+
+
+@dataclass(slots=True)
+class TypeaheadEntry:
+	entity_id: str
+	kind: str
+	campus_id: str
+	label: str
+	secondary: str | None = None
+	popularity: float = 0.0
+	extra: dict[str, Any] = field(default_factory=dict)
+
+	def keys(self) -> tuple[str, ...]:
+		seen: dict[str, None] = {}
+		if self.kind == KIND_USER and self.secondary:
+			for key in _word_keys(self.secondary):
+				seen.setdefault(key, None)
+		for key in _word_keys(self.label):
+			seen.setdefault(key, None)
+		return tuple(seen)
+
+	def approx_bytes(self, keys: tuple[str, ...] | None = None) -> int:
+		"""Estimated footprint of the entry plus its composite keys (``keys()`` if not given)."""
+
+		size = _ENTRY_OVERHEAD + sys.getsizeof(self.entity_id) + sys.getsizeof(self.label)
+		if self.secondary:
+			size += sys.getsizeof(self.secondary)
+		for key in self.keys() if keys is None else keys:
+			size += _KEY_OVERHEAD + sys.getsizeof(f"{key}{_SEP}{self.entity_id}")
+		return size
+
+
+class _PrefixTable:
+	"""Sorted-prefix array for one (campus, kind) pair."""
+
+	def __init__(self, *, top_depth: int, top_k: int, scan_limit: int) -> None:
+		self._top_depth = top_depth
+		self._top_k = top_k
+		self._scan_limit = scan_limit
+		self._keys: list[str] = []
+		self._entries: dict[str, TypeaheadEntry] = {}
+		self._entry_keys: dict[str, tuple[str, ...]] = {}
+		self._top: dict[str, list[str]] = {}
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, entity_id: str) -> Optional[TypeaheadEntry]:
+		return self._entries.get(entity_id)
+
+	def upsert(self, entry: TypeaheadEntry) -> int:
+		"""Insert or replace an entry, returning the change in approximate bytes."""
+
+		delta = -self.remove(entry.entity_id)
+		keys = entry.keys()
+		if not keys:
+			return delta
+		self._entries[entry.entity_id] = entry
+		self._entry_keys[entry.entity_id] = keys
+		delta += entry.approx_bytes()
+		for key in keys:
+			insort(self._keys, f"{key}{_SEP}{entry.entity_id}")
+		for prefix in self._short_prefixes(keys):
+			self._promote(prefix, entry)
+		return delta
+
+	def load(self, entries: Iterable[tuple[TypeaheadEntry, tuple[str, ...], int]]) -> int:
+		"""Bulk-build an empty table from ``(entry, keys, approx bytes)``; returns the bytes loaded.
+
+		Keys are sorted once and every short prefix's top-k is filled in a single
+		pass over the entries in rank order, instead of an ``insort`` and a
+		re-sort per entry as :meth:`upsert` does.
+		"""
+
+		loaded = 0
+		keys: list[str] = []
+		for entry, entry_keys, size in entries:
+			self._entries[entry.entity_id] = entry
+			self._entry_keys[entry.entity_id] = entry_keys
+			loaded += size
+			keys.extend(f"{key}{_SEP}{entry.entity_id}" for key in entry_keys)
+		keys.sort()
+		self._keys = keys
+		for entry in sorted(self._entries.values(), key=_rank_key):
+			for prefix in self._short_prefixes(self._entry_keys[entry.entity_id]):
+				ranked = self._top.setdefault(prefix, [])
+				if len(ranked) < self._top_k:
+					ranked.append(entry.entity_id)
+		return loaded
+
+	def remove(self, entity_id: str) -> int:
+		"""Drop an entry, returning the approximate bytes released."""
+
+		entry = self._entries.pop(entity_id, None)
+		if entry is None:
+			return 0
+		keys = self._entry_keys.pop(entity_id, ())
+		released = entry.approx_bytes()
+		for key in keys:
+			composite = f"{key}{_SEP}{entity_id}"
+			idx = bisect_left(self._keys, composite)
+			if idx < len(self._keys) and self._keys[idx] == composite:
+				del self._keys[idx]
+		for prefix in self._short_prefixes(keys):
+			ranked = self._top.get(prefix)
+			if ranked and entity_id in ranked:
+				self._rebuild_top(prefix)
+		return released
+
+	def lookup(self, prefix: str, limit: int) -> list[TypeaheadEntry]:
+		if not prefix:
+			return []
+		if len(prefix) <= self._top_depth:
+			ids = self._top.get(prefix, [])[:limit]
+			return [self._entries[entity_id] for entity_id in ids]
+		return self._rank(self._scan(prefix, self._scan_limit), limit)
+
+	def _short_prefixes(self, keys: Iterable[str]) -> set[str]:
+		prefixes: set[str] = set()
+		for key in keys:
+			for length in range(1, min(len(key), self._top_depth) + 1):
+				prefixes.add(key[:length])
+		return prefixes
+
+	def _scan(self, prefix: str, limit: Optional[int]) -> set[str]:
+		lo = bisect_left(self._keys, prefix)
+		hi = bisect_left(self._keys, prefix + _MAX_CHAR, lo)
+		if limit is not None:
+			hi = min(hi, lo + limit)
+		return {composite.rsplit(_SEP, 1)[1] for composite in self._keys[lo:hi]}
+
+	def _rank(self, entity_ids: Iterable[str], limit: int) -> list[TypeaheadEntry]:
+		entries = (self._entries[entity_id] for entity_id in entity_ids if entity_id in self._entries)
+		return heapq.nsmallest(limit, entries, key=_rank_key)
+
+	def _promote(self, prefix: str, entry: TypeaheadEntry) -> None:
+		ranked = self._top.setdefault(prefix, [])
+		if entry.entity_id in ranked:
+			ranked.remove(entry.entity_id)
+		if len(ranked) >= self._top_k:
+			tail = self._entries[ranked[-1]]
+			if _rank_key(entry) >= _rank_key(tail):
+				return
+		ranked.append(entry.entity_id)
+		ranked.sort(key=lambda entity_id: _rank_key(self._entries[entity_id]))
+		del ranked[self._top_k :]
+
+	def _rebuild_top(self, prefix: str) -> None:
+		best = self._rank(self._scan(prefix, None), self._top_k)
+		if best:
+			self._top[prefix] = [entry.entity_id for entry in best]
+		else:
+			self._top.pop(prefix, None)
+
+
+def _rank_key(entry: TypeaheadEntry) -> tuple[float, str, str]:
+	return (-entry.popularity, entry.label.casefold(), entry.entity_id)
+
+
+class TypeaheadIndex:
+	"""Campus-partitioned prefix tables for users and groups with a memory budget."""
+
+	def __init__(
+		self,
+		*,
+		max_bytes: int | None = None,
+		top_depth: int = 3,
+		top_k: int = 50,
+		scan_limit: int = 2048,
+	) -> None:
+		self.max_bytes = max_bytes if max_bytes is not None else settings.search_typeahead_max_mb * 1024 * 1024
+		self._top_depth = top_depth
+		self._top_k = top_k
+		self._scan_limit = scan_limit
+		self._tables: dict[tuple[str, str], _PrefixTable] = {}
+		self.approx_bytes = 0
+		self.dropped = 0
+		self.ready = False
+
+	def _table(self, campus_id: str, kind: str) -> _PrefixTable:
+		key = (campus_id, kind)
+		table = self._tables.get(key)
+		if table is None:
+			table = _PrefixTable(top_depth=self._top_depth, top_k=self._top_k, scan_limit=self._scan_limit)
+			self._tables[key] = table
+		return table
+
+	def _locate(self, entity_id: str, kind: str) -> Optional[_PrefixTable]:
+		for (_campus, table_kind), table in self._tables.items():
+			if table_kind == kind and table.get(entity_id) is not None:
+				return table
+		return None
+
+	def upsert(self, entry: TypeaheadEntry) -> bool:
+		"""Add or replace an entry; returns False when the memory cap rejects it."""
+
+		previous = self._locate(entry.entity_id, entry.kind)
+		if previous is not None:
+			existing = previous.get(entry.entity_id)
+			if existing is not None and not entry.popularity:
+				entry.popularity = existing.popularity
+			self.approx_bytes -= previous.remove(entry.entity_id)
+		elif self.approx_bytes + entry.approx_bytes() > self.max_bytes:
+			self.dropped += 1
+			obs_metrics.SEARCH_TYPEAHEAD_DROPPED.inc()
+			return False
+		self.approx_bytes += self._table(entry.campus_id, entry.kind).upsert(entry)
+		obs_metrics.SEARCH_TYPEAHEAD_BYTES.set(self.approx_bytes)
+		return True
+
+	def load(self, entries: Iterable[TypeaheadEntry]) -> None:
+		"""Bulk-build an empty index; the result of repeated :meth:`upsert` calls, faster.
+
+		Entries are admitted in order until the memory cap is reached (so pass the
+		most popular first); a repeated id replaces the earlier entry. Pure CPU
+		work with no awaits, so a rebuild can run it in a worker thread.
+		"""
+
+		admitted: dict[tuple[str, str], tuple[TypeaheadEntry, tuple[str, ...], int]] = {}
+		budget = 0
+		for entry in entries:
+			keys = entry.keys()
+			if not keys:
+				continue
+			size = entry.approx_bytes(keys)
+			previous = admitted.pop((entry.kind, entry.entity_id), None)
+			if previous is not None:
+				budget -= previous[2]
+			elif budget + size > self.max_bytes:
+				self.dropped += 1
+				obs_metrics.SEARCH_TYPEAHEAD_DROPPED.inc()
+				continue
+			admitted[(entry.kind, entry.entity_id)] = (entry, keys, size)
+			budget += size
+		by_table: dict[tuple[str, str], list[tuple[TypeaheadEntry, tuple[str, ...], int]]] = defaultdict(list)
+		for item in admitted.values():
+			by_table[(item[0].campus_id, item[0].kind)].append(item)
+		for (campus_id, kind), table_entries in by_table.items():
+			self.approx_bytes += self._table(campus_id, kind).load(table_entries)
+
+	def remove(self, entity_id: str, kind: str) -> None:
+		table = self._locate(entity_id, kind)
+		if table is not None:
+			self.approx_bytes -= table.remove(entity_id)
+			obs_metrics.SEARCH_TYPEAHEAD_BYTES.set(self.approx_bytes)
+
+	def lookup(self, kind: str, campus_id: str | None, query: str, *, limit: int) -> Optional[list[TypeaheadEntry]]:
+		"""Return top-``limit`` entries whose keys start with ``query``.
+
+		``None`` means the index is not built yet and callers must fall back to the
+		database. Groups without a campus are global and merge into every campus.
+		"""
+
+		if not self.ready:
+			obs_metrics.SEARCH_TYPEAHEAD_LOOKUPS.labels(kind=kind, result="unready").inc()
+			return None
+		prefix = normalize(query)
+		campuses = [str(campus_id)] if campus_id else []
+		if kind == KIND_GROUP or not campuses:
+			campuses.append(_GLOBAL_CAMPUS)
+		found: list[TypeaheadEntry] = []
+		for campus in campuses:
+			table = self._tables.get((campus, kind))
+			if table is not None:
+				found.extend(table.lookup(prefix, limit))
+		results = heapq.nsmallest(limit, found, key=_rank_key) if len(campuses) > 1 else found[:limit]
+		obs_metrics.SEARCH_TYPEAHEAD_LOOKUPS.labels(kind=kind, result="hit" if results else "miss").inc()
+		return results
+
+	def replace_with(self, other: "TypeaheadIndex") -> None:
+		"""Swap in a freshly built index atomically (single-threaded event loop)."""
+
+		self._tables = other._tables
+		self.approx_bytes = other.approx_bytes
+		self.dropped = other.dropped
+		self.ready = True
+		obs_metrics.SEARCH_TYPEAHEAD_BYTES.set(self.approx_bytes)
+
+	def reset(self) -> None:
+		self._tables = {}
+		self.approx_bytes = 0
+		self.dropped = 0
+		self.ready = False
+
+
+def user_entry(row: dict[str, Any] | asyncpg.Record) -> TypeaheadEntry:
+	return TypeaheadEntry(
+		entity_id=str(row["id"]),
+		kind=KIND_USER,
+		campus_id=str(row["campus_id"]) if row["campus_id"] else _GLOBAL_CAMPUS,
+		label=row["display_name"] or row["handle"] or "",
+		secondary=row["handle"],
+		popularity=float(row["popularity"] or 0),
+	)
+
+
+def group_entry(payload: dict[str, Any], *, popularity: float = 0.0) -> TypeaheadEntry:
+	campus = payload.get("campus_id")
+	return TypeaheadEntry(
+		entity_id=str(payload["id"]),
+		kind=KIND_GROUP,
+		campus_id=str(campus) if campus else _GLOBAL_CAMPUS,
+		label=payload.get("name") or "",
+		secondary=payload.get("slug"),
+		popularity=popularity,
+		extra={
+			"description": payload.get("description"),
+			"tags": list(payload.get("tags") or []),
+		},
+	)
+
+
+def _load_rows(index: TypeaheadIndex, users: Iterable[asyncpg.Record], groups: Iterable[asyncpg.Record]) -> None:
+	entries = [user_entry(row) for row in users]
+	entries.extend(group_entry(dict(row), popularity=float(row["popularity"] or 0)) for row in groups)
+	index.load(entries)
+
+
+_INDEX = TypeaheadIndex()
+
+
+def get_index() -> TypeaheadIndex:
+	return _INDEX
+
+
+async def publish_profile_change(
+	*,
+	user_id: str,
+	campus_id: str | None,
+	handle: str | None,
+	display_name: str | None,
+	deleted: bool = False,
+) -> None:
+	"""Broadcast a user naming change so every process can patch its index."""
+
+	await redis_client.xadd(
+		PROFILE_STREAM,
+		{
+			"user_id": str(user_id),
+			"campus_id": str(campus_id or ""),
+			"handle": handle or "",
+			"display_name": display_name or "",
+			"deleted": "1" if deleted else "0",
+		},
+		maxlen=_PROFILE_STREAM_MAXLEN,
+		approximate=True,
+	)
+
+
+class TypeaheadSync:
+	"""Builds the process-local index and keeps it current.
+
+	Group changes come from ``outbox_event`` read by id watermark (read-only, so
+	the OpenSearch indexer keeps ownership of ``processed_at``); user changes come
+	from :data:`PROFILE_STREAM`. A full rebuild runs every ``rebuild_interval``.
+	"""
+
+	def __init__(
+		self,
+		*,
+		index: TypeaheadIndex | None = None,
+		poll_interval: float = 2.0,
+		rebuild_interval: float = 3600.0,
+		batch_size: int = 500,
+	) -> None:
+		self.index = index or get_index()
+		self.poll_interval = poll_interval
+		self.rebuild_interval = rebuild_interval
+		self.batch_size = batch_size
+		self._outbox_watermark = 0
+		self._stream_id = "$"
+		self._last_build = 0.0
+		self._running = False
+
+	async def run_forever(self) -> None:
+		self._running = True
+		while self._running:
+			try:
+				if time.monotonic() - self._last_build >= self.rebuild_interval:
+					await self.rebuild()
+				processed = await self.process_once()
+			except asyncio.CancelledError:
+				raise
+			except Exception:
+				logger.exception("search.typeahead.sync_failed")
+				processed = 0
+			if processed == 0:
+				await asyncio.sleep(self.poll_interval)
+
+	def stop(self) -> None:
+		self._running = False
+
+	async def rebuild(self) -> None:
+		from app.infra.postgres import get_pool
+
+		started = time.perf_counter()
+		fresh = TypeaheadIndex(
+			max_bytes=self.index.max_bytes,
+			top_depth=self.index._top_depth,
+			top_k=self.index._top_k,
+			scan_limit=self.index._scan_limit,
+		)
+		stream_tail = await self._stream_tail()
+		pool = await get_pool()
+		async with pool.acquire() as conn:
+			watermark = await self._outbox_head(conn)
+			users = await conn.fetch(
+				"""
+				WITH friend_counts AS (
+					SELECT user_id, COUNT(*) AS n
+					FROM friendships
+					WHERE status = 'accepted'
+					GROUP BY user_id
+				)
+				SELECT u.id, u.campus_id, u.handle, u.display_name, COALESCE(fc.n, 0) AS popularity
+				FROM users u
+				LEFT JOIN friend_counts fc ON fc.user_id = u.id
+				WHERE u.deleted_at IS NULL
+				ORDER BY popularity DESC, u.id
+				"""
+			)
+			groups = await self._load_groups(conn)
+		await asyncio.to_thread(_load_rows, fresh, users, groups)
+		self.index.replace_with(fresh)
+		self._outbox_watermark = watermark
+		self._stream_id = stream_tail
+		self._last_build = time.monotonic()
+		logger.info(
+			"search.typeahead.rebuilt users=%d groups=%d bytes=%d dropped=%d took_ms=%.1f",
+			len(users),
+			len(groups),
+			fresh.approx_bytes,
+			fresh.dropped,
+			(time.perf_counter() - started) * 1000.0,
+		)
+
+	async def process_once(self) -> int:
+		return await self._apply_outbox() + await self._apply_profile_stream()
+
+	async def _stream_tail(self) -> str:
+		entries = await redis_client.xrevrange(PROFILE_STREAM, count=1)
+		return entries[0][0] if entries else "0-0"
+
+	@staticmethod
+	async def _outbox_head(conn: asyncpg.Connection) -> int:
+		if not await conn.fetchval("SELECT to_regclass('public.outbox_event') IS NOT NULL"):
+			return 0
+		return int(await conn.fetchval("SELECT COALESCE(MAX(id), 0) FROM outbox_event") or 0)
+
+	@staticmethod
+	async def _load_groups(conn: asyncpg.Connection) -> list[asyncpg.Record]:
+		if not await conn.fetchval("SELECT to_regclass('public.group_entity') IS NOT NULL"):
+			return []
+		return await conn.fetch(
+			"""
+			WITH member_counts AS (
+				SELECT group_id, COUNT(*) AS n
+				FROM group_member
+				WHERE is_banned = FALSE
+				GROUP BY group_id
+			)
+			SELECT g.id, g.campus_id, g.name, g.slug, g.description, g.tags, COALESCE(mc.n, 0) AS popularity
+			FROM group_entity g
+			LEFT JOIN member_counts mc ON mc.group_id = g.id
+			WHERE g.deleted_at IS NULL AND g.visibility <> 'secret'
+			ORDER BY popularity DESC, g.id
+			"""
+		)
+
+	async def _apply_outbox(self) -> int:
+		from app.communities.domain.repo import CommunitiesRepository
+
+		events = await CommunitiesRepository().fetch_outbox_since(
+			after_id=self._outbox_watermark,
+			aggregate_types=("group",),
+			limit=self.batch_size,
+		)
+		for event in events:
+			payload = event.payload if isinstance(event.payload, dict) else json.loads(event.payload or "{}")
+			payload.setdefault("id", str(event.aggregate_id))
+			if event.event_type == "deleted" or payload.get("deleted") or payload.get("visibility") == "secret":
+				self.index.remove(str(event.aggregate_id), KIND_GROUP)
+			else:
+				self.index.upsert(group_entry(payload))
+			self._outbox_watermark = max(self._outbox_watermark, event.id)
+		return len(events)
+
+	async def _apply_profile_stream(self) -> int:
+		response = await redis_client.xread({PROFILE_STREAM: self._stream_id}, count=self.batch_size)
+		processed = 0
+		for _stream, entries in response or []:
+			for entry_id, fields in entries:
+				self._stream_id = entry_id
+				processed += 1
+				user_id = fields.get("user_id")
+				if not user_id:
+					continue
+				if fields.get("deleted") == "1":
+					self.index.remove(user_id, KIND_USER)
+					continue
+				self.index.upsert(
+					user_entry(
+						{
+							"id": user_id,
+							"campus_id": fields.get("campus_id") or None,
+							"handle": fields.get("handle") or None,
+							"display_name": fields.get("display_name") or None,
+							"popularity": 0,
+						}
+					)
+				)
+		return processed
+
+
+__all__ = [
+	"KIND_GROUP",
+	"KIND_USER",
+	"PROFILE_STREAM",
+	"TypeaheadEntry",
+	"TypeaheadIndex",
+	"TypeaheadSync",
+	"get_index",
+	"publish_profile_change",
+]
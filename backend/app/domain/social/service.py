@@ -9,6 +9,7 @@ from uuid import UUID, uuid4
 
 import asyncpg
 
+from app.domain.discovery import candidates as discovery_candidates
 from app.domain.social import audit, policy, sockets
 from app.domain.social.exceptions import (
 	InviteAlreadySent,
@@ -146,6 +147,11 @@ async def _emit_friend_update_pair(user_a: str, user_b: str, status: str) -> Non
 	payload_b = FriendUpdatePayload(user_id=user_b, friend_id=user_a, status=status).model_dump(mode="json")
 	await sockets.emit_friend_update(user_a, payload_a)
 	await sockets.emit_friend_update(user_b, payload_b)
+	# Every friendship transition funnels through here; refresh discovery candidates.
+	try:
+		await discovery_candidates.mark_friendship_changed(user_a, user_b)
+	except Exception:
+		logger.warning("Failed to queue discovery candidate refresh", exc_info=True)
 
 
 async def send_invite(auth_user: AuthenticatedUser, to_user_id: UUID, campus_id: UUID | None) -> InviteSummary:
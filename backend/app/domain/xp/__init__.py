@@ -1,4 +1,5 @@
 """XP domain module."""
+from app.domain.xp.models import XPAward
 from app.domain.xp.service import XPService
 
-__all__ = ["XPService"]
+__all__ = ["XPAward", "XPService"]
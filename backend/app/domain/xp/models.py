@@ -38,6 +38,15 @@ class UserXPStats:
         return max(0.0, min(1.0, earned_in_level / needed))
 
 
+@dataclass
+class XPAward:
+    """One award request for :meth:`XPService.award_many`."""
+
+    user_id: str | UUID
+    action: "XPAction"
+    metadata: dict[str, Any] | None = None
+
+
 @dataclass
 class XPEvent:
     id: UUID
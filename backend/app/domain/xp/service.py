@@ -4,21 +4,89 @@ from __future__ import annotations
 
 from uuid import UUID
 from datetime import datetime
+from typing import Optional, Sequence
 
 import logging
 import json
+from redis.exceptions import ResponseError
+
 from app.domain.xp.models import (
     LEVEL_THRESHOLDS,
     XP_AMOUNTS,
     XPAction,
+    XPAward,
     UserXPStats,
 )
 from app.domain.identity import audit
 from app.infra.postgres import get_pool
 from app.infra.redis import redis_client
+from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Bumps the per-day interaction counter and reads the cached verification flag
+# in one round trip. Returns {count, verified-or-nil}.
+_INTERACTION_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return {count, redis.call('GET', KEYS[2])}
+"""
+
+# Logs every award and applies the per-user sums to user_xp_stats in one
+# statement. The level is derived from the thresholds passed in; the RETURNING
+# sub-select reads the pre-statement snapshot, i.e. the level before this award.
+_AWARD_SQL = """
+WITH input AS (
+    SELECT * FROM unnest($1::uuid[], $2::text[], $3::int[], $4::jsonb[])
+        AS t(user_id, action_type, amount, metadata)
+),
+logged AS (
+    INSERT INTO xp_events (user_id, action_type, amount, metadata)
+    SELECT user_id, action_type, amount, metadata FROM input
+),
+delta AS (
+    SELECT user_id, SUM(amount)::int AS amount FROM input GROUP BY user_id
+),
+levels AS (
+    SELECT * FROM unnest($5::int[], $6::bigint[]) AS l(level, threshold)
+)
+INSERT INTO user_xp_stats AS s (user_id, total_xp, current_level)
+SELECT
+    d.user_id,
+    GREATEST(0, d.amount),
+    (SELECT MAX(level) FROM levels WHERE threshold <= GREATEST(0, d.amount))
+FROM delta d
+ON CONFLICT (user_id) DO UPDATE
+SET total_xp = GREATEST(0, s.total_xp + (SELECT amount FROM delta WHERE delta.user_id = EXCLUDED.user_id)),
+    current_level = (
+        SELECT MAX(level) FROM levels
+        WHERE threshold <= GREATEST(0, s.total_xp + (SELECT amount FROM delta WHERE delta.user_id = EXCLUDED.user_id))
+    ),
+    last_updated_at = NOW()
+RETURNING
+    s.user_id,
+    s.total_xp,
+    s.current_level,
+    s.last_updated_at,
+    (SELECT prev.current_level FROM user_xp_stats prev WHERE prev.user_id = s.user_id) AS previous_level
+"""
+
+_scripting_available = True
+
+
+def _verified_key(user_id: str) -> str:
+    return f"xp:verified:{user_id}"
+
+
+async def invalidate_verification(user_id: str | UUID) -> None:
+    """Drop the cached verification flag after a user's status changes."""
+    try:
+        await redis_client.delete(_verified_key(str(user_id)))
+    except Exception:
+        logger.warning("Failed to invalidate XP verification cache", exc_info=True)
+
 
 class XPService:
     """Service for managing user XP and levels."""
@@ -35,14 +103,14 @@ class XPService:
         """Fetch XP stats for a user."""
         uid = str(user_id)
         pool = await get_pool()
-        
+
         async with pool.acquire() as conn:
             row = await conn.fetchrow("""
                 SELECT user_id, total_xp, current_level, last_updated_at
                 FROM user_xp_stats
                 WHERE user_id = $1
             """, uid)
-            
+
             if row:
                 return UserXPStats(
                     user_id=row["user_id"],
@@ -50,7 +118,7 @@ class XPService:
                     current_level=row["current_level"],
                     last_updated_at=row["last_updated_at"],
                 )
-            
+
             logger.warning(f"XP stats not found for user {uid}, returning defaults")
             # Return empty stats if not found
             return UserXPStats(
@@ -60,153 +128,226 @@ class XPService:
                 last_updated_at=None, # type: ignore
             )
 
-    async def _is_user_verified(self, user_id: str) -> bool:
-        """Check if user is verified (e.g. valid student)."""
+    async def _verified_many(self, user_ids: Sequence[str]) -> dict[str, bool]:
+        """Load university verification for users and cache it in Redis."""
+        ids = sorted(set(user_ids))
+        if not ids:
+            return {}
         pool = await get_pool()
         async with pool.acquire() as conn:
-            # Basic check, adjust table/column if needed or just safe-guard
-            try:
-                # Check for is_verified column or similar. If not sure, default False or try/except
-                # Assuming 'is_verified' exists as per common sense features
-                val = await conn.fetchval("SELECT is_verified FROM users WHERE id = $1", UUID(user_id))
-                return bool(val)
-            except Exception:
-                return False
+            rows = await conn.fetch(
+                "SELECT id, is_university_verified FROM users WHERE id = ANY($1::uuid[])",
+                ids,
+            )
+        verified = {uid: False for uid in ids}
+        verified.update({str(row["id"]): bool(row["is_university_verified"]) for row in rows})
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for uid, flag in verified.items():
+                    pipe.set(_verified_key(uid), "1" if flag else "0", ex=settings.xp_verified_cache_seconds)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Failed to cache XP verification status", exc_info=True)
+        return verified
 
-    async def _apply_diminishing_returns(self, user_id: str, target_id: str, action: XPAction, amount: int) -> int:
-        """Apply diminishing returns for repeated interactions."""
-        if not redis_client:
-            return amount
-            
-        key = f"xp:interaction:{user_id}:{target_id}:{action.value}"
+    async def _is_user_verified(self, user_id: str) -> bool:
+        """Check if user is verified (e.g. valid student)."""
+        try:
+            return (await self._verified_many([user_id])).get(user_id, False)
+        except Exception:
+            return False
+
+    async def _bump_interactions(self, keys: Sequence[tuple[str, str]]) -> list[tuple[int, Optional[bool]]]:
+        """Increment interaction counters; returns (count, cached verification) per key pair."""
+        global _scripting_available
         # Expire at midnight
         now = datetime.now()
         midnight = now.replace(hour=23, minute=59, second=59)
-        ttl = int((midnight - now).total_seconds())
-        if ttl < 1: ttl = 1
-        
-        count = await redis_client.incr(key)
-        if count == 1:
-            await redis_client.expire(key, ttl)
-            
-        verified = await self._is_user_verified(user_id)
-        
-        modifier = 1.0
-        if not verified:
-            modifier = 0.5
-            
-        # Diminishing logic: 
+        ttl = max(1, int((midnight - now).total_seconds()))
+
+        replies: list = []
+        if _scripting_available:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for counter_key, verified_key in keys:
+                        pipe.eval(_INTERACTION_LUA, 2, counter_key, verified_key, ttl)
+                    replies = await pipe.execute()
+            except ResponseError:
+                # Scripting disabled (some managed Redis tiers): same result via MULTI.
+                _scripting_available = False
+                replies = []
+        if not replies:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for counter_key, verified_key in keys:
+                    pipe.incr(counter_key)
+                    pipe.expire(counter_key, ttl, nx=True)
+                    pipe.get(verified_key)
+                flat = await pipe.execute()
+            replies = [[flat[i], flat[i + 2]] for i in range(0, len(flat), 3)]
+
+        results: list[tuple[int, Optional[bool]]] = []
+        for reply in replies:
+            cached = reply[1] if len(reply) > 1 else None
+            results.append((int(reply[0]), None if cached is None else str(cached) == "1"))
+        return results
+
+    @staticmethod
+    def _diminish(amount: int, count: int, verified: bool) -> int:
+        # Diminishing logic:
         # Count 1: 100% (or 50% if unverified)
         # Count 2: 50% (of that)
         # Count >2: 0
-        
         if count > 2:
             return 0
-        
+        modifier = 1.0 if verified else 0.5
         final = int(amount * modifier)
-        
         if count == 2:
             final = int(final * 0.5)
-            
         return final
 
+    async def _apply_diminishing_returns(self, user_id: str, target_id: str, action: XPAction, amount: int) -> int:
+        """Apply diminishing returns for repeated interactions."""
+        if not redis_client:
+            return amount
+        key = f"xp:interaction:{user_id}:{target_id}:{action.value}"
+        [(count, verified)] = await self._bump_interactions([(key, _verified_key(user_id))])
+        if verified is None:
+            verified = await self._is_user_verified(user_id)
+        return self._diminish(amount, count, verified)
+
+    @staticmethod
+    def _target_of(metadata: Optional[dict]) -> Optional[str]:
+        if not metadata:
+            return None
+        target_id = metadata.get("host_id") or metadata.get("target_id") or metadata.get("to")
+        return str(target_id) if target_id else None
+
+    async def _resolve_amounts(self, awards: Sequence[XPAward]) -> list[int]:
+        """Base amounts after anti-cheat diminishing returns, one Redis round trip for the batch."""
+        amounts = [XP_AMOUNTS.get(award.action, 0) for award in awards]
+        # Don't apply diminishing returns if interacting with self
+        # Also don't apply for negative XP (penalties shouldn't diminish)
+        pending: list[int] = []
+        for idx, award in enumerate(awards):
+            target_id = self._target_of(award.metadata)
+            if target_id and target_id != str(award.user_id) and amounts[idx] > 0:
+                pending.append(idx)
+        if not pending or not redis_client:
+            return amounts
+
+        keys = []
+        for idx in pending:
+            award = awards[idx]
+            uid = str(award.user_id)
+            keys.append((f"xp:interaction:{uid}:{self._target_of(award.metadata)}:{award.action.value}", _verified_key(uid)))
+        bumped = await self._bump_interactions(keys)
+        misses = [str(awards[idx].user_id) for idx, (_, cached) in zip(pending, bumped) if cached is None]
+        loaded: dict[str, bool] = {}
+        if misses:
+            try:
+                loaded = await self._verified_many(misses)
+            except Exception:
+                logger.warning("Failed to load XP verification status", exc_info=True)
+        for idx, (count, cached) in zip(pending, bumped):
+            uid = str(awards[idx].user_id)
+            verified = cached if cached is not None else loaded.get(uid, False)
+            amounts[idx] = self._diminish(amounts[idx], count, verified)
+        return amounts
+
+    async def award_many(self, awards: Sequence[XPAward]) -> list[tuple[UserXPStats, int]]:
+        """Award several XP grants at once (e.g. both players of a game).
+
+        Returns ``(stats, actual_amount_awarded)`` per input award, in order.
+        """
+        if not awards:
+            return []
+        amounts = await self._resolve_amounts(awards)
+        applied = [(award, amount) for award, amount in zip(awards, amounts) if amount != 0]
+
+        stats_by_user: dict[str, UserXPStats] = {}
+        level_changes: dict[str, int] = {}
+        if applied:
+            levels = sorted(LEVEL_THRESHOLDS.items())
+            pool = await get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(
+                    _AWARD_SQL,
+                    [str(award.user_id) for award, _ in applied],
+                    [award.action.value for award, _ in applied],
+                    [amount for _, amount in applied],
+                    [json.dumps(award.metadata or {}) for award, _ in applied],
+                    [level for level, _ in levels],
+                    [threshold for _, threshold in levels],
+                )
+            for row in rows:
+                uid = str(row["user_id"])
+                stats_by_user[uid] = UserXPStats(
+                    user_id=row["user_id"],
+                    total_xp=row["total_xp"],
+                    current_level=row["current_level"],
+                    last_updated_at=row["last_updated_at"],
+                )
+                if row["current_level"] != (row["previous_level"] or 1):
+                    level_changes[uid] = row["current_level"]
+
+        await self._announce(applied, stats_by_user, level_changes)
+
+        results: list[tuple[UserXPStats, int]] = []
+        for award, amount in zip(awards, amounts):
+            uid = str(award.user_id)
+            if uid not in stats_by_user:
+                # No XP change for this user, just return current stats
+                stats_by_user[uid] = await self.get_user_stats(uid)
+            results.append((stats_by_user[uid], amount))
+        return results
+
+    async def _announce(
+        self,
+        applied: Sequence[tuple[XPAward, int]],
+        stats_by_user: dict[str, UserXPStats],
+        level_changes: dict[str, int],
+    ) -> None:
+        from app.domain.xp import sockets
+
+        for award, amount in applied:
+            uid = str(award.user_id)
+            stats = stats_by_user.get(uid)
+            if stats is None:
+                continue
+            await sockets.emit_xp_gained(uid, amount, award.action.value, stats.total_xp, stats.current_level)
+            # Log to Activity Feed (Audit)
+            try:
+                await audit.log_event(
+                    user_id=uid,
+                    event="xp.gained",
+                    meta={
+                        "action": award.action.value,
+                        "amount": amount,
+                        "total_xp": stats.total_xp,
+                        "level": stats.current_level,
+                        "source_meta": award.metadata or {}
+                    }
+                )
+            except Exception:
+                logger.warning("Failed to log XP audit event", exc_info=True)
+
+        for uid, level in level_changes.items():
+            # Trigger level up notification
+            await sockets.emit_level_up(uid, level)
+            try:
+                await audit.log_event(
+                    user_id=uid,
+                    event="level.up",
+                    meta={"level": level}
+                )
+            except Exception:
+                logger.warning("Failed to log level up audit event", exc_info=True)
+
     async def award_xp(self, user_id: str | UUID, action: XPAction, metadata: dict = None) -> tuple[UserXPStats, int]:
         """Award XP to a user for a specific action.
-        
+
         Returns:
             Tuple of (UserXPStats, actual_amount_awarded)
         """
-        uid = str(user_id)
-        amount = XP_AMOUNTS.get(action, 0)
-        original_amount = amount  # Store to track what was actually awarded
-        
-        # --- Anti-Cheat: Diminishing Returns ---
-        target_id = None
-        if metadata:
-            target_id = metadata.get("host_id") or metadata.get("target_id") or metadata.get("to")
-        
-        if target_id:
-            target_id = str(target_id)
-            # Don't apply diminishing returns if interacting with self
-            # Also don't apply for negative XP (penalties shouldn't diminish)
-            if target_id != uid and amount > 0:
-                amount = await self._apply_diminishing_returns(uid, target_id, action, amount)
-        # ---------------------------------------
-        
-        if amount == 0:
-            # No XP change for this action, just return current stats
-            return await self.get_user_stats(uid), 0
-
-        pool = await get_pool()
-        async with pool.acquire() as conn:
-            async with conn.transaction():
-                # 1. Log the event
-                await conn.execute("""
-                    INSERT INTO xp_events (user_id, action_type, amount, metadata)
-                    VALUES ($1, $2, $3, $4::jsonb)
-                """, uid, action.value, amount, json.dumps(metadata or {}))
-
-                # 2. Update stats and get new totals
-                row = await conn.fetchrow("""
-                    INSERT INTO user_xp_stats (user_id, total_xp, current_level)
-                    VALUES ($1, GREATEST(0, $2::int), 1)
-                    ON CONFLICT (user_id) DO UPDATE
-                    SET total_xp = GREATEST(0, user_xp_stats.total_xp + $2::int),
-                        last_updated_at = NOW()
-                    RETURNING total_xp, current_level
-                """, uid, amount)
-                
-                current_total = row["total_xp"]
-                db_level = row["current_level"]
-                
-                # 3. Check for level up
-                calculated_level = self._calculate_level(current_total)
-                
-                # Emit XP Gained Event (only for non-zero amounts)
-                from app.domain.xp import sockets
-                # We do this inside transaction for safety, but ideal is AFTER commit. 
-                # However, asyncpg doesn't fully support on_commit hooks easily here.
-                # Fire and forget is okay for UI updates.
-                if amount != 0:
-                    await sockets.emit_xp_gained(uid, amount, action.value, current_total, calculated_level)
-
-                # Log to Activity Feed (Audit)
-                try:
-                    await audit.log_event(
-                        user_id=uid,
-                        event="xp.gained",
-                        meta={
-                            "action": action.value,
-                            "amount": amount,
-                            "total_xp": current_total,
-                            "level": calculated_level,
-                            "source_meta": metadata or {}
-                        }
-                    )
-                except Exception:
-                    logger.warning("Failed to log XP audit event", exc_info=True)
-                
-                if calculated_level != db_level:
-                    await conn.execute("""
-                        UPDATE user_xp_stats 
-                        SET current_level = $1
-                        WHERE user_id = $2
-                    """, calculated_level, uid)
-                    db_level = calculated_level
-                    
-                    # Trigger level up notification
-                    await sockets.emit_level_up(uid, calculated_level)
-                    
-                    # Log to Activity Feed (Audit)
-                    try:
-                        await audit.log_event(
-                            user_id=uid,
-                            event="level.up",
-                            meta={"level": calculated_level}
-                        )
-                    except Exception:
-                        logger.warning("Failed to log level up audit event", exc_info=True)
-                
-                # Re-fetch strictly to match UserXPStats structure with ID
-                stats = await self.get_user_stats(uid)
-                return stats, amount  # Return both stats and actual amount awarded
+        [result] = await self.award_many([XPAward(user_id=user_id, action=action, metadata=metadata)])
+        return result
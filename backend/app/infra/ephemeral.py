@@ -0,0 +1,49 @@
+"""In-process coalescing for ephemeral socket events."""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional, Tuple
+
+from app.obs import metrics as obs_metrics
+
+
+class TypingDebouncer:
+	"""Leading-edge debounce of typing indicators per (sender, target).
+
+	The first event of a burst is forwarded immediately; repeats with the same
+	state are dropped until ``window_seconds`` has passed, by which point the
+	receiving client's indicator would otherwise have expired. A state change
+	(typing stopped) always goes through.
+	"""
+
+	def __init__(self, kind: str, *, window_seconds: float, max_keys: int = 50_000) -> None:
+		self.kind = kind
+		self.window_seconds = window_seconds
+		self.max_keys = max_keys
+		self._last: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+
+	def admit(self, sender_id: str, target_id: str, *, state: bool = True, now: Optional[float] = None) -> bool:
+		now = time.monotonic() if now is None else now
+		key = (sender_id, target_id)
+		previous = self._last.get(key)
+		if previous is not None and previous[0] == state and now - previous[1] < self.window_seconds:
+			obs_metrics.EPHEMERAL_EVENTS.labels(kind=self.kind, result="suppressed").inc()
+			return False
+		if previous is None and len(self._last) >= self.max_keys:
+			self._prune(now)
+		self._last[key] = (state, now)
+		obs_metrics.EPHEMERAL_EVENTS.labels(kind=self.kind, result="emitted").inc()
+		return True
+
+	def _prune(self, now: float) -> None:
+		expired = [key for key, (_, seen) in self._last.items() if now - seen >= self.window_seconds]
+		for key in expired:
+			del self._last[key]
+		if len(self._last) >= self.max_keys:
+			# Still full of live bursts: forgetting them only costs a duplicate
+			# indicator, never a lost one.
+			self._last.clear()
+
+
+__all__ = ["TypingDebouncer"]
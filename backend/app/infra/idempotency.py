@@ -1,13 +1,33 @@
+"""Idempotency keys for write endpoints.
+
+Keys live in Redis for the hot window (``IDEMPOTENCY_REDIS_TTL_SECONDS``): one
+``SET NX GET`` reserves a new key or returns the stored payload hash/result id,
+and ``complete`` records the result id. Postgres is only involved when Redis is
+unreachable (synchronous fallback) or when the durability window
+(``IDEMPOTENCY_TTL_SECONDS``) outlives the hot window, in which case completed
+keys are written through asynchronously and consulted for keys Redis no longer
+holds. Keys the server generated itself can never be replayed, so endpoints
+skip storage for them (see :func:`client_key`).
+"""
+
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import json
+import logging
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional
 
 from app.infra.postgres import get_pool
+from app.infra.redis import redis_client
 from app.obs import metrics as obs_metrics
 from app.settings import settings
 
+logger = logging.getLogger(__name__)
+
+_background: set[asyncio.Task] = set()
+
 
 class IdempotencyConflictError(Exception):
     """Raised when an idempotency key is replayed with a conflicting payload."""
@@ -21,6 +41,87 @@ def hash_payload(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
+def client_key(request: Any) -> Optional[str]:
+    """The Idempotency-Key the client sent, or ``None`` when the middleware minted one."""
+
+    state = getattr(request, "state", None)
+    if state is None or getattr(state, "idem_key_generated", False):
+        return None
+    return getattr(state, "idem_key", None)
+
+
+def _redis_key(key: str, handler: str) -> str:
+    return f"idem:{handler}:{key}"
+
+
+def _durable() -> bool:
+    return settings.idempotency_ttl_seconds > settings.idempotency_redis_ttl_seconds
+
+
+def _required() -> bool:
+    return settings.idempotency_required and settings.environment.lower() not in ("dev", "test")
+
+
+def _check(existing_hash: Optional[str], result_id: Optional[str], payload_hash: Optional[str]) -> Optional[dict[str, str]]:
+    if payload_hash and existing_hash and existing_hash != payload_hash:
+        obs_metrics.inc_idem_conflict()
+        raise IdempotencyConflictError("idempotency_conflict")
+    if result_id:
+        obs_metrics.inc_idem_hit()
+        return {"result_id": str(result_id)}
+    return None
+
+
+async def begin(
+    key: str,
+    handler: str,
+    *,
+    payload_hash: Optional[str],
+    ttl_s: int | None = None,
+) -> Optional[dict[str, str]]:
+    """Reserve or replay an idempotency key."""
+    ttl = min(ttl_s or settings.idempotency_ttl_seconds, settings.idempotency_redis_ttl_seconds)
+    record = json.dumps({"h": payload_hash, "r": None})
+    try:
+        previous = await redis_client.set(_redis_key(key, handler), record, nx=True, get=True, ex=ttl)
+    except Exception:
+        logger.warning("idempotency redis unavailable; falling back to postgres", exc_info=True)
+        return await _pg_begin(key, handler, payload_hash=payload_hash, ttl_s=ttl_s)
+    if previous is not None:
+        stored = json.loads(previous)
+        return _check(stored.get("h"), stored.get("r"), payload_hash)
+    if _durable():
+        # Reserved in Redis, but the key may have been completed before the hot
+        # window expired; the durable tier still remembers it.
+        row = await _pg_lookup(key, handler)
+        if row is not None:
+            return _check(row["payload_hash"], row["result_id"], payload_hash)
+    obs_metrics.inc_idem_miss()
+    return None
+
+
+async def complete(key: str, handler: str, result_id: str, *, payload_hash: Optional[str] = None) -> None:
+    redis_key = _redis_key(key, handler)
+    try:
+        stored_hash = payload_hash
+        if stored_hash is None:
+            previous = await redis_client.get(redis_key)
+            stored_hash = json.loads(previous).get("h") if previous else None
+        await redis_client.set(
+            redis_key,
+            json.dumps({"h": stored_hash, "r": result_id}),
+            ex=settings.idempotency_redis_ttl_seconds,
+        )
+    except Exception:
+        logger.warning("idempotency redis unavailable; completing in postgres", exc_info=True)
+        await _pg_complete(key, handler, result_id, payload_hash=payload_hash)
+        return
+    if _durable():
+        task = asyncio.create_task(_persist(key, handler, result_id, stored_hash))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+
 async def _pool_or_none():
     try:
         return await get_pool()
@@ -28,19 +129,37 @@ async def _pool_or_none():
         return None
 
 
-async def begin(
+async def _pg_lookup(key: str, handler: str):
+    pool = await _pool_or_none()
+    if pool is None:
+        return None
+    async with pool.acquire() as conn:
+        return await conn.fetchrow(
+            "SELECT result_id, payload_hash FROM idempotency_keys WHERE key=$1 AND handler=$2 AND expires_at>NOW()",
+            key,
+            handler,
+        )
+
+
+async def _persist(key: str, handler: str, result_id: str, payload_hash: Optional[str]) -> None:
+    try:
+        await _pg_complete(key, handler, result_id, payload_hash=payload_hash)
+    except Exception:
+        logger.warning("idempotency persist failed key=%s handler=%s", key, handler, exc_info=True)
+
+
+async def _pg_begin(
     key: str,
     handler: str,
     *,
     payload_hash: Optional[str],
     ttl_s: int | None = None,
 ) -> Optional[dict[str, str]]:
-    """Reserve or replay an idempotency key."""
     ttl = ttl_s or settings.idempotency_ttl_seconds
     pool = await _pool_or_none()
     if pool is None:
         obs_metrics.inc_idem_unavail()
-        if settings.idempotency_required and settings.environment.lower() not in ("dev", "test"):
+        if _required():
             raise IdempotencyUnavailableError("idempotency_unavailable")
         return None
 
@@ -51,15 +170,7 @@ async def begin(
             handler,
         )
         if row:
-            existing_hash = row["payload_hash"]
-            if payload_hash and existing_hash and existing_hash != payload_hash:
-                obs_metrics.inc_idem_conflict()
-                raise IdempotencyConflictError("idempotency_conflict")
-            rid = row["result_id"]
-            if rid:
-                obs_metrics.inc_idem_hit()
-                return {"result_id": str(rid)}
-            return None
+            return _check(row["payload_hash"], row["result_id"], payload_hash)
 
         exp = datetime.now(timezone.utc) + timedelta(seconds=ttl)
         await conn.execute(
@@ -77,16 +188,24 @@ async def begin(
         return None
 
 
-async def complete(key: str, handler: str, result_id: str) -> None:
+async def _pg_complete(key: str, handler: str, result_id: str, *, payload_hash: Optional[str] = None) -> None:
     pool = await _pool_or_none()
     if pool is None:
-        if settings.idempotency_required and settings.environment.lower() not in ("dev", "test"):
+        if _required():
             raise IdempotencyUnavailableError("idempotency_unavailable")
         return
+    exp = datetime.now(timezone.utc) + timedelta(seconds=settings.idempotency_ttl_seconds)
     async with pool.acquire() as conn:
         await conn.execute(
-            "UPDATE idempotency_keys SET result_id=$3 WHERE key=$1 AND handler=$2",
+            """
+            INSERT INTO idempotency_keys(key, handler, result_id, payload_hash, expires_at)
+            VALUES($1,$2,$3,$4,$5)
+            ON CONFLICT (key) DO UPDATE SET result_id = EXCLUDED.result_id
+            WHERE idempotency_keys.handler = EXCLUDED.handler
+            """,
             key,
             handler,
             result_id,
+            payload_hash,
+            exp,
         )
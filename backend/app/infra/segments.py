@@ -0,0 +1,55 @@
+"""Compressed message segments for cold chat history.
+
+A segment is a JSON array of message records compressed as one blob. zstd is
+used when the ``zstandard`` package is installed; otherwise segments are
+written with zlib so compaction still works in minimal environments. The codec
+is stored next to each payload, so readers decode whatever a writer produced.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, List, Tuple
+
+try:
+	import zstandard
+except ImportError:  # pragma: no cover - depends on the deployment image
+	zstandard = None
+
+ZSTD = "zstd"
+ZLIB = "zlib"
+
+_ZSTD_LEVEL = 10
+_ZLIB_LEVEL = 6
+
+
+def default_codec() -> str:
+	return ZSTD if zstandard is not None else ZLIB
+
+
+def encode(records: List[dict[str, Any]], *, codec: str | None = None) -> Tuple[str, bytes]:
+	codec = codec or default_codec()
+	raw = json.dumps(records, separators=(",", ":")).encode("utf-8")
+	if codec == ZSTD:
+		if zstandard is None:
+			raise RuntimeError("zstandard_unavailable")
+		return codec, zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(raw)
+	if codec == ZLIB:
+		return codec, zlib.compress(raw, _ZLIB_LEVEL)
+	raise ValueError(f"unknown segment codec: {codec}")
+
+
+def decode(codec: str, payload: bytes) -> List[dict[str, Any]]:
+	if codec == ZSTD:
+		if zstandard is None:
+			raise RuntimeError("zstandard_unavailable")
+		raw = zstandard.ZstdDecompressor().decompress(payload)
+	elif codec == ZLIB:
+		raw = zlib.decompress(payload)
+	else:
+		raise ValueError(f"unknown segment codec: {codec}")
+	return json.loads(raw)
+
+
+__all__ = ["ZLIB", "ZSTD", "decode", "default_codec", "encode"]
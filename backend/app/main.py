@@ -62,8 +62,13 @@ from app.communities.workers.unread_sync import UnreadSyncWorker
 from app.communities.jobs.invite_gc import InviteGarbageCollector
 from app.communities.jobs.membership_integrity import MembershipIntegrityJob
 from app.communities.jobs.anti_gaming import AntiGamingAnomalyJob
+from app.domain.chat import side_effects as chat_side_effects
+from app.domain.discovery.candidates import CandidateIndexWorker
+from app.domain.identity import audit_writer
 from app.domain.leaderboards import jobs as leaderboard_jobs
+from app.domain.search.typeahead import TypeaheadSync
 from app.infra.redis import redis_client
+from app.maintenance.cold_storage import compact_cold_messages
 from app.maintenance.retention import purge_soft_deleted
 from app.moderation import configure_postgres as configure_moderation
 from app.moderation import router as moderation_router
@@ -72,6 +77,7 @@ from app.domain.activities.sockets import ActivitiesNamespace, set_namespace as
 from app.domain.chat.sockets import ChatNamespace, set_namespace as set_chat_namespace
 from app.domain.proximity import live_sessions
 from app.domain.proximity.sockets import PresenceNamespace
+from app.domain.rooms import chat_service as room_chat_service
 from app.domain.rooms.sockets import RoomsNamespace, set_namespace as set_rooms_namespace
 from app.domain.social.sockets import SocialNamespace, set_namespace
 from app.infra import postgres
@@ -196,6 +202,7 @@ async def lifespan(app: FastAPI):
 		scheduler.schedule_hourly("communities-membership-integrity", membership_job.run_once, hours=1)
 		scheduler.schedule_hourly("communities-anti-gaming", anti_gaming_job.run_once, hours=1)
 		scheduler.schedule_hourly("retention-purge", purge_soft_deleted, hours=24)
+		scheduler.schedule_hourly("chat-cold-compaction", compact_cold_messages, hours=24)
 		# Leaderboard computation - runs every 5 minutes for near-real-time updates
 		scheduler.schedule_minutes("leaderboard-snapshot", leaderboard_jobs.finalize_daily_leaderboards, minutes=5)
 		# Run leaderboard snapshot once at startup
@@ -207,6 +214,33 @@ async def lifespan(app: FastAPI):
 		asyncio.create_task(live_sessions.run_presence_sweeper(redis_client), name="presence-sweeper")
 	)
 	
+	if settings.audit_writer_enabled:
+		writer = audit_writer.get_writer()
+		worker_instances.append(writer)
+		worker_tasks.append(asyncio.create_task(writer.run_forever(), name="identity-audit-writer"))
+	if settings.room_receipts_coalesce:
+		receipt_coalescer = room_chat_service.get_receipt_coalescer()
+		worker_instances.append(receipt_coalescer)
+		worker_tasks.append(asyncio.create_task(receipt_coalescer.run_forever(), name="rooms-receipt-coalescer"))
+	if settings.chat_side_effects_async:
+		for index, chat_worker in enumerate(chat_side_effects.spawn_workers()):
+			worker_instances.append(chat_worker)
+			worker_tasks.append(
+				asyncio.create_task(chat_worker.run_forever(), name=f"chat-side-effects-{index}")
+			)
+	if settings.discovery_candidates_worker_enabled:
+		candidate_worker = CandidateIndexWorker()
+		worker_instances.append(candidate_worker)
+		worker_tasks.append(
+			asyncio.create_task(candidate_worker.run_forever(), name="discovery-candidate-index")
+		)
+	if settings.search_typeahead_enabled:
+		typeahead_sync = TypeaheadSync(rebuild_interval=float(settings.search_typeahead_rebuild_seconds))
+		worker_instances.append(typeahead_sync)
+		worker_tasks.append(
+			asyncio.create_task(typeahead_sync.run_forever(), name="search-typeahead-sync")
+		)
+	
 	# Background seeding task to avoid blocking startup (prevents 502/timeout on slow DB)
 	async def run_seeding():
 		try:
@@ -0,0 +1,223 @@
+"""Compact old chat history into compressed per-month segments.
+
+Messages whose whole calendar month is older than ``CHAT_COLD_AFTER_DAYS`` are
+deleted from ``chat_messages`` / ``room_messages`` and stored as one segment
+per conversation (or room) per month (see infra migration 0279 and
+``app.infra.segments``). Sequence counters live in ``chat_seq``/``room_seq``,
+so removing old rows never affects seq allocation.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+import asyncpg
+
+from app.infra import segments
+from app.infra.postgres import get_pool
+from app.obs import metrics as obs_metrics
+from app.settings import settings
+
+
+@dataclass(frozen=True)
+class _Tier:
+    table: str
+    segment_table: str
+    owner_column: str
+    columns: str
+
+
+CHAT_TIER = _Tier(
+    table="chat_messages",
+    segment_table="chat_message_segments",
+    owner_column="conversation_id",
+    columns="conversation_id, seq, message_id, client_msg_id, sender_id, recipient_id, body, attachments, created_at",
+)
+
+ROOM_TIER = _Tier(
+    table="room_messages",
+    segment_table="room_message_segments",
+    owner_column="room_id",
+    columns="id, room_id, seq, sender_id, client_msg_id, kind, content, media_key, media_mime, media_bytes, created_at",
+)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def to_record(row: asyncpg.Record | dict) -> dict[str, Any]:
+    return {key: _jsonable(value) for key, value in dict(row).items()}
+
+
+def from_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of :func:`to_record` for the fields readers rely on."""
+    restored = dict(record)
+    restored["created_at"] = datetime.fromisoformat(restored["created_at"])
+    return restored
+
+
+async def _cold_groups(conn: asyncpg.Connection, tier: _Tier, days: int, limit: int) -> List[asyncpg.Record]:
+    return await conn.fetch(
+        f"""
+        SELECT {tier.owner_column} AS owner_id, date_trunc('month', created_at)::date AS month
+        FROM {tier.table}
+        WHERE created_at < date_trunc('month', NOW() - make_interval(days => $1))
+        GROUP BY 1, 2
+        ORDER BY 2
+        LIMIT $2
+        """,
+        days,
+        limit,
+    )
+
+
+async def _write_segment(
+    conn: asyncpg.Connection, tier: _Tier, owner_id: Any, month: date, records: List[dict[str, Any]]
+) -> None:
+    records.sort(key=lambda record: record["seq"])
+    codec, payload = segments.encode(records)
+    await conn.execute(
+        f"""
+        INSERT INTO {tier.segment_table} (
+            {tier.owner_column}, month, first_seq, last_seq, message_count, sender_ids, codec, payload
+        )
+        VALUES ($1, $2, $3, $4, $5, $6::uuid[], $7, $8)
+        ON CONFLICT ({tier.owner_column}, month) DO UPDATE SET
+            first_seq = EXCLUDED.first_seq,
+            last_seq = EXCLUDED.last_seq,
+            message_count = EXCLUDED.message_count,
+            sender_ids = EXCLUDED.sender_ids,
+            codec = EXCLUDED.codec,
+            payload = EXCLUDED.payload
+        """,
+        owner_id,
+        month,
+        records[0]["seq"],
+        records[-1]["seq"],
+        len(records),
+        sorted({record["sender_id"] for record in records}),
+        codec,
+        payload,
+    )
+
+
+async def _compact_group(conn: asyncpg.Connection, tier: _Tier, owner_id: Any, month: date) -> int:
+    async with conn.transaction():
+        rows = await conn.fetch(
+            f"""
+            DELETE FROM {tier.table}
+            WHERE {tier.owner_column} = $1
+              AND created_at >= $2::date
+              AND created_at < ($2::date + INTERVAL '1 month')
+            RETURNING {tier.columns}
+            """,
+            owner_id,
+            month,
+        )
+        if not rows:
+            return 0
+        records = [to_record(row) for row in rows]
+        existing = await conn.fetchrow(
+            f"SELECT codec, payload FROM {tier.segment_table} WHERE {tier.owner_column} = $1 AND month = $2 FOR UPDATE",
+            owner_id,
+            month,
+        )
+        if existing is not None:
+            # A previous run was interrupted or rows were restored; merge by seq.
+            merged = {record["seq"]: record for record in segments.decode(existing["codec"], bytes(existing["payload"]))}
+            merged.update((record["seq"], record) for record in records)
+            records = list(merged.values())
+        await _write_segment(conn, tier, owner_id, month, records)
+        return len(rows)
+
+
+async def compact_cold_messages(batch: int | None = None) -> Dict[str, int]:
+    """Move cold months of DM and room history into segments; returns rows moved per table."""
+    days = settings.chat_cold_after_days
+    limit = batch or settings.chat_cold_compaction_batch
+    counts: Dict[str, int] = {}
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        for tier in (CHAT_TIER, ROOM_TIER):
+            start = time.monotonic()
+            moved = 0
+            for group in await _cold_groups(conn, tier, days, limit):
+                moved += await _compact_group(conn, tier, group["owner_id"], group["month"])
+            counts[tier.table] = moved
+            if moved:
+                obs_metrics.CHAT_COLD_COMPACTED.labels(table=tier.table).inc(moved)
+            obs_metrics.CHAT_COLD_COMPACTION_DURATION.labels(table=tier.table).observe(time.monotonic() - start)
+    return counts
+
+
+async def load_segments(
+    conn: asyncpg.Connection,
+    tier: _Tier,
+    owner_id: Any,
+    *,
+    where: str = "",
+    params: tuple = (),
+    order: str = "month DESC",
+    limit: int = 1,
+) -> List[Tuple[asyncpg.Record, List[dict[str, Any]]]]:
+    """Decode up to ``limit`` segments of one conversation/room, in ``order``.
+
+    Returns (segment metadata, records sorted by seq) pairs; ``where`` may refer
+    to ``params`` as $2, $3, ...
+    """
+    rows = await conn.fetch(
+        f"""
+        SELECT month, first_seq, last_seq, codec, payload FROM {tier.segment_table}
+        WHERE {tier.owner_column} = $1 {where}
+        ORDER BY {order}
+        LIMIT {int(limit)}
+        """,
+        owner_id,
+        *params,
+    )
+    return [
+        (row, [from_record(record) for record in segments.decode(row["codec"], bytes(row["payload"]))])
+        for row in rows
+    ]
+
+
+async def purge_sender(conn: asyncpg.Connection, tier: _Tier, user_id: Any) -> int:
+    """Remove every compacted message sent by ``user_id``; returns messages removed.
+
+    Segments are rewritten without the user's records, or dropped once empty.
+    Call inside the caller's transaction alongside the hot-table delete.
+    """
+    rows = await conn.fetch(
+        f"""
+        SELECT {tier.owner_column} AS owner_id, month, codec, payload FROM {tier.segment_table}
+        WHERE $1::uuid = ANY(sender_ids)
+        FOR UPDATE
+        """,
+        user_id,
+    )
+    removed = 0
+    for row in rows:
+        records = segments.decode(row["codec"], bytes(row["payload"]))
+        kept = [record for record in records if str(record["sender_id"]) != str(user_id)]
+        removed += len(records) - len(kept)
+        if kept:
+            await _write_segment(conn, tier, row["owner_id"], row["month"], kept)
+        else:
+            await conn.execute(
+                f"DELETE FROM {tier.segment_table} WHERE {tier.owner_column} = $1 AND month = $2",
+                row["owner_id"],
+                row["month"],
+            )
+    return removed
+
+
+__all__ = ["CHAT_TIER", "ROOM_TIER", "compact_cold_messages", "from_record", "load_segments", "purge_sender", "to_record"]
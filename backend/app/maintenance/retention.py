@@ -90,7 +90,14 @@ async def _log_retention_run(
 async def purge_soft_deleted(batch: int = 1000) -> Dict[str, int]:
     """Purge soft-deleted records respecting legal holds."""
     pool = await get_pool()
-    counts: Dict[str, int] = {"messages": 0, "sessions": 0, "invitations": 0, "skipped_holds": 0}
+    counts: Dict[str, int] = {
+        "messages": 0,
+        "chat_message_segments": 0,
+        "room_message_segments": 0,
+        "sessions": 0,
+        "invitations": 0,
+        "skipped_holds": 0,
+    }
 
     # Get users under legal hold to exclude from purge
     held_users = await _get_users_under_hold()
@@ -103,6 +110,14 @@ async def purge_soft_deleted(batch: int = 1000) -> Dict[str, int]:
         counts["skipped_holds"] += skipped
         await _log_retention_run(conn, "messages", purged, MESSAGES_RETENTION_DAYS, skipped, duration_ms)
 
+        for table in ("chat_message_segments", "room_message_segments"):
+            start = time.monotonic()
+            purged, skipped = await _purge_segments(conn, table, MESSAGES_RETENTION_DAYS, batch, held_users)
+            duration_ms = int((time.monotonic() - start) * 1000)
+            counts[table] = purged
+            counts["skipped_holds"] += skipped
+            await _log_retention_run(conn, table, purged, MESSAGES_RETENTION_DAYS, skipped, duration_ms)
+
         start = time.monotonic()
         purged = await _purge_sessions(conn, SESSIONS_RETENTION_DAYS, batch)
         duration_ms = int((time.monotonic() - start) * 1000)
@@ -173,6 +188,43 @@ async def _purge_messages(
         return len(rows), 0
 
 
+async def _purge_segments(
+    conn: asyncpg.Connection,
+    table: str,
+    days: int,
+    limit: int,
+    held_users: Set[UUID],
+) -> tuple[int, int]:
+    """Drop whole cold-history segments whose newest message is past retention.
+
+    A segment covers one calendar month, so it expires once the end of that
+    month is older than the window. Segments with a sender under legal hold are
+    kept. Returns (purged_count, skipped_count).
+    """
+    q = f"""
+    WITH doomed AS (
+        SELECT ctid FROM {table}
+        WHERE month + INTERVAL '1 month' <= NOW() - INTERVAL '{days} days'
+          AND NOT (sender_ids && $1::uuid[])
+        LIMIT {limit}
+    )
+    DELETE FROM {table} t USING doomed d WHERE t.ctid = d.ctid
+    RETURNING t.message_count;
+    """
+    rows = await conn.fetch(q, list(held_users))
+    skipped = 0
+    if held_users:
+        skipped = await conn.fetchval(
+            f"""
+            SELECT COUNT(*) FROM {table}
+            WHERE month + INTERVAL '1 month' <= NOW() - INTERVAL '{days} days'
+              AND sender_ids && $1::uuid[]
+            """,
+            list(held_users),
+        )
+    return sum(row["message_count"] for row in rows), skipped or 0
+
+
 async def _purge(
     conn: asyncpg.Connection,
     table: str,
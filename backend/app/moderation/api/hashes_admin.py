@@ -14,7 +14,7 @@ router = APIRouter(prefix="/api/mod/v1/hashes", tags=["moderation-hashes"])
 
 
 class HashEntryIn(BaseModel):
-    algo: str = Field(pattern=r"^(phash|pdq|ahash)$")
+    algo: str = Field(pattern=r"^(phash|dhash|ahash)$")
     hash: str = Field(min_length=8, max_length=128)
     label: str
     source: str
@@ -18,6 +18,7 @@ from app.moderation.domain.enforcement import (
 	ModerationEnforcer,
 	ModerationRepository,
 )
+from app.moderation.domain.gate_state import GateStateCache
 from app.moderation.domain.ip_enrichment import (
 	InMemoryIpReputationRepository,
 	IpEnrichmentService,
@@ -134,12 +135,17 @@ _policy = Policy(
 )
 _enforcer = ModerationEnforcer(repository=_repository, hooks=_hooks)
 _redis_proxy: RedisProxy = redis_client
+_gate_state = GateStateCache(_redis_proxy)
 _reputation_repository: ReputationRepository = InMemoryReputationRepository()
-_reputation_service = ReputationService(repository=_reputation_repository)
+_reputation_service = ReputationService(repository=_reputation_repository, gate_state=_gate_state)
 _restriction_repository: RestrictionRepository = InMemoryRestrictionRepository()
 _velocity_config: VelocityConfig = default_velocity_config()
 _velocity_service = VelocityService(redis=_redis_proxy, config=_velocity_config)
-_restriction_service = RestrictionService(repository=_restriction_repository, redis=_redis_proxy)
+_restriction_service = RestrictionService(
+	repository=_restriction_repository,
+	redis=_redis_proxy,
+	gate_state=_gate_state,
+)
 _linkage_repository: LinkageRepository = InMemoryLinkageRepository()
 _linkage_service = LinkageService(repository=_linkage_repository)
 _ip_repository: IpReputationRepository = InMemoryIpReputationRepository()
@@ -149,6 +155,7 @@ _write_gate: WriteGateV2 = WriteGateV2(
 	reputation=_reputation_service,
 	restrictions=_restriction_service,
 	velocity=_velocity_service,
+	state_cache=_gate_state,
 )
 _actions_catalog_service: ActionsCatalogService | None = None
 _guard_evaluator: "GuardEvaluator" | None = None
@@ -195,11 +202,12 @@ def configure(
     ip_enrichment_service: Optional[IpEnrichmentService] = None,
     reputation_config: Optional[ReputationConfig] = None,
     actions_catalog_service: Optional[ActionsCatalogService] = None,
+    gate_state: Optional[GateStateCache] = None,
 ) -> None:
     global _repository, _trust_repo, _trust_ledger, _hooks, _detectors, _policy, _enforcer, _redis_proxy, _subject_resolver, _notifications, _staff_ids, _case_service, _safety_repository, _thresholds
     global _reputation_repository, _reputation_service, _restriction_repository, _restriction_service, _velocity_config, _velocity_service
     global _linkage_repository, _linkage_service, _ip_repository, _ip_enrichment_service
-    global _reputation_config, _write_gate, _actions_catalog_service
+    global _reputation_config, _write_gate, _actions_catalog_service, _gate_state
     global _guard_evaluator, _batch_job_scheduler, _bundle_service, _revert_registry, _admin_tools_executor
     if repository is not None:
         _repository = repository
@@ -248,11 +256,16 @@ def configure(
         notifications=_notifications,
         staff_recipient_ids=_staff_ids,
     )
-    _reputation_service = reputation_service or ReputationService(repository=_reputation_repository)
+    _gate_state = gate_state or GateStateCache(_redis_proxy)
+    _reputation_service = reputation_service or ReputationService(
+        repository=_reputation_repository,
+        gate_state=_gate_state,
+    )
     _velocity_service = velocity_service or VelocityService(redis=_redis_proxy, config=_velocity_config)
     _restriction_service = restriction_service or RestrictionService(
         repository=_restriction_repository,
         redis=_redis_proxy,
+        gate_state=_gate_state,
     )
     _linkage_service = linkage_service or LinkageService(repository=_linkage_repository)
     _ip_enrichment_service = ip_enrichment_service or IpEnrichmentService(repository=_ip_repository)
@@ -267,6 +280,7 @@ def configure(
         honey_shadow_hours=config_for_gate.honey_shadow_hours if config_for_gate else None,
         honey_captcha_hours=config_for_gate.honey_captcha_hours if config_for_gate else None,
         link_cooloff_hours=config_for_gate.link_cooloff_hours if config_for_gate else 24,
+        state_cache=_gate_state,
     )
     if actions_catalog_service is not None:
         _actions_catalog_service = actions_catalog_service
@@ -289,7 +303,8 @@ def configure_postgres(
     thresholds = load_thresholds(safety_thresholds_path) if safety_thresholds_path else None
     reputation_repo = PostgresReputationRepository(pool)
     restriction_repo = PostgresRestrictionRepository(pool)
-    restriction_service = RestrictionService(repository=restriction_repo, redis=proxy)
+    gate_state = GateStateCache(proxy)
+    restriction_service = RestrictionService(repository=restriction_repo, redis=proxy, gate_state=gate_state)
     linkage_repo = PostgresLinkageRepository(pool)
     ip_repo = PostgresIpReputationRepository(pool)
     reputation_config = load_reputation_config(reputation_config_path) if reputation_config_path else None
@@ -317,6 +332,7 @@ def configure_postgres(
         ip_repository=ip_repo,
         reputation_config=reputation_config,
         actions_catalog_service=catalog_service,
+        gate_state=gate_state,
     )
     from app.moderation.domain.tools.bundle_io import BundleService
     from app.moderation.domain.tools.executor import AdminToolsExecutor
@@ -405,6 +421,10 @@ def get_write_gate() -> WriteGateV2:
     return _write_gate
 
 
+def get_gate_state_cache() -> GateStateCache:
+    return _gate_state
+
+
 def get_reputation_config() -> ReputationConfig | None:
     return _reputation_config
 
@@ -1,4 +1,12 @@
-"""SQL helpers powering the moderation admin dashboards."""
+"""SQL helpers powering the moderation admin dashboards.
+
+KPIs, trends and workload queues read the incremental rollups from migration
+0273 (``mod_metrics_gauge`` and ``mod_metrics_hourly``), which triggers keep
+current as cases, reports, actions and appeals change, so a dashboard load
+costs O(buckets) rather than O(history). :func:`reconcile_rollups` rebuilds the
+gauges and recent buckets from the source tables and runs periodically from
+the moderation workers.
+"""
 
 from __future__ import annotations
 
@@ -14,62 +22,63 @@ def _ensure_iter(seq: Sequence[str] | Iterable[str] | None) -> list[str]:
     return list(seq) if seq else []
 
 
+def _campus_clause(campuses: list[str], params: list[Any], column: str = "campus_key") -> str:
+    if not campuses:
+        return ""
+    params.append(campuses)
+    return f"AND {column} = ANY(${len(params)}::text[])"
+
+
 async def fetch_kpis(
     conn: asyncpg.Connection,
     *,
     campus_filter: Sequence[str] | None = None,
 ) -> dict[str, Any]:
+    """Headline numbers from the rollup tables.
+
+    Backlog sizes come from ``mod_metrics_gauge``; the 24 hour and 7 day
+    windows sum ``mod_metrics_hourly`` buckets, so they are accurate to the
+    hour (the oldest bucket is counted whole).
+    """
+
     campuses = _ensure_iter(campus_filter)
     params: list[Any] = []
-    campus_clause = ""
-    if campuses:
-        params.append(campuses)
-        campus_clause = f"AND CAST(c.campus_id AS text) = ANY(${len(params)}::text[])"
+    campus_clause = _campus_clause(campuses, params)
 
     row = await conn.fetchrow(
         f"""
+        WITH gauges AS (
+            SELECT
+                COALESCE(SUM(value) FILTER (WHERE metric = 'open'), 0) AS open_cases,
+                COALESCE(SUM(value) FILTER (WHERE metric = 'escalated'), 0) AS escalated_count,
+                COALESCE(SUM(value) FILTER (WHERE metric = 'pending_appeal'), 0) AS pending_appeals
+            FROM mod_metrics_gauge
+            WHERE TRUE {campus_clause}
+        ),
+        windows AS (
+            SELECT
+                COALESCE(SUM(cases_resolved) FILTER (WHERE bucket >= mod_metrics_hour(now() - interval '24 hours')), 0)
+                    AS resolved_today,
+                COALESCE(SUM(reports) FILTER (WHERE bucket >= mod_metrics_hour(now() - interval '24 hours')), 0)
+                    AS new_reports_24h,
+                COALESCE(SUM(actions_applied) FILTER (WHERE bucket >= mod_metrics_hour(now() - interval '24 hours')), 0)
+                    AS actions_24h,
+                COALESCE(SUM(cases_resolved), 0) AS resolved_7d,
+                COALESCE(SUM(resolution_seconds), 0) AS resolution_seconds_7d
+            FROM mod_metrics_hourly
+            WHERE bucket >= mod_metrics_hour(now() - interval '7 days')
+              {campus_clause}
+        )
         SELECT
-            (SELECT COUNT(*) FROM mod_case c WHERE status = 'open' {campus_clause})::int AS open_cases,
-            (SELECT COUNT(*) FROM mod_case c WHERE status = 'escalated' {campus_clause})::int AS escalated_count,
-            (
-                SELECT COUNT(*)
-                FROM mod_case c
-                WHERE c.status IN ('actioned', 'dismissed')
-                  AND c.updated_at >= now() - interval '24 hours'
-                  {campus_clause}
-            )::int AS resolved_today,
-            (
-                SELECT COUNT(*)
-                FROM mod_appeal a
-                JOIN mod_case c ON c.id = a.case_id
-                WHERE a.status = 'pending'
-                  {campus_clause}
-            )::int AS pending_appeals,
-            COALESCE(
-                (
-                    SELECT AVG(EXTRACT(EPOCH FROM (c.updated_at - c.created_at)) / 3600.0)
-                    FROM mod_case c
-                    WHERE c.status IN ('actioned', 'dismissed')
-                      AND c.updated_at >= now() - interval '7 days'
-                      {campus_clause}
-                ),
-                0
-            )::double precision AS avg_resolution_hours,
-            -- Keep original fields for backward compatibility/other views
-            (
-                SELECT COUNT(*)
-                FROM mod_report r
-                JOIN mod_case c ON c.id = r.case_id
-                WHERE r.created_at >= now() - interval '24 hours'
-                {campus_clause}
-            )::int AS new_reports_24h,
-            (
-                SELECT COUNT(*)
-                FROM mod_action a
-                JOIN mod_case c ON c.id = a.case_id
-                WHERE a.created_at >= now() - interval '24 hours'
-                {campus_clause}
-            )::int AS actions_24h
+            g.open_cases::int AS open_cases,
+            g.escalated_count::int AS escalated_count,
+            w.resolved_today::int AS resolved_today,
+            g.pending_appeals::int AS pending_appeals,
+            CASE WHEN w.resolved_7d > 0 THEN w.resolution_seconds_7d / w.resolved_7d / 3600.0 ELSE 0 END
+                ::double precision AS avg_resolution_hours,
+            w.new_reports_24h::int AS new_reports_24h,
+            w.actions_24h::int AS actions_24h
+        FROM gauges g CROSS JOIN windows w
         """,
         *params,
     )
@@ -103,76 +112,46 @@ async def fetch_trends(
     bucket: Literal["hour", "day"] | None = None,
     campus_filter: Sequence[str] | None = None,
 ) -> list[dict[str, Any]]:
+    """Per-bucket activity summed from ``mod_metrics_hourly`` (UTC buckets)."""
+
     campuses = _ensure_iter(campus_filter)
     end = end or datetime.now(timezone.utc)
     start = start or end - timedelta(hours=_DEFAULT_RANGE_HOURS)
     bucket = bucket or ("day" if (end - start) > timedelta(days=7) else "hour")
     interval = "1 day" if bucket == "day" else "1 hour"
     params: list[Any] = [start, end, interval, bucket]
-    campus_clause_cases = ""
-    campus_clause_join = ""
-    if campuses:
-        params.append(campuses)
-        bind = len(params)
-        campus_clause_cases = f"AND CAST(c.campus_id AS text) = ANY(${bind}::text[])"
-        campus_clause_join = f"AND CAST(c.campus_id AS text) = ANY(${bind}::text[])"
+    campus_clause = _campus_clause(campuses, params, "h.campus_key")
     rows = await conn.fetch(
         f"""
         WITH buckets AS (
-            SELECT generate_series($1::timestamptz, $2::timestamptz, $3::interval) AS bucket
-        ),
-        report_counts AS (
-            SELECT date_trunc($4, r.created_at) AS bucket, COUNT(*) AS count
-            FROM mod_report r
-            JOIN mod_case c ON c.id = r.case_id
-            WHERE r.created_at BETWEEN $1 AND $2
-            {campus_clause_join}
-            GROUP BY 1
-        ),
-        case_counts AS (
-            SELECT date_trunc($4, c.created_at) AS bucket, COUNT(*) AS count
-            FROM mod_case c
-            WHERE c.created_at BETWEEN $1 AND $2
-            {campus_clause_cases}
-            GROUP BY 1
-        ),
-        action_counts AS (
-            SELECT date_trunc($4, a.created_at) AS bucket, COUNT(*) AS count
-            FROM mod_action a
-            JOIN mod_case c ON c.id = a.case_id
-            WHERE a.created_at BETWEEN $1 AND $2
-            {campus_clause_join}
-            GROUP BY 1
-        ),
-        appeals_received AS (
-            SELECT date_trunc($4, ap.created_at) AS bucket, COUNT(*) AS count
-            FROM mod_appeal ap
-            JOIN mod_case c ON c.id = ap.case_id
-            WHERE ap.created_at BETWEEN $1 AND $2
-            {campus_clause_join}
-            GROUP BY 1
+            SELECT generate_series(
+                date_trunc($4, $1::timestamptz AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                $2::timestamptz,
+                $3::interval
+            ) AS bucket
         ),
-        appeals_accepted AS (
-            SELECT date_trunc($4, ap.reviewed_at) AS bucket, COUNT(*) AS count
-            FROM mod_appeal ap
-            JOIN mod_case c ON c.id = ap.case_id
-            WHERE ap.reviewed_at BETWEEN $1 AND $2 AND ap.status = 'accepted'
-            {campus_clause_join}
+        rolled AS (
+            SELECT
+                date_trunc($4, h.bucket AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+                SUM(h.reports) AS reports,
+                SUM(h.cases_opened) AS cases_opened,
+                SUM(h.actions_applied) AS actions_applied,
+                SUM(h.appeals_received) AS appeals_received,
+                SUM(h.appeals_accepted) AS appeals_accepted
+            FROM mod_metrics_hourly h
+            WHERE h.bucket >= mod_metrics_hour($1) AND h.bucket <= $2
+            {campus_clause}
             GROUP BY 1
         )
         SELECT
             b.bucket,
-            COALESCE(r.count, 0) AS reports,
-            COALESCE(cc.count, 0) AS cases_opened,
-            COALESCE(ac.count, 0) AS actions_applied,
-            COALESCE(ar.count, 0) AS appeals_received,
-            COALESCE(aa.count, 0) AS appeals_accepted
+            COALESCE(r.reports, 0) AS reports,
+            COALESCE(r.cases_opened, 0) AS cases_opened,
+            COALESCE(r.actions_applied, 0) AS actions_applied,
+            COALESCE(r.appeals_received, 0) AS appeals_received,
+            COALESCE(r.appeals_accepted, 0) AS appeals_accepted
         FROM buckets b
-        LEFT JOIN report_counts r ON r.bucket = b.bucket
-        LEFT JOIN case_counts cc ON cc.bucket = b.bucket
-        LEFT JOIN action_counts ac ON ac.bucket = b.bucket
-        LEFT JOIN appeals_received ar ON ar.bucket = b.bucket
-        LEFT JOIN appeals_accepted aa ON aa.bucket = b.bucket
+        LEFT JOIN rolled r ON r.bucket = b.bucket
         ORDER BY b.bucket
         """,
         *params,
@@ -199,26 +178,26 @@ async def fetch_workload(
 ) -> dict[str, Any]:
     campuses = _ensure_iter(campus_filter)
     params: list[Any] = []
-    campus_clause = ""
-    if campuses:
-        params.append(campuses)
-        bind = len(params)
-        campus_clause = f"AND CAST(c.campus_id AS text) = ANY(${bind}::text[])"
+    gauge_clause = _campus_clause(campuses, params)
     queue_rows = await conn.fetch(
         f"""
         SELECT
-            COALESCE(CAST(c.campus_id AS text), 'unknown') AS campus_id,
-            c.severity,
-            COUNT(*) FILTER (WHERE c.status = 'open') AS open_cases,
-            COUNT(*) FILTER (WHERE c.status = 'escalated') AS escalated_cases
-        FROM mod_case c
-        WHERE c.status IN ('open','escalated')
-        {campus_clause}
+            campus_key AS campus_id,
+            severity,
+            SUM(value) FILTER (WHERE metric = 'open') AS open_cases,
+            SUM(value) FILTER (WHERE metric = 'escalated') AS escalated_cases
+        FROM mod_metrics_gauge
+        WHERE metric IN ('open', 'escalated')
+        {gauge_clause}
         GROUP BY 1, 2
+        HAVING SUM(value) > 0
         ORDER BY 1, 2
         """,
         *params,
     )
+    case_clause = "AND CAST(c.campus_id AS text) = ANY($1::text[])" if campuses else ""
+    # Breaches depend on the clock, so they are counted over the open backlog
+    # (idx_mod_case_open_age) rather than maintained as a counter.
     sla_rows = await conn.fetch(
         f"""
         SELECT
@@ -227,7 +206,7 @@ async def fetch_workload(
             COUNT(*) AS breaches
         FROM mod_case c
         WHERE c.status = 'open'
-          {campus_clause}
+          {case_clause}
           AND EXTRACT(EPOCH FROM (now() - c.created_at)) / 60.0 > CASE
                 WHEN c.severity >= 4 THEN 30
                 WHEN c.severity >= 2 THEN 60
@@ -345,3 +324,122 @@ async def fetch_moderator_performance(
             }
         )
     return result
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_RECONCILE_GAUGES_SQL = """
+INSERT INTO mod_metrics_gauge (campus_key, metric, severity, value)
+SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), c.status, c.severity, COUNT(*)
+FROM mod_case c
+WHERE c.status IN ('open', 'escalated')
+GROUP BY 1, 2, 3
+UNION ALL
+SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), 'pending_appeal', c.severity, COUNT(*)
+FROM mod_appeal a
+JOIN mod_case c ON c.id = a.case_id
+WHERE a.status = 'pending'
+GROUP BY 1, 3
+"""
+
+_RECONCILE_HOURLY_SQL = """
+INSERT INTO mod_metrics_hourly (
+    campus_key, bucket, reports, cases_opened, cases_resolved, resolution_seconds,
+    actions_applied, appeals_received, appeals_accepted
+)
+SELECT
+    campus_key, bucket, SUM(reports), SUM(cases_opened), SUM(cases_resolved), SUM(resolution_seconds),
+    SUM(actions_applied), SUM(appeals_received), SUM(appeals_accepted)
+FROM (
+    SELECT COALESCE(CAST(c.campus_id AS text), 'unknown') AS campus_key, mod_metrics_hour(r.created_at) AS bucket,
+           1 AS reports, 0 AS cases_opened, 0 AS cases_resolved, 0::double precision AS resolution_seconds,
+           0 AS actions_applied, 0 AS appeals_received, 0 AS appeals_accepted
+    FROM mod_report r
+    JOIN mod_case c ON c.id = r.case_id
+    WHERE r.created_at >= $1
+    UNION ALL
+    SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), mod_metrics_hour(c.created_at), 0, 1, 0, 0, 0, 0, 0
+    FROM mod_case c
+    WHERE c.created_at >= $1
+    UNION ALL
+    SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), mod_metrics_hour(c.updated_at), 0, 0, 1,
+           EXTRACT(EPOCH FROM (c.updated_at - c.created_at)), 0, 0, 0
+    FROM mod_case c
+    WHERE c.status IN ('actioned', 'dismissed') AND c.updated_at >= $1
+    UNION ALL
+    SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), mod_metrics_hour(a.created_at), 0, 0, 0, 0, 1, 0, 0
+    FROM mod_action a
+    JOIN mod_case c ON c.id = a.case_id
+    WHERE a.created_at >= $1
+    UNION ALL
+    SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), mod_metrics_hour(ap.created_at), 0, 0, 0, 0, 0, 1, 0
+    FROM mod_appeal ap
+    JOIN mod_case c ON c.id = ap.case_id
+    WHERE ap.created_at >= $1
+    UNION ALL
+    SELECT COALESCE(CAST(c.campus_id AS text), 'unknown'), mod_metrics_hour(ap.reviewed_at), 0, 0, 0, 0, 0, 0, 1
+    FROM mod_appeal ap
+    JOIN mod_case c ON c.id = ap.case_id
+    WHERE ap.status = 'accepted' AND ap.reviewed_at >= $1
+) events
+GROUP BY 1, 2
+"""
+
+
+def _affected(status: str) -> int:
+    try:
+        return int(status.split()[-1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+async def reconcile_rollups(
+    conn: asyncpg.Connection,
+    *,
+    window_hours: int | None = 48,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    """Recompute the gauges and the last ``window_hours`` hourly buckets from source rows.
+
+    ``window_hours=None`` rebuilds every bucket (the backfill). The rollup
+    tables are locked against trigger writes for the duration: transactions
+    that already wrote a delta commit before the recompute reads the source
+    tables, and ones still in flight apply their delta on top of the
+    recomputed totals once the lock is released.
+    """
+
+    cutoff = _window_start(window_hours, now)
+    async with conn.transaction():
+        await conn.execute("LOCK TABLE mod_metrics_gauge, mod_metrics_hourly IN SHARE ROW EXCLUSIVE MODE")
+        await conn.execute("DELETE FROM mod_metrics_gauge")
+        gauges = await conn.execute(_RECONCILE_GAUGES_SQL)
+        await conn.execute("DELETE FROM mod_metrics_hourly WHERE bucket >= $1", cutoff)
+        buckets = await conn.execute(_RECONCILE_HOURLY_SQL, cutoff)
+    return {"gauges": _affected(gauges), "buckets": _affected(buckets)}
+
+
+async def rollups_need_backfill(
+    conn: asyncpg.Connection,
+    *,
+    window_hours: int,
+    now: datetime | None = None,
+) -> bool:
+    """True when case history predates the window but no hourly bucket does."""
+
+    cutoff = _window_start(window_hours, now)
+    return bool(
+        await conn.fetchval(
+            """
+            SELECT NOT EXISTS (SELECT 1 FROM mod_metrics_hourly WHERE bucket < $1)
+               AND EXISTS (SELECT 1 FROM mod_case WHERE created_at < $1)
+            """,
+            cutoff,
+        )
+    )
+
+
+def _window_start(window_hours: int | None, now: datetime | None) -> datetime:
+    if window_hours is None:
+        return _EPOCH
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(hours=window_hours)).astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
@@ -1,17 +1,35 @@
-"""Detector bundle wiring for the moderation ingress worker."""
+"""Detector bundle wiring for the moderation ingress worker.
+
+:meth:`DetectorSuite.evaluate` runs the CPU-bound detectors (profanity, link
+safety) inline and fans the I/O-bound ones out concurrently: the NSFW check,
+and one :class:`DetectorCounters` call that records the duplicate-text and
+velocity counters together (a single Redis pipeline in production). Each
+I/O-bound task has a latency budget; a task that misses it or fails reports
+its fallback signal instead, and is listed under ``detector_fallbacks``.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Awaitable, Dict, Iterable, Optional, Protocol, TypeVar
 
 from app.moderation.domain.detectors.dup_text import DuplicateTextDetector, RollingStore
 from app.moderation.domain.detectors.links import LinkSafetyDetector
 from app.moderation.domain.detectors.nsfw_stub import NsfwStubDetector
 from app.moderation.domain.detectors.profanity import ProfanityDetector
 from app.moderation.domain.detectors.velocity import RateCounter, VelocityDetector
-from app.moderation.infra.redis import RedisRateCounter, RedisRollingStore
+from app.moderation.infra.redis import RedisDetectorCounters, RedisRateCounter, RedisRollingStore
+from app.obs import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds each I/O-bound detector may take before its fallback is used.
+DEFAULT_BUDGETS: Dict[str, float] = {"nsfw": 0.25, "counters": 0.05}
 
 
 class InMemoryRollingStore:
@@ -52,6 +70,44 @@ class InMemoryRateCounter:
         return value
 
 
+class DetectorCounters(Protocol):
+    """Records one event's duplicate-text member and velocity hit together.
+
+    Returns the rolling-set size and the rate count, ``None`` for a part that
+    was not requested.
+    """
+
+    async def observe(
+        self,
+        rolling: tuple[str, str, int] | None,
+        rate: tuple[str, int] | None,
+    ) -> tuple[int | None, int | None]:
+        ...
+
+
+class StoreDetectorCounters:
+    """Adapts a separate rolling store and rate counter to :class:`DetectorCounters`."""
+
+    def __init__(self, store: RollingStore, counter: RateCounter) -> None:
+        self.store = store
+        self.counter = counter
+
+    async def observe(
+        self,
+        rolling: tuple[str, str, int] | None,
+        rate: tuple[str, int] | None,
+    ) -> tuple[int | None, int | None]:
+        total = hits = None
+        if rolling is not None:
+            key, value, ttl_seconds = rolling
+            await self.store.add(key, value, ttl_seconds=ttl_seconds)
+            total = await self.store.count(key)
+        if rate is not None:
+            key, ttl_seconds = rate
+            hits = await self.counter.increment(key, ttl_seconds)
+        return total, hits
+
+
 @dataclass
 class DetectorSuite:
     """Aggregates individual detectors into a single evaluate call."""
@@ -61,10 +117,13 @@ class DetectorSuite:
     rate_counter: RateCounter = field(default_factory=InMemoryRateCounter)
     link_safety: LinkSafetyDetector = field(default_factory=LinkSafetyDetector)
     nsfw: NsfwStubDetector = field(default_factory=NsfwStubDetector)
+    counters: Optional[DetectorCounters] = None
+    budgets: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_BUDGETS))
 
     def __post_init__(self) -> None:
         self.duplicate = DuplicateTextDetector(store=self.dup_store)
         self.velocity = VelocityDetector(counter=self.rate_counter)
+        self._counters = self.counters or StoreDetectorCounters(self.dup_store, self.rate_counter)
 
     async def evaluate(self, event: Dict[str, Any]) -> Dict[str, Any]:
         text = event.get("text", "")
@@ -75,12 +134,37 @@ class DetectorSuite:
         results: Dict[str, Any] = {}
         results["profanity"] = self.profanity.evaluate(text)
         results.update(self.link_safety.evaluate(text))
-        results["nsfw"] = await self.nsfw.evaluate(event.get("media_keys"))
-        results["dup_text_5m"] = await self.duplicate.evaluate(actor_id, text) if actor_id and text else False
-        high_velocity = await self.velocity.evaluate(actor_id, subject_type, trust_score) if actor_id else False
+
+        rolling = None
+        if actor_id and text:
+            key, digest = self.duplicate.entry(actor_id, text)
+            rolling = (key, digest, self.duplicate.window_seconds)
+        rate = (self.velocity.key(actor_id, subject_type), self.velocity.window_seconds) if actor_id else None
+        fallbacks: list[str] = []
+        results["nsfw"], (total, hits) = await asyncio.gather(
+            self._budgeted("nsfw", self.nsfw.evaluate(event.get("media_keys")), "unknown", fallbacks),
+            self._budgeted("counters", self._counters.observe(rolling, rate), (None, None), fallbacks),
+        )
+        results["dup_text_5m"] = self.duplicate.is_duplicate(total) if total is not None else False
+        high_velocity = self.velocity.exceeds(hits, trust_score, subject_type) if hits is not None else False
         results["high_velocity_posts"] = high_velocity if subject_type == "post" else False
+        if fallbacks:
+            results["detector_fallbacks"] = sorted(fallbacks)
         return results
 
+    async def _budgeted(self, name: str, call: Awaitable[T], fallback: T, fallbacks: list[str]) -> T:
+        budget = self.budgets.get(name)
+        try:
+            return await asyncio.wait_for(call, budget)
+        except asyncio.TimeoutError:
+            reason = "timeout"
+        except Exception:
+            logger.warning("moderation detector failed: detector=%s", name, exc_info=True)
+            reason = "error"
+        metrics.MODERATION_DETECTOR_FALLBACKS.labels(name, reason).inc()
+        fallbacks.append(name)
+        return fallback
+
     @classmethod
     def from_redis(
         cls,
@@ -88,6 +172,7 @@ class DetectorSuite:
         *,
         profanity: Optional[ProfanityDetector] = None,
         denylist: Optional[Iterable[str]] = None,
+        budgets: Optional[Dict[str, float]] = None,
     ) -> "DetectorSuite":
         """Create a detector suite backed by Redis for duplicate and velocity checks."""
 
@@ -97,5 +182,7 @@ class DetectorSuite:
             rate_counter=RedisRateCounter(redis_client),
             link_safety=LinkSafetyDetector(denylist=denylist or []),
             nsfw=NsfwStubDetector(),
+            counters=RedisDetectorCounters(redis_client),
+            budgets={**DEFAULT_BUDGETS, **(budgets or {})},
         )
         return suite
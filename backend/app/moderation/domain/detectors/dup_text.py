@@ -27,8 +27,15 @@ class DuplicateTextDetector:
     threshold: int = 3
 
     async def evaluate(self, user_id: str, text: str) -> bool:
-        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
-        key = f"dup:{user_id}:{int(time.time() // 30)}"
+        key, digest = self.entry(user_id, text)
         await self.store.add(key, digest, ttl_seconds=self.window_seconds)
-        total = await self.store.count(key)
+        return self.is_duplicate(await self.store.count(key))
+
+    def entry(self, user_id: str, text: str) -> tuple[str, str]:
+        """Rolling-set key and member for a submission."""
+
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"dup:{user_id}:{int(time.time() // 30)}", digest
+
+    def is_duplicate(self, total: int) -> bool:
         return total >= self.threshold
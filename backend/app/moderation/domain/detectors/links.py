@@ -5,6 +5,8 @@ from __future__ import annotations
 import re
 from typing import Iterable, Sequence
 
+from app.moderation.domain.detectors.matching import DomainSuffixTrie
+
 
 URL_RE = re.compile(r"https?://([a-z0-9.-]+)", re.IGNORECASE)
 
@@ -13,12 +15,20 @@ class LinkSafetyDetector:
     """Detects unsafe links based on a denylist and link count."""
 
     def __init__(self, denylist: Iterable[str] | None = None, max_links: int = 3) -> None:
-        self.denylist = {domain.lower() for domain in (denylist or [])}
         self.max_links = max_links
+        self.update_denylist(denylist or [])
+
+    def update_denylist(self, denylist: Iterable[str]) -> None:
+        """Rebuild the suffix trie and swap it in; a domain also blocks its subdomains."""
+
+        domains = {domain.lower() for domain in denylist}
+        trie = DomainSuffixTrie(domains)
+        self.denylist, self._trie = domains, trie
 
     def evaluate(self, text: str) -> dict[str, bool | Sequence[str]]:
         domains = [match.group(1).lower() for match in URL_RE.finditer(text or "")]
-        flagged = [domain for domain in domains if any(domain.endswith(item) for item in self.denylist)]
+        trie = self._trie
+        flagged = [domain for domain in domains if trie.matches(domain)]
         excessive = len(domains) > self.max_links
         return {
             "unsafe_links": bool(flagged),
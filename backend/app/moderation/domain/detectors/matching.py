@@ -0,0 +1,124 @@
+"""Compiled matchers shared by the text and link detectors.
+
+Both structures are built once from a lexicon or denylist and never mutated,
+so detectors swap in a freshly built instance when their source list changes
+and in-flight evaluations keep using the old one.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+# (start, end, value) of a match in the searched text.
+Match = Tuple[int, int, str]
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text regardless of lexicon size.
+
+    Patterns match on word boundaries of the (already normalised, single-space
+    separated) text unless registered as substrings.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out", "size")
+
+    def __init__(self, patterns: Mapping[str, str], *, substrings: Iterable[str] = ()) -> None:
+        substring_set = set(substrings)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (pattern length, value, boundary required) for every pattern ending here.
+        self._out: List[List[Tuple[int, str, bool]]] = [[]]
+        self.size = 0
+        for pattern, value in patterns.items():
+            if pattern:
+                self._add(pattern, value, pattern not in substring_set)
+        self._link()
+
+    def _add(self, pattern: str, value: str, bounded: bool) -> None:
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value, bounded))
+        self.size += 1
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        last = len(text)
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            end = index + 1
+            for length, value, bounded in out[state]:
+                start = end - length
+                if bounded and ((start and text[start - 1] != " ") or (end != last and text[end] != " ")):
+                    continue
+                yield start, end, value
+
+
+class DomainSuffixTrie:
+    """Denylist lookup keyed on reversed DNS labels.
+
+    ``evil.example`` matches ``evil.example`` and any subdomain of it, but not
+    ``notevil.example``; a lookup walks at most as many nodes as the domain has
+    labels.
+    """
+
+    __slots__ = ("_root", "size")
+
+    _TERMINAL = ""
+
+    def __init__(self, domains: Iterable[str]) -> None:
+        self._root: Dict[str, dict] = {}
+        self.size = 0
+        for domain in domains:
+            labels = _labels(domain)
+            if not labels:
+                continue
+            node = self._root
+            for label in labels:
+                node = node.setdefault(label, {})
+            if self._TERMINAL not in node:
+                node[self._TERMINAL] = {}
+                self.size += 1
+
+    def matches(self, domain: str) -> bool:
+        node = self._root
+        for label in _labels(domain):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._TERMINAL in node:
+                return True
+        return False
+
+
+def _labels(domain: str) -> List[str]:
+    return [label for label in reversed(domain.lower().strip().strip(".").split(".")) if label]
+
+
+__all__ = ["AhoCorasick", "DomainSuffixTrie", "Match"]
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable, Mapping
+from typing import Mapping
+
+from app.moderation.domain.detectors.matching import AhoCorasick
 
 
 SANITIZE_RE = re.compile(r"[^a-z0-9]+")
+SUBSTRING_MARK = "*"
 LEET_REPLACEMENTS: Mapping[str, str] = {
     "4": "a",
     "@": "a",
@@ -16,6 +19,7 @@ LEET_REPLACEMENTS: Mapping[str, str] = {
     "$": "s",
     "7": "t",
 }
+_LEET_TABLE = str.maketrans(dict(LEET_REPLACEMENTS))
 
 BASELINE_PROFANITY: Mapping[str, str] = {
     "foo": "low",
@@ -25,34 +29,52 @@ BASELINE_PROFANITY: Mapping[str, str] = {
 
 
 class ProfanityDetector:
-    """Detects textual profanity using a deterministic lookup."""
+    """Detects textual profanity with a compiled lexicon.
+
+    Entries match whole words or word sequences ("two words") of the
+    normalised text; an entry wrapped in ``*`` (``*word*``) also matches inside
+    longer words.
+    """
 
     def __init__(self, lexicon: Mapping[str, str] | None = None) -> None:
-        self.lexicon = dict(BASELINE_PROFANITY)
+        self.lexicon: dict[str, str] = {}
+        self._substrings: set[str] = set()
+        self._matcher = AhoCorasick({})
+        self.update_lexicon(lexicon)
+
+    def update_lexicon(self, lexicon: Mapping[str, str] | None) -> None:
+        """Rebuild the matcher from the baseline plus ``lexicon`` and swap it in."""
+
+        entries = dict(BASELINE_PROFANITY)
         if lexicon:
-            self.lexicon.update({self._normalize(word): level for word, level in lexicon.items()})
+            entries.update(lexicon)
+        normalized: dict[str, str] = {}
+        substrings: set[str] = set()
+        for word, level in entries.items():
+            key = self._normalize(word.strip(SUBSTRING_MARK))
+            if not key:
+                continue
+            if len(word) > 2 and word.startswith(SUBSTRING_MARK) and word.endswith(SUBSTRING_MARK):
+                substrings.add(key)
+            normalized[key] = level
+        matcher = AhoCorasick(normalized, substrings=substrings)
+        self.lexicon, self._substrings, self._matcher = normalized, substrings, matcher
 
     def evaluate(self, text: str) -> str:
-        token_levels = [self._lookup(token) for token in self._tokenize(text)]
-        if not token_levels:
+        normalized = self._normalize(text or "")
+        if not normalized:
             return "unknown"
-        severity = max((level or "unknown" for level in token_levels), key=_rank)
+        severity = "unknown"
+        for _, _, level in self._matcher.finditer(normalized):
+            if _rank(level) > _rank(severity):
+                severity = level
+                if severity == "high":
+                    break
         return severity
 
-    def _lookup(self, token: str) -> str:
-        normalized = self._normalize(token)
-        return self.lexicon.get(normalized, "unknown")
-
-    def _tokenize(self, text: str) -> Iterable[str]:
-        if not text:
-            return []
-        sanitized = text.lower()
-        for src, dest in LEET_REPLACEMENTS.items():
-            sanitized = sanitized.replace(src, dest)
-        return SANITIZE_RE.split(sanitized)
-
-    def _normalize(self, token: str) -> str:
-        return SANITIZE_RE.sub("", token.lower())
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return SANITIZE_RE.sub(" ", text.lower().translate(_LEET_TABLE)).strip()
 
 
 def _rank(level: str) -> int:
@@ -18,13 +18,17 @@ class VelocityDetector:
     """Flags users who exceed content velocity thresholds."""
 
     counter: RateCounter
+    window_seconds: int = 60
 
     async def evaluate(self, user_id: str, subject_type: str, trust_score: int) -> bool:
-        ttl = 60
-        key = f"vel:{user_id}:{subject_type}"
-        hits = await self.counter.increment(key, ttl)
-        limit = self._threshold_for(trust_score, subject_type)
-        return hits > limit
+        hits = await self.counter.increment(self.key(user_id, subject_type), self.window_seconds)
+        return self.exceeds(hits, trust_score, subject_type)
+
+    def key(self, user_id: str, subject_type: str) -> str:
+        return f"vel:{user_id}:{subject_type}"
+
+    def exceeds(self, hits: int, trust_score: int, subject_type: str) -> bool:
+        return hits > self._threshold_for(trust_score, subject_type)
 
     def _threshold_for(self, trust_score: int, subject_type: str) -> int:
         base = 5 if subject_type == "post" else 12
@@ -2,12 +2,34 @@
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Mapping, Optional, Protocol
+from typing import Mapping, Optional, Protocol, Sequence
 
 from app.moderation.domain.policy_engine import Decision
 
+logger = logging.getLogger(__name__)
+
+
+class EnforcementBatchError(RuntimeError):
+    """A stream batch could not be enforced past ``entry_id``.
+
+    Workers stop their read cursor just before ``entry_id`` and re-raise, so the
+    failed entry and everything after it is read again. Entries after it that
+    were already enforced come back as duplicates and are not re-dispatched.
+    """
+
+    def __init__(self, entry_id: str) -> None:
+        super().__init__(f"moderation enforcement failed at stream entry {entry_id}")
+        self.entry_id = entry_id
+
+    def resume_after(self, entry_ids: Sequence[str], current: str) -> str:
+        """The last id before the failed entry, or ``current`` when it was the first."""
+
+        index = list(entry_ids).index(self.entry_id)
+        return entry_ids[index - 1] if index > 0 else current
+
 
 @dataclass
 class ModerationReport:
@@ -79,6 +101,44 @@ class AuditLogEntry:
     created_at: datetime
 
 
+@dataclass(slots=True)
+class EnforcementRequest:
+    """One decision to enforce as part of a worker batch."""
+
+    subject_type: str
+    subject_id: str
+    actor_id: Optional[str]
+    base_reason: str
+    decision: Decision
+    policy_id: Optional[str]
+
+
+@dataclass(slots=True)
+class PendingAction:
+    """An action whose hooks ran and which still has to be recorded."""
+
+    case: ModerationCase
+    action: str
+    payload: Mapping[str, object]
+    actor_id: Optional[str]
+
+
+class BatchModerationRepository(Protocol):
+    """Optional set-based writes used by :meth:`ModerationEnforcer.apply_decisions`."""
+
+    async def prepare_cases(
+        self,
+        requests: Sequence[EnforcementRequest],
+    ) -> list[tuple[ModerationCase, frozenset[str]]]:
+        """Upsert the cases for ``requests`` and return, per request, the case and
+        which of the requested actions were already recorded on it."""
+        ...
+
+    async def commit_actions(self, pending: Sequence[PendingAction]) -> list[ModerationAction]:
+        """Record actions, mark their cases actioned and write the audit rows."""
+        ...
+
+
 class ModerationRepository(Protocol):
     """Storage contract used by the enforcement layer."""
 
@@ -234,6 +294,77 @@ class ModerationEnforcer:
         )
         return case, action
 
+    async def apply_decisions(
+        self,
+        requests: Sequence[EnforcementRequest],
+    ) -> list[tuple[ModerationCase, ModerationAction] | Exception | None]:
+        """Enforce a batch of decisions with two repository round trips.
+
+        Results line up with ``requests``; a request whose hook raised gets the
+        exception instead of a result, and one the repository returned no
+        action for gets ``None``. Within a batch, later requests for an
+        action already applied to the same case are treated as duplicates,
+        as they would be one at a time.
+        """
+
+        if not requests:
+            return []
+        prepare = getattr(self.repository, "prepare_cases", None)
+        commit = getattr(self.repository, "commit_actions", None)
+        if prepare is None or commit is None:
+            return [await self._apply_one(request) for request in requests]
+        try:
+            prepared = await prepare(requests)
+        except Exception:
+            logger.exception("batch case upsert failed; enforcing %d decisions one by one", len(requests))
+            return [await self._apply_one(request) for request in requests]
+
+        results: list[tuple[ModerationCase, ModerationAction] | Exception | None] = [None] * len(requests)
+        pending: list[PendingAction] = []
+        pending_index: list[int] = []
+        seen: set[tuple[str, str]] = set()
+        for index, (request, (case, applied)) in enumerate(zip(requests, prepared)):
+            action_name = request.decision.action
+            key = (case.case_id, action_name)
+            if action_name in applied or key in seen:
+                results[index] = (
+                    case,
+                    ModerationAction(case.case_id, action_name, request.decision.payload, request.actor_id, datetime.now(timezone.utc)),
+                )
+                continue
+            try:
+                await self._dispatch(case, request.decision)
+            except Exception as exc:
+                results[index] = exc
+                continue
+            seen.add(key)
+            pending.append(PendingAction(case=case, action=action_name, payload=request.decision.payload, actor_id=request.actor_id))
+            pending_index.append(index)
+        if pending:
+            try:
+                recorded = await commit(pending)
+            except Exception as exc:
+                logger.exception("batch action commit failed for %d decisions", len(pending))
+                for index in pending_index:
+                    results[index] = exc
+            else:
+                for index, item, action in zip(pending_index, pending, recorded):
+                    results[index] = (item.case, action)
+        return results
+
+    async def _apply_one(self, request: EnforcementRequest) -> tuple[ModerationCase, ModerationAction] | Exception:
+        try:
+            return await self.apply_decision(
+                subject_type=request.subject_type,
+                subject_id=request.subject_id,
+                actor_id=request.actor_id,
+                base_reason=request.base_reason,
+                decision=request.decision,
+                policy_id=request.policy_id,
+            )
+        except Exception as exc:
+            return exc
+
     async def _dispatch(self, case: ModerationCase, decision: Decision) -> None:
         action = decision.action
         payload = decision.payload
@@ -344,6 +475,33 @@ class InMemoryModerationRepository(ModerationRepository):
         self.audit_log.append(entry)
         return entry
 
+    async def prepare_cases(
+        self,
+        requests: Sequence[EnforcementRequest],
+    ) -> list[tuple[ModerationCase, frozenset[str]]]:
+        prepared: list[tuple[ModerationCase, frozenset[str]]] = []
+        for request in requests:
+            case = await self.upsert_case(
+                subject_type=request.subject_type,
+                subject_id=request.subject_id,
+                reason=request.base_reason,
+                severity=request.decision.severity,
+                policy_id=request.policy_id,
+                created_by=request.actor_id,
+            )
+            applied = frozenset(entry.action for entry in self.actions.get(case.case_id, []))
+            prepared.append((case, applied))
+        return prepared
+
+    async def commit_actions(self, pending: Sequence[PendingAction]) -> list[ModerationAction]:
+        recorded: list[ModerationAction] = []
+        for item in pending:
+            recorded.append(await self.record_action(item.case.case_id, item.action, item.payload, item.actor_id))
+            if item.action != "none":
+                await self.update_case_status(item.case.case_id, "actioned")
+            await self.audit(item.actor_id, "action.apply", item.case.subject_type, item.case.subject_id, {"action": item.action})
+        return recorded
+
     async def get_case(self, case_id: str) -> ModerationCase | None:
         return self.cases.get(case_id)
 
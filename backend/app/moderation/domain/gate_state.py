@@ -0,0 +1,173 @@
+"""Cached per-user state for the write gate.
+
+The gate needs a user's reputation band and the restriction flags for the
+surface being written on every post, comment and message. :class:`GateStateCache`
+keeps that as a small :class:`GateState` in a short-lived in-process map backed
+by a Redis hash (``gate:{user_id}``), so a good-standing user costs no extra
+Redis reads on a local hit and one pipelined read otherwise.
+
+Flags are stored as absolute expiry timestamps, so a cached entry stops
+reporting a restriction on its own once the underlying TTL key would have
+expired. ``RestrictionService`` and ``ReputationService`` call
+:meth:`GateStateCache.invalidate` whenever a flag or band changes; that bumps a
+per-user version so a concurrent request cannot write an older snapshot back.
+Other processes may serve their local copy for up to ``local_ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from redis.asyncio import Redis
+
+from app.infra.redis import RedisProxy
+from app.moderation.domain.reputation import ReputationBand
+from app.moderation.domain.restrictions import FlagTTLs, RestrictionFlags
+from app.obs import metrics
+from app.settings import settings
+
+# (cooldown_until, shadow_until, captcha_until) as epoch seconds; 0 means unset.
+ScopeExpiries = Tuple[float, float, float]
+
+
+def _until(ttl: int, now: float) -> float:
+    if ttl == -2:
+        return 0.0
+    if ttl == -1:
+        return math.inf
+    return now + ttl
+
+
+@dataclass(slots=True)
+class GateState:
+    band: ReputationBand
+    version: str = "0"
+    link_until: float = 0.0
+    scopes: Dict[str, ScopeExpiries] = field(default_factory=dict)
+
+    def merge_ttls(self, scope: str, ttls: FlagTTLs, *, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        # A cooldown key without expiry never counted as active (see check_flags).
+        cooldown = now + ttls.cooldown if ttls.cooldown > 0 else 0.0
+        self.scopes[scope] = (cooldown, _until(ttls.shadow, now), _until(ttls.captcha, now))
+        self.link_until = _until(ttls.link, now)
+
+    def flags(self, scope: str, *, now: float | None = None) -> RestrictionFlags | None:
+        """Flags for ``scope`` as of ``now``, or None when the scope was never loaded."""
+
+        expiries = self.scopes.get(scope)
+        if expiries is None:
+            return None
+        now = time.time() if now is None else now
+        cooldown_until, shadow_until, captcha_until = expiries
+        return RestrictionFlags(
+            cooldown_ttl=math.ceil(cooldown_until - now) if cooldown_until > now else None,
+            shadow_active=shadow_until > now,
+            captcha_required=captcha_until > now,
+            link_cooloff=self.link_until > now,
+        )
+
+    def to_hash(self) -> Dict[str, str]:
+        payload = {"band": self.band.value, "v": self.version, "link": repr(self.link_until)}
+        for scope, expiries in self.scopes.items():
+            payload[f"s:{scope}"] = ",".join(repr(value) for value in expiries)
+        return payload
+
+    @classmethod
+    def from_hash(cls, raw: Dict[str, str]) -> "GateState":
+        state = cls(band=ReputationBand(raw["band"]), version=raw.get("v", "0"), link_until=float(raw.get("link", 0.0)))
+        for key, value in raw.items():
+            if key.startswith("s:"):
+                cooldown, shadow, captcha = (float(part) for part in value.split(","))
+                state.scopes[key[2:]] = (cooldown, shadow, captcha)
+        return state
+
+
+def _text(value: object) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+class GateStateCache:
+    """Two-level cache of :class:`GateState` keyed by user id."""
+
+    def __init__(
+        self,
+        redis: Redis | RedisProxy,
+        *,
+        local_ttl_seconds: float | None = None,
+        redis_ttl_seconds: int | None = None,
+        max_local: int = 50_000,
+        prefix: str = "gate",
+    ) -> None:
+        self._redis = redis
+        self.local_ttl_seconds = (
+            local_ttl_seconds if local_ttl_seconds is not None else settings.moderation_gate_local_ttl_seconds
+        )
+        self.redis_ttl_seconds = redis_ttl_seconds or settings.moderation_gate_state_ttl_seconds
+        self._max_local = max_local
+        self._prefix = prefix
+        self._local: Dict[str, Tuple[float, GateState]] = {}
+
+    def _key(self, user_id: str) -> str:
+        return f"{self._prefix}:{user_id}"
+
+    def _version_key(self, user_id: str) -> str:
+        return f"{self._prefix}:v:{user_id}"
+
+    def peek(self, user_id: str) -> GateState | None:
+        """Return the in-process copy if it is still fresh."""
+
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.local_ttl_seconds:
+            self._local.pop(user_id, None)
+            return None
+        metrics.MODERATION_GATE_STATE.labels(source="local").inc()
+        return entry[1]
+
+    async def fetch(self, user_id: str) -> Tuple[GateState | None, str]:
+        """Read the shared copy; returns (state or None when absent/stale, current version)."""
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._key(user_id))
+            pipe.get(self._version_key(user_id))
+            raw, version = await pipe.execute()
+        current = _text(version) if version is not None else "0"
+        decoded = {_text(key): _text(value) for key, value in (raw or {}).items()}
+        if not decoded or decoded.get("v") != current or "band" not in decoded:
+            metrics.MODERATION_GATE_STATE.labels(source="miss").inc()
+            return None, current
+        state = GateState.from_hash(decoded)
+        self._remember(user_id, state)
+        metrics.MODERATION_GATE_STATE.labels(source="redis").inc()
+        return state, current
+
+    async def store(self, user_id: str, state: GateState) -> None:
+        key = self._key(user_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=state.to_hash())
+            pipe.expire(key, self.redis_ttl_seconds)
+            await pipe.execute()
+        self._remember(user_id, state)
+
+    async def invalidate(self, user_id: str) -> None:
+        self._local.pop(user_id, None)
+        version_key = self._version_key(user_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self._key(user_id))
+            pipe.incr(version_key)
+            # Outlive any hash written under the previous version.
+            pipe.expire(version_key, self.redis_ttl_seconds * 2)
+            await pipe.execute()
+
+    def _remember(self, user_id: str, state: GateState) -> None:
+        if user_id not in self._local and len(self._local) >= self._max_local:
+            self._local.clear()
+        self._local[user_id] = (time.monotonic(), state)
+
+
+__all__ = ["GateState", "GateStateCache"]
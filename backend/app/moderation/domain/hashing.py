@@ -1,14 +1,50 @@
-"""Utilities for perceptual hashing of media payloads."""
+"""Perceptual hashing of media payloads and near-duplicate lookup.
+
+``phash`` (DCT), ``dhash`` (gradient) and ``ahash`` (mean) produce 64-bit
+fingerprints that survive re-encoding, resizing and mild edits, so copies of a
+known-bad image land within a small Hamming distance of the stored hash. The
+bit layout and hex encoding follow the ``imagehash`` package, which lets
+imported hash lists computed with it match directly.
+
+Near-duplicate lookups use multi-index hashing: a 64-bit hash is split into
+four 16-bit bands, stored as indexed columns in Postgres and as dict tables in
+:class:`MultiIndexHash`. By the pigeonhole principle a hash within distance
+``r`` shares at least one band with the query up to ``r // 4`` differing bits,
+so a few hundred equality probes replace a full scan.
+"""
 
 from __future__ import annotations
 
 import base64
 import hashlib
+import io
 import math
 from dataclasses import dataclass
-from typing import Iterable
+from itertools import combinations
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow ships with the qrcode[pil] dependency
+    Image = None
+
+_SUPPORTED_ALGOS = {"phash", "dhash", "ahash"}
+# Algorithms whose hashes are compared by Hamming distance rather than equality.
+NEAR_DUPLICATE_ALGOS = frozenset(_SUPPORTED_ALGOS)
+# Exact digest used for payloads that are not decodable images.
+DIGEST_ALGO = "blake2b"
+DEFAULT_MAX_DISTANCE = 8
 
-_SUPPORTED_ALGOS = {"phash", "pdq", "ahash"}
+HASH_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = HASH_BITS // BAND_BITS
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+# Unnormalised DCT-II basis rows for the low frequencies we keep.
+_DCT_BASIS = [
+    [math.cos(math.pi * (2 * n + 1) * k / (2 * _DCT_SIZE)) for n in range(_DCT_SIZE)] for k in range(_HASH_SIZE)
+]
 
 
 @dataclass(frozen=True)
@@ -25,21 +61,115 @@ class PerceptualHash:
         return f"{self.algo}:{self.value}"
 
 
+def _bits_to_hex(bits: Iterable[bool]) -> str:
+    bits = list(bits)
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"{value:0{math.ceil(len(bits) / 4)}x}"
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _grayscale(image: "Image.Image", width: int, height: int) -> List[int]:
+    resample = Image.Resampling.LANCZOS
+    return list(image.convert("L").resize((width, height), resample).tobytes())
+
+
+def _phash(image: "Image.Image") -> str:
+    pixels = _grayscale(image, _DCT_SIZE, _DCT_SIZE)
+    rows = [pixels[offset : offset + _DCT_SIZE] for offset in range(0, len(pixels), _DCT_SIZE)]
+    # Separable 2-D DCT restricted to the top-left 8x8 block: columns, then rows.
+    partial = [
+        [sum(basis[y] * rows[y][x] for y in range(_DCT_SIZE)) for x in range(_DCT_SIZE)] for basis in _DCT_BASIS
+    ]
+    coefficients = [sum(basis[x] * line[x] for x in range(_DCT_SIZE)) for line in partial for basis in _DCT_BASIS]
+    median = _median(coefficients)
+    return _bits_to_hex(value > median for value in coefficients)
+
+
+def _dhash(image: "Image.Image") -> str:
+    width = _HASH_SIZE + 1
+    pixels = _grayscale(image, width, _HASH_SIZE)
+    return _bits_to_hex(
+        pixels[row * width + col + 1] > pixels[row * width + col] for row in range(_HASH_SIZE) for col in range(_HASH_SIZE)
+    )
+
+
+def _ahash(image: "Image.Image") -> str:
+    pixels = _grayscale(image, _HASH_SIZE, _HASH_SIZE)
+    mean = sum(pixels) / len(pixels)
+    return _bits_to_hex(pixel > mean for pixel in pixels)
+
+
+_HASHERS = {"phash": _phash, "dhash": _dhash, "ahash": _ahash}
+
+
 class PerceptualHasher:
-    """Best-effort implementation of perceptual hashes without native deps."""
+    """Perceptual image hashes computed with Pillow on the CPU."""
 
     def __init__(self, *, digest_size: int = 16) -> None:
         self.digest_size = digest_size
 
     def compute(self, payload: bytes, *, algo: str = "phash") -> PerceptualHash:
+        """Hash ``payload`` with ``algo``.
+
+        Payloads Pillow cannot decode (documents, truncated uploads) fall back
+        to a ``blake2b`` digest, which only ever matches byte-identical files.
+        """
+
+        image = self._open(payload, _DCT_SIZE * 2)
+        if image is None:
+            self._check_algo(algo)
+            return self.digest(payload)
+        with image:
+            return self.compute_image(image, algo=algo)
+
+    def compute_image(self, image: "Image.Image", *, algo: str = "phash") -> PerceptualHash:
+        """Hash an already decoded image (for example a scanner thumbnail)."""
+
+        algo = self._check_algo(algo)
+        return PerceptualHash(algo=algo, value=_HASHERS[algo](image))
+
+    def digest(self, payload: bytes) -> PerceptualHash:
+        digest = hashlib.blake2b(payload, digest_size=self.digest_size).digest()
+        encoded = base64.b16encode(digest).decode("ascii").lower()
+        return PerceptualHash(algo=DIGEST_ALGO, value=encoded)
+
+    def open_thumbnail(self, payload: bytes, max_side: int) -> "Image.Image | None":
+        """Decode ``payload`` downsampled to fit ``max_side``, or None when it is not an image."""
+
+        image = self._open(payload, max_side)
+        if image is None:
+            return None
+        image.thumbnail((max_side, max_side))
+        return image
+
+    @staticmethod
+    def _check_algo(algo: str) -> str:
         algo = algo.lower()
         if algo not in _SUPPORTED_ALGOS:
             raise ValueError(f"Unsupported perceptual hash algorithm: {algo}")
-        # We approximate pHash / PDQ behaviour using blake2b to avoid heavy deps.
-        # Downstream only requires deterministic fingerprints for lookups.
-        digest = hashlib.blake2b(payload, digest_size=self.digest_size).digest()
-        encoded = base64.b16encode(digest).decode("ascii").lower()
-        return PerceptualHash(algo=algo, value=encoded)
+        return algo
+
+    @staticmethod
+    def _open(payload: bytes, max_side: int) -> "Image.Image | None":
+        if Image is None:
+            return None
+        try:
+            image = Image.open(io.BytesIO(payload))
+            # Let JPEG decode at a reduced scale instead of full resolution.
+            image.draft("RGB", (max_side, max_side))
+            image.load()
+        except Exception:  # Pillow raises a mix of OSError/ValueError/DecompressionBombError
+            return None
+        return image
 
     @staticmethod
     def hamming_distance(lhs: str, rhs: str) -> int:
@@ -70,3 +200,76 @@ def nearest_match(hash_value: str, candidates: Iterable[str]) -> tuple[str | Non
         if distance < best[1]:
             best = (candidate, distance)
     return best
+
+
+def hash_bands(hash_value: str) -> Tuple[int, ...] | None:
+    """Split a 64-bit hex hash into its 16-bit bands (most significant first)."""
+
+    if len(hash_value) != HASH_BITS // 4:
+        return None
+    try:
+        value = int(hash_value, 16)
+    except ValueError:
+        return None
+    mask = (1 << BAND_BITS) - 1
+    return tuple((value >> (BAND_BITS * (BAND_COUNT - 1 - index))) & mask for index in range(BAND_COUNT))
+
+
+def band_candidates(band: int, radius: int) -> List[int]:
+    """All 16-bit values within ``radius`` bits of ``band``, including itself."""
+
+    values = [band]
+    for flips in range(1, min(radius, BAND_BITS) + 1):
+        for positions in combinations(range(BAND_BITS), flips):
+            mask = 0
+            for position in positions:
+                mask |= 1 << position
+            values.append(band ^ mask)
+    return values
+
+
+class MultiIndexHash:
+    """In-process multi-index over 64-bit hex hashes.
+
+    Mirrors the ``band0..band3`` columns of ``mod_media_hash``: one table per
+    band maps a 16-bit value to the hashes carrying it. Hashes of any other
+    length are kept for exact lookups only.
+    """
+
+    __slots__ = ("_bands", "_exact")
+
+    def __init__(self, hashes: Iterable[str] = ()) -> None:
+        self._bands: List[Dict[int, List[str]]] = [{} for _ in range(BAND_COUNT)]
+        self._exact: set[str] = set()
+        for hash_value in hashes:
+            self.add(hash_value)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, hash_value: str) -> None:
+        if hash_value in self._exact:
+            return
+        self._exact.add(hash_value)
+        bands = hash_bands(hash_value)
+        if bands is None:
+            return
+        for table, band in zip(self._bands, bands):
+            table.setdefault(band, []).append(hash_value)
+
+    def search(self, hash_value: str, max_distance: int) -> List[Tuple[str, int]]:
+        """Hashes within ``max_distance`` of ``hash_value``, nearest first."""
+
+        bands = hash_bands(hash_value)
+        if bands is None:
+            return [(hash_value, 0)] if hash_value in self._exact else []
+        radius = max_distance // BAND_COUNT
+        candidates: set[str] = set()
+        for table, band in zip(self._bands, bands):
+            for probe in band_candidates(band, radius):
+                candidates.update(table.get(probe, ()))
+        query = int(hash_value, 16)
+        found = [(candidate, (int(candidate, 16) ^ query).bit_count()) for candidate in candidates]
+        found = [item for item in found if item[1] <= max_distance]
+        found.sort(key=lambda item: item[1])
+        return found
@@ -0,0 +1,96 @@
+"""Bounded-memory helpers for streaming media into the scanners.
+
+:class:`ByteBudget` caps the bytes held by all in-flight scans in a worker:
+each scan reserves its object's size before it starts reading and waits
+(first come, first served) while the budget is exhausted. :func:`read_bounded`
+drains a chunk iterator into one buffer and refuses to grow past the
+reservation, so an object larger than advertised cannot overrun the budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Tuple
+
+
+class MediaTooLarge(Exception):
+    """Raised when a streamed object exceeds the bytes reserved for it."""
+
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"media object exceeds {limit} bytes")
+        self.limit = limit
+
+
+class ByteBudget:
+    """Async byte-counting semaphore with FIFO admission.
+
+    A single request larger than ``limit`` is clamped to ``limit`` so it can
+    still run, alone.
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit <= 0:
+            raise ValueError("byte budget must be positive")
+        self.limit = limit
+        self._used = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+    @property
+    def in_use(self) -> int:
+        return self._used
+
+    def clamp(self, amount: int) -> int:
+        return max(0, min(amount, self.limit))
+
+    async def acquire(self, amount: int) -> int:
+        amount = self.clamp(amount)
+        if not self._waiters and self._used + amount <= self.limit:
+            self._used += amount
+            return amount
+        future = asyncio.get_running_loop().create_future()
+        entry = (amount, future)
+        self._waiters.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(amount)
+            else:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                self._wake()
+            raise
+        return amount
+
+    def release(self, amount: int) -> None:
+        self._used -= amount
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._used + self._waiters[0][0] <= self.limit:
+            amount, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._used += amount
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def reserve(self, amount: int) -> AsyncIterator[int]:
+        granted = await self.acquire(amount)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+
+async def read_bounded(chunks: AsyncIterator[bytes], limit: int) -> bytes:
+    """Concatenate ``chunks`` into one buffer, raising :class:`MediaTooLarge` past ``limit``."""
+
+    buffer = bytearray()
+    async for chunk in chunks:
+        if len(buffer) + len(chunk) > limit:
+            raise MediaTooLarge(limit)
+        buffer += chunk
+    return bytes(buffer)
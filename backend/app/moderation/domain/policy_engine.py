@@ -1,9 +1,15 @@
-"""Policy evaluation primitives for the moderation stack."""
+"""Policy evaluation primitives for the moderation stack.
+
+``evaluate_policy`` runs a policy compiled once per (policy_id, version) into
+per-rule predicate closures ordered by severity; ``interpret_policy`` is the
+original rule-by-rule interpreter, kept as the reference implementation.
+"""
 
 from __future__ import annotations
 
+import weakref
 from dataclasses import dataclass, field
-from typing import Any, Iterable, List, Mapping, Optional
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 
 @dataclass
@@ -112,8 +118,8 @@ class PredicateEvaluator:
         return self.trust_score < bound
 
 
-def evaluate_policy(policy: Policy, signals: Mapping[str, Any], trust_score: Optional[int]) -> Decision:
-    """Evaluate a policy against detector signals for a moderation event."""
+def interpret_policy(policy: Policy, signals: Mapping[str, Any], trust_score: Optional[int]) -> Decision:
+    """Evaluate ``policy`` by interpreting every rule's ``when`` clause."""
 
     evaluator = PredicateEvaluator(signals, trust_score)
     matches: List[PolicyRule] = []
@@ -127,6 +133,173 @@ def evaluate_policy(policy: Policy, signals: Mapping[str, Any], trust_score: Opt
     return Decision(action=winner.action, severity=winner.severity, payload=winner.payload, reasons=reasons)
 
 
+_LABEL_ORDER = ("unknown", "low", "medium", "high")
+_LABEL_RANK: Dict[str, int] = {label: rank for rank, label in enumerate(_LABEL_ORDER)}
+_DEFAULT_TRUST = 50
+
+# A compiled predicate takes (signals, trust score) and returns whether it holds.
+Check = Callable[[Mapping[str, Any], int], bool]
+
+
+def _never(signals: Mapping[str, Any], trust: int) -> bool:
+    return False
+
+
+def _compile_labels(signal: str, labels: Iterable[str]) -> Check:
+    """Fold an ``any_of`` label list into an equality set plus one rank threshold."""
+
+    exact: set[str] = set()
+    threshold: Optional[int] = None
+    for label in labels:
+        if ">" not in label:
+            exact.add(label)
+            continue
+        name, bound = label.split(">", 1)
+        rank = _LABEL_RANK.get(bound)
+        if name not in {"profanity", "nsfw"} or rank is None:
+            continue
+        threshold = rank if threshold is None else min(threshold, rank)
+    if not exact and threshold is None:
+        return _never
+
+    def check(signals: Mapping[str, Any], trust: int) -> bool:
+        observed = str(signals.get(signal, "unknown"))
+        if observed in exact:
+            return True
+        if threshold is None:
+            return False
+        rank = _LABEL_RANK.get(observed)
+        return rank is not None and rank >= threshold
+
+    return check
+
+
+def _compile_signals(keys: Iterable[str]) -> Check:
+    required = tuple(keys)
+
+    def check(signals: Mapping[str, Any], trust: int) -> bool:
+        for key in required:
+            if not signals.get(key):
+                return False
+        return True
+
+    return check
+
+
+def _compile_trust_below(threshold: Any) -> Check:
+    try:
+        bound = int(threshold)
+    except (TypeError, ValueError):
+        return _never
+
+    def check(signals: Mapping[str, Any], trust: int) -> bool:
+        return trust < bound
+
+    return check
+
+
+_PREDICATES: Dict[str, Callable[[Any], Check]] = {
+    "text.any_of": lambda value: _compile_labels("profanity", value),
+    "image.any_of": lambda value: _compile_labels("nsfw", value),
+    "signals.all_of": _compile_signals,
+    "user.trust_below": _compile_trust_below,
+}
+
+
+@dataclass(slots=True)
+class _CompiledRule:
+    index: int
+    rule: PolicyRule
+    checks: Tuple[Check, ...]
+
+    def matches(self, signals: Mapping[str, Any], trust: int) -> bool:
+        for check in self.checks:
+            if not check(signals, trust):
+                return False
+        return True
+
+
+class CompiledPolicy:
+    """A policy lowered to predicate closures, highest severity first.
+
+    The first matching rule in severity order is the winner (ties keep
+    definition order, as ``max`` did). After that only rules carrying a
+    reason still need evaluating, since reasons from every match are reported.
+    """
+
+    __slots__ = ("policy_id", "version", "default_action", "_ordered", "_source", "__weakref__")
+
+    def __init__(self, policy: Policy) -> None:
+        self.policy_id = policy.policy_id
+        self.version = policy.version
+        self.default_action = policy.default_action
+        self._source = weakref.ref(policy)
+        compiled: List[_CompiledRule] = []
+        for index, rule in enumerate(policy.rules):
+            checks: List[Check] = []
+            for predicate, value in rule.when.items():
+                factory = _PREDICATES.get(predicate)
+                check = factory(value) if factory is not None else _never
+                if check is _never:
+                    break
+                checks.append(check)
+            else:
+                compiled.append(_CompiledRule(index=index, rule=rule, checks=tuple(checks)))
+        compiled.sort(key=lambda item: (-item.rule.severity, item.index))
+        self._ordered: Tuple[_CompiledRule, ...] = tuple(compiled)
+
+    def compiled_from(self, policy: Policy) -> bool:
+        return self._source() is policy
+
+    def evaluate(self, signals: Mapping[str, Any], trust_score: Optional[int]) -> Decision:
+        trust = trust_score if trust_score is not None else _DEFAULT_TRUST
+        ordered = self._ordered
+        for position, compiled in enumerate(ordered):
+            if compiled.matches(signals, trust):
+                break
+        else:
+            return Decision(action=self.default_action, severity=0, payload={}, reasons=[])
+        winner = compiled.rule
+        hits: List[Tuple[int, str]] = [(compiled.index, winner.reason)] if winner.reason else []
+        for other in ordered[position + 1 :]:
+            if other.rule.reason and other.matches(signals, trust):
+                hits.append((other.index, other.rule.reason))
+        hits.sort()
+        return Decision(
+            action=winner.action,
+            severity=winner.severity,
+            payload=winner.payload,
+            reasons=[reason for _, reason in hits],
+        )
+
+
+_COMPILED: Dict[Tuple[str, int], CompiledPolicy] = {}
+_COMPILED_MAX = 256
+
+
+def compile_policy(policy: Policy) -> CompiledPolicy:
+    """Return the compiled form of ``policy``, cached by (policy_id, version).
+
+    A different ``Policy`` object under the same key replaces the cached entry;
+    edit rules by publishing a new version rather than mutating them in place.
+    """
+
+    key = (policy.policy_id, policy.version)
+    compiled = _COMPILED.get(key)
+    if compiled is None or not compiled.compiled_from(policy):
+        compiled = CompiledPolicy(policy)
+        if key not in _COMPILED and len(_COMPILED) >= _COMPILED_MAX:
+            _COMPILED.clear()
+        _COMPILED[key] = compiled
+    return compiled
+
+
+def evaluate_policy(policy: Policy, signals: Mapping[str, Any], trust_score: Optional[int]) -> Decision:
+    """Evaluate a policy against detector signals for a moderation event."""
+
+    return compile_policy(policy).evaluate(signals, trust_score)
+
+
 def _compare_label(observed: str, predicate: str) -> bool:
     """Compares labels of the form 'profanity>medium'."""
 
@@ -6,9 +6,13 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
 from math import floor
-from typing import Iterable, Mapping, MutableMapping, Protocol, Sequence
+from typing import TYPE_CHECKING, Iterable, Mapping, MutableMapping, Protocol, Sequence
+
+if TYPE_CHECKING:
+    from app.moderation.domain.gate_state import GateStateCache
 
 DEFAULT_NEUTRAL_SCORE = 50
+DECAY_BANDS = ("watch", "risk", "bad")
 
 
 class ReputationBand(str, Enum):
@@ -45,6 +49,20 @@ class ReputationEvent:
     meta: Mapping[str, object] = field(default_factory=dict)
 
 
+@dataclass(slots=True)
+class DecayBatch:
+    """Outcome of decaying one keyset page of candidates.
+
+    ``cursor`` is the last user id examined (decayed or not) and is ``None``
+    once the walk has run past the last candidate.
+    """
+
+    cursor: str | None
+    scanned: int
+    decayed: list[ReputationScore] = field(default_factory=list)
+    band_changed: list[str] = field(default_factory=list)
+
+
 class ReputationRepository(Protocol):
     """Storage layer contract for reputation data."""
 
@@ -63,7 +81,22 @@ class ReputationRepository(Protocol):
     async def has_negative_event_since(self, user_id: str, since: datetime) -> bool:
         ...
 
-    async def list_for_decay(self, before: datetime) -> Sequence[ReputationScore]:
+    async def get_decay_checkpoint(self) -> str | None:
+        ...
+
+    async def decay_batch(
+        self,
+        *,
+        after: str | None,
+        limit: int,
+        quiet_since: datetime,
+        rate: float,
+        now: datetime,
+    ) -> DecayBatch:
+        """Decay the next ``limit`` candidates after ``after`` and checkpoint the new cursor."""
+        ...
+
+    async def clear_decay_checkpoint(self) -> None:
         ...
 
 
@@ -94,10 +127,14 @@ class ReputationService:
         *,
         decay_rate: float = 0.05,
         negative_window: timedelta = timedelta(hours=24),
+        decay_batch_size: int = 1000,
+        gate_state: "GateStateCache" | None = None,
     ) -> None:
         self._repo = repository
+        self._gate_state = gate_state
         self._decay_rate = decay_rate
         self._negative_window = negative_window
+        self._decay_batch_size = decay_batch_size
 
     async def get_or_create(self, user_id: str) -> ReputationScore:
         """Return the current score, seeding a neutral record when absent."""
@@ -149,7 +186,10 @@ class ReputationService:
             band=band_for_score(next_score),
             last_event_at=timestamp,
         )
-        return await self._repo.upsert_user_reputation(score)
+        stored = await self._repo.upsert_user_reputation(score)
+        if self._gate_state is not None and stored.band is not current.band:
+            await self._gate_state.invalidate(user_id)
+        return stored
 
     async def adjust_manual(self, user_id: str, delta: int, note: str | None = None) -> ReputationScore:
         """Helper for staff adjustments outside of automatic signals."""
@@ -183,15 +223,33 @@ class ReputationService:
         )
 
     async def run_decay_pass(self, *, now: datetime | None = None) -> list[ReputationScore]:
-        """Execute a decay sweep used by background jobs."""
+        """Execute a decay sweep used by background jobs.
+
+        Candidates are decayed a page at a time in user id order; each page is
+        one set-based repository call that also checkpoints its cursor, so a
+        pass interrupted part way resumes from the last committed page.
+        """
 
         now = now or datetime.now(timezone.utc)
-        candidates = await self._repo.list_for_decay(now - self._negative_window)
+        quiet_since = now - self._negative_window
+        cursor = await self._repo.get_decay_checkpoint()
         results: list[ReputationScore] = []
-        for score in candidates:
-            updated = await self.apply_decay_if_needed(score, now=now)
-            if updated:
-                results.append(updated)
+        while True:
+            batch = await self._repo.decay_batch(
+                after=cursor,
+                limit=self._decay_batch_size,
+                quiet_since=quiet_since,
+                rate=self._decay_rate,
+                now=now,
+            )
+            results.extend(batch.decayed)
+            if self._gate_state is not None:
+                for user_id in batch.band_changed:
+                    await self._gate_state.invalidate(user_id)
+            if batch.cursor is None or batch.scanned < self._decay_batch_size:
+                break
+            cursor = batch.cursor
+        await self._repo.clear_decay_checkpoint()
         return results
 
     async def list_recent_events(self, user_id: str, limit: int = 20, offset: int = 0) -> Sequence[ReputationEvent]:
@@ -227,6 +285,7 @@ class InMemoryReputationRepository(ReputationRepository):
     def __init__(self) -> None:
         self.scores: dict[str, ReputationScore] = {}
         self.events: list[ReputationEvent] = []
+        self.decay_checkpoint: str | None = None
 
     async def get_user_reputation(self, user_id: str) -> ReputationScore | None:
         return self.scores.get(user_id)
@@ -252,5 +311,50 @@ class InMemoryReputationRepository(ReputationRepository):
                 return True
         return False
 
-    async def list_for_decay(self, before: datetime) -> Sequence[ReputationScore]:
-        return [score for score in self.scores.values() if score.last_event_at < before]
+    async def get_decay_checkpoint(self) -> str | None:
+        return self.decay_checkpoint
+
+    async def decay_batch(
+        self,
+        *,
+        after: str | None,
+        limit: int,
+        quiet_since: datetime,
+        rate: float,
+        now: datetime,
+    ) -> DecayBatch:
+        candidates = sorted(
+            (
+                score
+                for score in self.scores.values()
+                if (after is None or score.user_id > after)
+                and score.band.value in DECAY_BANDS
+                and score.last_event_at < quiet_since
+            ),
+            key=lambda score: score.user_id,
+        )[:limit]
+        batch = DecayBatch(cursor=candidates[-1].user_id if candidates else None, scanned=len(candidates))
+        for current in candidates:
+            decay_delta = floor(current.score * rate)
+            if decay_delta <= 0 or await self.has_negative_event_since(current.user_id, quiet_since):
+                continue
+            self.events.append(
+                ReputationEvent(user_id=current.user_id, surface="decay", kind="decay", delta=-decay_delta, created_at=now)
+            )
+            next_score = clamp(current.score - decay_delta)
+            stored = ReputationScore(
+                user_id=current.user_id,
+                score=next_score,
+                band=band_for_score(next_score),
+                last_event_at=now,
+            )
+            self.scores[current.user_id] = stored
+            batch.decayed.append(stored)
+            if stored.band is not current.band:
+                batch.band_changed.append(current.user_id)
+        if batch.cursor is not None:
+            self.decay_checkpoint = batch.cursor
+        return batch
+
+    async def clear_decay_checkpoint(self) -> None:
+        self.decay_checkpoint = None
@@ -5,13 +5,16 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import List, Protocol, Sequence
+from typing import TYPE_CHECKING, List, Protocol, Sequence
 
 from redis.asyncio import Redis
 
 from app.infra.redis import RedisProxy
 from app.obs import metrics
 
+if TYPE_CHECKING:
+    from app.moderation.domain.gate_state import GateStateCache
+
 
 class RestrictionMode(str, Enum):
     COOLDOWN = "cooldown"
@@ -45,6 +48,16 @@ class RestrictionFlags:
     link_cooloff: bool = False
 
 
+@dataclass(slots=True)
+class FlagTTLs:
+    """Raw Redis TTLs of one user's flag keys (-2 missing, -1 no expiry)."""
+
+    cooldown: int = -2
+    shadow: int = -2
+    captcha: int = -2
+    link: int = -2
+
+
 class RestrictionRepository(Protocol):
     async def create(self, restriction: Restriction) -> Restriction:
         ...
@@ -75,6 +88,7 @@ class RestrictionService:
         captcha_prefix: str = "captcha",
         link_prefix: str = "linkcooloff",
         honey_prefix: str = "honey:trip",
+        gate_state: "GateStateCache" | None = None,
     ) -> None:
         self._repo = repository
         self._redis = redis
@@ -83,6 +97,7 @@ class RestrictionService:
         self._captcha_prefix = captcha_prefix
         self._link_prefix = link_prefix
         self._honey_prefix = honey_prefix
+        self._gate_state = gate_state
 
     async def apply_restriction(
         self,
@@ -160,6 +175,7 @@ class RestrictionService:
 
     async def link_cooloff(self, *, user_id: str, hours: int) -> None:
         await self._set_flag(f"{self._link_prefix}:{user_id}", int(hours * 3600))
+        await self._invalidate(user_id)
 
     async def revoke(self, restriction_id: str) -> None:
         restriction = await self._repo.get(restriction_id)
@@ -179,17 +195,25 @@ class RestrictionService:
         return await self._repo.get(restriction_id)
 
     async def check_flags(self, *, user_id: str, scope: str) -> RestrictionFlags:
-        cooldown_ttl = await self._redis.ttl(self._cooldown_key(user_id, scope))
-        shadow_exists = await self._redis.exists(self._shadow_key(user_id, scope))
-        captcha_exists = await self._redis.exists(self._captcha_key(user_id, scope))
-        link_exists = await self._redis.exists(f"{self._link_prefix}:{user_id}")
+        ttls = await self.flag_ttls(user_id=user_id, scope=scope)
         return RestrictionFlags(
-            cooldown_ttl=cooldown_ttl if cooldown_ttl and cooldown_ttl > 0 else None,
-            shadow_active=bool(shadow_exists),
-            captcha_required=bool(captcha_exists),
-            link_cooloff=bool(link_exists),
+            cooldown_ttl=ttls.cooldown if ttls.cooldown > 0 else None,
+            shadow_active=ttls.shadow != -2,
+            captcha_required=ttls.captcha != -2,
+            link_cooloff=ttls.link != -2,
         )
 
+    async def flag_ttls(self, *, user_id: str, scope: str) -> FlagTTLs:
+        """Read every flag key for ``scope`` in one pipelined round trip."""
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.ttl(self._cooldown_key(user_id, scope))
+            pipe.ttl(self._shadow_key(user_id, scope))
+            pipe.ttl(self._captcha_key(user_id, scope))
+            pipe.ttl(f"{self._link_prefix}:{user_id}")
+            cooldown, shadow, captcha, link = await pipe.execute()
+        return FlagTTLs(cooldown=int(cooldown), shadow=int(shadow), captcha=int(captcha), link=int(link))
+
     async def record_honey_trip(self, user_id: str) -> int:
         key = f"{self._honey_prefix}:{user_id}"
         count = await self._redis.incr(key)
@@ -206,6 +230,7 @@ class RestrictionService:
         elif restriction.mode is RestrictionMode.HARD_BLOCK:
             await self._set_flag(self._shadow_key(restriction.user_id, restriction.scope), restriction.ttl_seconds)
             await self._set_flag(self._cooldown_key(restriction.user_id, restriction.scope), restriction.ttl_seconds)
+        await self._invalidate(restriction.user_id)
 
     async def _clear_flags(self, user_id: str, scope: str, mode: RestrictionMode) -> None:
         keys: List[str] = []
@@ -217,6 +242,11 @@ class RestrictionService:
             keys.append(self._captcha_key(user_id, scope))
         if keys:
             await self._redis.delete(*keys)
+            await self._invalidate(user_id)
+
+    async def _invalidate(self, user_id: str) -> None:
+        if self._gate_state is not None:
+            await self._gate_state.invalidate(user_id)
 
     async def _set_flag(self, key: str, ttl_seconds: int | None, *, nx: bool = False) -> None:
         kwargs: dict[str, object] = {}
@@ -6,6 +6,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Mapping, MutableMapping, Protocol, Sequence
 
+from app.moderation.domain.hashing import NEAR_DUPLICATE_ALGOS, MultiIndexHash
+
 
 @dataclass(slots=True)
 class AttachmentSafetyRecord:
@@ -94,6 +96,11 @@ class SafetyRepository(Protocol):
     async def find_media_hash(self, algo: str, hash_value: str) -> MediaHashEntry | None:
         """Return a known-bad media hash entry if one exists."""
 
+    async def find_similar_media_hash(
+        self, algo: str, hash_value: str, *, max_distance: int
+    ) -> tuple[MediaHashEntry, int] | None:
+        """Return the closest known-bad entry within ``max_distance`` bits, with its distance."""
+
     async def bulk_upsert_media_hashes(self, entries: Sequence[MediaHashUpsert]) -> int:
         """Insert or update multiple media hash records, returning the affected row count."""
 
@@ -153,6 +160,7 @@ class InMemorySafetyRepository(SafetyRepository):
     hashes: MutableMapping[tuple[str, str], MediaHashEntry] = field(default_factory=dict)
     text_scans: MutableMapping[tuple[str, str], TextScanRecord] = field(default_factory=dict)
     url_scans: MutableMapping[str, UrlScanRecord] = field(default_factory=dict)
+    hash_index: MutableMapping[str, MultiIndexHash] = field(default_factory=dict)
 
     async def get_attachment_by_key(self, s3_key: str) -> AttachmentSafetyRecord | None:
         for record in self.attachments.values():
@@ -194,6 +202,19 @@ class InMemorySafetyRepository(SafetyRepository):
     async def find_media_hash(self, algo: str, hash_value: str) -> MediaHashEntry | None:
         return self.hashes.get((algo, hash_value))
 
+    async def find_similar_media_hash(
+        self, algo: str, hash_value: str, *, max_distance: int
+    ) -> tuple[MediaHashEntry, int] | None:
+        index = self.hash_index.get(algo)
+        if algo not in NEAR_DUPLICATE_ALGOS or index is None:
+            entry = self.hashes.get((algo, hash_value))
+            return (entry, 0) if entry else None
+        matches = index.search(hash_value, max_distance)
+        if not matches:
+            return None
+        match, distance = matches[0]
+        return self.hashes[(algo, match)], distance
+
     async def bulk_upsert_media_hashes(self, entries: Sequence[MediaHashUpsert]) -> int:
         count = 0
         for entry in entries:
@@ -201,6 +222,8 @@ class InMemorySafetyRepository(SafetyRepository):
             existing = self.hashes.get(key)
             if existing is None:
                 count += 1
+                if entry.algo in NEAR_DUPLICATE_ALGOS:
+                    self.hash_index.setdefault(entry.algo, MultiIndexHash()).add(entry.hash_value)
                 self.hashes[key] = MediaHashEntry(
                     entry_id=len(self.hashes) + 1,
                     algo=entry.algo,
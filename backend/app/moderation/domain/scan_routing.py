@@ -0,0 +1,49 @@
+"""Routing of safety scan jobs onto per-type ingress streams.
+
+Each scanner used to read the shared ``scan:ingress`` stream and throw away
+every job that was not its type. Jobs are now published straight to
+``scan:ingress:text``, ``scan:ingress:url`` and ``scan:ingress:media`` so a
+scanner only receives its own work and each type scales on its own.
+Producers call :func:`publish_scan_job` (the image scanner does so for the
+text it extracts with OCR). ``LegacyScanRouter`` (``app.moderation.workers.scan_router``) drains anything
+producers still write to ``scan:ingress`` onto the same streams.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Protocol
+
+LEGACY_SCAN_INGRESS = "scan:ingress"
+
+SCAN_STREAMS: Mapping[str, str] = {
+    "text": "scan:ingress:text",
+    "url": "scan:ingress:url",
+    "media": "scan:ingress:media",
+}
+
+# Job ``type`` field -> route; images and generic files share the media scanner.
+_ROUTES: Mapping[str, str] = {"text": "text", "url": "url", "image": "media", "file": "media"}
+
+
+class StreamWriter(Protocol):
+    async def xadd(self, stream: str, fields: Mapping[str, Any]) -> str:
+        ...
+
+
+def stream_for(job_type: Any) -> str | None:
+    """Return the ingress stream for a job ``type``, or None when no scanner handles it."""
+
+    route = _ROUTES.get(str(job_type)) if job_type is not None else None
+    return SCAN_STREAMS[route] if route else None
+
+
+async def publish_scan_job(redis: StreamWriter, fields: Mapping[str, Any]) -> str:
+    """Append a scan job to the stream of its ``type``."""
+
+    stream = stream_for(fields.get("type"))
+    if stream is None:
+        raise ValueError(f"unsupported scan job type: {fields.get('type')!r}")
+    return await redis.xadd(stream, fields)
+
+
+__all__ = ["LEGACY_SCAN_INGRESS", "SCAN_STREAMS", "publish_scan_job", "stream_for"]
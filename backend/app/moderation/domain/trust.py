@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Protocol
+from typing import Dict, Iterable, Protocol
 
 
 class TrustRepository(Protocol):
@@ -37,3 +37,20 @@ class TrustLedger:
             await self.repository.upsert_score(user_id, 50, datetime.now(timezone.utc))
             return 50
         return score
+
+    async def hydrate_many(self, user_ids: Iterable[str]) -> Dict[str, int]:
+        """Batch form of :meth:`hydrate`: one read, plus one seed write for new users."""
+
+        unique = list(dict.fromkeys(user_ids))
+        if not unique:
+            return {}
+        get_scores = getattr(self.repository, "get_scores", None)
+        seed_scores = getattr(self.repository, "seed_scores", None)
+        if get_scores is None or seed_scores is None:
+            return {user_id: await self.hydrate(user_id) for user_id in unique}
+        scores = dict(await get_scores(unique))
+        missing = [user_id for user_id in unique if user_id not in scores]
+        if missing:
+            await seed_scores(missing, 50, datetime.now(timezone.utc))
+            scores.update({user_id: 50 for user_id in missing})
+        return scores
@@ -0,0 +1,302 @@
+"""Shared verdict cache for the URL scanner.
+
+A viral link is posted many times in a burst, and every copy used to cost a
+Postgres read and, on a miss, a classification (redirect resolution plus list
+checks). :class:`UrlVerdictCache` sits in front of both:
+
+* a process LRU keyed by normalized URL, plus entries keyed by eTLD+1 for
+  verdicts that come from a host deny list (a link anywhere on a listed
+  registrable domain takes that verdict without being resolved);
+* a Redis tier shared by all scanner processes. Clean and unknown verdicts
+  are negative results and are kept for ``negative_ttl`` only, so a link that
+  is listed later is picked up quickly;
+* single-flight loading: concurrent misses for the same URL in a process share
+  one loader task, and across processes a short Redis lock lets one worker
+  classify while the others wait for its verdict to land.
+
+Redis failures only cost the shared tier; the cache then behaves as a
+process-local one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from redis.asyncio import Redis
+
+from app.moderation.domain.url_reputation import UrlVerdict, _etld_plus_one
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT_LOCAL = "hit_local"
+CACHE_HIT_DOMAIN = "hit_domain"
+CACHE_HIT_REDIS = "hit_redis"
+CACHE_COALESCED = "coalesced"
+CACHE_MISS = "miss"
+
+NEGATIVE_VERDICTS = frozenset({"clean", "unknown"})
+# Lists that depend only on the final host, so they hold for the whole domain.
+DOMAIN_LISTS = frozenset({"malware", "phishing", "suspicious_host"})
+
+_NAMESPACE = "mod:url:v1"
+_DEFAULT_PORTS = {("http", 80), ("https", 443)}
+
+Loader = Callable[[], Awaitable[UrlVerdict]]
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lowercase scheme and host, no default port or fragment."""
+
+    raw = url.strip()
+    try:
+        parts = urlsplit(raw)
+        port = parts.port
+    except ValueError:
+        return raw
+    host = (parts.hostname or "").rstrip(".")
+    scheme = parts.scheme.lower()
+    if not scheme or not host:
+        return raw
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port is None or (scheme, port) in _DEFAULT_PORTS else f"{host}:{port}"
+    userinfo = parts.netloc.rpartition("@")[0] if "@" in parts.netloc else ""
+    if userinfo:
+        netloc = f"{userinfo}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def domain_of(url: str) -> str | None:
+    try:
+        return _etld_plus_one(urlsplit(url).hostname)
+    except ValueError:
+        return None
+
+
+def dump_verdict(verdict: UrlVerdict) -> str:
+    return json.dumps(
+        {
+            "requested_url": verdict.requested_url,
+            "final_url": verdict.final_url,
+            "etld_plus_one": verdict.etld_plus_one,
+            "verdict": verdict.verdict,
+            "lists": list(verdict.lists),
+            "details": dict(verdict.details),
+            "resolved_at": verdict.resolved_at.isoformat(),
+        }
+    )
+
+
+def load_verdict(raw: str | bytes) -> UrlVerdict:
+    data = json.loads(raw)
+    return UrlVerdict(
+        requested_url=data["requested_url"],
+        final_url=data.get("final_url"),
+        etld_plus_one=data.get("etld_plus_one"),
+        verdict=data["verdict"],
+        lists=list(data.get("lists") or []),
+        details=dict(data.get("details") or {}),
+        resolved_at=datetime.fromisoformat(data["resolved_at"]),
+    )
+
+
+class UrlVerdictCache:
+    """Two-tier (process LRU + Redis) URL verdict cache with single-flight loads."""
+
+    def __init__(
+        self,
+        redis: Optional[Redis] = None,
+        *,
+        ttl: timedelta = timedelta(hours=24),
+        negative_ttl: timedelta = timedelta(hours=1),
+        max_entries: int = 10_000,
+        lock_ms: int = 5000,
+        poll_ms: int = 50,
+    ) -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.lock_ms = lock_ms
+        self.poll_ms = poll_ms
+        self._local: OrderedDict[str, tuple[float, UrlVerdict]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def resolve(self, url: str, loader: Loader) -> tuple[UrlVerdict, str]:
+        """Return ``(verdict, outcome)`` where outcome is one of the ``CACHE_*`` labels."""
+
+        key = normalize_url(url)
+        verdict = self._get_local(f"u:{key}")
+        if verdict is not None:
+            return verdict, CACHE_HIT_LOCAL
+        domain = domain_of(key)
+        if domain:
+            verdict = self._get_local(f"d:{domain}")
+            if verdict is not None:
+                return _for_url(verdict, url), CACHE_HIT_DOMAIN
+        task = self._inflight.get(key)
+        if task is not None:
+            verdict, _ = await asyncio.shield(task)
+            return verdict, CACHE_COALESCED
+        task = asyncio.create_task(self._load(key, domain, url, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        # Shielded so one cancelled scan does not abort the load other scans wait on.
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def _get_local(self, key: str) -> UrlVerdict | None:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, verdict = entry
+        if expires_at <= time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return verdict
+
+    def _put_local(self, key: str, verdict: UrlVerdict, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._local[key] = (time.monotonic() + ttl, verdict)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _remaining(self, verdict: UrlVerdict) -> float:
+        """Seconds left on ``verdict``; verdicts read back from Postgres may be part-aged."""
+
+        lifetime = self.negative_ttl if verdict.verdict in NEGATIVE_VERDICTS else self.ttl
+        age = datetime.now(timezone.utc) - verdict.resolved_at
+        return (lifetime - max(age, timedelta(0))).total_seconds()
+
+    async def _load(self, key: str, domain: str | None, url: str, loader: Loader) -> tuple[UrlVerdict, str]:
+        cached = await self._read_shared(key, domain, url)
+        if cached is not None:
+            return cached
+        locked = await self._lock(key)
+        try:
+            if locked is False:
+                cached = await self._await_peer(key, url)
+                if cached is not None:
+                    return cached
+            verdict = await loader()
+            await self._store(key, verdict)
+        finally:
+            if locked:
+                await self._unlock(key)
+        return verdict, CACHE_MISS
+
+    async def _read_shared(self, key: str, domain: str | None, url: str) -> tuple[UrlVerdict, str] | None:
+        if self.redis is None:
+            return None
+        keys = [_redis_key("u", key)] + ([_redis_key("d", domain)] if domain else [])
+        try:
+            raw_url, *raw_domain = await self.redis.mget(keys)
+        except Exception:
+            logger.debug("url verdict cache redis read failed", exc_info=True)
+            return None
+        if raw_url:
+            verdict = load_verdict(raw_url)
+            self._put_local(f"u:{key}", verdict, self._remaining(verdict))
+            return verdict, CACHE_HIT_REDIS
+        if raw_domain and raw_domain[0]:
+            verdict = load_verdict(raw_domain[0])
+            self._put_local(f"d:{domain}", verdict, self._remaining(verdict))
+            return _for_url(verdict, url), CACHE_HIT_DOMAIN
+        return None
+
+    async def _store(self, key: str, verdict: UrlVerdict) -> None:
+        ttl = self._remaining(verdict)
+        if ttl <= 0:
+            return
+        entries = {f"u:{key}": verdict}
+        if verdict.etld_plus_one and DOMAIN_LISTS.intersection(verdict.lists):
+            entries[f"d:{verdict.etld_plus_one}"] = verdict
+        for local_key, value in entries.items():
+            self._put_local(local_key, value, ttl)
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            payload = dump_verdict(verdict)
+            for local_key in entries:
+                kind, _, name = local_key.partition(":")
+                pipe.set(_redis_key(kind, name), payload, px=int(ttl * 1000))
+            await pipe.execute()
+        except Exception:
+            logger.debug("url verdict cache redis write failed", exc_info=True)
+
+    async def _lock(self, key: str) -> bool | None:
+        """True when this process owns the load, False when a peer does, None without Redis."""
+
+        if self.redis is None:
+            return None
+        try:
+            return bool(await self.redis.set(_redis_key("lock", key), "1", nx=True, px=self.lock_ms))
+        except Exception:
+            logger.debug("url verdict cache lock failed", exc_info=True)
+            return None
+
+    async def _unlock(self, key: str) -> None:
+        try:
+            await self.redis.delete(_redis_key("lock", key))  # type: ignore[union-attr]
+        except Exception:
+            logger.debug("url verdict cache unlock failed", exc_info=True)
+
+    async def _await_peer(self, key: str, url: str) -> tuple[UrlVerdict, str] | None:
+        """Poll for the verdict another worker is classifying, up to the lock lifetime."""
+
+        deadline = time.monotonic() + self.lock_ms / 1000.0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_ms / 1000.0)
+            cached = await self._read_shared(key, None, url)
+            if cached is not None:
+                return cached[0], CACHE_COALESCED
+        return None
+
+
+def _redis_key(kind: str, name: str) -> str:
+    digest = name if kind == "d" else hashlib.blake2b(name.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{_NAMESPACE}:{kind}:{digest}"
+
+
+def _for_url(verdict: UrlVerdict, url: str) -> UrlVerdict:
+    """A domain-level verdict re-issued for another URL on the same domain."""
+
+    if verdict.requested_url == url:
+        return verdict
+    details: dict[str, Any] = {**verdict.details, "cache": "domain"}
+    return replace(verdict, requested_url=url, final_url=None, details=details)
+
+
+__all__ = [
+    "CACHE_COALESCED",
+    "CACHE_HIT_DOMAIN",
+    "CACHE_HIT_LOCAL",
+    "CACHE_HIT_REDIS",
+    "CACHE_MISS",
+    "NEGATIVE_VERDICTS",
+    "UrlVerdictCache",
+    "dump_verdict",
+    "load_verdict",
+    "normalize_url",
+]
@@ -96,15 +96,32 @@ class VelocityService:
     ) -> VelocityTrip | None:
         """Increment counters and return the first window that trips."""
 
+        counts = await self.count(user_id=user_id, surface=surface)
+        return self.evaluate(surface=surface, counts=counts, band=band)
+
+    async def count(self, *, user_id: str, surface: str) -> list[int]:
+        """Increment every window for ``surface`` in one pipelined round trip.
+
+        The band only scales limits, so callers can count before the band is
+        known and :meth:`evaluate` afterwards.
+        """
+
         windows = self._config.thresholds_for_surface(surface)
         if not windows:
-            return None
+            return []
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for window in windows:
+                key = f"{self._namespace}:{surface}:{user_id}:{window.seconds}"
+                pipe.incr(key)
+                pipe.expire(key, window.seconds)
+            results = await pipe.execute()
+        return [int(value) for value in results[::2]]
+
+    def evaluate(self, *, surface: str, counts: list[int], band: ReputationBand) -> VelocityTrip | None:
+        windows = self._config.thresholds_for_surface(surface)
         multiplier = max(0.1, self._config.band_multiplier(band))
-        for window in windows:
+        for window, count in zip(windows, counts):
             limit = max(1, int(window.limit * multiplier))
-            key = f"{self._namespace}:{surface}:{user_id}:{window.seconds}"
-            count = await self._redis.incr(key)
-            await self._redis.expire(key, window.seconds)
             if count > limit:
                 cooldown = timedelta(minutes=window.cooldown_minutes)
                 return VelocityTrip(surface=surface, window=window, count=count, limit=limit, cooldown=cooldown)
@@ -4,19 +4,92 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
-from typing import Mapping, Optional
+from typing import Mapping, Optional, Sequence
+from uuid import UUID
 
 import asyncpg
 
 from app.moderation.domain.enforcement import (
     AuditLogEntry,
+    EnforcementRequest,
     ModerationAction,
     ModerationAppeal,
     ModerationCase,
     ModerationReport,
     ModerationRepository,
+    PendingAction,
 )
 
+_CASE_COLUMNS = """
+    id,
+    subject_type,
+    subject_id,
+    status,
+    reason,
+    severity,
+    policy_id,
+    created_by,
+    created_at,
+    updated_at,
+    assigned_to,
+    escalation_level,
+    appeal_open,
+    appealed_by,
+    appeal_note
+"""
+
+# Upsert every distinct subject of a batch and report which requested actions
+# each case already carries, in one statement.
+_PREPARE_CASES_SQL = f"""
+WITH input AS (
+    SELECT *
+    FROM unnest($1::text[], $2::uuid[], $3::text[], $4::uuid[], $5::smallint[], $6::uuid[])
+        AS t(subject_type, subject_id, reason, policy_id, severity, created_by)
+),
+upserted AS (
+    INSERT INTO mod_case (subject_type, subject_id, status, reason, policy_id, severity, created_by)
+    SELECT subject_type, subject_id, 'open', reason, policy_id, severity, created_by FROM input
+    ON CONFLICT (subject_type, subject_id)
+    DO UPDATE SET
+        reason = EXCLUDED.reason,
+        policy_id = EXCLUDED.policy_id,
+        severity = EXCLUDED.severity,
+        updated_at = now()
+    RETURNING {_CASE_COLUMNS}
+)
+SELECT
+    u.*,
+    ARRAY(
+        SELECT DISTINCT a.action FROM mod_action a
+        WHERE a.case_id = u.id AND a.action = ANY($7::text[])
+    ) AS applied
+FROM upserted u
+"""
+
+# Action insert, case status update and audit rows for a whole batch.
+_COMMIT_ACTIONS_SQL = """
+WITH input AS (
+    SELECT *
+    FROM unnest($1::uuid[], $2::text[], $3::text[], $4::uuid[], $5::text[], $6::text[], $7::int[])
+        AS t(case_id, action, payload, actor_id, target_type, target_id, ord)
+),
+inserted AS (
+    INSERT INTO mod_action (case_id, action, payload, actor_id)
+    SELECT case_id, action, payload::jsonb, actor_id FROM input ORDER BY ord
+    RETURNING case_id, action, payload, actor_id, created_at
+),
+actioned AS (
+    UPDATE mod_case SET status = 'actioned', updated_at = now()
+    WHERE id IN (SELECT case_id FROM input WHERE action <> 'none')
+),
+audited AS (
+    INSERT INTO mod_audit (actor_id, action, target_type, target_id, meta)
+    SELECT actor_id, 'action.apply', target_type, target_id, jsonb_build_object('action', action)
+    FROM input ORDER BY ord
+)
+SELECT case_id, action, payload, actor_id, created_at FROM inserted
+"""
+
 
 class PostgresModerationRepository(ModerationRepository):
     """Persists moderation mutations using asyncpg."""
@@ -92,6 +165,53 @@ class PostgresModerationRepository(ModerationRepository):
         row = await self.pool.fetchrow(query, case_id, action)
         return row is not None
 
+    async def prepare_cases(
+        self,
+        requests: Sequence[EnforcementRequest],
+    ) -> list[tuple[ModerationCase, frozenset[str]]]:
+        # One row per subject: later requests win for the updated columns, the
+        # first actor is kept as creator, matching one-at-a-time upserts.
+        subjects: dict[tuple[str, str], list[object]] = {}
+        for request in requests:
+            key = (request.subject_type, _uuid_key(request.subject_id))
+            row = subjects.get(key)
+            if row is None:
+                subjects[key] = [
+                    request.subject_type,
+                    request.subject_id,
+                    request.base_reason,
+                    request.policy_id,
+                    request.decision.severity,
+                    request.actor_id,
+                ]
+            else:
+                row[2], row[3], row[4] = request.base_reason, request.policy_id, request.decision.severity
+        columns = list(zip(*subjects.values()))
+        actions = sorted({request.decision.action for request in requests})
+        records = await self.pool.fetch(_PREPARE_CASES_SQL, *[list(column) for column in columns], actions)
+        by_subject = {
+            (str(record["subject_type"]), _uuid_key(record["subject_id"])): (
+                _case_from_record(record),
+                frozenset(record["applied"] or ()),
+            )
+            for record in records
+        }
+        return [by_subject[(request.subject_type, _uuid_key(request.subject_id))] for request in requests]
+
+    async def commit_actions(self, pending: Sequence[PendingAction]) -> list[ModerationAction]:
+        records = await self.pool.fetch(
+            _COMMIT_ACTIONS_SQL,
+            [item.case.case_id for item in pending],
+            [item.action for item in pending],
+            [json.dumps(dict(item.payload), default=str) for item in pending],
+            [item.actor_id for item in pending],
+            [item.case.subject_type for item in pending],
+            [item.case.subject_id for item in pending],
+            list(range(len(pending))),
+        )
+        by_key = {(_uuid_key(record["case_id"]), str(record["action"])): _action_from_record(record) for record in records}
+        return [by_key[(_uuid_key(item.case.case_id), item.action)] for item in pending]
+
     async def update_case_status(self, case_id: str, status: str) -> None:
         query = "UPDATE mod_case SET status = $2, updated_at = now() WHERE id = $1"
         await self.pool.execute(query, case_id, status)
@@ -355,6 +475,13 @@ class PostgresModerationRepository(ModerationRepository):
         return _case_from_record(record)
 
 
+def _uuid_key(value: object) -> str:
+    try:
+        return str(value if isinstance(value, UUID) else UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
 def _case_from_record(record: asyncpg.Record) -> ModerationCase:
     return ModerationCase(
         case_id=str(record["id"]),
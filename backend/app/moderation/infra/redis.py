@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Mapping, Sequence
 
 from redis.asyncio import Redis
+from redis.exceptions import ResponseError
 
 
 class RedisStreamClient:
@@ -19,6 +20,47 @@ class RedisStreamClient:
     async def xadd(self, stream: str, fields: Mapping[str, Any]) -> str:
         return await self.client.xadd(stream, fields)
 
+    async def ensure_group(self, stream: str, group: str) -> None:
+        """Create ``group`` on ``stream`` (and the stream) if it does not exist yet."""
+
+        try:
+            await self.client.xgroup_create(stream, group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def xreadgroup(
+        self, group: str, consumer: str, streams: Mapping[str, str], count: int, block: int
+    ) -> list[tuple[str, list[tuple[str, Mapping[bytes, bytes]]]]]:
+        return await self.client.xreadgroup(group, consumer, streams, count=count, block=block)
+
+    async def xautoclaim(
+        self, stream: str, group: str, consumer: str, min_idle_ms: int, count: int
+    ) -> list[tuple[str, Mapping[bytes, bytes]]]:
+        """Take over entries another consumer read but never acknowledged."""
+
+        result = await self.client.xautoclaim(stream, group, consumer, min_idle_time=min_idle_ms, start_id="0-0", count=count)
+        return [entry for entry in result[1] if entry[1] is not None] if result else []
+
+    async def move_entries(
+        self,
+        source: str,
+        entry_ids: Sequence[str],
+        targets: Sequence[tuple[str, Mapping[Any, Any]]],
+        *,
+        group: str | None = None,
+    ) -> None:
+        """Append ``targets`` and ack/delete ``entry_ids`` from ``source`` atomically."""
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            for stream, fields in targets:
+                pipe.xadd(stream, fields)
+            if entry_ids:
+                if group is not None:
+                    pipe.xack(source, group, *entry_ids)
+                pipe.xdel(source, *entry_ids)
+            await pipe.execute()
+
     async def add_rolling(self, key: str, value: str, ttl_seconds: int) -> None:
         async with self.client.pipeline(transaction=False) as pipe:
             pipe.sadd(key, value)
@@ -61,3 +103,32 @@ class RedisRateCounter:
             pipe.expire(key, ttl_seconds)
             results = await pipe.execute()
         return int(results[0])
+
+
+class RedisDetectorCounters:
+    """Runs an event's duplicate-text and velocity updates in one pipeline."""
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+
+    async def observe(
+        self,
+        rolling: tuple[str, str, int] | None,
+        rate: tuple[str, int] | None,
+    ) -> tuple[int | None, int | None]:
+        if rolling is None and rate is None:
+            return None, None
+        async with self.client.pipeline(transaction=False) as pipe:
+            if rolling is not None:
+                key, value, ttl_seconds = rolling
+                pipe.sadd(key, value)
+                pipe.expire(key, ttl_seconds)
+                pipe.scard(key)
+            if rate is not None:
+                key, ttl_seconds = rate
+                pipe.incr(key, 1)
+                pipe.expire(key, ttl_seconds)
+            results = await pipe.execute()
+        total = int(results[2]) if rolling is not None else None
+        hits = int(results[3 if rolling is not None else 0]) if rate is not None else None
+        return total, hits
@@ -8,6 +8,8 @@ from typing import Sequence
 import asyncpg
 
 from app.moderation.domain.reputation import (
+    DECAY_BANDS,
+    DecayBatch,
     ReputationBand,
     ReputationEvent,
     ReputationRepository,
@@ -15,6 +17,61 @@ from app.moderation.domain.reputation import (
 )
 
 
+DECAY_JOB = "reputation_decay"
+
+# One page of a decay pass. ``batch`` locks the next keyset page of candidates
+# so concurrent score upserts wait instead of racing the update; ``decayed``
+# applies floor(score * rate) to the candidates without a recent negative
+# (score-raising) event and recomputes the band with the same thresholds as
+# ``band_for_score``; ``ledger`` records one decay event per decayed user. The
+# final select returns every scanned row so the caller can advance its cursor
+# even when nothing in the page decayed.
+_DECAY_BATCH_SQL = """
+WITH batch AS (
+    SELECT user_id, score, band
+    FROM mod_user_reputation
+    WHERE user_id > COALESCE($1::uuid, '00000000-0000-0000-0000-000000000000'::uuid)
+      AND band = ANY($2::text[])
+      AND last_event_at < $3
+    ORDER BY user_id
+    LIMIT $4
+    FOR UPDATE
+),
+decayed AS (
+    UPDATE mod_user_reputation AS r
+    SET score = r.score - floor(r.score * $5::float8)::int,
+        band = CASE
+            WHEN r.score - floor(r.score * $5::float8)::int <= 25 THEN 'good'
+            WHEN r.score - floor(r.score * $5::float8)::int <= 45 THEN 'neutral'
+            WHEN r.score - floor(r.score * $5::float8)::int <= 60 THEN 'watch'
+            WHEN r.score - floor(r.score * $5::float8)::int <= 80 THEN 'risk'
+            ELSE 'bad'
+        END,
+        last_event_at = $6
+    FROM batch AS b
+    WHERE r.user_id = b.user_id
+      AND floor(b.score * $5::float8) > 0
+      AND NOT EXISTS (
+          SELECT 1
+          FROM mod_reputation_event AS e
+          WHERE e.user_id = b.user_id
+            AND e.delta > 0
+            AND e.created_at >= $3
+      )
+    RETURNING r.user_id, r.score, r.band, r.last_event_at, b.score AS previous_score
+),
+ledger AS (
+    INSERT INTO mod_reputation_event (user_id, surface, kind, delta, created_at)
+    SELECT user_id, 'decay', 'decay', score - previous_score, $6
+    FROM decayed
+)
+SELECT b.user_id, b.band AS previous_band, d.score, d.band, d.last_event_at
+FROM batch AS b
+LEFT JOIN decayed AS d USING (user_id)
+ORDER BY b.user_id
+"""
+
+
 def _row_to_score(row: asyncpg.Record) -> ReputationScore:
     return ReputationScore(
         user_id=str(row["user_id"]),
@@ -116,14 +173,42 @@ class PostgresReputationRepository(ReputationRepository):
         )
         return row is not None
 
-    async def list_for_decay(self, before: datetime) -> Sequence[ReputationScore]:
-        rows = await self._pool.fetch(
-            """
-            SELECT user_id, score, band, last_event_at
-            FROM mod_user_reputation
-            WHERE last_event_at < $1
-              AND band IN ('watch', 'risk', 'bad')
-            """,
-            before,
-        )
-        return [_row_to_score(row) for row in rows]
+    async def get_decay_checkpoint(self) -> str | None:
+        return await self._pool.fetchval("SELECT cursor FROM mod_job_checkpoint WHERE job = $1", DECAY_JOB)
+
+    async def decay_batch(
+        self,
+        *,
+        after: str | None,
+        limit: int,
+        quiet_since: datetime,
+        rate: float,
+        now: datetime,
+    ) -> DecayBatch:
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(_DECAY_BATCH_SQL, after, list(DECAY_BANDS), quiet_since, limit, rate, now)
+                if not rows:
+                    return DecayBatch(cursor=None, scanned=0)
+                cursor = str(rows[-1]["user_id"])
+                await conn.execute(
+                    """
+                    INSERT INTO mod_job_checkpoint (job, cursor, updated_at)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (job) DO UPDATE SET cursor = EXCLUDED.cursor, updated_at = EXCLUDED.updated_at
+                    """,
+                    DECAY_JOB,
+                    cursor,
+                    now,
+                )
+        batch = DecayBatch(cursor=cursor, scanned=len(rows))
+        for row in rows:
+            if row["score"] is None:
+                continue
+            batch.decayed.append(_row_to_score(row))
+            if row["band"] != row["previous_band"]:
+                batch.band_changed.append(str(row["user_id"]))
+        return batch
+
+    async def clear_decay_checkpoint(self) -> None:
+        await self._pool.execute("DELETE FROM mod_job_checkpoint WHERE job = $1", DECAY_JOB)
@@ -7,6 +7,7 @@ from typing import Any, Mapping, Sequence
 
 import asyncpg
 
+from app.moderation.domain.hashing import BAND_COUNT, PerceptualHasher, band_candidates, hash_bands
 from app.moderation.domain.safety_repository import (
     AttachmentSafetyRecord,
     MediaHashEntry,
@@ -70,19 +71,44 @@ class PostgresSafetyRepository(SafetyRepository):
         record = await self.pool.fetchrow(query, algo, hash_value)
         return _hash_from_record(record) if record else None
 
+    async def find_similar_media_hash(
+        self, algo: str, hash_value: str, *, max_distance: int
+    ) -> tuple[MediaHashEntry, int] | None:
+        bands = hash_bands(hash_value)
+        if bands is None:
+            entry = await self.find_media_hash(algo, hash_value)
+            return (entry, 0) if entry else None
+        # Multi-index probe: some band must lie within max_distance // 4 bits of the query's.
+        radius = max_distance // BAND_COUNT
+        probes = [band_candidates(band, radius) for band in bands]
+        query = """
+        SELECT id, algo, hash, label, source, created_at
+        FROM mod_media_hash
+        WHERE algo = $1
+          AND (band0 = ANY($2::int[]) OR band1 = ANY($3::int[]) OR band2 = ANY($4::int[]) OR band3 = ANY($5::int[]))
+        """
+        records = await self.pool.fetch(query, algo, *probes)
+        best: tuple[MediaHashEntry, int] | None = None
+        for record in records:
+            distance = PerceptualHasher.hamming_distance(hash_value, str(record["hash"]))
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (_hash_from_record(record), distance)
+        return best
+
     async def bulk_upsert_media_hashes(self, entries: Sequence[MediaHashUpsert]) -> int:
         if not entries:
             return 0
         query = """
-        INSERT INTO mod_media_hash (algo, hash, label, source)
-        VALUES ($1, $2, $3, $4)
+        INSERT INTO mod_media_hash (algo, hash, label, source, band0, band1, band2, band3)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
         ON CONFLICT (algo, hash)
         DO UPDATE SET label = EXCLUDED.label, source = EXCLUDED.source
         """
-        await self.pool.executemany(
-            query,
-            [(entry.algo, entry.hash_value, entry.label, entry.source) for entry in entries],
-        )
+        rows = []
+        for entry in entries:
+            bands = hash_bands(entry.hash_value) or (None,) * BAND_COUNT
+            rows.append((entry.algo, entry.hash_value, entry.label, entry.source, *bands))
+        await self.pool.executemany(query, rows)
         return len(entries)
 
     async def upsert_text_scan(
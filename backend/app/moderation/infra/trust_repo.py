@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Dict, Sequence
+from uuid import UUID
 
 import asyncpg
 
@@ -29,3 +31,22 @@ class PostgresTrustRepository(TrustRepository):
         DO UPDATE SET score = EXCLUDED.score, last_event_at = EXCLUDED.last_event_at
         """
         await self.pool.execute(query, user_id, score, event_at)
+
+    async def get_scores(self, user_ids: Sequence[str]) -> Dict[str, int]:
+        # Match on the canonical UUID text so any spelling of an id finds its row.
+        canonical = {user_id: str(UUID(str(user_id))) for user_id in user_ids}
+        records = await self.pool.fetch(
+            "SELECT user_id, score FROM trust_score WHERE user_id = ANY($1::uuid[])",
+            list(dict.fromkeys(canonical.values())),
+        )
+        by_id = {str(UUID(str(record["user_id"]))): int(record["score"]) for record in records}
+        # Key results by the caller's spelling of each id.
+        return {user_id: by_id[key] for user_id, key in canonical.items() if key in by_id}
+
+    async def seed_scores(self, user_ids: Sequence[str], score: int, event_at: datetime) -> None:
+        query = """
+        INSERT INTO trust_score(user_id, score, last_event_at)
+        SELECT user_id, $2, $3 FROM unnest($1::uuid[]) AS t(user_id)
+        ON CONFLICT (user_id) DO NOTHING
+        """
+        await self.pool.execute(query, list(user_ids), score, event_at)
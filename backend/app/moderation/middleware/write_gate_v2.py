@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
+import time
 from dataclasses import dataclass, field
 
 from fastapi import HTTPException, status
 
+from app.moderation.domain.gate_state import GateState, GateStateCache
 from app.moderation.domain.reputation import ReputationBand, ReputationService
-from app.moderation.domain.restrictions import RestrictionService
+from app.moderation.domain.restrictions import RestrictionFlags, RestrictionService
 from app.moderation.domain.velocity import VelocityService
 from app.obs import metrics
 
@@ -46,8 +49,10 @@ class WriteGateV2:
         honey_shadow_hours: int | None = None,
         honey_captcha_hours: int | None = None,
         link_cooloff_hours: int = 24,
+        state_cache: GateStateCache | None = None,
     ) -> None:
         self._reputation = reputation
+        self._state_cache = state_cache
         self._restrictions = restrictions
         self._velocity = velocity
         self._cooldown_reason = cooldown_reason
@@ -61,18 +66,26 @@ class WriteGateV2:
         self._link_cooloff_hours = max(1, link_cooloff_hours)
 
     async def enforce(self, *, user_id: str, surface: str, ctx: WriteContext) -> WriteContext:
-        band = ctx.band or (await self._reputation.get_or_create(user_id)).band
-        flags = await self._restrictions.check_flags(user_id=user_id, scope=surface)
-
-        if flags.cooldown_ttl:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={"code": "cooldown_active", "retry_after": flags.cooldown_ttl},
+        now = time.time()
+        state = self._state_cache.peek(user_id) if self._state_cache is not None else None
+        flags = state.flags(surface, now=now) if state is not None else None
+        if flags is not None:
+            # Local hit: a cooling-down user is rejected without touching Redis.
+            self._raise_if_cooling_down(flags)
+            counts = await self._velocity.count(user_id=user_id, surface=surface)
+        else:
+            state, counts = await asyncio.gather(
+                self._load_state(user_id, surface, now),
+                self._velocity.count(user_id=user_id, surface=surface),
             )
+            flags = state.flags(surface, now=now) or RestrictionFlags()
+            self._raise_if_cooling_down(flags)
+        band = ctx.band or state.band
+
         if flags.shadow_active:
             ctx.shadow = True
 
-        trip = await self._velocity.observe(user_id=user_id, surface=surface, band=band)
+        trip = self._velocity.evaluate(surface=surface, counts=counts, band=band)
         if trip:
             ttl_minutes = int(trip.cooldown.total_seconds() // 60) or 1
             await self._restrictions.apply_cooldown(
@@ -144,6 +157,36 @@ class WriteGateV2:
         metrics.REPUTATION_BAND_GAUGE.labels(band=band.value).set(1)
         return ctx
 
+    async def _load_state(self, user_id: str, surface: str, now: float) -> GateState:
+        """Fetch band and ``surface`` flags, filling the shared cache on a miss."""
+
+        state: GateState | None = None
+        version = "0"
+        if self._state_cache is not None:
+            state, version = await self._state_cache.fetch(user_id)
+            if state is not None and surface in state.scopes:
+                return state
+        if state is None:
+            score, ttls = await asyncio.gather(
+                self._reputation.get_or_create(user_id),
+                self._restrictions.flag_ttls(user_id=user_id, scope=surface),
+            )
+            state = GateState(band=score.band, version=version)
+        else:
+            ttls = await self._restrictions.flag_ttls(user_id=user_id, scope=surface)
+        state.merge_ttls(surface, ttls, now=now)
+        if self._state_cache is not None:
+            await self._state_cache.store(user_id, state)
+        return state
+
+    @staticmethod
+    def _raise_if_cooling_down(flags: RestrictionFlags) -> None:
+        if flags.cooldown_ttl:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={"code": "cooldown_active", "retry_after": flags.cooldown_ttl},
+            )
+
     @staticmethod
     def _contains_external_links(text: str | None) -> bool:
         if not text:
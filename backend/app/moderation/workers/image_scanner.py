@@ -1,18 +1,33 @@
-"""Asynchronous worker that scans uploaded media for safety signals."""
+"""Asynchronous worker that scans uploaded media for safety signals.
+
+Objects are streamed from storage in ``chunk_size`` pieces and up to
+``concurrency`` scans run at once. Every scan reserves its object's size from a
+shared :class:`ByteBudget` of ``max_inflight_bytes`` before reading, so a burst
+of large uploads queues instead of growing the worker's memory. An object
+larger than its declared size is re-read under a ``max_fetch_bytes``
+reservation; one larger than that is held for manual review. NSFW scoring
+and hashing see a thumbnail of at most ``thumbnail_size`` pixels per side,
+decoded at reduced scale where the format allows; OCR still reads the
+original bytes.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import io
 import json
 import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Mapping, Protocol
+from typing import Any, AsyncIterator, Mapping, Protocol
 
-from app.moderation.domain.hashing import PerceptualHasher
+from app.moderation.domain.hashing import DEFAULT_MAX_DISTANCE, NEAR_DUPLICATE_ALGOS, PerceptualHash, PerceptualHasher
+from app.moderation.domain.media_stream import ByteBudget, MediaTooLarge, read_bounded
 from app.moderation.domain.nsfw_client import NsfwClassifier, NsfwScore
 from app.moderation.domain.ocr_client import OcrClient
 from app.moderation.domain.safety_repository import AttachmentSafetyRecord, MediaHashEntry, SafetyRepository
+from app.moderation.domain.scan_routing import SCAN_STREAMS, publish_scan_job
 from app.moderation.domain.thresholds import ModerationThresholds, ThresholdDecision
 from app.obs import metrics
 
@@ -31,6 +46,10 @@ class ObjectStorage(Protocol):
     async def fetch(self, key: str, *, max_bytes: int | None = None) -> bytes:
         ...
 
+    def stream(self, key: str, *, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield the object in chunks; storages without it fall back to ``fetch``."""
+        ...
+
 
 @dataclass(slots=True)
 class ImageScannerWorker:
@@ -43,25 +62,46 @@ class ImageScannerWorker:
     nsfw: NsfwClassifier
     ocr: OcrClient
     thresholds: ModerationThresholds
-    ingress_stream: str = "scan:ingress"
+    ingress_stream: str = SCAN_STREAMS["media"]
     results_stream: str = "scan:results"
     quarantine_stream: str = "scan:quarantine"
     batch_size: int = 50
     block_ms: int = 5000
     last_id: str = "0-0"
     max_fetch_bytes: int = 25 * 1024 * 1024
+    hash_max_distance: int = DEFAULT_MAX_DISTANCE
+    concurrency: int = 4
+    max_inflight_bytes: int = 64 * 1024 * 1024
+    chunk_size: int = 256 * 1024
+    thumbnail_size: int = 512
+    _budget: ByteBudget | None = field(default=None, init=False, repr=False)
 
     async def run_once(self) -> None:
         messages = await self.redis.xread({self.ingress_stream: self.last_id}, count=self.batch_size, block=self.block_ms)
         if not messages:
             return
+        jobs: list[tuple[str, Mapping[str, Any]]] = []
+        last_id = self.last_id
         for _stream, entries in messages:
             for entry_id, payload in entries:
                 event = _decode(payload)
                 if event.get("type") not in {"image", "file"}:
                     continue
+                jobs.append((entry_id, event))
+            last_id = entries[-1][0]
+        slots = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def _bounded(entry_id: str, event: Mapping[str, Any]) -> None:
+            async with slots:
                 await self._process_event(entry_id, event)
-            self.last_id = entries[-1][0]
+
+        await asyncio.gather(*(_bounded(entry_id, event) for entry_id, event in jobs))
+        self.last_id = last_id
+
+    def _byte_budget(self) -> ByteBudget:
+        if self._budget is None:
+            self._budget = ByteBudget(self.max_inflight_bytes)
+        return self._budget
 
     async def _process_event(self, entry_id: str, event: Mapping[str, Any]) -> None:
         start = time.perf_counter()
@@ -71,11 +111,22 @@ class ImageScannerWorker:
             if not attachment:
                 logger.warning("media scan skipped; attachment missing for s3_key=%s", event.get("s3_key"))
                 return
-            payload = await self.storage.fetch(attachment.s3_key, max_bytes=self.max_fetch_bytes)
-            nsfw_scores = await self.nsfw.score(payload, mime=attachment.mime)
-            perceptual_hash = self.hasher.compute(payload)
-            hash_match = await self.repository.find_media_hash(perceptual_hash.algo, perceptual_hash.value)
-            ocr_text = await self._extract_ocr(payload, attachment.mime)
+            budget = self._byte_budget()
+            declared = attachment.size_bytes or self.max_fetch_bytes
+            try:
+                try:
+                    scanned = await self._scan(attachment, min(declared, self.max_fetch_bytes))
+                except MediaTooLarge as exc:
+                    if exc.limit >= budget.clamp(self.max_fetch_bytes):
+                        raise
+                    # The upload under-declared its size; retry with the full fetch allowance.
+                    logger.warning("media larger than declared; rescanning attachment_id=%s", attachment.attachment_id)
+                    scanned = await self._scan(attachment, self.max_fetch_bytes)
+            except MediaTooLarge:
+                status = "needs_review"
+                await self._hold_oversized(entry_id, attachment)
+                return
+            perceptual_hash, nsfw_scores, hash_match, hash_distance, ocr_text = scanned
             decision = self.thresholds.evaluate_image(
                 nsfw_score=nsfw_scores.nsfw,
                 gore_score=nsfw_scores.gore,
@@ -84,7 +135,9 @@ class ImageScannerWorker:
             )
             status = decision.status
             await self._persist_attachment(attachment, decision, perceptual_hash.value, nsfw_scores, ocr_text)
-            await self._emit_results(entry_id, event, attachment, decision, nsfw_scores, perceptual_hash.value, hash_match, ocr_text)
+            await self._emit_results(
+                entry_id, event, attachment, decision, nsfw_scores, perceptual_hash.value, hash_match, hash_distance, ocr_text
+            )
         except Exception as exc:  # pragma: no cover - defensive guard, tested via integration
             status = "error"
             metrics.SCAN_FAILURES_TOTAL.labels("image", exc.__class__.__name__).inc()
@@ -94,6 +147,82 @@ class ImageScannerWorker:
             metrics.SCAN_LATENCY_SECONDS.labels("image").observe(duration)
             metrics.SCAN_JOBS_TOTAL.labels("image", status).inc()
 
+    async def _scan(
+        self, attachment: AttachmentSafetyRecord, amount: int
+    ) -> tuple[PerceptualHash, NsfwScore, MediaHashEntry | None, int | None, str]:
+        """Read and score ``attachment`` while holding ``amount`` bytes of the budget."""
+
+        budget = self._byte_budget()
+        async with budget.reserve(amount) as reserved:
+            metrics.MEDIA_SCAN_INFLIGHT_BYTES.set(budget.in_use)
+            try:
+                payload = await self._read(attachment.s3_key, reserved)
+                # Decoding is CPU-bound; Pillow releases the GIL while it works.
+                perceptual_hash, preview, preview_mime = await asyncio.to_thread(self._preview, payload, attachment.mime)
+                nsfw_scores, (hash_match, hash_distance), ocr_text = await asyncio.gather(
+                    self.nsfw.score(preview, mime=preview_mime),
+                    self._match_hash(perceptual_hash),
+                    self._extract_ocr(payload, attachment.mime),
+                )
+                del payload, preview
+            finally:
+                metrics.MEDIA_SCAN_INFLIGHT_BYTES.set(budget.in_use - reserved)
+        return perceptual_hash, nsfw_scores, hash_match, hash_distance, ocr_text
+
+    async def _hold_oversized(self, entry_id: str, attachment: AttachmentSafetyRecord) -> None:
+        """Objects past ``max_fetch_bytes`` cannot be scanned; hold them for manual review."""
+
+        safety_score = {**attachment.safety_score, "decision_level": "unscanned", "reason": "too_large"}
+        await self.repository.update_attachment_safety(
+            attachment.attachment_id,
+            safety_status="needs_review",
+            safety_score=safety_score,
+            scanned_at=datetime.now(timezone.utc),
+        )
+        await self.redis.xadd(
+            self.quarantine_stream,
+            {
+                "attachment_id": attachment.attachment_id,
+                "subject_type": attachment.subject_type,
+                "subject_id": attachment.subject_id,
+                "status": "needs_review",
+                "reason": "too_large",
+            },
+        )
+        logger.warning("media exceeds max_fetch_bytes; held for review: entry_id=%s", entry_id)
+
+    async def _read(self, key: str, limit: int) -> bytes:
+        stream = getattr(self.storage, "stream", None)
+        if stream is None:
+            payload = await self.storage.fetch(key, max_bytes=limit)
+            if len(payload) > limit:
+                raise MediaTooLarge(limit)
+            return payload
+        return await read_bounded(stream(key, chunk_size=self.chunk_size), limit)
+
+    def _preview(self, payload: bytes, mime: str | None) -> tuple[PerceptualHash, bytes, str | None]:
+        """Hash and classifier input for ``payload``: a JPEG thumbnail, or the raw bytes for non-images."""
+
+        thumbnail = self.hasher.open_thumbnail(payload, self.thumbnail_size)
+        if thumbnail is None:
+            return self.hasher.digest(payload), payload, mime
+        with thumbnail:
+            perceptual_hash = self.hasher.compute_image(thumbnail)
+            buffer = io.BytesIO()
+            thumbnail.convert("RGB").save(buffer, format="JPEG", quality=90)
+        return perceptual_hash, buffer.getvalue(), "image/jpeg"
+
+    async def _match_hash(self, perceptual_hash: PerceptualHash) -> tuple[MediaHashEntry | None, int | None]:
+        if perceptual_hash.algo not in NEAR_DUPLICATE_ALGOS:
+            entry = await self.repository.find_media_hash(perceptual_hash.algo, perceptual_hash.value)
+            return entry, 0 if entry else None
+        match = await self.repository.find_similar_media_hash(
+            perceptual_hash.algo, perceptual_hash.value, max_distance=self.hash_max_distance
+        )
+        if match is None:
+            return None, None
+        return match
+
     async def _resolve_attachment(self, event: Mapping[str, Any]) -> AttachmentSafetyRecord | None:
         s3_key = str(event.get("s3_key")) if event.get("s3_key") else None
         attachment_id = str(event.get("attachment_id")) if event.get("attachment_id") else None
@@ -146,6 +275,7 @@ class ImageScannerWorker:
         nsfw_scores: NsfwScore,
         hash_value: str,
         hash_match: MediaHashEntry | None,
+        hash_distance: int | None,
         ocr_text: str,
     ) -> None:
         metrics.NSFW_SCORE_HISTOGRAM.observe(nsfw_scores.nsfw)
@@ -155,6 +285,7 @@ class ImageScannerWorker:
             "nsfw_level": decision.level,
             "hash_value": hash_value,
             "hash_label": hash_match.label if hash_match else None,
+            "hash_distance": hash_distance,
             "type": "image",
             "status": decision.status,
         }
@@ -187,7 +318,7 @@ class ImageScannerWorker:
                 "ocr": "1",
                 "text": ocr_text,
             }
-            await self.redis.xadd(self.ingress_stream, text_payload)
+            await publish_scan_job(self.redis, text_payload)
 
 
 def _decode(payload: Mapping[bytes, bytes]) -> Mapping[str, Any]:
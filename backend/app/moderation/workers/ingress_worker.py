@@ -3,13 +3,18 @@
 from __future__ import annotations
 
 import json
+import logging
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Mapping, Protocol
 
-from app.moderation.domain.enforcement import ModerationEnforcer
+from app.moderation.domain.enforcement import EnforcementBatchError, EnforcementRequest, ModerationEnforcer
 from app.moderation.domain.policy_engine import Decision, Policy, evaluate_policy
 from app.moderation.domain.trust import TrustLedger
+from app.obs import metrics
+
+logger = logging.getLogger(__name__)
 
 
 class RedisStreams(Protocol):
@@ -45,27 +50,47 @@ class IngressWorker:
         if not messages:
             return
         for _stream, entries in messages:
-            for entry_id, payload in entries:
-                event = _decode_payload(payload)
-                await self._process_event(entry_id, event)
+            try:
+                await self._process_batch([(entry_id, _decode_payload(payload)) for entry_id, payload in entries])
+            except EnforcementBatchError as exc:
+                self.last_id = exc.resume_after([entry_id for entry_id, _ in entries], self.last_id)
+                raise
             self.last_id = entries[-1][0]
 
-    async def _process_event(self, entry_id: str, event: Mapping[str, Any]) -> None:
-        actor_id = event.get("actor_id")
-        trust_score = None
-        if actor_id:
-            trust_score = await self.trust.hydrate(str(actor_id))
-        signals = await self.detectors.evaluate(event)
-        decision = evaluate_policy(self.policy, signals, trust_score)
-        case, action = await self.enforcer.apply_decision(
-            subject_type=str(event.get("subject_type")),
-            subject_id=str(event.get("subject_id")),
-            actor_id=str(actor_id) if actor_id else None,
-            base_reason=str(event.get("reason", "auto_policy")),
-            decision=decision,
-            policy_id=self.policy.policy_id,
-        )
-        await self._emit_decision(event, decision, case.case_id, entry_id, action.action)
+    async def _process_batch(self, events: list[tuple[str, Mapping[str, Any]]]) -> None:
+        """Hydrate trust in one query, then enforce the whole batch together.
+
+        Decisions are emitted in stream order up to the first entry that failed
+        to enforce, which raises :class:`EnforcementBatchError`.
+        """
+
+        start = time.perf_counter()
+        actors = [str(event["actor_id"]) for _, event in events if event.get("actor_id")]
+        trust_scores = await self.trust.hydrate_many(actors)
+        requests: list[EnforcementRequest] = []
+        for _, event in events:
+            actor_id = event.get("actor_id")
+            trust_score = trust_scores.get(str(actor_id)) if actor_id else None
+            signals = await self.detectors.evaluate(event)
+            decision = evaluate_policy(self.policy, signals, trust_score)
+            requests.append(
+                EnforcementRequest(
+                    subject_type=str(event.get("subject_type")),
+                    subject_id=str(event.get("subject_id")),
+                    actor_id=str(actor_id) if actor_id else None,
+                    base_reason=str(event.get("reason", "auto_policy")),
+                    decision=decision,
+                    policy_id=self.policy.policy_id,
+                )
+            )
+        results = await self.enforcer.apply_decisions(requests)
+        for (entry_id, event), request, result in zip(events, requests, results):
+            if result is None or isinstance(result, Exception):
+                logger.error("moderation ingress enforcement failed: entry_id=%s", entry_id, exc_info=result)
+                raise EnforcementBatchError(entry_id) from result
+            case, action = result
+            await self._emit_decision(event, request.decision, case.case_id, entry_id, action.action)
+        _observe_batch("ingress", len(events), time.perf_counter() - start)
 
     async def _emit_decision(
         self,
@@ -89,6 +114,13 @@ class IngressWorker:
         await self.redis.xadd(self.decisions_stream, payload)
 
 
+def _observe_batch(worker: str, size: int, elapsed: float) -> None:
+    metrics.MODERATION_BATCH_EVENTS.labels(worker).inc(size)
+    metrics.MODERATION_BATCH_SECONDS.labels(worker).observe(elapsed)
+    if elapsed > 0:
+        metrics.MODERATION_BATCH_THROUGHPUT.labels(worker).set(size / elapsed)
+
+
 def _decode_payload(payload: Mapping[Any, Any]) -> Mapping[str, Any]:
     decoded: dict[str, Any] = {}
 
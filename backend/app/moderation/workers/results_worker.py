@@ -9,7 +9,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Mapping, Protocol
 
-from app.moderation.domain.enforcement import ModerationEnforcer
+from app.moderation.domain.enforcement import EnforcementBatchError, EnforcementRequest, ModerationEnforcer
 from app.moderation.domain.policy_engine import Decision
 from app.obs import metrics
 
@@ -42,38 +42,63 @@ class ResultsWorker:
         if not messages:
             return
         for _stream, entries in messages:
-            for entry_id, payload in entries:
-                body = _decode(payload)
-                await self._process_entry(entry_id, body)
+            try:
+                await self._process_batch([(entry_id, _decode(payload)) for entry_id, payload in entries])
+            except EnforcementBatchError as exc:
+                self.last_id = exc.resume_after([entry_id for entry_id, _ in entries], self.last_id)
+                raise
             self.last_id = entries[-1][0]
 
-    async def _process_entry(self, entry_id: str, payload: Mapping[str, Any]) -> None:
+    async def _process_batch(self, entries: list[tuple[str, Mapping[str, Any]]]) -> None:
+        """Enforce every actionable result of an XREAD batch in one pass.
+
+        Decisions are emitted in stream order up to the first result that failed
+        to enforce, which raises :class:`EnforcementBatchError`.
+        """
+
         start = time.perf_counter()
-        action = payload.get("suggested_action", "none")
-        status = payload.get("status", "clean")
-        try:
+        actionable: list[tuple[str, Mapping[str, Any], Mapping[str, Any]]] = []
+        requests: list[EnforcementRequest] = []
+        for entry_id, payload in entries:
+            action = payload.get("suggested_action", "none")
             if action == "none":
-                metrics.SCAN_JOBS_TOTAL.labels("results", status).inc()
-                metrics.SCAN_LATENCY_SECONDS.labels("results").observe(time.perf_counter() - start)
-                return
-            severity = _severity_for(action)
+                metrics.SCAN_JOBS_TOTAL.labels("results", payload.get("status", "clean")).inc()
+                continue
             signals = _parse_signals(payload.get("signals"))
-            decision = Decision(action=action, severity=severity, payload={"signals": signals}, reasons=[self.base_reason])
-            case, applied_action = await self.enforcer.apply_decision(
-                subject_type=str(payload.get("subject_type")),
-                subject_id=str(payload.get("subject_id")),
-                actor_id=None,
-                base_reason=self.base_reason,
-                decision=decision,
-                policy_id=None,
+            decision = Decision(
+                action=action,
+                severity=_severity_for(action),
+                payload={"signals": signals},
+                reasons=[self.base_reason],
+            )
+            actionable.append((entry_id, payload, signals))
+            requests.append(
+                EnforcementRequest(
+                    subject_type=str(payload.get("subject_type")),
+                    subject_id=str(payload.get("subject_id")),
+                    actor_id=None,
+                    base_reason=self.base_reason,
+                    decision=decision,
+                    policy_id=None,
+                )
             )
+        results = await self.enforcer.apply_decisions(requests)
+        for (entry_id, payload, signals), result in zip(actionable, results):
+            status = payload.get("status", "clean")
+            if result is None or isinstance(result, Exception):
+                metrics.SCAN_FAILURES_TOTAL.labels("results", result.__class__.__name__).inc()
+                logger.error("failed to apply scan result: entry_id=%s", entry_id, exc_info=result)
+                raise EnforcementBatchError(entry_id) from result
+            case, applied_action = result
             await self._emit_decision(entry_id, payload, case.case_id, applied_action.action, signals)
             metrics.SCAN_JOBS_TOTAL.labels("results", status).inc()
-        except Exception as exc:  # pragma: no cover - defensive guard
-            metrics.SCAN_FAILURES_TOTAL.labels("results", exc.__class__.__name__).inc()
-            logger.exception("failed to apply scan result: entry_id=%s", entry_id)
-        finally:
-            metrics.SCAN_LATENCY_SECONDS.labels("results").observe(time.perf_counter() - start)
+        elapsed = time.perf_counter() - start
+        for _ in entries:
+            metrics.SCAN_LATENCY_SECONDS.labels("results").observe(elapsed / len(entries))
+        metrics.MODERATION_BATCH_EVENTS.labels("results").inc(len(entries))
+        metrics.MODERATION_BATCH_SECONDS.labels("results").observe(elapsed)
+        if elapsed > 0:
+            metrics.MODERATION_BATCH_THROUGHPUT.labels("results").set(len(entries) / elapsed)
 
     async def _emit_decision(
         self,
@@ -0,0 +1,50 @@
+"""Worker that periodically reconciles the moderation dashboard rollups."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from app.infra.postgres import get_pool
+from app.moderation.domain.dashboard_queries import reconcile_rollups, rollups_need_backfill
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class DashboardRollupReconciler:
+    """Rebuilds rollup gauges and recent hourly buckets from the source tables.
+
+    The first pass also backfills the full history when no bucket predates the
+    window yet (right after the rollup tables were created).
+    """
+
+    window_hours: int = 48
+    pool_factory: Callable[[], Awaitable[asyncpg.Pool]] = get_pool
+    _checked_backfill: bool = field(default=False, init=False, repr=False)
+
+    async def run_once(self) -> dict[str, int] | None:
+        start = time.perf_counter()
+        try:
+            pool = await self.pool_factory()
+            async with pool.acquire() as conn:
+                window: int | None = self.window_hours
+                if not self._checked_backfill and await rollups_need_backfill(conn, window_hours=self.window_hours):
+                    window = None
+                counts = await reconcile_rollups(conn, window_hours=window)
+                self._checked_backfill = True
+        except Exception:
+            logger.exception("moderation rollup reconciliation failed")
+            return None
+        logger.info(
+            "moderation rollups reconciled gauges=%s buckets=%s window_hours=%s elapsed_ms=%.1f",
+            counts["gauges"],
+            counts["buckets"],
+            window if window is not None else "all",
+            (time.perf_counter() - start) * 1000.0,
+        )
+        return counts
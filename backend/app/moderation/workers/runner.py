@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from typing import Iterable, Optional
 
 from redis.asyncio import Redis
@@ -14,12 +15,23 @@ from app.moderation.workers.appeals_worker import AppealsWorker
 from app.moderation.workers.escalation_worker import EscalationWorker
 from app.moderation.workers.ingress_worker import IngressWorker
 from app.moderation.workers.reports_worker import ReportsWorker
+from app.moderation.workers.rollup_reconciler import DashboardRollupReconciler
+from app.moderation.workers.scan_router import LegacyScanRouter
 from app.moderation.infra.reporter_metrics import RedisReporterMetricsRepository
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
 
 
 async def _run_forever(worker, delay: float) -> None:
     while True:
-        await worker.run_once()
+        try:
+            await worker.run_once()
+        except Exception:
+            # Workers leave their cursor before a failed entry, so the next pass retries it.
+            logger.exception("moderation worker pass failed: worker=%s", type(worker).__name__)
+            await asyncio.sleep(max(delay, 1.0))
+            continue
         await asyncio.sleep(delay)
 
 
@@ -29,6 +41,8 @@ def spawn_workers(
     ingress_stream: str = "mod:ingress",
     decisions_stream: str = "mod:decisions",
     poll_interval: float = 0.1,
+    route_legacy_scans: bool = True,
+    reconcile_rollups: bool = True,
     loop: Optional[asyncio.AbstractEventLoop] = None,
 ) -> Iterable[asyncio.Task]:
     """Create asyncio tasks for moderation ingress and actions workers."""
@@ -53,6 +67,17 @@ def spawn_workers(
     reporter_metrics = RedisReporterMetricsRepository(redis_client)
     reports_worker = ReportsWorker(redis=redis_stream, repository=reporter_metrics)
     tasks.append(event_loop.create_task(_run_forever(reports_worker, poll_interval), name="moderation-reports"))
+    if route_legacy_scans:
+        scan_router = LegacyScanRouter(redis=redis_stream)
+        tasks.append(event_loop.create_task(_run_forever(scan_router, poll_interval), name="moderation-scan-router"))
+    if reconcile_rollups:
+        reconciler = DashboardRollupReconciler(window_hours=settings.moderation_rollup_window_hours)
+        tasks.append(
+            event_loop.create_task(
+                _run_forever(reconciler, settings.moderation_rollup_reconcile_seconds),
+                name="moderation-rollup-reconciler",
+            )
+        )
 
     case_service = get_case_service()
     notifications = getattr(case_service, "notifications", None)
@@ -0,0 +1,106 @@
+"""Migration shim that moves legacy ``scan:ingress`` jobs onto per-type streams."""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Protocol, Sequence
+
+from app.moderation.domain.scan_routing import LEGACY_SCAN_INGRESS, stream_for
+from app.obs import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RedisStreams(Protocol):
+    async def ensure_group(self, stream: str, group: str) -> None:
+        ...
+
+    async def xreadgroup(
+        self, group: str, consumer: str, streams: Mapping[str, str], count: int, block: int
+    ) -> list[tuple[str, list[tuple[str, Mapping[bytes, bytes]]]]]:
+        ...
+
+    async def xautoclaim(
+        self, stream: str, group: str, consumer: str, min_idle_ms: int, count: int
+    ) -> list[tuple[str, Mapping[bytes, bytes]]]:
+        ...
+
+    async def move_entries(
+        self,
+        source: str,
+        entry_ids: Sequence[str],
+        targets: Sequence[tuple[str, Mapping[Any, Any]]],
+        *,
+        group: str | None = None,
+    ) -> None:
+        ...
+
+
+def _consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass(slots=True)
+class LegacyScanRouter:
+    """Re-publishes jobs from the shared ingress stream to ``scan:ingress:<type>``.
+
+    Every process that runs moderation workers starts a router, so they share
+    the ``group`` consumer group and each legacy entry is delivered to one of
+    them. Forwarding, acking and deleting the source entries happen in one
+    MULTI, so a restart neither drops nor duplicates jobs; entries a dead
+    router read but never moved are claimed by a live one after
+    ``claim_idle_ms``. Jobs of a type no scanner handles are deleted and counted.
+    """
+
+    redis: RedisStreams
+    source_stream: str = LEGACY_SCAN_INGRESS
+    group: str = "scan-router"
+    consumer: str = field(default_factory=_consumer_name)
+    batch_size: int = 500
+    block_ms: int = 5000
+    claim_idle_ms: int = 60_000
+    _group_ready: bool = field(default=False, init=False, repr=False)
+
+    async def run_once(self) -> int:
+        if not self._group_ready:
+            await self.redis.ensure_group(self.source_stream, self.group)
+            self._group_ready = True
+        entries = await self.redis.xautoclaim(
+            self.source_stream, self.group, self.consumer, self.claim_idle_ms, self.batch_size
+        )
+        if not entries:
+            messages = await self.redis.xreadgroup(
+                self.group, self.consumer, {self.source_stream: ">"}, count=self.batch_size, block=self.block_ms
+            )
+            entries = [entry for _stream, stream_entries in messages or [] for entry in stream_entries]
+        if not entries:
+            return 0
+        targets: list[tuple[str, Mapping[Any, Any]]] = []
+        for _entry_id, payload in entries:
+            job_type = _field(payload, "type")
+            stream = stream_for(job_type)
+            if stream is None:
+                metrics.SCAN_ROUTED_TOTAL.labels("unknown").inc()
+                logger.warning("dropping scan job with unsupported type=%r", job_type)
+                continue
+            targets.append((stream, payload))
+            metrics.SCAN_ROUTED_TOTAL.labels(stream.rsplit(":", 1)[-1]).inc()
+        await self.redis.move_entries(
+            self.source_stream, [entry_id for entry_id, _ in entries], targets, group=self.group
+        )
+        return len(targets)
+
+
+def _field(payload: Mapping[Any, Any], name: str) -> str | None:
+    value = payload.get(name)
+    if value is None:
+        value = payload.get(name.encode("utf-8"))
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+__all__ = ["LegacyScanRouter"]
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from typing import Any, Mapping, Protocol
 
 from app.moderation.domain.safety_repository import SafetyRepository
+from app.moderation.domain.scan_routing import SCAN_STREAMS
 from app.moderation.domain.thresholds import ModerationThresholds, ThresholdDecision
 from app.obs import metrics
 
@@ -46,7 +47,7 @@ class TextScannerWorker:
     repository: SafetyRepository
     model: TextSafetyModel
     thresholds: ModerationThresholds
-    ingress_stream: str = "scan:ingress"
+    ingress_stream: str = SCAN_STREAMS["text"]
     results_stream: str = "scan:results"
     batch_size: int = 100
     block_ms: int = 5000
@@ -1,7 +1,16 @@
-"""Worker that resolves URLs and classifies their safety."""
+"""Worker that resolves URLs and classifies their safety.
+
+Up to ``concurrency`` jobs from a batch run at once. Verdicts go through a
+:class:`UrlVerdictCache`, so repeated copies of a link, including concurrent
+ones, cost at most one Postgres read and one classification. When ``redis`` is
+a :class:`RedisStreamClient` the cache also uses its Redis connection as the
+tier shared by all scanner processes. Clean and unknown verdicts, whether
+cached or read back from Postgres, are trusted for ``negative_ttl`` only.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
@@ -9,8 +18,12 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Mapping, Protocol
 
+from redis.asyncio import Redis
+
 from app.moderation.domain.safety_repository import SafetyRepository
+from app.moderation.domain.scan_routing import SCAN_STREAMS
 from app.moderation.domain.thresholds import ModerationThresholds, ThresholdDecision
+from app.moderation.domain.url_cache import NEGATIVE_VERDICTS, UrlVerdictCache
 from app.moderation.domain.url_reputation import UrlReputationClient, UrlVerdict
 from app.obs import metrics
 
@@ -33,54 +46,55 @@ class UrlScannerWorker:
     repository: SafetyRepository
     client: UrlReputationClient
     thresholds: ModerationThresholds
-    ingress_stream: str = "scan:ingress"
+    ingress_stream: str = SCAN_STREAMS["url"]
     results_stream: str = "scan:results"
     batch_size: int = 100
     block_ms: int = 5000
     last_id: str = "0-0"
     cache_ttl: timedelta = timedelta(hours=24)
+    negative_ttl: timedelta = timedelta(hours=1)
+    concurrency: int = 8
+    verdict_cache: UrlVerdictCache | None = None
 
     async def run_once(self) -> None:
         messages = await self.redis.xread({self.ingress_stream: self.last_id}, count=self.batch_size, block=self.block_ms)
         if not messages:
             return
+        jobs: list[tuple[str, Mapping[str, Any]]] = []
+        last_id = self.last_id
         for _stream, entries in messages:
             for entry_id, payload in entries:
                 event = _decode(payload)
                 if event.get("type") != "url":
                     continue
+                jobs.append((entry_id, event))
+            last_id = entries[-1][0]
+        slots = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def _bounded(entry_id: str, event: Mapping[str, Any]) -> None:
+            async with slots:
                 await self._process_event(entry_id, event)
-            self.last_id = entries[-1][0]
+
+        await asyncio.gather(*(_bounded(entry_id, event) for entry_id, event in jobs))
+        self.last_id = last_id
+
+    def _verdicts(self) -> UrlVerdictCache:
+        if self.verdict_cache is None:
+            shared = getattr(self.redis, "client", None)
+            self.verdict_cache = UrlVerdictCache(
+                shared if isinstance(shared, Redis) else None,
+                ttl=self.cache_ttl,
+                negative_ttl=self.negative_ttl,
+            )
+        return self.verdict_cache
 
     async def _process_event(self, entry_id: str, event: Mapping[str, Any]) -> None:
         start = time.perf_counter()
         status = "error"
         try:
             url = str(event.get("url"))
-            cached = await self.repository.get_recent_url_scan(url)
-            verdict: UrlVerdict
-            if cached and self._is_fresh(cached.created_at):
-                verdict = UrlVerdict(
-                    requested_url=cached.url,
-                    final_url=cached.final_url,
-                    etld_plus_one=cached.etld_plus_one,
-                    verdict=cached.verdict,
-                    lists=list(cached.details.get("lists", [])) if isinstance(cached.details.get("lists"), list) else [],
-                    details={key: str(value) for key, value in cached.details.items()},
-                    resolved_at=cached.created_at,
-                )
-            else:
-                verdict = await self.client.classify(url)
-                details = dict(verdict.details)
-                if verdict.lists:
-                    details.setdefault("lists", verdict.lists)
-                await self.repository.upsert_url_scan(
-                    url=verdict.requested_url,
-                    final_url=verdict.final_url,
-                    etld_plus_one=verdict.etld_plus_one,
-                    verdict=verdict.verdict,
-                    details=details,
-                )
+            verdict, outcome = await self._verdicts().resolve(url, lambda: self._lookup(url))
+            metrics.URL_VERDICT_CACHE_TOTAL.labels(outcome).inc()
             decision = self.thresholds.evaluate_url(verdict.verdict)
             await self._emit_results(entry_id, event, verdict, decision)
             status = decision.status
@@ -94,6 +108,33 @@ class UrlScannerWorker:
             metrics.SCAN_LATENCY_SECONDS.labels("url").observe(duration)
             metrics.SCAN_JOBS_TOTAL.labels("url", status).inc()
 
+    async def _lookup(self, url: str) -> UrlVerdict:
+        """Cache miss path: a fresh Postgres row, else classify and persist."""
+
+        cached = await self.repository.get_recent_url_scan(url)
+        if cached and self._is_fresh(cached.verdict, cached.created_at):
+            return UrlVerdict(
+                requested_url=cached.url,
+                final_url=cached.final_url,
+                etld_plus_one=cached.etld_plus_one,
+                verdict=cached.verdict,
+                lists=list(cached.details.get("lists", [])) if isinstance(cached.details.get("lists"), list) else [],
+                details={key: str(value) for key, value in cached.details.items()},
+                resolved_at=cached.created_at,
+            )
+        verdict = await self.client.classify(url)
+        details = dict(verdict.details)
+        if verdict.lists:
+            details.setdefault("lists", verdict.lists)
+        await self.repository.upsert_url_scan(
+            url=verdict.requested_url,
+            final_url=verdict.final_url,
+            etld_plus_one=verdict.etld_plus_one,
+            verdict=verdict.verdict,
+            details=details,
+        )
+        return verdict
+
     async def _emit_results(
         self,
         entry_id: str,
@@ -121,9 +162,9 @@ class UrlScannerWorker:
         }
         await self.redis.xadd(self.results_stream, payload)
 
-    def _is_fresh(self, created_at: datetime) -> bool:
-        now = datetime.now(timezone.utc)
-        return now - created_at <= self.cache_ttl
+    def _is_fresh(self, verdict: str, created_at: datetime) -> bool:
+        lifetime = self.negative_ttl if verdict in NEGATIVE_VERDICTS else self.cache_ttl
+        return datetime.now(timezone.utc) - created_at <= lifetime
 
 
 def _decode(payload: Mapping[bytes, bytes]) -> Mapping[str, Any]:
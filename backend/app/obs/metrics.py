@@ -241,6 +241,47 @@ CHAT_READ_UPDATES = Counter(
 	"Chat read receipts",
 )
 
+CHAT_SEND_DURATION = Histogram(
+	"unihood_chat_send_duration_seconds",
+	"Time spent in ChatService.send_message",
+	buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+CHAT_SIDE_EFFECTS = Counter(
+	"unihood_chat_side_effects_total",
+	"DM post-commit side effects processed",
+	["effect", "result"],
+)
+
+AUDIT_WRITER_EVENTS = Counter(
+	"unihood_audit_writer_events_total",
+	"Audit rows by writer outcome (queued, written, overflow, spilled, recovered, dropped)",
+	["result"],
+)
+
+AUDIT_WRITER_QUEUE_DEPTH = Gauge(
+	"unihood_audit_writer_queue_depth",
+	"Audit rows waiting in the in-process queue",
+)
+
+AUDIT_WRITER_BATCH = Histogram(
+	"unihood_audit_writer_batch_rows",
+	"Rows per audit_logs COPY",
+	buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+ROOM_HISTORY_CACHE = Counter(
+	"unihood_room_history_cache_total",
+	"Room history hot-tail cache outcomes (read hit/miss, skipped refills)",
+	["result"],
+)
+
+EPHEMERAL_EVENTS = Counter(
+	"unihood_ephemeral_events_total",
+	"Typing indicators and receipts by coalescing outcome",
+	["kind", "result"],
+)
+
 ROOMS_CREATED = Counter(
 	"unihood_rooms_created_total",
 	"Rooms created",
@@ -274,6 +315,12 @@ RESTRICTIONS_ACTIVE_GAUGE = Gauge(
 	["mode", "scope"],
 )
 
+MODERATION_GATE_STATE = Counter(
+	"unihood_moderation_gate_state_total",
+	"Write-gate state lookups by source (local, redis, miss)",
+	["source"],
+)
+
 REPUTATION_BAND_GAUGE = Gauge(
 	"unihood_reputation_band",
 	"Current reputation band observations",
@@ -366,6 +413,34 @@ SEARCH_RESULTS_AVG = Gauge(
 	["type"],
 )
 
+SEARCH_BUCKET_INCOMPLETE = Counter(
+	"search_bucket_incomplete_total",
+	"Multi-search buckets returned as partial",
+	["type", "reason"],
+)
+
+SEARCH_TYPEAHEAD_LOOKUPS = Counter(
+	"search_typeahead_lookups_total",
+	"In-process typeahead index lookups",
+	["kind", "result"],
+)
+
+SEARCH_TYPEAHEAD_BYTES = Gauge(
+	"search_typeahead_bytes",
+	"Approximate memory held by the typeahead index",
+)
+
+SEARCH_TYPEAHEAD_DROPPED = Counter(
+	"search_typeahead_dropped_total",
+	"Typeahead entries rejected by the memory cap",
+)
+
+SEARCH_CACHE_LOOKUPS = Counter(
+	"search_cache_lookups_total",
+	"Search result cache outcomes",
+	["kind", "result"],
+)
+
 FEED_RANK_CANDIDATES = Counter(
 	"feed_rank_candidates_total",
 	"Candidates considered",
@@ -466,6 +541,18 @@ RETENTION_PURGED = Counter(
 	["table"],
 )
 
+CHAT_COLD_COMPACTED = Counter(
+	"unihood_chat_cold_compacted_total",
+	"Messages moved from hot tables into compressed history segments",
+	["table"],
+)
+
+CHAT_COLD_COMPACTION_DURATION = Histogram(
+	"unihood_chat_cold_compaction_seconds",
+	"Duration of one cold-history compaction pass per table",
+	["table"],
+)
+
 ACL_CACHE_HITS = Counter(
 	"unihood_acl_cache_hits_total",
 	"ACL cache hits",
@@ -561,6 +648,37 @@ SCAN_FAILURES_TOTAL = Counter(
 	["type", "reason"],
 )
 
+MODERATION_BATCH_EVENTS = Counter(
+	"unihood_moderation_batch_events_total",
+	"Events enforced through moderation worker batches",
+	["worker"],
+)
+
+MODERATION_BATCH_SECONDS = Histogram(
+	"unihood_moderation_batch_seconds",
+	"Wall time to enforce one moderation worker batch",
+	["worker"],
+	buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+MODERATION_BATCH_THROUGHPUT = Gauge(
+	"unihood_moderation_batch_events_per_second",
+	"Events per second achieved by the last moderation worker batch",
+	["worker"],
+)
+
+MODERATION_DETECTOR_FALLBACKS = Counter(
+	"unihood_moderation_detector_fallbacks_total",
+	"Ingress detectors that missed their latency budget or failed and reported a fallback signal",
+	["detector", "reason"],
+)
+
+SCAN_ROUTED_TOTAL = Counter(
+	"unihood_scan_routed_total",
+	"Legacy scan:ingress jobs moved to per-type streams",
+	["route"],
+)
+
 SCAN_LATENCY_SECONDS = Histogram(
 	"unihood_scan_latency_seconds",
 	"Safety scanner latency in seconds",
@@ -568,6 +686,11 @@ SCAN_LATENCY_SECONDS = Histogram(
 	buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0),
 )
 
+MEDIA_SCAN_INFLIGHT_BYTES = Gauge(
+	"unihood_media_scan_inflight_bytes",
+	"Bytes reserved by in-flight media scans against the worker byte budget",
+)
+
 QUARANTINE_BACKLOG_GAUGE = Gauge(
 	"unihood_quarantine_backlog_gauge",
 	"Quarantine backlog segmented by status",
@@ -580,6 +703,12 @@ URL_VERDICT_TOTAL = Counter(
 	["verdict"],
 )
 
+URL_VERDICT_CACHE_TOTAL = Counter(
+	"unihood_url_verdict_cache_total",
+	"URL scanner verdict cache lookups by outcome",
+	["outcome"],
+)
+
 UI_SAFETY_QUARANTINE_REVEALS = Counter(
 	"ui_safety_quarantine_reveals_total",
 	"Moderator UI quarantine reveal events",
@@ -949,8 +1078,10 @@ def inc_search_query(kind: str) -> None:
 	SEARCH_QUERIES.labels(kind=kind).inc()
 
 
-def observe_search_latency(kind: str, latency_seconds: float) -> None:
+def observe_search_latency(kind: str, latency_seconds: float, *, cache: str | None = None) -> None:
 	SEARCH_LATENCY.labels(kind=kind).observe(latency_seconds)
+	if cache is not None:
+		SEARCH_CACHE_LOOKUPS.labels(kind=kind, result=cache).inc()
 
 
 def inc_identity_register() -> None:
@@ -55,6 +55,43 @@ class Settings(BaseSettings):
     # search slightly to account for GPS jitter. If radius_m <= 10, use this value.
     proximity_min_search_radius_10m: int = 15
     search_backend: str = "postgres"
+    # pg_trgm.similarity_threshold applied per multi-search bucket so the `%`
+    # operator can drive the trigram GIN indexes.
+    search_trgm_threshold_people: float = _env_field(0.2, "SEARCH_TRGM_THRESHOLD_PEOPLE")
+    search_trgm_threshold_rooms: float = _env_field(0.15, "SEARCH_TRGM_THRESHOLD_ROOMS")
+    search_trgm_threshold_posts: float = _env_field(0.1, "SEARCH_TRGM_THRESHOLD_POSTS")
+    # Overall budget for GET /search; buckets still running at the deadline are
+    # cancelled and reported as partial.
+    search_multi_deadline_ms: int = _env_field(800, "SEARCH_MULTI_DEADLINE_MS")
+    # Per-process typeahead prefix index (handles, display names, group names).
+    search_typeahead_enabled: bool = _env_field(True, "SEARCH_TYPEAHEAD_ENABLED")
+    search_typeahead_max_mb: int = _env_field(256, "SEARCH_TYPEAHEAD_MAX_MB")
+    search_typeahead_rebuild_seconds: int = _env_field(3600, "SEARCH_TYPEAHEAD_REBUILD_SECONDS")
+    # Shared search/discovery result cache (process LRU in front of Redis).
+    search_cache_enabled: bool = _env_field(True, "SEARCH_CACHE_ENABLED")
+    search_cache_max_entries: int = _env_field(2048, "SEARCH_CACHE_MAX_ENTRIES")
+    search_cache_local_ttl_seconds: float = _env_field(5.0, "SEARCH_CACHE_LOCAL_TTL_SECONDS")
+    search_cache_redis_ttl_seconds: float = _env_field(20.0, "SEARCH_CACHE_REDIS_TTL_SECONDS")
+    # Discovery friend-of-friend / shared-course candidate index (Redis ZSETs).
+    discovery_candidates_worker_enabled: bool = _env_field(True, "DISCOVERY_CANDIDATES_WORKER_ENABLED")
+    discovery_candidates_top_n: int = _env_field(200, "DISCOVERY_CANDIDATES_TOP_N")
+    discovery_candidates_ttl_seconds: int = _env_field(21600, "DISCOVERY_CANDIDATES_TTL_SECONDS")
+    discovery_candidates_course_fanout: int = _env_field(500, "DISCOVERY_CANDIDATES_COURSE_FANOUT")
+    # DM post-commit side effects (delivery, audit, leaderboard, XP) via Redis stream.
+    chat_side_effects_async: bool = _env_field(True, "CHAT_SIDE_EFFECTS_ASYNC")
+    chat_side_effect_workers: int = _env_field(2, "CHAT_SIDE_EFFECT_WORKERS")
+    xp_verified_cache_seconds: int = _env_field(600, "XP_VERIFIED_CACHE_SECONDS")
+    # Redis hot tail of recent room messages served to room opens / reconnects.
+    room_history_cache_size: int = _env_field(100, "ROOM_HISTORY_CACHE_SIZE")
+    room_history_cache_ttl_seconds: int = _env_field(3600, "ROOM_HISTORY_CACHE_TTL_SECONDS")
+    # Ephemeral socket events: typing debounce window and room receipt batching.
+    socket_typing_debounce_ms: int = _env_field(2500, "SOCKET_TYPING_DEBOUNCE_MS")
+    room_receipts_coalesce: bool = _env_field(True, "ROOM_RECEIPTS_COALESCE")
+    room_receipts_flush_ms: int = _env_field(500, "ROOM_RECEIPTS_FLUSH_MS")
+    room_receipts_max_pending: int = _env_field(5000, "ROOM_RECEIPTS_MAX_PENDING")
+    # Chat history tiering: months older than this move to compressed segments.
+    chat_cold_after_days: int = _env_field(90, "CHAT_COLD_AFTER_DAYS")
+    chat_cold_compaction_batch: int = _env_field(200, "CHAT_COLD_COMPACTION_BATCH")
     webauthn_rp_id: str = _env_field("localhost", "WEBAUTHN_RP_ID")
     webauthn_rp_name: str = _env_field("uniHood", "WEBAUTHN_RP_NAME")
     webauthn_origin: str = _env_field("http://localhost:3000", "WEBAUTHN_ORIGIN")
@@ -76,8 +113,19 @@ class Settings(BaseSettings):
     communities_workers_enabled: bool = _env_field(False, "COMMUNITIES_WORKERS_ENABLED")
     moderation_workers_enabled: bool = _env_field(False, "MODERATION_WORKERS_ENABLED")
     moderation_staff_ids: Union[str, Tuple[str, ...]] = _env_field((), "MODERATION_STAFF_IDS")
+    # Write-gate state cache: in-process copy lifetime and shared Redis hash TTL.
+    moderation_gate_local_ttl_seconds: float = _env_field(2.0, "MODERATION_GATE_LOCAL_TTL_SECONDS")
+    moderation_gate_state_ttl_seconds: int = _env_field(300, "MODERATION_GATE_STATE_TTL_SECONDS")
+    # Dashboard rollups: how often to rebuild them from source rows, and how many recent hours to rebuild.
+    moderation_rollup_reconcile_seconds: int = _env_field(900, "MODERATION_ROLLUP_RECONCILE_SECONDS")
+    moderation_rollup_window_hours: int = _env_field(48, "MODERATION_ROLLUP_WINDOW_HOURS")
     idempotency_required: bool = _env_field(True, "IDEMPOTENCY_REQUIRED")
     idempotency_ttl_seconds: int = _env_field(86400, "IDEMPOTENCY_TTL_SECONDS")
+    idempotency_redis_ttl_seconds: int = _env_field(86400, "IDEMPOTENCY_REDIS_TTL_SECONDS")
+    audit_writer_enabled: bool = _env_field(True, "AUDIT_WRITER_ENABLED")
+    audit_writer_max_queue: int = _env_field(10000, "AUDIT_WRITER_MAX_QUEUE")
+    audit_writer_batch_size: int = _env_field(500, "AUDIT_WRITER_BATCH_SIZE")
+    audit_writer_flush_ms: int = _env_field(250, "AUDIT_WRITER_FLUSH_MS")
 
     # Phase E: Signed intents and security
     intent_signing_required: bool = _env_field(True, "INTENT_SIGNING_REQUIRED")
@@ -0,0 +1,77 @@
+"""Measure DM send latency with side effects inline versus on the worker stream.
+
+Sends ``--messages`` DMs between two seeded users twice: once with
+``CHAT_SIDE_EFFECTS_ASYNC`` off (delivery, audit, leaderboard and XP awaited on
+the request, the old behaviour) and once with it on (only the write gate, the
+insert, the socket echo and one XADD). Prints p50/p95 for both runs. Needs a
+Postgres and Redis reachable through the usual settings.
+
+Usage:
+	python scripts/bench_chat_send.py --messages 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.domain.chat.schemas import SendMessageRequest
+from app.domain.chat.service import ChatService
+from app.infra.auth import AuthenticatedUser
+from app.infra.postgres import get_pool
+from app.settings import settings
+
+SENDER = "bbbbbbbb-0000-4000-8000-000000000031"
+RECIPIENT = "bbbbbbbb-0000-4000-8000-000000000032"
+
+
+async def _seed() -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		for user_id, handle in ((SENDER, "bench_dm_a"), (RECIPIENT, "bench_dm_b")):
+			await conn.execute(
+				"""
+				INSERT INTO users (id, email, handle, display_name, password_hash)
+				VALUES ($1, $2 || '@bench.invalid', $2, $2, 'x')
+				ON CONFLICT (id) DO NOTHING
+				""",
+				user_id,
+				handle,
+			)
+
+
+def _report(label: str, samples: list[float]) -> None:
+	samples = sorted(samples)
+	p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+	print(f"{label:<22} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  n={len(samples)}")
+
+
+async def _run_mode(service: ChatService, messages: int, *, async_effects: bool) -> list[float]:
+	settings.chat_side_effects_async = async_effects
+	sender = AuthenticatedUser(id=SENDER, campus_id=None)
+	samples: list[float] = []
+	for idx in range(messages):
+		payload = SendMessageRequest(to_user_id=RECIPIENT, body=f"bench message {idx}")
+		start = time.perf_counter()
+		await service.send_message(sender, payload)
+		samples.append((time.perf_counter() - start) * 1000.0)
+	return samples
+
+
+async def _run(args: argparse.Namespace) -> None:
+	await _seed()
+	service = ChatService()
+	_report("inline side effects", await _run_mode(service, args.messages, async_effects=False))
+	_report("async side effects", await _run_mode(service, args.messages, async_effects=True))
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--messages", type=int, default=500)
+	asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,90 @@
+"""Count typing/receipt events per active conversation with and without coalescing.
+
+Replays a synthetic workload on a simulated clock: ``--conversations`` DMs
+where one side types in bursts (a keystroke event every ``--keystroke-ms``,
+a message after ``--burst`` keystrokes) and one busy room taking
+``--room-rate`` messages per second whose ``--readers`` members acknowledge
+every message as it arrives. The raw counts are what the
+namespaces emitted before (one ``chat:typing`` per keystroke, one receipt write
+and broadcast per ack); the coalesced counts go through ``TypingDebouncer``
+and ``ReceiptCoalescer`` with the configured windows. The receipt flushes XADD
+to the room chat stream, so Redis must be reachable through the usual settings.
+
+Usage:
+	python scripts/bench_ephemeral_events.py --conversations 50 --seconds 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from app.domain.rooms.receipts import ReceiptCoalescer, ReceiptUpdate
+from app.infra.ephemeral import TypingDebouncer
+from app.settings import settings
+
+
+def _typing(args: argparse.Namespace) -> tuple[int, int]:
+	debouncer = TypingDebouncer("bench_typing", window_seconds=settings.socket_typing_debounce_ms / 1000.0)
+	raw = emitted = 0
+	step = args.keystroke_ms / 1000.0
+	for conv in range(args.conversations):
+		now = conv * 0.013  # stagger conversations
+		keystrokes = 0
+		while now < args.seconds:
+			raw += 1
+			emitted += debouncer.admit(f"typist-{conv}", f"peer-{conv}", now=now)
+			keystrokes += 1
+			now += step
+			if keystrokes % args.burst == 0:
+				now += 2.0  # message sent, peer reads and replies
+	return raw, emitted
+
+
+async def _receipts(args: argparse.Namespace) -> tuple[int, int]:
+	writes = 0
+
+	async def _apply(updates: list[ReceiptUpdate]) -> list[ReceiptUpdate]:
+		nonlocal writes
+		writes += len(updates)
+		return updates
+
+	coalescer = ReceiptCoalescer(_apply, flush_interval=settings.room_receipts_flush_ms / 1000.0)
+	raw = 0
+	message_gap = 1.0 / args.room_rate
+	now = next_flush = 0.0
+	seq = 0
+	while now < args.seconds:
+		seq += 1
+		for reader in range(args.readers):
+			raw += 1
+			coalescer.record_read("bench-room", f"reader-{reader}", seq)
+		now += message_gap
+		if now >= next_flush:
+			await coalescer.flush()
+			next_flush = now + coalescer.flush_interval
+	await coalescer.flush()
+	return raw, writes
+
+
+async def _run(args: argparse.Namespace) -> None:
+	raw_typing, typing = _typing(args)
+	raw_receipts, receipts = await _receipts(args)
+	per_conv = max(1, args.conversations)
+	print(f"typing    before={raw_typing:8d} ({raw_typing / per_conv / args.seconds:6.2f}/conv/s)  after={typing:8d} ({typing / per_conv / args.seconds:6.2f}/conv/s)")
+	print(f"receipts  before={raw_receipts:8d} ({raw_receipts / args.seconds:6.2f}/room/s)  after={receipts:8d} ({receipts / args.seconds:6.2f}/room/s)")
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--conversations", type=int, default=50)
+	parser.add_argument("--seconds", type=float, default=60.0)
+	parser.add_argument("--keystroke-ms", type=int, default=150)
+	parser.add_argument("--burst", type=int, default=25, help="keystrokes per message")
+	parser.add_argument("--readers", type=int, default=30, help="members acknowledging in the busy room")
+	parser.add_argument("--room-rate", type=float, default=5.0, help="messages per second in the busy room")
+	asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+	main()
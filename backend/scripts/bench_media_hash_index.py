@@ -0,0 +1,75 @@
+"""Time near-duplicate media hash lookups against a linear Hamming scan.
+
+Builds ``--size`` random 64-bit hashes, then for ``--queries`` lookups (each a
+stored hash with a few bits flipped) compares the ``MultiIndexHash`` band probe
+(the same probes the Postgres band indexes serve) with the previous
+``nearest_match`` linear scan. Also reports the cost of computing a pHash for
+a decoded image.
+
+Usage:
+	python scripts/bench_media_hash_index.py --size 200000 --queries 200 --radius 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import time
+
+from PIL import Image
+
+import app.communities  # noqa: F401  # import before app.moderation to avoid the package cycle
+from app.moderation.domain.hashing import MultiIndexHash, PerceptualHasher, nearest_match
+
+
+def _flip(value: int, rng: random.Random, bits: int) -> str:
+	for position in rng.sample(range(64), bits):
+		value ^= 1 << position
+	return f"{value:016x}"
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--size", type=int, default=200_000)
+	parser.add_argument("--queries", type=int, default=200)
+	parser.add_argument("--radius", type=int, default=8)
+	parser.add_argument("--seed", type=int, default=3)
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	hashes = [f"{rng.getrandbits(64):016x}" for _ in range(args.size)]
+	queries = [_flip(int(rng.choice(hashes), 16), rng, rng.randint(0, args.radius)) for _ in range(args.queries)]
+
+	start = time.perf_counter()
+	index = MultiIndexHash(hashes)
+	build = time.perf_counter() - start
+
+	timings = {}
+	for name, fn in (
+		("bands", lambda query: index.search(query, args.radius)),
+		("scan", lambda query: nearest_match(query, hashes)),
+	):
+		start = time.perf_counter()
+		for query in queries:
+			fn(query)
+		timings[name] = (time.perf_counter() - start) / len(queries) * 1000
+
+	image = Image.effect_noise((1024, 768), 40).convert("RGB")
+	buffer = io.BytesIO()
+	image.save(buffer, format="JPEG")
+	payload = buffer.getvalue()
+	hasher = PerceptualHasher()
+	start = time.perf_counter()
+	for _ in range(50):
+		hasher.compute(payload)
+	phash_ms = (time.perf_counter() - start) / 50 * 1000
+
+	print(f"size={args.size} queries={args.queries} radius={args.radius} index build={build:.1f}s")
+	for name, millis in timings.items():
+		print(f"{name:>8}: {millis:8.2f} ms/lookup")
+	print(f"{'phash':>8}: {phash_ms:8.2f} ms/image (1024x768 JPEG)")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,160 @@
+"""Compare per-event and batched moderation enforcement throughput.
+
+Runs ``--events`` decisions through ``ModerationEnforcer.apply_decision`` one at
+a time and through ``apply_decisions`` in ``--batch``-sized groups. The
+repository is the in-memory one with ``--rtt-ms`` of simulated latency added to
+every call, so the numbers reflect round trips rather than SQL cost; trust
+hydration is timed the same way (per-user ``hydrate`` vs ``hydrate_many``).
+
+Usage:
+	python scripts/bench_moderation_enforcement.py --events 2000 --batch 100 --rtt-ms 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import app.communities  # noqa: F401  # import before app.moderation to avoid the package cycle
+from app.moderation.domain.enforcement import EnforcementRequest, InMemoryModerationRepository, ModerationEnforcer
+from app.moderation.domain.policy_engine import Decision
+from app.moderation.domain.trust import TrustLedger
+
+
+class _Hooks:
+	async def tombstone(self, case, payload):
+		return None
+
+	async def warn(self, case, payload):
+		return None
+
+
+class _SlowRepository(InMemoryModerationRepository):
+	def __init__(self, rtt: float) -> None:
+		super().__init__()
+		self.rtt = rtt
+		self.round_trips = 0
+
+	async def _wait(self) -> None:
+		self.round_trips += 1
+		await asyncio.sleep(self.rtt)
+
+	async def upsert_case(self, *args, **kwargs):
+		await self._wait()
+		return await super().upsert_case(*args, **kwargs)
+
+	async def already_applied(self, case_id, action):
+		await self._wait()
+		return await super().already_applied(case_id, action)
+
+	async def record_action(self, *args, **kwargs):
+		await self._wait()
+		return await super().record_action(*args, **kwargs)
+
+	async def update_case_status(self, case_id, status):
+		await self._wait()
+		return await super().update_case_status(case_id, status)
+
+	async def audit(self, *args, **kwargs):
+		await self._wait()
+		return await super().audit(*args, **kwargs)
+
+	async def prepare_cases(self, requests):
+		await self._wait()
+		self.round_trips -= len(requests)  # inner upsert_case calls are part of this statement
+		return await _unthrottled(self, super().prepare_cases(requests))
+
+	async def commit_actions(self, pending):
+		await self._wait()
+		self.round_trips -= 3 * len(pending)
+		return await _unthrottled(self, super().commit_actions(pending))
+
+
+async def _unthrottled(repo: _SlowRepository, coro):
+	rtt, repo.rtt = repo.rtt, 0.0
+	try:
+		return await coro
+	finally:
+		repo.rtt = rtt
+
+
+class _SlowTrust:
+	def __init__(self, rtt: float) -> None:
+		self.rtt = rtt
+		self.scores: dict[str, int] = {}
+
+	async def get_score(self, user_id: str) -> int | None:
+		await asyncio.sleep(self.rtt)
+		return self.scores.get(user_id)
+
+	async def upsert_score(self, user_id: str, score: int, event_at: datetime) -> None:
+		await asyncio.sleep(self.rtt)
+		self.scores[user_id] = score
+
+	async def get_scores(self, user_ids):
+		await asyncio.sleep(self.rtt)
+		return {user_id: self.scores[user_id] for user_id in user_ids if user_id in self.scores}
+
+	async def seed_scores(self, user_ids, score, event_at):
+		await asyncio.sleep(self.rtt)
+		self.scores.update({user_id: score for user_id in user_ids})
+
+
+def _requests(count: int) -> list[EnforcementRequest]:
+	return [
+		EnforcementRequest(
+			subject_type="post",
+			subject_id=f"post-{index % (count // 2 or 1)}",
+			actor_id=f"user-{index % 50}",
+			base_reason="auto_policy",
+			decision=Decision(action="tombstone" if index % 3 else "warn", severity=2, payload={}, reasons=[]),
+			policy_id=None,
+		)
+		for index in range(count)
+	]
+
+
+async def _run(args: argparse.Namespace) -> None:
+	rtt = args.rtt_ms / 1000.0
+	requests = _requests(args.events)
+
+	repo = _SlowRepository(rtt)
+	enforcer = ModerationEnforcer(repository=repo, hooks=_Hooks())  # type: ignore[arg-type]
+	trust = TrustLedger(repository=_SlowTrust(rtt))  # type: ignore[arg-type]
+	start = time.perf_counter()
+	for offset in range(0, len(requests), args.batch):
+		chunk = requests[offset : offset + args.batch]
+		for request in chunk:
+			if request.actor_id:
+				await trust.hydrate(request.actor_id)
+			await enforcer._apply_one(request)
+	single = time.perf_counter() - start
+	single_trips = repo.round_trips
+
+	repo = _SlowRepository(rtt)
+	enforcer = ModerationEnforcer(repository=repo, hooks=_Hooks())  # type: ignore[arg-type]
+	trust = TrustLedger(repository=_SlowTrust(rtt))  # type: ignore[arg-type]
+	start = time.perf_counter()
+	for offset in range(0, len(requests), args.batch):
+		chunk = requests[offset : offset + args.batch]
+		await trust.hydrate_many(request.actor_id for request in chunk if request.actor_id)
+		await enforcer.apply_decisions(chunk)
+	batched = time.perf_counter() - start
+
+	print(f"events={args.events} batch={args.batch} rtt={args.rtt_ms}ms")
+	print(f"per-event: {args.events / single:9.0f} events/s  ({single_trips} enforcement round trips)")
+	print(f"batched:   {args.events / batched:9.0f} events/s  ({repo.round_trips} enforcement round trips)")
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--events", type=int, default=2000)
+	parser.add_argument("--batch", type=int, default=100)
+	parser.add_argument("--rtt-ms", type=float, default=0.5)
+	asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+	main()
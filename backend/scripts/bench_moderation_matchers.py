@@ -0,0 +1,73 @@
+"""Time the profanity and link detectors as their lexicons grow.
+
+Builds synthetic lexicons/denylists of each ``--sizes`` entry, then times
+``ProfanityDetector.evaluate`` and ``LinkSafetyDetector.evaluate`` over a fixed
+batch of messages. The "scan" columns reproduce the previous per-entry
+``endswith`` denylist check for comparison; detector time should stay flat
+while the scan grows linearly with the list.
+
+Usage:
+	python scripts/bench_moderation_matchers.py --sizes 100 1000 10000 --messages 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+
+import app.communities  # noqa: F401  # import before app.moderation to avoid the package cycle
+from app.moderation.domain.detectors.links import URL_RE, LinkSafetyDetector
+from app.moderation.domain.detectors.profanity import ProfanityDetector
+
+
+def _word(rng: random.Random, length: int = 7) -> str:
+	return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def _messages(rng: random.Random, count: int) -> list[str]:
+	messages = []
+	for _ in range(count):
+		words = [_word(rng, rng.randint(2, 9)) for _ in range(rng.randint(8, 40))]
+		words.append(f"https://{_word(rng)}.{_word(rng, 3)}.com/path")
+		messages.append(" ".join(words))
+	return messages
+
+
+def _time(fn, messages: list[str]) -> float:
+	start = time.perf_counter()
+	for message in messages:
+		fn(message)
+	return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+	parser.add_argument("--messages", type=int, default=2000)
+	parser.add_argument("--seed", type=int, default=7)
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	messages = _messages(rng, args.messages)
+	print(f"{'entries':>8}  {'profanity us/msg':>16}  {'links us/msg':>12}  {'links scan us/msg':>17}")
+	for size in args.sizes:
+		lexicon = {_word(rng): "medium" for _ in range(size)}
+		denylist = [f"{_word(rng)}.{_word(rng, 3)}.com" for _ in range(size)]
+		profanity = ProfanityDetector(lexicon=lexicon)
+		links = LinkSafetyDetector(denylist=denylist)
+		deny_set = set(denylist)
+
+		def _scan(text: str) -> list[str]:
+			domains = [match.group(1).lower() for match in URL_RE.finditer(text)]
+			return [domain for domain in domains if any(domain.endswith(item) for item in deny_set)]
+
+		print(
+			f"{size:>8}  {_time(profanity.evaluate, messages):>16.1f}  "
+			f"{_time(links.evaluate, messages):>12.1f}  {_time(_scan, messages):>17.1f}"
+		)
+
+
+if __name__ == "__main__":
+	main()
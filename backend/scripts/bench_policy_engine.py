@@ -0,0 +1,86 @@
+"""Micro-benchmark the compiled policy evaluator against the interpreter.
+
+Generates a policy with ``--rules`` rules mixing the supported predicates,
+then evaluates ``--events`` synthetic signal sets with ``interpret_policy``
+(per-event interpretation of every ``when`` clause) and ``evaluate_policy``
+(compiled closures, severity-ordered with early exit), checking that both
+return the same decision.
+
+Usage:
+	python scripts/bench_policy_engine.py --rules 50 --events 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import app.communities  # noqa: F401  # import before app.moderation to avoid the package cycle
+from app.moderation.domain.policy_engine import Policy, compile_policy, evaluate_policy, interpret_policy
+
+_LABELS = ["unknown", "low", "medium", "high"]
+
+
+def _policy(rng: random.Random, count: int) -> Policy:
+	rules = []
+	for index in range(count):
+		kind = index % 4
+		if kind == 0:
+			when = {"text.any_of": [f"profanity>{rng.choice(_LABELS[1:])}"]}
+		elif kind == 1:
+			when = {"image.any_of": [f"nsfw>{rng.choice(_LABELS[1:])}"]}
+		elif kind == 2:
+			when = {"signals.all_of": rng.sample(["dup_text_5m", "high_velocity_posts", "unsafe_links"], 2)}
+		else:
+			when = {"user.trust_below": rng.randint(5, 40), "signals.all_of": ["excessive_links"]}
+		then = {"action": rng.choice(["tombstone", "shadow_hide", "restrict_create"]), "severity": rng.randint(0, 5)}
+		if rng.random() < 0.3:
+			then["reason"] = f"rule_{index}"
+		rules.append({"id": f"rule-{index}", "when": when, "then": then})
+	return Policy.from_dict("bench", {"version": 1, "rules": rules})
+
+
+def _events(rng: random.Random, count: int) -> list[tuple[dict, int]]:
+	events = []
+	for _ in range(count):
+		signals = {
+			"profanity": rng.choice(_LABELS),
+			"nsfw": rng.choice(_LABELS),
+			"dup_text_5m": rng.random() < 0.1,
+			"high_velocity_posts": rng.random() < 0.1,
+			"unsafe_links": rng.random() < 0.05,
+			"excessive_links": rng.random() < 0.05,
+		}
+		events.append((signals, rng.randint(0, 100)))
+	return events
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--rules", type=int, default=50)
+	parser.add_argument("--events", type=int, default=20000)
+	parser.add_argument("--seed", type=int, default=11)
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	policy = _policy(rng, args.rules)
+	events = _events(rng, args.events)
+	compile_policy(policy)
+
+	timings = {}
+	results = {}
+	for name, fn in (("interpreter", interpret_policy), ("compiled", evaluate_policy)):
+		start = time.perf_counter()
+		results[name] = [fn(policy, signals, trust) for signals, trust in events]
+		timings[name] = (time.perf_counter() - start) / len(events) * 1e6
+	mismatches = sum(1 for left, right in zip(results["interpreter"], results["compiled"]) if left != right)
+
+	print(f"rules={args.rules} events={args.events} mismatches={mismatches}")
+	for name, micros in timings.items():
+		print(f"{name:>12}: {micros:7.2f} us/event")
+	print(f"{'speedup':>12}: {timings['interpreter'] / timings['compiled']:7.2f}x")
+
+
+if __name__ == "__main__":
+	main()
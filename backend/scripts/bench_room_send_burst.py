@@ -0,0 +1,198 @@
+"""Burst benchmark: many senders writing into one busy room at once.
+
+Seeds a throwaway campus, room and ``--senders`` members, then fires
+``--messages`` sends per sender concurrently through two allocators:
+
+* legacy  - the old transaction (``ORDER BY seq DESC LIMIT 1 FOR UPDATE`` on
+  ``room_messages``, then INSERT, then per-member receipt upserts);
+* counter - ``RoomChatRepository.persist_message`` (one ``room_seq`` upsert +
+  insert statement, receipts via ``unnest``).
+
+Reports per-send p50/p95, throughput and whether the resulting seqs are gap
+and duplicate free. Requires infra migration 0276_room_seq.sql to be applied.
+
+Usage:
+	python scripts/bench_room_send_burst.py --senders 50 --messages 40
+	python scripts/bench_room_send_burst.py --cleanup
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import ulid
+
+from app.domain.rooms import models, schemas
+from app.domain.rooms.chat_service import RoomChatRepository
+from app.infra.postgres import get_pool
+
+BENCH_CAMPUS = UUID("bbbbbbbb-0000-4000-8000-000000000043")
+BENCH_ROOM = UUID("bbbbbbbb-0000-4000-8000-000000000044")
+
+
+async def _seed(senders: int) -> list[str]:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		await conn.execute(
+			"INSERT INTO campuses (id, name) VALUES ($1, 'Room Burst Bench U') ON CONFLICT (id) DO NOTHING",
+			BENCH_CAMPUS,
+		)
+		rows = await conn.fetch("SELECT id FROM users WHERE campus_id = $1 ORDER BY id", BENCH_CAMPUS)
+		user_ids = [str(row["id"]) for row in rows]
+		for idx in range(len(user_ids), senders):
+			user_id = str(uuid4())
+			await conn.execute(
+				"""
+				INSERT INTO users (id, email, handle, display_name, campus_id, password_hash)
+				VALUES ($1, $2 || '@bench.invalid', $2, $2, $3, 'x')
+				""",
+				user_id,
+				f"burst_{idx}_{user_id[:8]}",
+				BENCH_CAMPUS,
+			)
+			user_ids.append(user_id)
+		user_ids = user_ids[:senders]
+		await conn.execute(
+			"""
+			INSERT INTO rooms (id, campus_id, owner_id, name, preset, visibility, capacity)
+			VALUES ($1, $2, $3, 'Burst Bench', '12+', 'private', $4)
+			ON CONFLICT (id) DO NOTHING
+			""",
+			BENCH_ROOM,
+			BENCH_CAMPUS,
+			user_ids[0],
+			max(senders, 12),
+		)
+		await conn.execute(
+			"""
+			INSERT INTO room_members (room_id, user_id, role)
+			SELECT $1, member_id, 'member' FROM unnest($2::uuid[]) AS member_id
+			ON CONFLICT (room_id, user_id) DO NOTHING
+			""",
+			BENCH_ROOM,
+			user_ids,
+		)
+	return user_ids
+
+
+async def _reset_room() -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		await conn.execute("DELETE FROM room_messages WHERE room_id = $1", BENCH_ROOM)
+		await conn.execute("DELETE FROM room_seq WHERE room_id = $1", BENCH_ROOM)
+
+
+async def _cleanup() -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		await conn.execute("DELETE FROM rooms WHERE id = $1", BENCH_ROOM)
+		await conn.execute("DELETE FROM users WHERE campus_id = $1", BENCH_CAMPUS)
+		await conn.execute("DELETE FROM campuses WHERE id = $1", BENCH_CAMPUS)
+
+
+async def _legacy_persist(room_id: str, sender_id: str, payload: schemas.RoomMessageSendRequest, members: list[str]) -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		async with conn.transaction():
+			last_row = await conn.fetchrow(
+				"SELECT seq FROM room_messages WHERE room_id=$1 ORDER BY seq DESC LIMIT 1 FOR UPDATE",
+				room_id,
+			)
+			next_seq = int(last_row["seq"]) + 1 if last_row else 1
+			await conn.execute(
+				"""
+				INSERT INTO room_messages (id, room_id, seq, sender_id, client_msg_id, kind, content)
+				VALUES ($1,$2,$3,$4,$5,$6,$7)
+				""",
+				str(ulid.new()),
+				room_id,
+				next_seq,
+				sender_id,
+				payload.client_msg_id,
+				payload.kind,
+				payload.content,
+			)
+			await conn.executemany(
+				"""
+				INSERT INTO room_receipts (room_id, user_id, delivered_seq, read_seq)
+				VALUES ($1,$2,0,0)
+				ON CONFLICT (room_id, user_id) DO NOTHING
+				""",
+				[(room_id, member) for member in members],
+			)
+
+
+async def _burst(label: str, user_ids: list[str], messages: int) -> None:
+	await _reset_room()
+	room_id = str(BENCH_ROOM)
+	now = datetime.now(timezone.utc)
+	members = [models.RoomMember(room_id=room_id, user_id=uid, role="member", muted=False, joined_at=now) for uid in user_ids]
+	repo = RoomChatRepository()
+	samples: list[float] = []
+	errors = 0
+
+	async def _sender(sender_id: str) -> None:
+		nonlocal errors
+		for idx in range(messages):
+			payload = schemas.RoomMessageSendRequest(
+				client_msg_id=f"burst-{sender_id[:8]}-{idx:05d}",
+				kind="text",
+				content=f"burst {idx}",
+			)
+			start = time.perf_counter()
+			try:
+				if label == "legacy":
+					await _legacy_persist(room_id, sender_id, payload, user_ids)
+				else:
+					await repo.persist_message(room_id=room_id, sender_id=sender_id, payload=payload, members=members)
+			except Exception:
+				# The legacy allocator races on an empty room (no row to lock) and
+				# trips UNIQUE(room_id, seq); count those instead of aborting.
+				errors += 1
+				continue
+			samples.append((time.perf_counter() - start) * 1000.0)
+
+	started = time.perf_counter()
+	await asyncio.gather(*(_sender(uid) for uid in user_ids))
+	elapsed = time.perf_counter() - started
+
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		stats = await conn.fetchrow(
+			"SELECT COUNT(*) AS n, COUNT(DISTINCT seq) AS distinct_seq, MAX(seq) AS max_seq FROM room_messages WHERE room_id = $1",
+			BENCH_ROOM,
+		)
+	samples.sort()
+	p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+	p50 = statistics.median(samples) if samples else 0.0
+	print(
+		f"{label:<8} p50={p50:8.2f}ms  p95={p95:8.2f}ms  "
+		f"{len(samples) / elapsed:8.1f} msg/s  errors={errors}  "
+		f"rows={stats['n']} distinct_seq={stats['distinct_seq']} max_seq={stats['max_seq']}"
+	)
+
+
+async def _run(args: argparse.Namespace) -> None:
+	if args.cleanup:
+		await _cleanup()
+		return
+	user_ids = await _seed(args.senders)
+	await _burst("legacy", user_ids, args.messages)
+	await _burst("counter", user_ids, args.messages)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--senders", type=int, default=50)
+	parser.add_argument("--messages", type=int, default=40, help="messages per sender")
+	parser.add_argument("--cleanup", action="store_true")
+	asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+	main()
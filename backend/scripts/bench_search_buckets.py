@@ -0,0 +1,218 @@
+"""Benchmark multi-search bucket queries against a synthetic 1M-row corpus.
+
+Seeds a throwaway campus with ``--users`` users and ``--posts`` posts (server-side
+``generate_series`` so seeding 1M rows takes seconds, not minutes), then times the
+legacy per-row ``to_tsvector()`` scan against the indexed bucket queries used by
+``SearchService``, plus the concurrent three-bucket fan-out whose p95 should track
+the slowest single bucket. Requires infra migration 0275_search_tsvector.sql to be applied.
+
+Usage:
+	python scripts/bench_search_buckets.py --users 1000000 --posts 1000000
+	python scripts/bench_search_buckets.py --cleanup
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from app.domain.search.service import SearchService, _MultiSearchContext
+from app.infra.postgres import get_pool
+from app.settings import settings
+
+BENCH_CAMPUS = UUID("bbbbbbbb-0000-4000-8000-000000000041")
+BENCH_GROUP = UUID("bbbbbbbb-0000-4000-8000-000000000042")
+QUERIES = ("alex", "maria chen", "comp sci", "basketball", "zzqx")
+
+LEGACY_PEOPLE_SQL = """
+WITH ranked AS (
+	SELECT
+		u.id,
+		u.created_at,
+		ts_rank_cd(
+			to_tsvector('english', coalesce(u.display_name,'') || ' ' || coalesce(u.bio,'')),
+			websearch_to_tsquery('english', $1)
+		) AS ts_score,
+		GREATEST(similarity(u.handle, $1), similarity(u.display_name, $1)) AS trgm_score
+	FROM users u
+	WHERE ($2::uuid IS NULL OR u.campus_id = $2::uuid)
+)
+SELECT * FROM ranked
+WHERE ts_score > 0 OR trgm_score > 0.2
+ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
+LIMIT $3
+"""
+
+LEGACY_POSTS_SQL = """
+WITH ranked AS (
+	SELECT
+		p.id,
+		p.created_at,
+		ts_rank_cd(to_tsvector('english', coalesce(p.body,'')), websearch_to_tsquery('english', $1)) AS ts_score,
+		similarity(coalesce(p.body,''), $1) AS trgm_score
+	FROM post p
+	JOIN group_entity g ON g.id = p.group_id
+	WHERE p.deleted_at IS NULL
+		AND p.created_at >= NOW() - INTERVAL '7 days'
+		AND ($2::uuid IS NULL OR g.campus_id = $2::uuid)
+)
+SELECT * FROM ranked
+WHERE ts_score > 0 OR trgm_score > 0.1
+ORDER BY ts_score DESC, trgm_score DESC, created_at DESC, id DESC
+LIMIT $3
+"""
+
+
+async def _seed(users: int, posts: int) -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		await conn.execute(
+			"INSERT INTO campuses (id, name) VALUES ($1, 'Search Bench U') ON CONFLICT (id) DO NOTHING",
+			BENCH_CAMPUS,
+		)
+		existing = await conn.fetchval("SELECT COUNT(*) FROM users WHERE campus_id = $1", BENCH_CAMPUS)
+		if existing < users:
+			print(f"seeding {users - existing} users...")
+			await conn.execute(
+				"""
+				INSERT INTO users (id, email, handle, display_name, bio, campus_id, password_hash)
+				SELECT
+					gen_random_uuid(),
+					'bench' || g || '@bench.invalid',
+					'bench_' || (ARRAY['alex','maria','jordan','sam','li','chen','noor','ivan'])[1 + g % 8] || g,
+					(ARRAY['Alex','Maria','Jordan','Sam','Li','Chen','Noor','Ivan'])[1 + g % 8] || ' '
+						|| (ARRAY['Smith','Chen','Garcia','Khan','Nguyen','Rossi'])[1 + g % 6],
+					(ARRAY['comp sci major','loves basketball','biology lab','film club','chess'])[1 + g % 5],
+					$1,
+					'x'
+				FROM generate_series($2::bigint + 1, $3::bigint) AS g
+				""",
+				BENCH_CAMPUS,
+				existing,
+				users,
+			)
+		has_post = await conn.fetchval("SELECT to_regclass('public.post') IS NOT NULL")
+		if has_post and posts:
+			await conn.execute(
+				"""
+				INSERT INTO group_entity (id, campus_id, name, slug, visibility, created_by)
+				VALUES ($1, $2, 'Search Bench', 'search-bench', 'public', gen_random_uuid())
+				ON CONFLICT (id) DO NOTHING
+				""",
+				BENCH_GROUP,
+				BENCH_CAMPUS,
+			)
+			existing_posts = await conn.fetchval("SELECT COUNT(*) FROM post WHERE group_id = $1", BENCH_GROUP)
+			if existing_posts < posts:
+				print(f"seeding {posts - existing_posts} posts...")
+				await conn.execute(
+					"""
+					INSERT INTO post (group_id, author_id, body, created_at)
+					SELECT
+						$1,
+						gen_random_uuid(),
+						(ARRAY['pickup basketball tonight','comp sci study group','lost my keys','film screening friday'])[1 + g % 4]
+							|| ' #' || g,
+						NOW() - (g % 10080) * INTERVAL '1 minute'
+					FROM generate_series($2::bigint + 1, $3::bigint) AS g
+					""",
+					BENCH_GROUP,
+					existing_posts,
+					posts,
+				)
+		await conn.execute("ANALYZE users")
+		if has_post:
+			await conn.execute("ANALYZE post")
+
+
+async def _cleanup() -> None:
+	pool = await get_pool()
+	async with pool.acquire() as conn:
+		if await conn.fetchval("SELECT to_regclass('public.post') IS NOT NULL"):
+			await conn.execute("DELETE FROM post WHERE group_id = $1", BENCH_GROUP)
+			await conn.execute("DELETE FROM group_entity WHERE id = $1", BENCH_GROUP)
+		await conn.execute("DELETE FROM users WHERE campus_id = $1", BENCH_CAMPUS)
+		await conn.execute("DELETE FROM campuses WHERE id = $1", BENCH_CAMPUS)
+
+
+def _report(label: str, samples: list[float]) -> None:
+	samples = sorted(samples)
+	p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+	print(f"{label:<24} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  n={len(samples)}")
+
+
+async def _time_sql(sql: str, rounds: int) -> list[float]:
+	pool = await get_pool()
+	samples: list[float] = []
+	async with pool.acquire() as conn:
+		for _ in range(rounds):
+			for q in QUERIES:
+				start = time.perf_counter()
+				await conn.fetch(sql, q, BENCH_CAMPUS, 21)
+				samples.append((time.perf_counter() - start) * 1000.0)
+	return samples
+
+
+def _context(query: str) -> _MultiSearchContext:
+	return _MultiSearchContext(
+		query=query,
+		campus_id=BENCH_CAMPUS,
+		limit=20,
+		coeff={"ts": 0.7, "trgm": 0.3, "recency_tau": 24.0},
+		blocked_ids=[],
+	)
+
+
+async def _time_bucket(service: SearchService, bucket: str, rounds: int) -> list[float]:
+	samples: list[float] = []
+	for _ in range(rounds):
+		for q in QUERIES:
+			start = time.perf_counter()
+			await service._run_bucket(bucket, _context(q), None)
+			samples.append((time.perf_counter() - start) * 1000.0)
+	return samples
+
+
+async def _time_multi(service: SearchService, rounds: int) -> list[float]:
+	"""Three buckets fanned out together, as GET /search runs them."""
+
+	samples: list[float] = []
+	for _ in range(rounds):
+		for q in QUERIES:
+			start = time.perf_counter()
+			await service._run_buckets(["people", "rooms", "posts"], _context(q), None, deadline=start + 30.0)
+			samples.append((time.perf_counter() - start) * 1000.0)
+	return samples
+
+
+async def _run(args: argparse.Namespace) -> None:
+	if args.cleanup:
+		await _cleanup()
+		return
+	await _seed(args.users, args.posts)
+	# Measure the queries themselves, not the result cache in front of them.
+	settings.search_cache_enabled = False
+	service = SearchService()
+	_report("people legacy", await _time_sql(LEGACY_PEOPLE_SQL, args.rounds))
+	_report("people indexed", await _time_bucket(service, "people", args.rounds))
+	if args.posts:
+		_report("posts legacy", await _time_sql(LEGACY_POSTS_SQL, args.rounds))
+		_report("posts indexed", await _time_bucket(service, "posts", args.rounds))
+	_report("rooms indexed", await _time_bucket(service, "rooms", args.rounds))
+	_report("multi (3 buckets)", await _time_multi(service, args.rounds))
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--users", type=int, default=1_000_000)
+	parser.add_argument("--posts", type=int, default=1_000_000)
+	parser.add_argument("--rounds", type=int, default=5)
+	parser.add_argument("--cleanup", action="store_true", help="remove the synthetic campus and exit")
+	asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+	main()
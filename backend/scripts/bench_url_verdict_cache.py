@@ -0,0 +1,127 @@
+"""Benchmark the URL verdict cache against a fake classifier, offline.
+
+Replays ``--events`` URL scan lookups drawn from a Zipf-like popularity curve
+over ``--urls`` distinct links (a few viral links and a long tail), with up to
+``--concurrency`` lookups in flight. Each classification sleeps
+``--latency-ms``. Prints classifications issued, cache outcome counts and
+per-lookup latency for the uncached path and for ``UrlVerdictCache``. Pass
+``--redis-url`` to include the shared Redis tier and cross-process lock.
+
+Usage:
+	python scripts/bench_url_verdict_cache.py --events 20000 --urls 2000 --latency-ms 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import app.communities  # noqa: F401  # import before app.moderation to avoid the package cycle
+from app.moderation.domain.url_cache import UrlVerdictCache
+from app.moderation.domain.url_reputation import UrlVerdict
+
+
+class FakeUrlClassifier:
+	"""Deterministic classifier with a fixed per-call latency."""
+
+	def __init__(self, latency_ms: float, listed: frozenset[str]) -> None:
+		self.latency = latency_ms / 1000.0
+		self.listed = listed
+		self.calls = 0
+
+	async def classify(self, url: str) -> UrlVerdict:
+		self.calls += 1
+		await asyncio.sleep(self.latency)
+		domain = url.split("/")[2]
+		listed = domain in self.listed
+		return UrlVerdict(
+			requested_url=url,
+			final_url=url,
+			etld_plus_one=domain,
+			verdict="malicious" if listed else "clean",
+			lists=["phishing"] if listed else [],
+			details={},
+			resolved_at=datetime.now(timezone.utc),
+		)
+
+
+async def _replay(urls: list[str], concurrency: int, lookup) -> list[float]:
+	slots = asyncio.Semaphore(concurrency)
+	latencies: list[float] = []
+
+	async def _one(url: str) -> None:
+		async with slots:
+			start = time.perf_counter()
+			await lookup(url)
+			latencies.append((time.perf_counter() - start) * 1000)
+
+	await asyncio.gather(*(_one(url) for url in urls))
+	return latencies
+
+
+def _report(name: str, calls: int, latencies: list[float], elapsed: float, outcomes: Counter | None = None) -> None:
+	ordered = sorted(latencies)
+	p99 = ordered[int(len(ordered) * 0.99) - 1]
+	print(
+		f"{name:>8}: classify={calls:6d} p50={statistics.median(ordered):7.2f}ms "
+		f"p99={p99:7.2f}ms wall={elapsed:6.2f}s"
+	)
+	if outcomes:
+		total = sum(outcomes.values())
+		summary = " ".join(f"{key}={value / total:.1%}" for key, value in sorted(outcomes.items()))
+		print(f"{'':>8}  {summary}")
+
+
+async def _main(args: argparse.Namespace) -> None:
+	rng = random.Random(args.seed)
+	domains = [f"site{index}.test" for index in range(max(1, args.urls // 10))]
+	listed = frozenset(rng.sample(domains, max(1, len(domains) // 50)))
+	links = [f"https://{rng.choice(domains)}/p/{index}" for index in range(args.urls)]
+	weights = [1.0 / (rank + 1) ** args.skew for rank in range(len(links))]
+	events = rng.choices(links, weights=weights, k=args.events)
+
+	direct = FakeUrlClassifier(args.latency_ms, listed)
+	start = time.perf_counter()
+	latencies = await _replay(events, args.concurrency, direct.classify)
+	_report("uncached", direct.calls, latencies, time.perf_counter() - start)
+
+	redis = None
+	if args.redis_url:
+		from redis.asyncio import Redis
+
+		redis = Redis.from_url(args.redis_url)
+		await redis.flushdb()
+	cached = FakeUrlClassifier(args.latency_ms, listed)
+	cache = UrlVerdictCache(redis)
+	outcomes: Counter = Counter()
+
+	async def _lookup(url: str) -> None:
+		_, outcome = await cache.resolve(url, lambda: cached.classify(url))
+		outcomes[outcome] += 1
+
+	start = time.perf_counter()
+	latencies = await _replay(events, args.concurrency, _lookup)
+	_report("cached", cached.calls, latencies, time.perf_counter() - start, outcomes)
+	if redis is not None:
+		await redis.aclose()
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("--events", type=int, default=20_000)
+	parser.add_argument("--urls", type=int, default=2_000)
+	parser.add_argument("--skew", type=float, default=1.1)
+	parser.add_argument("--concurrency", type=int, default=64)
+	parser.add_argument("--latency-ms", type=float, default=40.0)
+	parser.add_argument("--redis-url", default=None)
+	parser.add_argument("--seed", type=int, default=7)
+	asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+	main()
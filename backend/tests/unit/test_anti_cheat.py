@@ -3,7 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 from app.domain.xp.service import XPService
-from app.domain.xp.models import XPAction
+from app.domain.xp.models import XPAction, XPAward
 from app.domain.meetups.service import MeetupService
 from app.domain.meetups import schemas
 from app.infra.auth import AuthenticatedUser
@@ -103,3 +103,42 @@ async def test_meetup_attendance_no_self_xp():
             assert args[1] == XPAction.MEETUP_JOIN
             assert kwargs['metadata']['host_id'] == str(host_id)
 
+
+
+@pytest.mark.asyncio
+async def test_award_many_uses_cached_verification_and_one_statement(fake_redis):
+    service = XPService()
+    host, guest, other = str(uuid4()), str(uuid4()), str(uuid4())
+    await fake_redis.set(f"xp:verified:{guest}", "1")
+    await fake_redis.set(f"xp:verified:{other}", "0")
+
+    mock_pool = MagicMock()
+    mock_conn = AsyncMock()
+    mock_pool.acquire.return_value.__aenter__.return_value = mock_conn
+
+    async def fake_fetch(sql, user_ids, actions, amounts, metadata, levels, thresholds):
+        totals: dict[str, int] = {}
+        for uid, amount in zip(user_ids, amounts):
+            totals[uid] = totals.get(uid, 0) + amount
+        return [
+            {"user_id": uid, "total_xp": total, "current_level": 1, "last_updated_at": None, "previous_level": None}
+            for uid, total in totals.items()
+        ]
+
+    mock_conn.fetch.side_effect = fake_fetch
+    awards = [
+        XPAward(guest, XPAction.MEETUP_JOIN, {"host_id": host}),
+        XPAward(guest, XPAction.MEETUP_JOIN, {"host_id": host}),
+        XPAward(other, XPAction.MEETUP_JOIN, {"host_id": host}),
+    ]
+    with patch("app.domain.xp.service.get_pool", new=AsyncMock(return_value=mock_pool)), \
+            patch("app.domain.xp.sockets.emit_xp_gained", new_callable=AsyncMock), \
+            patch("app.domain.xp.sockets.emit_level_up", new_callable=AsyncMock), \
+            patch.object(service, "_verified_many", new_callable=AsyncMock) as verified_lookup:
+        results = await service.award_many(awards)
+
+    # Verified guest: 30 then 15; unverified user: halved. No users lookup needed.
+    assert [amount for _, amount in results] == [30, 15, 15]
+    assert results[0][0].total_xp == 45
+    verified_lookup.assert_not_called()
+    assert mock_conn.fetch.await_count == 1
@@ -0,0 +1,204 @@
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.domain.chat.service import ChatRepository
+from app.domain.rooms.chat_service import RoomChatRepository
+from app.infra import segments
+from app.maintenance import cold_storage
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class SegmentConn:
+    """Answers cold_storage.load_segments queries from an in-memory segment list."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, sql, owner_id, *params):
+        rows = [row for row in self.rows if row["owner"] == owner_id]
+        if params:
+            (bound,) = params
+            for clause, keep in (
+                ("last_seq > $2", lambda r: r["last_seq"] > bound),
+                ("first_seq < $2", lambda r: r["first_seq"] < bound),
+                ("month <= $2", lambda r: r["month"] <= bound),
+                ("month < $2", lambda r: r["month"] < bound),
+            ):
+                if clause in sql:
+                    rows = [r for r in rows if keep(r)]
+                    break
+        key = "last_seq" if "ORDER BY last_seq" in sql else "month"
+        rows.sort(key=lambda r: r[key], reverse="DESC" in sql.split("ORDER BY")[1])
+        return rows[:1]
+
+
+class WritableSegmentConn(SegmentConn):
+    """Also applies the segment rewrites and deletes issued by deletion paths."""
+
+    async def fetch(self, sql, *params):
+        if "ANY(sender_ids)" in sql:
+            (user_id,) = params
+            return [dict(row, owner_id=row["owner"]) for row in self.rows if user_id in row["sender_ids"]]
+        if "FROM chat_messages" in sql or "FROM room_messages" in sql:
+            return []
+        return await super().fetch(sql, *params)
+
+    async def execute(self, sql, *params):
+        if "_segments" not in sql:
+            return
+        owner = params[0]
+        if sql.lstrip().startswith("INSERT"):
+            _, month, first_seq, last_seq, _, sender_ids, codec, payload = params
+            self.rows = [r for r in self.rows if (r["owner"], r["month"]) != (owner, month)]
+            self.rows.append({
+                "owner": owner,
+                "month": month,
+                "first_seq": first_seq,
+                "last_seq": last_seq,
+                "sender_ids": sender_ids,
+                "codec": codec,
+                "payload": payload,
+            })
+        elif "month = $2" in sql:
+            self.rows = [r for r in self.rows if (r["owner"], r["month"]) != (owner, params[1])]
+        else:
+            self.rows = [r for r in self.rows if r["owner"] != owner]
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class _Pool:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _segment(owner, month: date, records):
+    codec, payload = segments.encode([cold_storage.to_record(r) for r in records])
+    return {
+        "owner": owner,
+        "month": month,
+        "first_seq": records[0]["seq"],
+        "last_seq": records[-1]["seq"],
+        "sender_ids": sorted({r["sender_id"] for r in records}),
+        "codec": codec,
+        "payload": payload,
+    }
+
+
+def _room_record(seq: int, sender_id: str = "user-1"):
+    return {
+        "id": f"m{seq}",
+        "room_id": "room-1",
+        "seq": seq,
+        "sender_id": sender_id,
+        "client_msg_id": f"c{seq}",
+        "kind": "text",
+        "content": f"body {seq}",
+        "media_key": None,
+        "media_mime": None,
+        "media_bytes": None,
+        "created_at": BASE + timedelta(days=seq),
+    }
+
+
+def test_segment_roundtrip_compresses():
+    records = [cold_storage.to_record(_room_record(seq)) for seq in range(1, 200)]
+    codec, payload = segments.encode(records)
+    assert codec == segments.default_codec()
+    assert len(payload) < len(str(records))
+    assert segments.decode(codec, payload) == records
+
+
+@pytest.mark.asyncio
+async def test_room_history_continues_into_segments():
+    conn = SegmentConn([
+        _segment("room-1", date(2024, 1, 1), [_room_record(seq) for seq in range(1, 4)]),
+        _segment("room-1", date(2024, 2, 1), [_room_record(seq) for seq in range(4, 7)]),
+    ])
+    repo = RoomChatRepository()
+
+    older = await repo._cold_backward(conn, "room-1", before=6, limit=4)
+    assert [m.seq for m in older] == [5, 4, 3, 2]
+    assert older[0].created_at == BASE + timedelta(days=5)
+
+    replay = await repo._cold_forward(conn, "room-1", after=2, limit=10)
+    assert [m.seq for m in replay] == [3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_dm_history_continues_into_segments():
+    conversation_id = "chat:a:b"
+
+    def _dm(seq: int):
+        return {
+            "conversation_id": conversation_id,
+            "seq": seq,
+            "message_id": f"m{seq:03d}",
+            "client_msg_id": f"c{seq}",
+            "sender_id": "a",
+            "recipient_id": "b",
+            "body": f"hi {seq}",
+            "attachments": "[]",
+            "created_at": BASE + timedelta(days=seq * 10),
+        }
+
+    conn = SegmentConn([
+        _segment(conversation_id, date(2024, 1, 1), [_dm(1), _dm(2), _dm(3)]),
+        _segment(conversation_id, date(2024, 2, 1), [_dm(4), _dm(5)]),
+    ])
+    repo = ChatRepository()
+
+    page = await repo._cold_messages(conn, conversation_id, before=(BASE + timedelta(days=45), "m005"), limit=3)
+    assert [m.seq for m in page] == [4, 3, 2]
+
+    tail = await repo._cold_messages(conn, conversation_id, before=None, limit=10)
+    assert [m.seq for m in tail] == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_account_deletion_purge_rewrites_room_segments():
+    conn = WritableSegmentConn([
+        _segment("room-1", date(2024, 1, 1), [_room_record(seq) for seq in range(1, 4)]),
+        _segment("room-1", date(2024, 2, 1), [_room_record(4), _room_record(5, "user-2"), _room_record(6)]),
+    ])
+
+    removed = await cold_storage.purge_sender(conn, cold_storage.ROOM_TIER, "user-1")
+
+    assert removed == 5
+    assert [row["month"] for row in conn.rows] == [date(2024, 2, 1)]
+    assert conn.rows[0]["sender_ids"] == ["user-2"] and conn.rows[0]["first_seq"] == 5
+    history = await RoomChatRepository()._cold_backward(conn, "room-1", before=10, limit=10)
+    assert [(m.seq, m.sender_id) for m in history] == [(5, "user-2")]
+
+
+@pytest.mark.asyncio
+async def test_deleted_conversation_has_no_cold_history():
+    conversation_id = "chat:a:b"
+    record = {
+        "conversation_id": conversation_id,
+        "seq": 1,
+        "message_id": "m001",
+        "client_msg_id": "c1",
+        "sender_id": "a",
+        "recipient_id": "b",
+        "body": "hi",
+        "attachments": "[]",
+        "created_at": BASE,
+    }
+    conn = WritableSegmentConn([_segment(conversation_id, date(2024, 1, 1), [record])])
+    repo = ChatRepository()
+    repo._pool, repo._pool_checked = _Pool(conn), True
+    assert [m.seq for m in await repo.list_messages(conversation_id, cursor=None, limit=10)] == [1]
+
+    await repo.delete_conversation(conversation_id)
+
+    assert await repo.list_messages(conversation_id, cursor=None, limit=10) == []
@@ -1,7 +1,10 @@
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 
+from app.api.pagination import decode_cursor
+from app.domain.chat import service as chat_service
 from app.domain.chat.models import ChatMessage, ConversationKey, attach_iterable
 from app.domain.chat.service import ChatService
 from app.infra.auth import AuthenticatedUser
@@ -136,3 +139,47 @@ async def test_send_message_strips_links(monkeypatch):
     recipients = {item[0] for item in emits}
     assert "bob" in recipients
     assert "alice" in recipients
+
+
+@pytest.mark.asyncio
+async def test_inbox_tracks_last_message_and_unread(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(chat_service, "_MEMORY_STORE", chat_service._InMemoryStore())
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(chat_service.sockets, "emit_delivery", _noop)
+    repo = chat_service.ChatRepository()
+    repo._pool_checked = True
+    service = ChatService(repository=repo)
+    alice = AuthenticatedUser(id="user-a", campus_id="campus-1")
+    bob = AuthenticatedUser(id="user-b", campus_id="campus-1")
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    with_bob = ConversationKey.from_participants(alice.id, bob.id)
+    with_carol = ConversationKey.from_participants(alice.id, "user-c")
+    await repo.create_message(with_bob, bob.id, alice.id, "hi", [], "c1", base)
+    await repo.create_message(with_bob, bob.id, alice.id, "you there?", [], "c2", base + timedelta(seconds=1))
+    await repo.create_message(with_carol, alice.id, "user-c", "lunch?", [], "c3", base + timedelta(seconds=2))
+
+    first = await service.list_inbox(alice, cursor=None, limit=1)
+    assert [item.peer_id for item in first.items] == ["user-c"]
+    assert first.items[0].unread_count == 0
+    assert first.next is not None
+
+    second = await service.list_inbox(alice, cursor=decode_cursor(first.next), limit=1)
+    assert [item.peer_id for item in second.items] == [bob.id]
+    assert second.items[0].last_body == "you there?"
+    assert second.items[0].unread_count == 2
+    assert second.next is None
+
+    await service.acknowledge_delivery(alice, bob.id, delivered_seq=1)
+    refreshed = await service.list_inbox(alice, cursor=None, limit=10)
+    assert {item.peer_id: item.unread_count for item in refreshed.items} == {"user-c": 0, bob.id: 1}
+
+    # A deleted conversation starts over: its old acknowledgement must not hide new messages.
+    await repo.delete_conversation(with_bob.conversation_id)
+    await repo.create_message(with_bob, bob.id, alice.id, "new thread", [], "c4", base + timedelta(seconds=3))
+    restarted = await service.list_inbox(alice, cursor=None, limit=10)
+    assert {item.peer_id: item.unread_count for item in restarted.items} == {bob.id: 1, "user-c": 0}
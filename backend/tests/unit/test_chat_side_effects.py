@@ -0,0 +1,124 @@
+import pytest
+
+from app.domain.chat import side_effects
+from app.domain.chat.side_effects import ChatSideEffectWorker, MessageSent
+
+
+class _DeliveryRepo:
+	def __init__(self) -> None:
+		self.updates: list[tuple[str, str, int]] = []
+
+	async def update_delivered_seq(self, conversation_id: str, user_id: str, seq: int) -> None:
+		self.updates.append((conversation_id, user_id, seq))
+
+
+def _event(message_id: str, seq: int, conversation: str = "c1") -> MessageSent:
+	return MessageSent(
+		message_id=message_id,
+		conversation_id=conversation,
+		seq=seq,
+		sender_id="alice",
+		recipient_id="bob",
+	)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+	calls: dict[str, list[str]] = {"audit": [], "engagement": [], "delivery_emits": []}
+
+	async def _audit(event):
+		calls["audit"].append(event.message_id)
+
+	async def _engagement(event):
+		calls["engagement"].append(event.message_id)
+
+	async def _emit_delivery(user_id, payload):
+		calls["delivery_emits"].append(payload["delivered_seq"])
+
+	monkeypatch.setattr(side_effects, "_apply_audit", _audit)
+	monkeypatch.setattr(side_effects, "_apply_engagement", _engagement)
+	monkeypatch.setattr(side_effects.sockets, "emit_delivery", _emit_delivery)
+	return calls
+
+
+@pytest.mark.asyncio
+async def test_worker_batches_delivery_and_acks(fake_redis, recorded):
+	repo = _DeliveryRepo()
+	await side_effects.publish(_event("m1", 1), repo)
+	await side_effects.publish(_event("m2", 2), repo)
+	assert repo.updates == []
+
+	worker = ChatSideEffectWorker(consumer="test-0", repository=repo, block_ms=10)
+	assert await worker.process_once() == 2
+
+	assert repo.updates == [("c1", "bob", 2)]
+	assert recorded["delivery_emits"] == [2]
+	assert recorded["audit"] == ["m1", "m2"]
+	assert recorded["engagement"] == ["m1", "m2"]
+	pending = await fake_redis.xpending(side_effects.STREAM, side_effects.GROUP)
+	assert pending["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_effect_is_retried_without_repeating_completed_ones(fake_redis, recorded, monkeypatch):
+	repo = _DeliveryRepo()
+	attempts = {"audit": 0}
+
+	async def _flaky_audit(event):
+		attempts["audit"] += 1
+		if attempts["audit"] == 1:
+			raise RuntimeError("db down")
+
+	monkeypatch.setattr(side_effects, "_apply_audit", _flaky_audit)
+	await side_effects.publish(_event("m1", 1), repo)
+
+	worker = ChatSideEffectWorker(consumer="test-0", repository=repo, block_ms=10, retry_idle_ms=0)
+	await worker.process_once()
+	pending = await fake_redis.xpending(side_effects.STREAM, side_effects.GROUP)
+	assert pending["pending"] == 1
+
+	await worker.process_once()
+	pending = await fake_redis.xpending(side_effects.STREAM, side_effects.GROUP)
+	assert pending["pending"] == 0
+	assert attempts["audit"] == 2
+	assert recorded["engagement"] == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_publish_applies_inline_when_async_disabled(fake_redis, recorded, monkeypatch):
+	monkeypatch.setattr(side_effects.settings, "chat_side_effects_async", False)
+	repo = _DeliveryRepo()
+	await side_effects.publish(_event("m9", 4), repo)
+	assert repo.updates == [("c1", "bob", 4)]
+	assert recorded["audit"] == ["m9"]
+	assert await fake_redis.exists(side_effects.STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_effect_interrupted_mid_run_is_repeated_after_lock_expires(fake_redis, recorded, monkeypatch):
+	repo = _DeliveryRepo()
+	event = _event("m3", 3)
+	event.entry_id = "1-0"
+
+	async def _crashing_audit(event):
+		raise SystemExit("worker killed")
+
+	monkeypatch.setattr(side_effects, "_apply_audit", _crashing_audit)
+	with pytest.raises(SystemExit):
+		await side_effects.apply_batch([event], repo)
+	assert await fake_redis.exists("chat:fx:m3:audit") == 0
+
+	# While the dead worker's lock is live, other consumers leave the entry pending.
+	async def _audit(event):
+		recorded["audit"].append(event.message_id)
+
+	monkeypatch.setattr(side_effects, "_apply_audit", _audit)
+	assert await side_effects.apply_batch([event], repo) == set()
+	assert recorded["audit"] == []
+
+	await fake_redis.delete("chat:fx:m3:audit:lock")
+	assert await side_effects.apply_batch([event], repo) == {"1-0"}
+	assert recorded["audit"] == ["m3"]
+	assert await fake_redis.exists("chat:fx:m3:audit") == 1
+	assert await side_effects.apply_batch([event], repo) == {"1-0"}
+	assert recorded["audit"] == ["m3"]
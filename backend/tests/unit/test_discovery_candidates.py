@@ -0,0 +1,129 @@
+from uuid import uuid4
+
+import pytest
+
+from app.domain.discovery import candidates, service
+from app.infra.auth import AuthenticatedUser
+
+
+class _Conn:
+	def __init__(self, responses):
+		self.responses = responses
+		self.queries: list[tuple[str, tuple]] = []
+
+	async def fetch(self, sql, *args):
+		self.queries.append((sql, args))
+		for marker, rows in self.responses:
+			if marker in sql:
+				return rows(args) if callable(rows) else rows
+		return []
+
+
+class _Acquire:
+	def __init__(self, conn):
+		self.conn = conn
+
+	async def __aenter__(self):
+		return self.conn
+
+	async def __aexit__(self, exc_type, exc, tb):
+		return False
+
+
+class _Pool:
+	def __init__(self, conn):
+		self.conn = conn
+
+	def acquire(self):
+		return _Acquire(self.conn)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_and_read_candidates(fake_redis):
+	conn = _Conn([("WITH me AS", [{"id": "u2", "score": 8}, {"id": "u3", "score": 2}])])
+	assert await candidates.read_candidates("u1", limit=10) is None
+
+	assert await candidates.rebuild_user(conn, "u1") == 2
+	assert await candidates.read_candidates("u1", limit=10) == [("u2", 8.0), ("u3", 2.0)]
+	assert await candidates.read_candidates("u1", limit=1) == [("u2", 8.0)]
+
+	# A user with no related candidates is still marked as built.
+	empty = _Conn([("WITH me AS", [])])
+	await candidates.rebuild_user(empty, "u9")
+	assert await candidates.read_candidates("u9", limit=10) == []
+	assert await fake_redis.ttl(candidates.candidate_key("u9")) > 0
+
+
+@pytest.mark.asyncio
+async def test_worker_fans_out_friend_and_course_changes(fake_redis, monkeypatch):
+	rebuilt: list[str] = []
+
+	async def _rebuild(conn, user_id):
+		rebuilt.append(user_id)
+		return 0
+
+	conn = _Conn(
+		[
+			("FROM friendships", [{"friend_id": "f1"}, {"friend_id": "f2"}]),
+			("FROM user_courses", [{"user_id": "c1"}, {"user_id": "a"}]),
+		]
+	)
+
+	async def _get_pool():
+		return _Pool(conn)
+
+	monkeypatch.setattr(candidates, "rebuild_user", _rebuild)
+	monkeypatch.setattr(candidates, "get_pool", _get_pool)
+
+	await candidates.mark_friendship_changed("a", "b")
+	await candidates.mark_courses_changed("z", ["COMP 202"])
+	worker = candidates.CandidateIndexWorker()
+	assert await worker.process_once() == 6
+	assert sorted(rebuilt) == ["a", "b", "c1", "f1", "f2", "z"]
+	assert await worker.process_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_candidates_follow_index_order(fake_redis, monkeypatch):
+	me = uuid4()
+	campus = uuid4()
+	first, second = uuid4(), uuid4()
+	await fake_redis.zadd(candidates.candidate_key(str(me)), {str(first): 9, str(second): 3, "_": -1})
+
+	def _profile(uid, fof):
+		return {
+			"id": uid,
+			"display_name": str(uid)[:4],
+			"handle": str(uid)[:6],
+			"avatar_url": None,
+			"major": None,
+			"graduation_year": None,
+			"passions": [],
+			"profile_gallery": None,
+			"is_university_verified": False,
+			"gender": None,
+			"birthday": None,
+			"hometown": None,
+			"languages": [],
+			"relationship_status": None,
+			"sexual_orientation": None,
+			"looking_for": [],
+			"height": None,
+			"lifestyle": None,
+			"profile_prompts": None,
+			"courses": [],
+			"is_fof": fof,
+		}
+
+	conn = _Conn([("WHERE u.id = ANY($2::uuid[])", [_profile(second, False), _profile(first, True)])])
+
+	async def _get_pool():
+		return _Pool(conn)
+
+	monkeypatch.setattr(service, "get_pool", _get_pool)
+	cards = await service._fetch_priority_candidates(AuthenticatedUser(id=str(me), campus_id=str(campus)), limit=5)
+
+	assert [card.user_id for card in cards] == [first, second]
+	assert cards[0].is_friend_of_friend is True
+	assert len(conn.queries) == 1
+	assert conn.queries[0][1][1] == [str(first), str(second)]
@@ -0,0 +1,91 @@
+import pytest
+
+from app.domain.rooms import chat_service, receipts
+from app.infra.ephemeral import TypingDebouncer
+
+
+def test_typing_debounce_forwards_first_keystroke_and_state_changes():
+    debouncer = TypingDebouncer("test_typing", window_seconds=2.0)
+
+    assert debouncer.admit("alice", "bob", now=0.0) is True
+    assert debouncer.admit("alice", "bob", now=0.5) is False
+    assert debouncer.admit("alice", "carol", now=0.5) is True
+    assert debouncer.admit("alice", "bob", state=False, now=1.0) is True
+    assert debouncer.admit("alice", "bob", now=1.1) is True
+    assert debouncer.admit("alice", "bob", now=3.2) is True
+
+
+def test_typing_debounce_stays_bounded():
+    debouncer = TypingDebouncer("test_typing", window_seconds=2.0, max_keys=2)
+    for idx in range(5):
+        assert debouncer.admit(f"user-{idx}", "room", now=float(idx)) is True
+    assert len(debouncer._last) <= 2
+
+
+@pytest.mark.asyncio
+async def test_receipts_flush_once_per_key_with_max_seq(fake_redis, monkeypatch):
+    batches: list[list[receipts.ReceiptUpdate]] = []
+    emitted: list[tuple[str, dict]] = []
+
+    async def _apply(updates):
+        batches.append(list(updates))
+        return list(updates)
+
+    async def _emit_message(event, room_id, payload):
+        emitted.append((event, payload))
+
+    async def _emit_user_event(user_id, event, payload):
+        emitted.append((event, payload))
+
+    monkeypatch.setattr(receipts.sockets, "emit_message", _emit_message)
+    monkeypatch.setattr(receipts.sockets, "emit_user_event", _emit_user_event)
+    coalescer = receipts.ReceiptCoalescer(_apply, flush_interval=60.0)
+
+    for seq in (3, 7, 5):
+        coalescer.record_read("room-1", "alice", seq)
+    for seq in (8, 9):
+        coalescer.record_delivered("room-1", "bob", seq)
+
+    assert await coalescer.flush() == 2
+    assert len(batches) == 1
+    by_user = {update.user_id: update for update in batches[0]}
+    assert (by_user["alice"].read_seq, by_user["alice"].delivered_seq) == (7, 7)
+    assert (by_user["bob"].read_seq, by_user["bob"].delivered_seq) == (0, 9)
+    assert sorted(event for event, _ in emitted) == ["room:msg:delivered", "room_msg_read"]
+    assert await coalescer.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_receipts_emit_delivered_and_read_when_both_pending(fake_redis, monkeypatch):
+    emitted: list[tuple[str, int]] = []
+
+    async def _apply(updates):
+        return list(updates)
+
+    async def _emit_message(event, room_id, payload):
+        emitted.append((event, payload["up_to_seq"]))
+
+    async def _emit_user_event(user_id, event, payload):
+        emitted.append((event, payload["up_to_seq"]))
+
+    monkeypatch.setattr(receipts.sockets, "emit_message", _emit_message)
+    monkeypatch.setattr(receipts.sockets, "emit_user_event", _emit_user_event)
+    coalescer = receipts.ReceiptCoalescer(_apply, flush_interval=60.0)
+
+    coalescer.record_delivered("room-1", "alice", 9)
+    coalescer.record_read("room-1", "alice", 6)
+
+    assert await coalescer.flush() == 1
+    assert emitted == [("room:msg:delivered", 9), ("room_msg_read", 6)]
+
+
+@pytest.mark.asyncio
+async def test_memory_store_applies_receipts_monotonically():
+    await chat_service.reset_message_store()
+    repo = chat_service.RoomChatRepository()
+    repo._pool_checked = True
+
+    await repo.apply_receipts([receipts.ReceiptUpdate("room-1", "alice", delivered_seq=5, read_seq=4)])
+    applied = await repo.apply_receipts([receipts.ReceiptUpdate("room-1", "alice", delivered_seq=2, read_seq=2)])
+
+    assert (applied[0].delivered_seq, applied[0].read_seq) == (5, 4)
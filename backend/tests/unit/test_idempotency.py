@@ -0,0 +1,51 @@
+import pytest
+
+from app.infra import idempotency
+from app.settings import settings
+
+
+@pytest.fixture
+def no_postgres(monkeypatch):
+	async def _unavailable():
+		raise AssertionError("postgres should not be touched")
+
+	monkeypatch.setattr(idempotency, "get_pool", _unavailable)
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_reserves_replays_and_detects_conflicts(fake_redis, no_postgres):
+	assert await idempotency.begin("k1", "messages.send", payload_hash="h1") is None
+	# In flight: a concurrent replay neither wins nor sees a result.
+	assert await idempotency.begin("k1", "messages.send", payload_hash="h1") is None
+
+	await idempotency.complete("k1", "messages.send", "msg-1", payload_hash="h1")
+	assert await idempotency.begin("k1", "messages.send", payload_hash="h1") == {"result_id": "msg-1"}
+	with pytest.raises(idempotency.IdempotencyConflictError):
+		await idempotency.begin("k1", "messages.send", payload_hash="other")
+	# Handlers have separate key spaces.
+	assert await idempotency.begin("k1", "invitations.create", payload_hash="h1") is None
+
+
+@pytest.mark.asyncio
+async def test_durable_window_consults_postgres_after_redis_expiry(fake_redis, monkeypatch):
+	monkeypatch.setattr(settings, "idempotency_redis_ttl_seconds", 60)
+	monkeypatch.setattr(settings, "idempotency_ttl_seconds", 3600)
+
+	async def _lookup(key, handler):
+		return {"result_id": "msg-9", "payload_hash": "h9"}
+
+	monkeypatch.setattr(idempotency, "_pg_lookup", _lookup)
+	assert await idempotency.begin("old", "messages.send", payload_hash="h9") == {"result_id": "msg-9"}
+
+
+def test_client_key_ignores_minted_keys():
+	class _State:
+		idem_key = "abc"
+		idem_key_generated = True
+
+	class _Request:
+		state = _State()
+
+	assert idempotency.client_key(_Request()) is None
+	_State.idem_key_generated = False
+	assert idempotency.client_key(_Request()) == "abc"
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from asyncpg.exceptions import ForeignKeyViolationError
+
+from app.domain.identity import audit, audit_writer
+from app.domain.identity.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def copies(monkeypatch):
+	batches: list[list[str]] = []
+
+	async def _copy(rows):
+		batches.append([row.event for row in rows])
+
+	monkeypatch.setattr(audit_writer, "copy_rows", _copy)
+	return batches
+
+
+def _row(event: str) -> audit_writer.AuditRow:
+	return audit_writer.make_row(event, user_id="u1", ip="203.0.113.9", user_agent="pytest", meta={"k": 1})
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_queued_rows_in_batches(fake_redis, copies):
+	writer = AuditWriter(max_queue=100, batch_size=3, flush_interval=0.01)
+	for idx in range(5):
+		writer.submit(_row(f"e{idx}"))
+	assert await writer.flush() == 5
+	assert copies == [["e0", "e1", "e2"], ["e3", "e4"]]
+
+
+@pytest.mark.asyncio
+async def test_overflow_spills_to_redis_and_is_recovered(fake_redis, copies):
+	writer = AuditWriter(max_queue=1, batch_size=10, flush_interval=0.01)
+	writer.submit(_row("kept"))
+	writer.submit(_row("overflow"))
+	await asyncio.sleep(0)
+	await asyncio.gather(*writer._spill_tasks)
+	assert await fake_redis.xlen(audit_writer.SPILL_STREAM) == 1
+
+	assert await writer._drain_spill() == 1
+	assert copies == [["overflow"]]
+	assert await fake_redis.xlen(audit_writer.SPILL_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_copy_spills_batch(fake_redis, monkeypatch):
+	async def _fail(rows):
+		raise RuntimeError("db down")
+
+	monkeypatch.setattr(audit_writer, "copy_rows", _fail)
+	writer = AuditWriter(max_queue=10, batch_size=10, flush_interval=0.01)
+	writer.submit(_row("a"))
+	writer.submit(_row("b"))
+	await writer.flush()
+	entries = await fake_redis.xrange(audit_writer.SPILL_STREAM)
+	assert [fields["event"] for _, fields in entries] == ["a", "b"]
+	assert audit_writer.AuditRow.from_fields(entries[0][1]).ip == "203.0.113.9"
+
+
+@pytest.mark.asyncio
+async def test_log_event_queues_when_writer_running(fake_redis, copies, monkeypatch):
+	writer = AuditWriter(max_queue=10, batch_size=10, flush_interval=0.01)
+	writer._running = True
+	monkeypatch.setattr(audit_writer, "_WRITER", writer)
+
+	await audit.log_event("login", user_id="u1", meta={"method": "password"})
+	assert copies == []
+	events = await fake_redis.xrange(audit.STREAM_KEY)
+	assert events[0][1]["event"] == "login"
+
+	await writer.flush()
+	assert copies == [["login"]]
+
+
+@pytest.fixture
+def strict_copies(monkeypatch):
+	"""COPY that rejects whole batches containing a 'poison' event, like a FK violation."""
+
+	batches: list[list[str]] = []
+
+	async def _copy(rows):
+		if any(row.event.startswith("poison") for row in rows):
+			raise ForeignKeyViolationError("audit_logs_user_id_fkey")
+		batches.append([row.event for row in rows])
+
+	monkeypatch.setattr(audit_writer, "copy_rows", _copy)
+	return batches
+
+
+@pytest.mark.asyncio
+async def test_rejected_row_is_dead_lettered_and_the_rest_written(fake_redis, strict_copies):
+	writer = AuditWriter(max_queue=10, batch_size=10, flush_interval=0.01)
+	for event in ("a", "b", "poison", "c", "d"):
+		writer.submit(_row(event))
+
+	await writer.flush()
+
+	assert sorted(event for batch in strict_copies for event in batch) == ["a", "b", "c", "d"]
+	assert await fake_redis.xlen(audit_writer.SPILL_STREAM) == 0
+	dead = await fake_redis.xrange(audit_writer.DEAD_LETTER_STREAM)
+	assert [(fields["event"], fields["error"].split(":")[0]) for _, fields in dead] == [("poison", "ForeignKeyViolationError")]
+
+
+@pytest.mark.asyncio
+async def test_spill_drain_moves_past_a_poison_row(fake_redis, strict_copies):
+	writer = AuditWriter(max_queue=10, batch_size=3, flush_interval=0.01)
+	await writer._spill([_row(event) for event in ("poison-1", "a", "b", "c", "poison-2")])
+
+	assert await writer._drain_spill() == 2
+	assert await writer._drain_spill() == 1
+	assert await writer._drain_spill() == 0
+
+	assert sorted(event for batch in strict_copies for event in batch) == ["a", "b", "c"]
+	assert await fake_redis.xlen(audit_writer.SPILL_STREAM) == 0
+	assert await fake_redis.xlen(audit_writer.DEAD_LETTER_STREAM) == 2
+
+
+@pytest.mark.asyncio
+async def test_drain_keeps_unwritten_entries_when_the_database_goes_away(fake_redis, monkeypatch):
+	calls = 0
+
+	async def _copy(rows):
+		nonlocal calls
+		calls += 1
+		if calls == 1:
+			raise ForeignKeyViolationError("audit_logs_user_id_fkey")
+		if calls == 3:
+			raise ConnectionError("db down")
+
+	monkeypatch.setattr(audit_writer, "copy_rows", _copy)
+	writer = AuditWriter(max_queue=10, batch_size=4, flush_interval=0.01)
+	await writer._spill([_row(event) for event in ("a", "b", "c", "d")])
+
+	with pytest.raises(audit_writer.CopyInterrupted):
+		await writer._drain_spill()
+
+	remaining = await fake_redis.xrange(audit_writer.SPILL_STREAM)
+	assert [fields["event"] for _, fields in remaining] == ["c", "d"]
+
+	monkeypatch.setattr(audit_writer, "copy_rows", lambda rows: asyncio.sleep(0))
+	assert await writer._drain_spill() == 2
+	assert await fake_redis.xlen(audit_writer.SPILL_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_drains_copy_each_spilled_row_once(fake_redis, monkeypatch):
+	copied: list[str] = []
+
+	async def _copy(rows):
+		# Yield mid-copy so the other writer's drain runs before this one deletes anything.
+		await asyncio.sleep(0.01)
+		copied.extend(row.event for row in rows)
+
+	monkeypatch.setattr(audit_writer, "copy_rows", _copy)
+	first = AuditWriter(max_queue=10, batch_size=3, flush_interval=0.01, consumer="api-1")
+	second = AuditWriter(max_queue=10, batch_size=3, flush_interval=0.01, consumer="api-2")
+	events = [f"e{idx}" for idx in range(6)]
+	await first._spill([_row(event) for event in events])
+
+	recovered = await asyncio.gather(first._drain_spill(), second._drain_spill())
+
+	assert recovered == [3, 3]
+	assert sorted(copied) == events
+	assert await fake_redis.xlen(audit_writer.SPILL_STREAM) == 0
+	assert await asyncio.gather(first._drain_spill(), second._drain_spill()) == [0, 0]
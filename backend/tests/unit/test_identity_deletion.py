@@ -33,6 +33,7 @@ class DummyAcquire:
 class DummyConnection:
     def __init__(self) -> None:
         self.executed: list[tuple[str, tuple[Any, ...]]] = []
+        self.fetched: list[tuple[str, tuple[Any, ...]]] = []
         self.last_status: dict[str, Any] | None = None
 
     async def execute(self, query: str, *params: Any) -> None:
@@ -61,6 +62,12 @@ class DummyConnection:
         elif "update account_deletions" in normalized and "purged_at" in normalized and self.last_status:
             self.last_status["purged_at"] = datetime.now(timezone.utc)
 
+    async def fetch(self, query: str, *params: Any) -> list[dict[str, Any]]:
+        self.fetched.append((query.strip(), params))
+        if "DELETE FROM room_messages" in query:
+            return [{"room_id": "room-1"}, {"room_id": "room-1"}]
+        return []
+
     async def fetchrow(self, query: str, *params: Any) -> dict[str, Any] | None:
         if "select requested_at" in query.lower():
             if not self.last_status or self.last_status["user_id"] != params[0]:
@@ -148,6 +155,7 @@ async def test_confirm_deletion_revokes_sessions_and_clears_token(monkeypatch):
     log_event.reset_mock()
     send_mail.reset_mock()
 
+    await redis_client.rpush("room:tail:room-1", "{}")
     status = await deletion.confirm_deletion(auth_user, token)
 
     assert status.requested_at is not None
@@ -158,4 +166,11 @@ async def test_confirm_deletion_revokes_sessions_and_clears_token(monkeypatch):
     log_event.assert_awaited_once()
     # Verify that a delete from users was part of the transaction
     assert any("delete from users" in query.lower() for query, _ in conn.executed)
-
+    # Compacted chat and room history is purged alongside the hot tables
+    assert any("FROM chat_message_segments" in query for query, _ in conn.fetched)
+    assert any("FROM room_message_segments" in query for query, _ in conn.fetched)
+    # Every process drops the account from its typeahead index
+    entries = await redis_client.xrange("search:typeahead:profiles")
+    assert entries[-1][1]["user_id"] == auth_user.id and entries[-1][1]["deleted"] == "1"
+    # Room tails holding the deleted user's messages are dropped
+    assert await redis_client.exists("room:tail:room-1") == 0
@@ -0,0 +1,116 @@
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+from pydantic import ValidationError
+
+from app.moderation.api.hashes_admin import HashEntryIn
+from app.moderation.domain.hashing import (
+    BAND_COUNT,
+    DIGEST_ALGO,
+    NEAR_DUPLICATE_ALGOS,
+    MultiIndexHash,
+    PerceptualHasher,
+    band_candidates,
+    hash_bands,
+)
+from app.moderation.domain.safety_repository import InMemorySafetyRepository, MediaHashUpsert
+
+
+def _image(seed: int, size: tuple[int, int] = (320, 240)) -> Image.Image:
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0 = rng.randint(0, size[0]), rng.randint(0, size[1])
+        x1, y1 = x0 + rng.randint(20, 160), y0 + rng.randint(20, 120)
+        draw.ellipse((x0, y0, x1, y1), fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    return image
+
+
+def _encode(image: Image.Image, fmt: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("algo", ["phash", "dhash", "ahash"])
+def test_resized_reencoded_copy_stays_within_radius(algo):
+    hasher = PerceptualHasher()
+    original = _image(1)
+    copy = original.resize((160, 120))
+
+    source = hasher.compute(_encode(original, "PNG"), algo=algo)
+    reencoded = hasher.compute(_encode(copy, "JPEG", quality=60), algo=algo)
+    unrelated = hasher.compute(_encode(_image(2), "PNG"), algo=algo)
+
+    assert source.algo == algo and len(source.value) == 16
+    assert PerceptualHasher.hamming_distance(source.value, reencoded.value) <= 8
+    assert PerceptualHasher.hamming_distance(source.value, unrelated.value) > 12
+
+
+def test_undecodable_payload_falls_back_to_digest():
+    result = PerceptualHasher().compute(b"%PDF-1.7 not an image")
+
+    assert result.algo == DIGEST_ALGO
+    assert result == PerceptualHasher().compute(b"%PDF-1.7 not an image")
+
+
+def test_multi_index_matches_linear_scan():
+    rng = random.Random(5)
+    hashes = [f"{rng.getrandbits(64):016x}" for _ in range(2000)]
+    index = MultiIndexHash(hashes)
+    query = f"{int(hashes[17], 16) ^ 0b1011:016x}"
+
+    expected = sorted(
+        distance
+        for distance in (PerceptualHasher.hamming_distance(query, value) for value in hashes)
+        if distance <= 10
+    )
+
+    assert len(index) == len(set(hashes))
+    assert [distance for _, distance in index.search(query, 10)] == expected
+    assert index.search(query, 10)[0] == (hashes[17], 3)
+
+
+def test_band_probes_cover_radius():
+    rng = random.Random(9)
+    radius = 9
+    base = rng.getrandbits(64)
+    query = f"{base:016x}"
+    probes = [set(band_candidates(band, radius // BAND_COUNT)) for band in hash_bands(query)]
+
+    assert len(probes[0]) == 1 + 16 + 120
+    for _ in range(500):
+        flipped = base
+        for position in rng.sample(range(64), rng.randint(0, radius)):
+            flipped ^= 1 << position
+        bands = hash_bands(f"{flipped:016x}")
+        assert any(band in probe for band, probe in zip(bands, probes))
+
+
+@pytest.mark.asyncio
+async def test_in_memory_repository_finds_near_duplicate():
+    hasher = PerceptualHasher()
+    known = hasher.compute(_encode(_image(3), "PNG"))
+    repo = InMemorySafetyRepository()
+    await repo.bulk_upsert_media_hashes(
+        [MediaHashUpsert(algo="phash", hash_value=known.value, label="csam", source="ncmec")]
+    )
+
+    upload = hasher.compute(_encode(_image(3).resize((200, 150)), "JPEG", quality=70))
+    match = await repo.find_similar_media_hash("phash", upload.value, max_distance=8)
+
+    assert match is not None
+    entry, distance = match
+    assert entry.label == "csam"
+    assert distance <= 8
+    assert await repo.find_similar_media_hash("phash", hasher.compute(_encode(_image(4), "PNG")).value, max_distance=8) is None
+
+
+def test_hash_import_only_accepts_algorithms_the_hasher_computes():
+    for algo in NEAR_DUPLICATE_ALGOS:
+        assert HashEntryIn(algo=algo, hash="ab" * 8, label="csam", source="ncmec").algo == algo
+    with pytest.raises(ValidationError):
+        HashEntryIn(algo="pdq", hash="ab" * 64, label="csam", source="ncmec")
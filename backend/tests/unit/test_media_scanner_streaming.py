@@ -0,0 +1,180 @@
+import asyncio
+import io
+import json
+
+import pytest
+from PIL import Image
+
+from app.moderation.domain.hashing import PerceptualHasher
+from app.moderation.domain.media_stream import ByteBudget, MediaTooLarge, read_bounded
+from app.moderation.domain.nsfw_client import NsfwScore
+from app.moderation.domain.ocr_client import NoopOcrClient
+from app.moderation.domain.safety_repository import AttachmentSafetyRecord, InMemorySafetyRepository
+from app.moderation.domain.thresholds import ModerationThresholds
+from app.moderation.workers.image_scanner import ImageScannerWorker
+
+
+def _jpeg(size=(1600, 1200)) -> bytes:
+    buffer = io.BytesIO()
+    Image.effect_noise(size, 30).convert("RGB").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class _Streams:
+    def __init__(self, entries) -> None:
+        self.entries = entries
+        self.added: list[tuple[str, dict]] = []
+
+    async def xread(self, streams, count, block):
+        return [("scan:ingress:media", self.entries)]
+
+    async def xadd(self, stream, fields):
+        self.added.append((stream, dict(fields)))
+        return "0-1"
+
+
+class _Storage:
+    def __init__(self, objects, budget_probe) -> None:
+        self.objects = objects
+        self.budget_probe = budget_probe
+        self.active = 0
+        self.peak_active = 0
+        self.peak_reserved = 0
+
+    async def fetch(self, key, *, max_bytes=None):  # pragma: no cover - stream is preferred
+        raise AssertionError("fetch should not be used when stream is available")
+
+    async def stream(self, key, *, chunk_size):
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        self.peak_reserved = max(self.peak_reserved, self.budget_probe().in_use)
+        try:
+            data = self.objects[key]
+            for offset in range(0, len(data), chunk_size):
+                await asyncio.sleep(0)
+                yield data[offset : offset + chunk_size]
+        finally:
+            self.active -= 1
+
+
+class _RecordingNsfw:
+    def __init__(self) -> None:
+        self.sizes: list[tuple[int, str | None]] = []
+
+    async def score(self, payload, *, mime=None):
+        self.sizes.append((len(payload), mime))
+        return NsfwScore(nsfw=0.0, gore=0.0)
+
+
+def _worker(objects, *, concurrency, inflight):
+    repo = InMemorySafetyRepository()
+    entries = []
+    for index, (key, data) in enumerate(objects.items()):
+        repo.attachments[key] = AttachmentSafetyRecord(
+            attachment_id=key,
+            subject_type="post",
+            subject_id=f"p{index}",
+            s3_key=key,
+            mime="image/jpeg",
+            size_bytes=len(data),
+            safety_status="pending",
+            safety_score={},
+            scanned_at=None,
+        )
+        entries.append((f"{index}-0", {"type": "image", "attachment_id": key}))
+    streams = _Streams(entries)
+    nsfw = _RecordingNsfw()
+    worker = ImageScannerWorker(
+        redis=streams,
+        repository=repo,
+        storage=None,  # type: ignore[arg-type]
+        hasher=PerceptualHasher(),
+        nsfw=nsfw,
+        ocr=NoopOcrClient(),
+        thresholds=ModerationThresholds.default(),
+        concurrency=concurrency,
+        max_inflight_bytes=inflight,
+        chunk_size=64 * 1024,
+        thumbnail_size=256,
+    )
+    storage = _Storage(objects, worker._byte_budget)
+    worker.storage = storage
+    return worker, storage, streams, nsfw, repo
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_never_exceeds_limit_and_admits_in_order():
+    budget = ByteBudget(100)
+    order: list[str] = []
+    peak = 0
+
+    async def job(name: str, amount: int) -> None:
+        nonlocal peak
+        async with budget.reserve(amount):
+            peak = max(peak, budget.in_use)
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(job("a", 60), job("b", 60), job("c", 10), job("huge", 500))
+
+    assert peak <= 100
+    assert order == ["a", "b", "c", "huge"]
+    assert budget.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_read_bounded_rejects_oversized_stream():
+    async def chunks():
+        for _ in range(4):
+            yield b"x" * 10
+
+    assert await read_bounded(chunks(), 40) == b"x" * 40
+    with pytest.raises(MediaTooLarge):
+        await read_bounded(chunks(), 35)
+
+
+@pytest.mark.asyncio
+async def test_scans_run_concurrently_within_byte_budget():
+    image = _jpeg()
+    objects = {f"k{index}": image for index in range(6)}
+    budget = len(image) * 2
+    worker, storage, streams, nsfw, repo = _worker(objects, concurrency=4, inflight=budget)
+
+    await worker.run_once()
+
+    assert worker.last_id == "5-0"
+    assert storage.peak_active == 2
+    assert storage.peak_reserved <= budget
+    assert worker._byte_budget().in_use == 0
+    assert all(record.safety_status == "clean" for record in repo.attachments.values())
+    assert len([stream for stream, _ in streams.added if stream == "scan:results"]) == 6
+    # The classifier sees a small thumbnail, not the multi-megapixel original.
+    assert all(size < len(image) // 4 and mime == "image/jpeg" for size, mime in nsfw.sizes)
+
+
+@pytest.mark.asyncio
+async def test_non_image_payload_is_digested_and_under_declared_objects_are_rescanned():
+    objects = {"doc": b"%PDF-1.7 " * 100, "big": _jpeg()}
+    worker, storage, streams, _, repo = _worker(objects, concurrency=2, inflight=1024 * 1024)
+    repo.attachments["big"].size_bytes = 1000
+
+    await worker.run_once()
+
+    signals = json.loads(next(fields["signals"] for stream, fields in streams.added if fields.get("attachment_id") == "doc"))
+    assert signals["hash_value"] == PerceptualHasher().digest(objects["doc"]).value
+    assert repo.attachments["big"].safety_status == "clean"
+    assert worker._byte_budget().in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_objects_past_max_fetch_bytes_are_held_for_review():
+    objects = {"big": _jpeg()}
+    worker, _, streams, nsfw, repo = _worker(objects, concurrency=1, inflight=1024 * 1024)
+    worker.max_fetch_bytes = len(objects["big"]) // 2
+    repo.attachments["big"].size_bytes = 1000
+
+    await worker.run_once()
+
+    assert repo.attachments["big"].safety_status == "needs_review"
+    assert nsfw.sizes == []
+    assert [(stream, fields["reason"]) for stream, fields in streams.added] == [("scan:quarantine", "too_large")]
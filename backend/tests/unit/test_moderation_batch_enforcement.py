@@ -0,0 +1,195 @@
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+
+from app.moderation.domain.enforcement import (
+    EnforcementBatchError,
+    EnforcementRequest,
+    InMemoryModerationRepository,
+    ModerationEnforcer,
+)
+from app.moderation.domain.policy_engine import Decision
+from app.moderation.domain.trust import TrustLedger
+from app.moderation.infra.trust_repo import PostgresTrustRepository
+from app.moderation.workers.results_worker import ResultsWorker
+
+
+class RecordingHooks:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str]] = []
+
+    async def tombstone(self, case, payload):
+        self.calls.append(("tombstone", case.subject_id))
+
+    async def remove(self, case, payload):
+        raise RuntimeError("remove hook down")
+
+    async def warn(self, case, payload):
+        self.calls.append(("warn", case.subject_id))
+
+
+class CountingRepository(InMemoryModerationRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batch_calls = 0
+
+    async def prepare_cases(self, requests):
+        self.batch_calls += 1
+        return await super().prepare_cases(requests)
+
+    async def commit_actions(self, pending):
+        self.batch_calls += 1
+        return await super().commit_actions(pending)
+
+
+def _request(subject_id: str, action: str) -> EnforcementRequest:
+    return EnforcementRequest(
+        subject_type="post",
+        subject_id=subject_id,
+        actor_id="actor-1",
+        base_reason="auto_policy",
+        decision=Decision(action=action, severity=2, payload={}, reasons=[]),
+        policy_id=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_apply_decisions_batches_and_dedupes_like_sequential_calls() -> None:
+    repository = CountingRepository()
+    hooks = RecordingHooks()
+    enforcer = ModerationEnforcer(repository=repository, hooks=hooks)  # type: ignore[arg-type]
+
+    results = await enforcer.apply_decisions(
+        [
+            _request("p1", "tombstone"),
+            _request("p1", "tombstone"),
+            _request("p2", "remove"),
+            _request("p2", "warn"),
+        ]
+    )
+
+    assert repository.batch_calls == 2
+    assert hooks.calls == [("tombstone", "p1"), ("warn", "p2")]
+    assert isinstance(results[2], RuntimeError)
+    assert [result[1].action for result in (results[0], results[1], results[3])] == ["tombstone", "tombstone", "warn"]
+    assert [entry.action for entry in repository.actions["post:p1"]] == ["tombstone"]
+    assert repository.cases["post:p2"].status == "actioned"
+    assert [entry.meta["action"] for entry in repository.audit_log] == ["tombstone", "warn"]
+
+    again = await enforcer.apply_decisions([_request("p1", "tombstone")])
+    assert again[0][1].action == "tombstone"
+    assert hooks.calls == [("tombstone", "p1"), ("warn", "p2")]
+
+
+class BatchTrustRepository:
+    def __init__(self) -> None:
+        self.scores = {"known": 80}
+        self.calls: list[str] = []
+
+    async def get_score(self, user_id: str) -> int | None:
+        raise AssertionError("per-user read on batch path")
+
+    async def upsert_score(self, user_id: str, score: int, event_at: datetime) -> None:
+        raise AssertionError("per-user write on batch path")
+
+    async def get_scores(self, user_ids):
+        self.calls.append("get_scores")
+        return {user_id: self.scores[user_id] for user_id in user_ids if user_id in self.scores}
+
+    async def seed_scores(self, user_ids, score, event_at):
+        self.calls.append("seed_scores")
+        self.scores.update({user_id: score for user_id in user_ids})
+
+
+@pytest.mark.asyncio
+async def test_hydrate_many_reads_once_and_seeds_missing() -> None:
+    repository = BatchTrustRepository()
+    ledger = TrustLedger(repository=repository)  # type: ignore[arg-type]
+
+    scores = await ledger.hydrate_many(["known", "new", "known"])
+
+    assert scores == {"known": 80, "new": 50}
+    assert repository.calls == ["get_scores", "seed_scores"]
+    assert repository.scores["new"] == 50
+
+
+class _TrustPool:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.params: list[list[str]] = []
+
+    async def fetch(self, sql, ids):
+        self.params.append(ids)
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_postgres_get_scores_matches_any_uuid_spelling() -> None:
+    user_id = UUID("0f8fad5b-d9cb-469f-a165-70867728950e")
+    pool = _TrustPool([{"user_id": user_id, "score": 72}])
+    repository = PostgresTrustRepository(pool)  # type: ignore[arg-type]
+    spellings = [str(user_id).upper(), user_id.hex, "{%s}" % user_id]
+
+    scores = await repository.get_scores(spellings)
+
+    assert scores == {spelling: 72 for spelling in spellings}
+    assert pool.params == [[str(user_id)]]
+
+
+class _Streams:
+    def __init__(self, entries) -> None:
+        self.entries = entries
+        self.added: list[dict] = []
+        self.reads: list[str] = []
+
+    async def xread(self, streams, count, block):
+        (last_id,) = streams.values()
+        self.reads.append(last_id)
+        pending = [entry for entry in self.entries if _id(entry[0]) > _id(last_id)]
+        return [("scan:results", pending)] if pending else []
+
+    async def xadd(self, stream, fields):
+        self.added.append(dict(fields))
+        return "0-1"
+
+
+def _id(entry_id: str) -> tuple[int, int]:
+    ms, seq = entry_id.split("-")
+    return int(ms), int(seq)
+
+
+class FlakyHooks(RecordingHooks):
+    def __init__(self) -> None:
+        super().__init__()
+        self.fail_remove = True
+
+    async def remove(self, case, payload):
+        if self.fail_remove:
+            raise RuntimeError("remove hook down")
+        self.calls.append(("remove", case.subject_id))
+
+
+@pytest.mark.asyncio
+async def test_results_worker_stops_cursor_at_first_failure_and_retries() -> None:
+    entries = [
+        (f"{index}-0", {"suggested_action": action, "subject_type": "post", "subject_id": f"p{index}", "signals": "{}"})
+        for index, action in enumerate(["warn", "remove", "tombstone"], start=1)
+    ]
+    streams = _Streams(entries)
+    hooks = FlakyHooks()
+    worker = ResultsWorker(redis=streams, enforcer=ModerationEnforcer(repository=InMemoryModerationRepository(), hooks=hooks))  # type: ignore[arg-type]
+
+    with pytest.raises(EnforcementBatchError):
+        await worker.run_once()
+
+    assert worker.last_id == "1-0"
+    assert [fields["subject_id"] for fields in streams.added] == ["p1"]
+
+    hooks.fail_remove = False
+    await worker.run_once()
+
+    assert worker.last_id == "3-0"
+    assert [fields["subject_id"] for fields in streams.added] == ["p1", "p2", "p3"]
+    # p3 was enforced during the failed pass and is not dispatched twice.
+    assert hooks.calls == [("warn", "p1"), ("tombstone", "p3"), ("remove", "p2")]
@@ -0,0 +1,127 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from app.moderation.domain import dashboard_queries
+from app.moderation.workers.rollup_reconciler import DashboardRollupReconciler
+
+
+class RecordingConn:
+    """Records statements and answers with canned rows."""
+
+    def __init__(self, row=None, rows=(), value=None):
+        self.row = row
+        self.rows = list(rows)
+        self.value = value
+        self.statements: list[tuple[str, tuple]] = []
+        self.in_transaction = False
+
+    async def fetchrow(self, sql, *params):
+        self.statements.append((sql, params))
+        return self.row
+
+    async def fetch(self, sql, *params):
+        self.statements.append((sql, params))
+        return self.rows
+
+    async def fetchval(self, sql, *params):
+        self.statements.append((sql, params))
+        return self.value
+
+    async def execute(self, sql, *params):
+        assert self.in_transaction
+        self.statements.append((sql, params))
+        return "INSERT 0 3" if sql.lstrip().startswith("INSERT") else "DELETE 7"
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+
+def _tables(sql: str) -> set[str]:
+    words = sql.replace("\n", " ").split()
+    return {words[index + 1] for index, word in enumerate(words[:-1]) if word in {"FROM", "JOIN"}}
+
+
+@pytest.mark.asyncio
+async def test_kpis_and_trends_read_only_rollup_tables():
+    row = {
+        "open_cases": 4,
+        "escalated_count": 1,
+        "resolved_today": 2,
+        "pending_appeals": 3,
+        "avg_resolution_hours": 1.5,
+        "new_reports_24h": 9,
+        "actions_24h": 5,
+    }
+    conn = RecordingConn(row=row)
+
+    kpis = await dashboard_queries.fetch_kpis(conn, campus_filter=["c1"])
+    await dashboard_queries.fetch_trends(conn, campus_filter=["c1"])
+
+    assert kpis["open_cases"] == 4 and kpis["avg_resolution_hours"] == 1.5
+    (kpi_sql, kpi_params), (trend_sql, trend_params) = conn.statements
+    assert kpi_params == (["c1"],)
+    assert trend_params[-1] == ["c1"]
+    for sql in (kpi_sql, trend_sql):
+        assert not {"mod_case", "mod_report", "mod_action", "mod_appeal"} & _tables(sql)
+
+
+@pytest.mark.asyncio
+async def test_workload_queues_come_from_gauges():
+    conn = RecordingConn(rows=[])
+
+    await dashboard_queries.fetch_workload(conn, campus_filter=["c1"])
+
+    (queue_sql, _), (sla_sql, _) = conn.statements
+    assert _tables(queue_sql) == {"mod_metrics_gauge"}
+    # SLA breaches are clock dependent and still scan the open backlog only.
+    assert "c.status = 'open'" in sla_sql
+
+
+@pytest.mark.asyncio
+async def test_reconcile_locks_before_rebuilding_hour_aligned_window():
+    conn = RecordingConn()
+    now = datetime(2026, 3, 2, 10, 41, 7, tzinfo=timezone.utc)
+
+    counts = await dashboard_queries.reconcile_rollups(conn, window_hours=24, now=now)
+
+    statements = [sql.strip().split()[0] for sql, _ in conn.statements]
+    assert statements == ["LOCK", "DELETE", "INSERT", "DELETE", "INSERT"]
+    assert conn.statements[3][1] == (datetime(2026, 3, 1, 10, tzinfo=timezone.utc),)
+    assert counts == {"gauges": 3, "buckets": 3}
+
+
+@pytest.mark.asyncio
+async def test_reconciler_logs_and_survives_failures():
+    async def _broken_pool():
+        raise RuntimeError("database unavailable")
+
+    assert await DashboardRollupReconciler(pool_factory=_broken_pool).run_once() is None
+
+
+@pytest.mark.asyncio
+async def test_first_reconciler_pass_backfills_full_history():
+    conn = RecordingConn(value=True)
+
+    class _Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield conn
+
+    async def _pool():
+        return _Pool()
+
+    reconciler = DashboardRollupReconciler(window_hours=48, pool_factory=_pool)
+    await reconciler.run_once()
+    await reconciler.run_once()
+
+    windows = [params[0] for sql, params in conn.statements if sql.startswith("DELETE FROM mod_metrics_hourly")]
+    assert windows[0] == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert windows[1] > datetime(2020, 1, 1, tzinfo=timezone.utc)
+    assert sum("NOT EXISTS" in sql for sql, _ in conn.statements) == 1
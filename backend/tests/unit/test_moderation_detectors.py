@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 import pytest
 
 from app.moderation.domain.detectors.bundle import DetectorSuite, InMemoryRateCounter, InMemoryRollingStore
@@ -13,6 +16,19 @@ def test_profanity_detector_levels() -> None:
     assert detector.evaluate("shenanigans!") == "medium"
 
 
+def test_profanity_matcher_handles_phrases_substrings_and_rebuilds() -> None:
+    detector = ProfanityDetector(lexicon={"rude phrase": "medium", "*gross*": "high"})
+    assert detector.evaluate("such a RUDE   phrase!") == "medium"
+    assert detector.evaluate("rude phrases") == "unknown"
+    assert detector.evaluate("ungrossly") == "high"
+    assert detector.evaluate("food") == "unknown"
+    assert detector.evaluate("f00 fighters") == "low"
+
+    detector.update_lexicon({"shiny": "medium"})
+    assert detector.evaluate("ungrossly") == "unknown"
+    assert detector.evaluate("so $hiny") == "medium"
+
+
 @pytest.mark.asyncio
 async def test_duplicate_detector_triggers() -> None:
     store = InMemoryRollingStore()
@@ -30,6 +46,16 @@ def test_link_safety_detector_flags() -> None:
     assert result["excessive_links"] is False
 
 
+def test_link_safety_denylist_matches_labels_not_string_suffixes() -> None:
+    detector = LinkSafetyDetector(denylist=["bad.example"])
+    result = detector.evaluate("https://cdn.BAD.example/x https://notbad.example https://bad.example.org")
+    assert result["flagged_domains"] == ["cdn.bad.example"]
+
+    detector.update_denylist(["example.org"])
+    assert detector.evaluate("https://bad.example.org")["unsafe_links"] is True
+    assert detector.evaluate("https://bad.example")["unsafe_links"] is False
+
+
 @pytest.mark.asyncio
 async def test_detector_suite_composes_results() -> None:
     suite = DetectorSuite(
@@ -43,3 +69,63 @@ async def test_detector_suite_composes_results() -> None:
     assert "profanity" in signals
     assert "dup_text_5m" in signals
     assert "high_velocity_posts" in signals
+
+
+class _SlowNsfw:
+    async def evaluate(self, media_keys=None):
+        await asyncio.sleep(1)
+        return "high"
+
+
+class _PipelineCountingRedis:
+    def __init__(self, client) -> None:
+        self.client = client
+        self.round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        outer = self
+        pipe = self.client.pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def _execute(*exec_args, **exec_kwargs):
+            outer.round_trips += 1
+            return await execute(*exec_args, **exec_kwargs)
+
+        pipe.execute = _execute
+        return pipe
+
+
+@pytest.mark.asyncio
+async def test_detector_suite_shares_one_redis_pipeline_per_event(fake_redis) -> None:
+    redis = _PipelineCountingRedis(fake_redis)
+    suite = DetectorSuite.from_redis(redis)
+    event = {"text": "same again", "actor_id": "user-3", "subject_type": "post", "trust_score": 50}
+
+    signals = [await suite.evaluate(event) for _ in range(6)]
+
+    assert redis.round_trips == 6
+    assert [result["high_velocity_posts"] for result in signals] == [False] * 5 + [True]
+    assert await fake_redis.scard(suite.duplicate.entry("user-3", "same again")[0]) == 1
+    assert all("detector_fallbacks" not in result for result in signals)
+
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_detectors_report_fallback_signals() -> None:
+    class _BrokenCounters:
+        async def observe(self, rolling, rate):
+            raise ConnectionError("redis down")
+
+    suite = DetectorSuite(nsfw=_SlowNsfw(), budgets={"nsfw": 0.01, "counters": 0.01})  # type: ignore[arg-type]
+    event = {"text": "foo", "actor_id": "user-4", "subject_type": "post"}
+
+    start = time.perf_counter()
+    signals = await suite.evaluate(event)
+
+    assert time.perf_counter() - start < 0.5
+    assert signals["nsfw"] == "unknown" and signals["profanity"] == "low"
+    assert signals["detector_fallbacks"] == ["nsfw"]
+
+    broken = DetectorSuite(counters=_BrokenCounters())
+    signals = await broken.evaluate(event)
+    assert (signals["dup_text_5m"], signals["high_velocity_posts"]) == (False, False)
+    assert signals["detector_fallbacks"] == ["counters"]
@@ -73,3 +73,45 @@ def test_policy_trust_gate() -> None:
 
     assert decision.action == "restrict_create"
     assert decision.reasons == ["low_trust"]
+
+
+def test_compiled_policy_matches_interpreter() -> None:
+    import itertools
+
+    from app.moderation.domain.policy_engine import interpret_policy
+
+    policy = Policy.from_dict(
+        "equivalence",
+        {
+            "version": 3,
+            "rules": [
+                {"id": "a", "when": {"text.any_of": ["profanity>low", "weird"]}, "then": {"action": "flag", "severity": 1, "reason": "a"}},
+                {"id": "b", "when": {"image.any_of": ["nsfw>high"]}, "then": {"action": "tombstone", "severity": 3}},
+                {"id": "c", "when": {"signals.all_of": ["dup"], "user.trust_below": 30}, "then": {"action": "shadow_hide", "severity": 3, "reason": "c"}},
+                {"id": "d", "when": {"unknown.predicate": True}, "then": {"action": "ban", "severity": 9, "reason": "d"}},
+                {"id": "e", "when": {}, "then": {"action": "noted", "severity": 0, "reason": "e"}},
+                {"id": "f", "when": {"text.any_of": ["profanity>bogus"]}, "then": {"action": "flag", "severity": 5, "reason": "f"}},
+            ],
+        },
+    )
+
+    for profanity, nsfw, dup, trust in itertools.product(
+        ["unknown", "low", "medium", "high", "weird"],
+        ["unknown", "high"],
+        [False, True],
+        [None, 10, 60],
+    ):
+        signals = {"profanity": profanity, "nsfw": nsfw, "dup": dup}
+        assert evaluate_policy(policy, signals, trust) == interpret_policy(policy, signals, trust)
+
+
+def test_compiled_policy_cached_per_policy_version() -> None:
+    from app.moderation.domain.policy_engine import compile_policy
+
+    data = {"version": 1, "rules": [{"id": "r", "when": {"user.trust_below": 20}, "then": {"action": "restrict_create"}}]}
+    first = Policy.from_dict("cache", data)
+    assert compile_policy(first) is compile_policy(first)
+
+    replacement = Policy.from_dict("cache", {**data, "rules": []})
+    assert compile_policy(replacement) is not compile_policy(first)
+    assert evaluate_policy(replacement, {}, trust_score=5).action == "none"
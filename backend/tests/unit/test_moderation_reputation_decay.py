@@ -0,0 +1,138 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.moderation.domain.reputation import (
+    DecayBatch,
+    InMemoryReputationRepository,
+    ReputationBand,
+    ReputationEvent,
+    ReputationScore,
+    ReputationService,
+    band_for_score,
+)
+from app.moderation.infra.reputation_repo import PostgresReputationRepository
+
+NOW = datetime(2026, 5, 4, 12, tzinfo=timezone.utc)
+STALE = NOW - timedelta(days=3)
+
+
+class _RecordingGateState:
+    def __init__(self) -> None:
+        self.invalidated: list[str] = []
+
+    async def invalidate(self, user_id: str) -> None:
+        self.invalidated.append(user_id)
+
+
+def _seed(repo: InMemoryReputationRepository, user_id: str, score: int, *, last_event_at: datetime = STALE) -> None:
+    repo.scores[user_id] = ReputationScore(user_id, score, band_for_score(score), last_event_at)
+
+
+@pytest.mark.asyncio
+async def test_decay_pass_walks_candidates_in_pages_and_skips_recent_offenders():
+    repo = InMemoryReputationRepository()
+    for index, score in enumerate((62, 70, 90, 81, 30)):
+        _seed(repo, f"u{index}", score)
+    _seed(repo, "u5", 90, last_event_at=NOW - timedelta(hours=1))
+    repo.events.append(ReputationEvent("u3", "post", "toxicity", 5, NOW - timedelta(hours=2)))
+    gate = _RecordingGateState()
+    service = ReputationService(repo, decay_batch_size=2, gate_state=gate)  # type: ignore[arg-type]
+
+    updated = await service.run_decay_pass(now=NOW)
+
+    assert [score.user_id for score in updated] == ["u0", "u1", "u2"]
+    assert [repo.scores[user].score for user in ("u0", "u1", "u2", "u3", "u4", "u5")] == [59, 67, 86, 81, 30, 90]
+    assert gate.invalidated == ["u0"]
+    assert repo.scores["u0"].band is ReputationBand.WATCH
+    assert [event.delta for event in repo.events if event.kind == "decay"] == [-3, -3, -4]
+    assert repo.decay_checkpoint is None
+
+    # Decayed users are not decayed again until they cool off for another window.
+    assert await service.run_decay_pass(now=NOW + timedelta(hours=1)) == []
+
+
+@pytest.mark.asyncio
+async def test_interrupted_pass_resumes_from_checkpoint():
+    class _FlakyRepo(InMemoryReputationRepository):
+        def __init__(self) -> None:
+            super().__init__()
+            self.calls = 0
+            self.afters: list[str | None] = []
+
+        async def decay_batch(self, **kwargs) -> DecayBatch:
+            self.calls += 1
+            self.afters.append(kwargs["after"])
+            if self.calls == 2:
+                raise ConnectionError("lost connection")
+            return await super().decay_batch(**kwargs)
+
+    repo = _FlakyRepo()
+    for index in range(5):
+        _seed(repo, f"u{index}", 90)
+    service = ReputationService(repo, decay_batch_size=2)
+
+    with pytest.raises(ConnectionError):
+        await service.run_decay_pass(now=NOW)
+    assert repo.decay_checkpoint == "u1"
+
+    resumed = await service.run_decay_pass(now=NOW)
+
+    assert [score.user_id for score in resumed] == ["u2", "u3", "u4"]
+    assert repo.afters == [None, "u1", "u1", "u3"]
+    assert all(score.score == 86 for score in repo.scores.values())
+
+
+class _Conn:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.statements: list[tuple[str, tuple]] = []
+        self.in_transaction = False
+
+    async def fetch(self, sql, *params):
+        assert self.in_transaction
+        self.statements.append((sql, params))
+        return self.rows
+
+    async def execute(self, sql, *params):
+        assert self.in_transaction
+        self.statements.append((sql, params))
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+
+class _Pool:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.mark.asyncio
+async def test_postgres_decay_batch_is_one_statement_plus_checkpoint():
+    rows = [
+        {"user_id": "a", "previous_band": "watch", "score": 59, "band": "watch", "last_event_at": NOW},
+        {"user_id": "b", "previous_band": "risk", "score": None, "band": None, "last_event_at": None},
+        {"user_id": "c", "previous_band": "watch", "score": 58, "band": "neutral", "last_event_at": NOW},
+    ]
+    conn = _Conn(rows)
+    repo = PostgresReputationRepository(_Pool(conn))  # type: ignore[arg-type]
+
+    batch = await repo.decay_batch(after=None, limit=3, quiet_since=STALE, rate=0.05, now=NOW)
+
+    assert batch.cursor == "c" and batch.scanned == 3
+    assert [score.user_id for score in batch.decayed] == ["a", "c"]
+    assert batch.band_changed == ["c"]
+    (decay_sql, decay_params), (checkpoint_sql, checkpoint_params) = conn.statements
+    assert "UPDATE mod_user_reputation" in decay_sql and "NOT EXISTS" in decay_sql
+    assert decay_params == (None, ["watch", "risk", "bad"], STALE, 3, 0.05, NOW)
+    assert "mod_job_checkpoint" in checkpoint_sql and checkpoint_params[1] == "c"
@@ -26,6 +26,10 @@ class StubConnection:
         self.fetch_queries.append(query)
         if "FROM messages" in query:
             return [1, 2, 3]
+        if "FROM chat_message_segments" in query:
+            return [{"message_count": 40}]
+        if "FROM room_message_segments" in query:
+            return []
         if "FROM sessions" in query:
             return [1]
         if "FROM invitations" in query:
@@ -66,7 +70,14 @@ async def test_purge_soft_deleted_aggregates_counts(monkeypatch):
 
     counts = await retention.purge_soft_deleted(batch=50)
 
-    assert counts == {"messages": 3, "sessions": 1, "invitations": 0, "skipped_holds": 0}
+    assert counts == {
+        "messages": 3,
+        "chat_message_segments": 40,
+        "room_message_segments": 0,
+        "sessions": 1,
+        "invitations": 0,
+        "skipped_holds": 0,
+    }
     assert any("LIMIT 50" in q for q in conn.fetch_queries)
     message_query = next(q for q in conn.fetch_queries if "FROM messages" in q)
     assert f"INTERVAL '{retention.MESSAGES_RETENTION_DAYS} days'" in message_query
@@ -74,6 +85,9 @@ async def test_purge_soft_deleted_aggregates_counts(monkeypatch):
     assert f"INTERVAL '{retention.SESSIONS_RETENTION_DAYS} days'" in session_query
     invite_query = next(q for q in conn.fetch_queries if "FROM invitations" in q)
     assert f"INTERVAL '{retention.INVITES_RETENTION_DAYS} days'" in invite_query
+    segment_query = next(q for q in conn.fetch_queries if "FROM chat_message_segments" in q)
+    assert "DELETE FROM chat_message_segments" in segment_query
+    assert f"INTERVAL '{retention.MESSAGES_RETENTION_DAYS} days'" in segment_query
 
 
 @pytest.mark.asyncio
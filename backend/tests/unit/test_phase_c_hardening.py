@@ -29,7 +29,7 @@ def idempotency_stub(monkeypatch):
             return None
         return {"result_id": result_id}
 
-    async def complete(key: str, handler: str, result_id: str) -> None:
+    async def complete(key: str, handler: str, result_id: str, *, payload_hash: str | None = None) -> None:
         entry = store.setdefault((key, handler), {"payload_hash": None, "result_id": None})
         entry["result_id"] = result_id
 
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.rooms import history_cache, models
+
+
+def _message(seq: int, room_id: str = "room-1") -> models.RoomMessage:
+    return models.RoomMessage(
+        id=f"msg-{seq}",
+        room_id=room_id,
+        seq=seq,
+        sender_id="user-1",
+        client_msg_id=f"client-{seq}",
+        kind="text",
+        content=f"hello {seq}",
+        media_key=None,
+        media_mime=None,
+        media_bytes=None,
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+@pytest.mark.asyncio
+async def test_append_skips_rooms_without_a_cached_tail(fake_redis):
+    await history_cache.append(_message(1))
+
+    assert await fake_redis.exists("room:tail:room-1") == 0
+    assert await history_cache.read("room-1", direction="backward", anchor=None, limit=10) is None
+
+
+@pytest.mark.asyncio
+async def test_tail_serves_room_open_and_reconnect(fake_redis):
+    await history_cache.fill("room-1", [_message(seq) for seq in range(1, 6)], version=None)
+    await history_cache.append(_message(6))
+
+    latest = await history_cache.read("room-1", direction="backward", anchor=None, limit=3)
+    assert [m.seq for m in latest] == [4, 5, 6]
+    assert latest[0].created_at == datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    resumed = await history_cache.read("room-1", direction="forward", anchor=4, limit=10)
+    assert [m.seq for m in resumed] == [5, 6]
+
+    older = await history_cache.read("room-1", direction="backward", anchor=3, limit=10)
+    assert [m.seq for m in older] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_partial_or_gapped_tail_falls_back(fake_redis, monkeypatch):
+    monkeypatch.setattr(history_cache.settings, "room_history_cache_size", 3)
+    await history_cache.fill("room-1", [_message(seq) for seq in range(1, 6)], version=None)
+
+    # Only seqs 3..5 are cached; anything older must come from Postgres.
+    assert await history_cache.read("room-1", direction="backward", anchor=None, limit=5) is None
+    assert await history_cache.read("room-1", direction="forward", anchor=1, limit=5) is None
+
+    await history_cache.append(_message(7))
+    assert await history_cache.read("room-1", direction="backward", anchor=None, limit=2) is None
+
+
+@pytest.mark.asyncio
+async def test_fill_is_dropped_when_a_send_lands_after_the_snapshot(fake_redis):
+    snapshot = await history_cache.version("room-1")
+    # Sent while the refill was reading Postgres: no tail yet, so RPUSHX is a no-op.
+    await history_cache.append(_message(6))
+    await history_cache.fill("room-1", [_message(seq) for seq in range(1, 6)], version=snapshot)
+
+    assert await fake_redis.exists("room:tail:room-1") == 0
+
+    await history_cache.fill("room-1", [_message(seq) for seq in range(1, 7)], version=await history_cache.version("room-1"))
+    assert [m.seq for m in await history_cache.read("room-1", direction="backward", anchor=None, limit=2)] == [5, 6]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_tails_and_voids_pending_fills(fake_redis):
+    await history_cache.fill("room-1", [_message(seq) for seq in range(1, 4)], version=None)
+    snapshot = await history_cache.version("room-2")
+
+    await history_cache.invalidate(["room-1", "room-2", "room-1"])
+    await history_cache.fill("room-2", [_message(1, "room-2")], version=snapshot)
+
+    assert await fake_redis.exists("room:tail:room-1", "room:tail:room-2") == 0
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 
 import pytest
@@ -79,3 +80,29 @@ async def test_send_message_and_history(fake_redis):
     assert history.items[0].content == "Hello"
 
     await chat_service.mark_read(member, room.id, ReadRequest(up_to_seq=1))
+
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sends_get_unique_sequences(fake_redis):
+    room_service = RoomService()
+    chat_service = RoomChatService(room_service=room_service)
+    owner = UserFactory("owner").to_user()
+    room = await room_service.create_room(owner, RoomCreateRequest(name="Busy", preset="12+", visibility="link"))
+    repo = chat_service._repo
+    members = await room_service._repo.list_members(room.id)
+
+    async def _send(idx: int):
+        return await repo.persist_message(
+            room_id=room.id,
+            sender_id=owner.id,
+            payload=RoomMessageSendRequest(client_msg_id=f"burst{idx:04d}", kind="text", content=str(idx)),
+            members=members,
+        )
+
+    messages = await asyncio.gather(*(_send(idx) for idx in range(25)))
+    assert sorted(m.seq for m in messages) == list(range(1, 26))
+
+    replay = await _send(3)
+    assert replay.id == messages[3].id
+    assert replay.seq == messages[3].seq
@@ -0,0 +1,74 @@
+import pytest
+
+from app.moderation.domain.scan_routing import LEGACY_SCAN_INGRESS, SCAN_STREAMS, publish_scan_job, stream_for
+from app.moderation.infra.redis import RedisStreamClient
+from app.moderation.workers.scan_router import LegacyScanRouter
+
+
+def test_stream_for_groups_media_types() -> None:
+    assert stream_for("text") == "scan:ingress:text"
+    assert stream_for("image") == stream_for("file") == "scan:ingress:media"
+    assert stream_for("video") is None
+
+
+@pytest.mark.asyncio
+async def test_publish_scan_job_targets_type_stream(fake_redis) -> None:
+    client = RedisStreamClient(fake_redis)
+    await publish_scan_job(client, {"type": "url", "url": "https://example.com"})
+
+    assert await fake_redis.xlen(SCAN_STREAMS["url"]) == 1
+    assert await fake_redis.exists(LEGACY_SCAN_INGRESS) == 0
+    with pytest.raises(ValueError):
+        await publish_scan_job(client, {"type": "video"})
+
+
+@pytest.mark.asyncio
+async def test_legacy_router_moves_jobs_and_drains_source(fake_redis) -> None:
+    for fields in (
+        {"type": "text", "text": "hi"},
+        {"type": "image", "s3_key": "a"},
+        {"type": "url", "url": "https://example.com"},
+        {"type": "file", "s3_key": "b"},
+        {"type": "video"},
+    ):
+        await fake_redis.xadd(LEGACY_SCAN_INGRESS, fields)
+
+    router = LegacyScanRouter(redis=RedisStreamClient(fake_redis), consumer="router-a", block_ms=1)
+    assert await router.run_once() == 4
+
+    assert await fake_redis.xlen(LEGACY_SCAN_INGRESS) == 0
+    assert await fake_redis.xlen(SCAN_STREAMS["text"]) == 1
+    assert await fake_redis.xlen(SCAN_STREAMS["url"]) == 1
+    media = await fake_redis.xrange(SCAN_STREAMS["media"])
+    assert [fields["s3_key"] for _, fields in media] == ["a", "b"]
+    assert await router.run_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_routers_in_several_processes_share_the_legacy_stream(fake_redis) -> None:
+    for index in range(6):
+        await fake_redis.xadd(LEGACY_SCAN_INGRESS, {"type": "text", "text": f"t{index}"})
+    client = RedisStreamClient(fake_redis)
+    first = LegacyScanRouter(redis=client, consumer="router-a", batch_size=4, block_ms=1)
+    second = LegacyScanRouter(redis=client, consumer="router-b", batch_size=4, block_ms=1)
+
+    assert await first.run_once() + await second.run_once() == 6
+    assert await first.run_once() == await second.run_once() == 0
+
+    texts = [fields["text"] for _, fields in await fake_redis.xrange(SCAN_STREAMS["text"])]
+    assert texts == [f"t{index}" for index in range(6)]
+    assert (await fake_redis.xpending(LEGACY_SCAN_INGRESS, "scan-router"))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_left_by_a_dead_router_are_claimed(fake_redis) -> None:
+    await fake_redis.xadd(LEGACY_SCAN_INGRESS, {"type": "url", "url": "https://example.com"})
+    client = RedisStreamClient(fake_redis)
+    await client.ensure_group(LEGACY_SCAN_INGRESS, "scan-router")
+    # router-a read the entry and died before moving it.
+    await client.xreadgroup("scan-router", "router-a", {LEGACY_SCAN_INGRESS: ">"}, count=10, block=1)
+
+    survivor = LegacyScanRouter(redis=client, consumer="router-b", block_ms=1, claim_idle_ms=0)
+    assert await survivor.run_once() == 1
+    assert await fake_redis.xlen(SCAN_STREAMS["url"]) == 1
+    assert await fake_redis.xlen(LEGACY_SCAN_INGRESS) == 0
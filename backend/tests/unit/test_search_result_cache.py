@@ -0,0 +1,109 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.domain.search import result_cache, schemas
+from app.domain.search.result_cache import SearchResultCache
+from app.domain.search.service import SearchService
+from app.infra.auth import AuthenticatedUser
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_local_then_redis_tier():
+	calls = 0
+
+	async def _load():
+		nonlocal calls
+		calls += 1
+		return {"items": [1, 2, 3]}
+
+	cache = SearchResultCache(max_entries=8, local_ttl=5, redis_ttl=5)
+	key = cache.make_key("users", "campus", "ali", 20)
+	assert await cache.get_or_load(key, _load) == ({"items": [1, 2, 3]}, result_cache.CACHE_MISS)
+	assert await cache.get_or_load(key, _load) == ({"items": [1, 2, 3]}, result_cache.CACHE_HIT_LOCAL)
+
+	# A second process (fresh LRU) reads the Redis copy.
+	other = SearchResultCache(max_entries=8, local_ttl=5, redis_ttl=5)
+	assert await other.get_or_load(key, _load) == ({"items": [1, 2, 3]}, result_cache.CACHE_HIT_REDIS)
+	assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+	calls = 0
+
+	async def _load():
+		nonlocal calls
+		calls += 1
+		await asyncio.sleep(0.05)
+		return ["x"]
+
+	cache = SearchResultCache(max_entries=8, local_ttl=5, redis_ttl=0)
+	results = await asyncio.gather(*(cache.get_or_load("k", _load) for _ in range(10)))
+	assert calls == 1
+	assert {value[0] for value, _ in results} == {"x"}
+	outcomes = sorted(outcome for _, outcome in results)
+	assert outcomes.count(result_cache.CACHE_MISS) == 1
+	assert outcomes.count(result_cache.CACHE_COALESCED) == 9
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest_and_disabled_cache_bypasses(monkeypatch):
+	cache = SearchResultCache(max_entries=2, local_ttl=5, redis_ttl=0)
+
+	async def _value(v):
+		return v
+
+	for key in ("a", "b", "c"):
+		await cache.get_or_load(key, lambda key=key: _value(key))
+	assert list(cache._local) == ["b", "c"]
+
+	monkeypatch.setattr(result_cache.settings, "search_cache_enabled", False)
+	assert await cache.get_or_load("b", lambda: _value("fresh")) == ("fresh", result_cache.CACHE_BYPASS)
+
+
+def test_keys_normalize_query_and_roll_with_coefficients():
+	assert result_cache.normalize_query("  Alice   SMITH ") == "alice smith"
+	base = {"ts": 0.7, "trgm": 0.3, "recency_tau": 24.0}
+	assert result_cache.coefficient_version(base) == result_cache.coefficient_version(dict(reversed(list(base.items()))))
+	assert result_cache.coefficient_version(base) != result_cache.coefficient_version({**base, "ts": 0.8})
+
+
+@pytest.mark.asyncio
+async def test_multi_search_shares_cached_bucket_and_filters_blocks_per_viewer(monkeypatch):
+	from app.domain.search import service as search_service
+
+	blocked_user = str(uuid.uuid4())
+	visible_user = str(uuid.uuid4())
+	service = SearchService()
+	service._pool_checked = True
+	service._pool = object()
+	loads: list[list] = []
+
+	async def _no_flag(_key):
+		return None
+
+	async def _people(ctx, cursor):
+		loads.append(list(ctx.blocked_ids))
+		return [{"id": blocked_user}, {"id": visible_user}], None
+
+	blocks = {"viewer-a": set(), "viewer-b": {blocked_user}}
+
+	async def _blocks(_pool, user_id):
+		return blocks[user_id]
+
+	monkeypatch.setattr(search_service.flag_service, "get_flag", _no_flag)
+	monkeypatch.setattr(service, "_search_people_bucket", _people)
+	monkeypatch.setattr(service, "_pool_block_ids", _blocks)
+
+	query = schemas.MultiSearchQuery(q="Alice ", type="people")
+	first = await service.search_multi(AuthenticatedUser(id="viewer-a", campus_id=None), query)
+	second = await service.search_multi(
+		AuthenticatedUser(id="viewer-b", campus_id=None),
+		schemas.MultiSearchQuery(q="alice", type="people"),
+	)
+
+	assert loads == [[]]
+	assert [item["id"] for item in first.buckets["people"].items] == [blocked_user, visible_user]
+	assert [item["id"] for item in second.buckets["people"].items] == [visible_user]
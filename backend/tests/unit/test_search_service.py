@@ -1,10 +1,11 @@
 import time
 
+import asyncpg
 import pytest
 import pytest_asyncio
 
 from app.domain.search import models, schemas
-from app.domain.search.service import SearchService, reset_memory_state, seed_memory_store
+from app.domain.search.service import SearchService, _MultiSearchContext, reset_memory_state, seed_memory_store
 from app.infra.auth import AuthenticatedUser
 
 
@@ -75,6 +76,41 @@ async def test_search_users_respects_privacy_and_blocks():
 	assert response.items[0].score > 0
 
 
+@pytest.mark.asyncio
+async def test_search_users_merges_fuzzy_matches_unless_typeahead_fills_the_page(fake_redis, monkeypatch):
+	from app.domain.search import service as search_service
+
+	service = SearchService()
+	service._pool_checked = True
+	service._pool = object()
+	service._adapter = None
+	prefix_hits: list[str] = [USER_ALICE]
+	fuzzy_calls: list[str] = []
+	hydrated: list[list[str]] = []
+
+	async def _match(pool, campus_id, normalized, limit):
+		fuzzy_calls.append(normalized)
+		return [USER_ALLY, USER_ALICE]
+
+	async def _hydrate(pool, user_id, campus_id, normalized, limit_prefetch, *, candidate_ids=None):
+		hydrated.append(candidate_ids)
+		return []
+
+	monkeypatch.setattr(search_service, "_typeahead_user_ids", lambda campus_id, normalized, limit: list(prefix_hits))
+	monkeypatch.setattr(service, "_match_user_ids", _match)
+	monkeypatch.setattr(service, "_search_users_postgres", _hydrate)
+	auth_user = AuthenticatedUser(id=USER_ME, campus_id="campus-a")
+
+	await service.search_users(auth_user, schemas.SearchUsersQuery(q="ali", limit=5))
+	assert hydrated == [[USER_ALICE, USER_ALLY]]
+
+	# A full page of prefix hits (limit + 10 prefetch) skips the trigram scan.
+	prefix_hits[:] = [f"00000000-0000-0000-0000-0000000001{idx:02d}" for idx in range(15)]
+	await service.search_users(auth_user, schemas.SearchUsersQuery(q="alic", limit=5))
+	assert fuzzy_calls == ["ali"]
+	assert hydrated[-1] == prefix_hits
+
+
 @pytest.mark.asyncio
 async def test_discover_people_prioritises_mutuals_and_recency():
 	service = SearchService()
@@ -175,3 +211,202 @@ async def test_discover_rooms_computes_scores_and_pagination():
 		schemas.DiscoverRoomsQuery(limit=1, cursor=response.cursor),
 	)
 	assert [str(item.room_id) for item in next_page.items] == [ROOM_B]
+
+
+class _RecordingTransaction:
+	async def __aenter__(self) -> "_RecordingTransaction":
+		return self
+
+	async def __aexit__(self, _exc_type, _exc, _tb) -> bool:
+		return False
+
+
+class _RecordingConnection:
+	def __init__(self, rows: list[dict]) -> None:
+		self.rows = rows
+		self.executed: list[tuple[str, tuple]] = []
+		self.fetched: list[tuple[str, tuple]] = []
+
+	async def execute(self, query: str, *params) -> None:
+		self.executed.append((query, params))
+
+	async def fetch(self, query: str, *params) -> list[dict]:
+		self.fetched.append((query, params))
+		return self.rows
+
+	def transaction(self) -> _RecordingTransaction:
+		return _RecordingTransaction()
+
+
+class _RecordingAcquire:
+	def __init__(self, conn: _RecordingConnection) -> None:
+		self._conn = conn
+
+	async def __aenter__(self) -> _RecordingConnection:
+		return self._conn
+
+	async def __aexit__(self, _exc_type, _exc, _tb) -> bool:
+		return False
+
+
+class _RecordingPool:
+	def __init__(self, conn: _RecordingConnection) -> None:
+		self._conn = conn
+
+	def acquire(self) -> _RecordingAcquire:
+		return _RecordingAcquire(self._conn)
+
+
+@pytest.mark.asyncio
+async def test_people_bucket_uses_indexed_predicates():
+	from datetime import datetime, timezone
+
+	conn = _RecordingConnection(
+		[
+			{
+				"id": USER_ALICE,
+				"handle": "alice",
+				"display_name": "Alice Wonder",
+				"bio": None,
+				"campus_id": None,
+				"created_at": datetime.now(timezone.utc),
+				"ts_score": 0.4,
+				"trgm_score": 0.6,
+			}
+		]
+	)
+	service = SearchService()
+	service._pool_checked = True
+	service._pool = _RecordingPool(conn)
+
+	ctx = _MultiSearchContext(
+		query="alice",
+		campus_id=None,
+		limit=5,
+		coeff={"ts": 0.7, "trgm": 0.3, "recency_tau": 24.0},
+		blocked_ids=[],
+	)
+	items, next_cursor = await service._search_people_bucket(ctx, None)
+
+	assert [item["id"] for item in items] == [USER_ALICE]
+	assert next_cursor is None
+	threshold_sql, threshold_params = conn.executed[0]
+	assert "pg_trgm.similarity_threshold" in threshold_sql
+	assert threshold_params == ("0.200",)
+	sql = conn.fetched[0][0]
+	assert "u.search_tsv @@" in sql
+	assert "u.handle % $1" in sql
+	assert "to_tsvector" not in sql
+	assert conn.fetched[0][1][3] == []
+
+
+class _NoStoredTsvConnection(_RecordingConnection):
+	"""A database where migration 0275 has not added the search_tsv columns yet."""
+
+	async def fetch(self, query: str, *params) -> list[dict]:
+		if "search_tsv" in query:
+			self.fetched.append((query, params))
+			raise asyncpg.UndefinedColumnError("column r.search_tsv does not exist")
+		return await super().fetch(query, *params)
+
+
+@pytest.mark.asyncio
+async def test_rooms_bucket_ranks_and_degrades_without_stored_tsvector():
+	from datetime import datetime, timedelta, timezone
+
+	now = datetime.now(timezone.utc)
+
+	def _room(room_id: str, name: str, ts_score: float, trgm_score: float, age: timedelta) -> dict:
+		return {
+			"id": room_id,
+			"name": name,
+			"preset": "4-6",
+			"campus_id": None,
+			"created_at": now - age,
+			"ts_score": ts_score,
+			"trgm_score": trgm_score,
+			"members_count": 3,
+			"msg_24h": 1,
+		}
+
+	room_c = "33333333-3333-3333-3333-333333333333"
+	conn = _NoStoredTsvConnection(
+		[
+			_room(ROOM_A, "chess club", 0.1, 0.3, timedelta(days=3)),
+			_room(ROOM_B, "chess night", 0.9, 0.8, timedelta(hours=1)),
+			_room(room_c, "chess", 0.0, 0.2, timedelta(days=6)),
+		]
+	)
+	service = SearchService()
+	service._pool_checked = True
+	service._pool = _RecordingPool(conn)
+	ctx = _MultiSearchContext(
+		query="chess",
+		campus_id=None,
+		limit=2,
+		coeff={"ts": 0.7, "trgm": 0.3, "recency_tau": 24.0},
+		blocked_ids=[],
+	)
+
+	items, next_cursor = await service._search_rooms_bucket(ctx, None)
+
+	assert [item["id"] for item in items] == [ROOM_B, ROOM_A]
+	assert items[0]["score"] > items[1]["score"]
+	assert next_cursor is not None
+	failed_sql, fallback_sql = (sql for sql, _params in conn.fetched)
+	assert "r.search_tsv" in failed_sql
+	assert "to_tsvector('english', coalesce(r.name, '')) @@" in fallback_sql
+
+	# Later requests go straight to the per-row fallback.
+	conn.fetched.clear()
+	again, _ = await service._search_rooms_bucket(ctx, None)
+	assert [item["id"] for item in again] == [ROOM_B, ROOM_A]
+	assert len(conn.fetched) == 1 and "search_tsv" not in conn.fetched[0][0]
+
+
+@pytest.mark.asyncio
+async def test_search_multi_runs_buckets_concurrently_and_marks_partial(monkeypatch):
+	import asyncio
+
+	from app.domain.search import service as search_service
+
+	service = SearchService()
+	service._pool_checked = True
+	calls: list[str] = []
+
+	async def _no_flag(_key):
+		return None
+
+	monkeypatch.setattr(search_service.flag_service, "get_flag", _no_flag)
+
+	async def _bucket(kind: str, delay: float):
+		calls.append(kind)
+		await asyncio.sleep(delay)
+		return [{"id": kind}], None
+
+	async def _people(ctx, cursor):
+		return await _bucket("people", 0.05)
+
+	async def _rooms(ctx, cursor):
+		return await _bucket("rooms", 0.05)
+
+	async def _posts(ctx, cursor):
+		return await _bucket("posts", 5.0)
+
+	monkeypatch.setattr(service, "_search_people_bucket", _people)
+	monkeypatch.setattr(service, "_search_rooms_bucket", _rooms)
+	monkeypatch.setattr(service, "_search_posts_bucket", _posts)
+	monkeypatch.setattr(search_service.settings, "search_multi_deadline_ms", 200)
+
+	auth_user = AuthenticatedUser(id=USER_ME, campus_id="campus-a")
+	start = time.perf_counter()
+	response = await service.search_multi(auth_user, schemas.MultiSearchQuery(q="alice"))
+	elapsed = time.perf_counter() - start
+
+	assert elapsed < 1.0
+	assert sorted(calls) == ["people", "posts", "rooms"]
+	assert response.partial is True
+	assert response.buckets["people"].items == [{"id": "people"}]
+	assert response.buckets["rooms"].partial is False
+	assert response.buckets["posts"].partial is True
+	assert response.buckets["posts"].items == []
@@ -0,0 +1,224 @@
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.communities.search.service import SearchService as CommunitiesSearchService
+from app.domain.search import typeahead
+from app.domain.search.typeahead import TypeaheadEntry, TypeaheadIndex, TypeaheadSync
+from app.infra.auth import AuthenticatedUser
+
+CAMPUS = "33333333-3333-3333-3333-333333333333"
+OTHER_CAMPUS = "44444444-4444-4444-4444-444444444444"
+
+
+def _user(entity_id: str, handle: str, display: str, popularity: float = 0.0, campus: str = CAMPUS) -> TypeaheadEntry:
+	return TypeaheadEntry(
+		entity_id=entity_id,
+		kind=typeahead.KIND_USER,
+		campus_id=campus,
+		label=display,
+		secondary=handle,
+		popularity=popularity,
+	)
+
+
+def _ready_index(**kwargs) -> TypeaheadIndex:
+	index = TypeaheadIndex(max_bytes=kwargs.pop("max_bytes", 10 * 1024 * 1024), **kwargs)
+	index.ready = True
+	return index
+
+
+def test_lookup_returns_none_until_built():
+	index = TypeaheadIndex(max_bytes=1024 * 1024)
+	index.upsert(_user("u1", "alice", "Alice Smith"))
+	assert index.lookup(typeahead.KIND_USER, CAMPUS, "al", limit=5) is None
+
+
+def test_prefix_lookup_matches_handles_and_word_starts_by_popularity():
+	index = _ready_index()
+	index.upsert(_user("u1", "alice", "Alice Smith", popularity=3))
+	index.upsert(_user("u2", "bob", "Bob Allen", popularity=9))
+	index.upsert(_user("u3", "carol", "Carol Jones", popularity=50))
+	index.upsert(_user("u4", "al_other", "Other Campus", popularity=99, campus=OTHER_CAMPUS))
+
+	short = index.lookup(typeahead.KIND_USER, CAMPUS, "Al", limit=5)
+	assert [entry.entity_id for entry in short] == ["u2", "u1"]
+
+	long = index.lookup(typeahead.KIND_USER, CAMPUS, "smith", limit=5)
+	assert [entry.entity_id for entry in long] == ["u1"]
+	assert index.lookup(typeahead.KIND_USER, CAMPUS, "zz", limit=5) == []
+
+
+def test_upsert_replaces_keys_and_remove_refreshes_top_k():
+	index = _ready_index(top_k=2)
+	index.upsert(_user("u1", "sam", "Sam One", popularity=1))
+	index.upsert(_user("u2", "sara", "Sara Two", popularity=2))
+	index.upsert(_user("u3", "sasha", "Sasha Three", popularity=3))
+	assert [e.entity_id for e in index.lookup(typeahead.KIND_USER, CAMPUS, "sa", limit=5)] == ["u3", "u2"]
+
+	index.remove("u3", typeahead.KIND_USER)
+	assert [e.entity_id for e in index.lookup(typeahead.KIND_USER, CAMPUS, "sa", limit=5)] == ["u2", "u1"]
+
+	# Renaming keeps the stored popularity and drops the old keys.
+	index.upsert(_user("u2", "zed", "Zed Two"))
+	assert [e.entity_id for e in index.lookup(typeahead.KIND_USER, CAMPUS, "sa", limit=5)] == ["u1"]
+	renamed = index.lookup(typeahead.KIND_USER, CAMPUS, "ze", limit=5)
+	assert renamed[0].entity_id == "u2" and renamed[0].popularity == 2
+
+
+def test_memory_cap_rejects_new_entries():
+	index = _ready_index(max_bytes=2048)
+	accepted = sum(index.upsert(_user(f"u{i}", f"user{i}", f"User {i}")) for i in range(50))
+	assert 0 < accepted < 50
+	assert index.dropped == 50 - accepted
+	assert index.approx_bytes <= 2048
+
+
+def test_bulk_load_matches_incremental_upserts():
+	entries = [
+		_user(f"u{i}", f"handle{i}", f"Name{i % 7} Person{i}", popularity=(i * 37) % 11, campus=CAMPUS if i % 3 else OTHER_CAMPUS)
+		for i in range(300)
+	]
+	incremental = _ready_index(top_k=5)
+	for entry in entries:
+		incremental.upsert(entry)
+	bulk = _ready_index(top_k=5)
+	bulk.load(entries)
+
+	assert bulk.approx_bytes == incremental.approx_bytes
+	for campus in (CAMPUS, OTHER_CAMPUS):
+		for query in ("n", "na", "nam", "name3", "person1", "handle2", "h"):
+			expected = [e.entity_id for e in incremental.lookup(typeahead.KIND_USER, campus, query, limit=10)]
+			assert [e.entity_id for e in bulk.lookup(typeahead.KIND_USER, campus, query, limit=10)] == expected
+
+	# The loaded index keeps accepting incremental changes.
+	bulk.upsert(_user("u1", "zed", "Zed Renamed"))
+	assert bulk.lookup(typeahead.KIND_USER, CAMPUS, "zed", limit=5)[0].entity_id == "u1"
+
+
+def test_bulk_load_admits_in_order_up_to_the_memory_cap():
+	index = _ready_index(max_bytes=2048)
+	index.load([_user(f"u{i}", f"user{i}", f"User {i}", popularity=50 - i) for i in range(50)])
+
+	assert 0 < index.dropped < 50
+	assert index.approx_bytes <= 2048
+	kept = [e.entity_id for e in index.lookup(typeahead.KIND_USER, CAMPUS, "u", limit=50)]
+	assert kept == [f"u{i}" for i in range(50 - index.dropped)]
+
+
+def test_groups_merge_global_entries():
+	index = _ready_index()
+	index.upsert(typeahead.group_entry({"id": "g1", "name": "Chess Club", "slug": "chess", "campus_id": CAMPUS}, popularity=4))
+	index.upsert(typeahead.group_entry({"id": "g2", "name": "Chess Worldwide", "slug": "chess-ww", "campus_id": None}, popularity=10))
+	hits = index.lookup(typeahead.KIND_GROUP, CAMPUS, "che", limit=5)
+	assert [entry.entity_id for entry in hits] == ["g2", "g1"]
+
+
+def test_lookup_is_sub_millisecond_on_large_campus():
+	index = _ready_index(max_bytes=512 * 1024 * 1024)
+	for i in range(20_000):
+		index.upsert(_user(f"u{i}", f"handle{i}", f"Name{i % 97} Person{i}", popularity=i % 500))
+	started = time.perf_counter()
+	for query in ("n", "na", "name1", "person19", "handle123"):
+		for _ in range(100):
+			index.lookup(typeahead.KIND_USER, CAMPUS, query, limit=10)
+	per_lookup_ms = (time.perf_counter() - started) * 1000 / 500
+	assert per_lookup_ms < 1.0
+
+
+@pytest.mark.asyncio
+async def test_sync_applies_profile_stream_and_outbox(monkeypatch):
+	index = _ready_index()
+	sync = TypeaheadSync(index=index)
+	sync._stream_id = "0-0"
+	await typeahead.publish_profile_change(user_id="u1", campus_id=CAMPUS, handle="nova", display_name="Nova Lee")
+
+	group_id = uuid4()
+	events = [
+		SimpleNamespace(
+			id=7,
+			aggregate_id=group_id,
+			event_type="created",
+			payload={"id": str(group_id), "name": "Robotics", "slug": "robotics", "campus_id": CAMPUS},
+		)
+	]
+
+	class _Repo:
+		async def fetch_outbox_since(self, *, after_id, aggregate_types, limit):
+			return [event for event in events if event.id > after_id]
+
+	monkeypatch.setattr("app.communities.domain.repo.CommunitiesRepository", _Repo)
+	assert await sync.process_once() == 2
+	assert sync._outbox_watermark == 7
+	assert index.lookup(typeahead.KIND_USER, CAMPUS, "nov", limit=5)[0].entity_id == "u1"
+	assert index.lookup(typeahead.KIND_GROUP, CAMPUS, "rob", limit=5)[0].entity_id == str(group_id)
+
+	events.append(SimpleNamespace(id=8, aggregate_id=group_id, event_type="deleted", payload={"deleted": True}))
+	assert await sync.process_once() == 1
+	assert index.lookup(typeahead.KIND_GROUP, CAMPUS, "rob", limit=5) == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_bulk_loads_off_the_event_loop_and_swaps_in(fake_redis, monkeypatch):
+	import threading
+	from contextlib import asynccontextmanager
+
+	rows = [
+		{"id": "u1", "campus_id": CAMPUS, "handle": "nova", "display_name": "Nova Lee", "popularity": 4},
+		{"id": "u2", "campus_id": CAMPUS, "handle": "noah", "display_name": "Noah Kim", "popularity": 9},
+	]
+
+	class _Conn:
+		async def fetchval(self, sql):
+			return False
+
+		async def fetch(self, sql):
+			return rows
+
+	class _Pool:
+		@asynccontextmanager
+		async def acquire(self):
+			yield _Conn()
+
+	async def _get_pool():
+		return _Pool()
+
+	loaded_on: list[bool] = []
+	original_load = TypeaheadIndex.load
+
+	def _load(self, entries):
+		loaded_on.append(threading.current_thread() is threading.main_thread())
+		original_load(self, entries)
+
+	monkeypatch.setattr("app.infra.postgres.get_pool", _get_pool)
+	monkeypatch.setattr(TypeaheadIndex, "load", _load)
+	index = TypeaheadIndex(max_bytes=1024 * 1024)
+	await TypeaheadSync(index=index).rebuild()
+
+	assert loaded_on == [False]
+	assert index.ready
+	assert [e.entity_id for e in index.lookup(typeahead.KIND_USER, CAMPUS, "no", limit=5)] == ["u2", "u1"]
+
+
+@pytest.mark.asyncio
+async def test_communities_typeahead_prefers_index(monkeypatch):
+	index = _ready_index()
+	index.upsert(typeahead.group_entry({"id": "g1", "name": "Film Society", "slug": "film", "campus_id": CAMPUS}))
+	monkeypatch.setattr(typeahead, "get_index", lambda: index)
+
+	async def _no_rate_limit(*args, **kwargs):
+		return None
+
+	monkeypatch.setattr("app.communities.search.guards.enforce_rate_limit", _no_rate_limit)
+
+	class _Repo:
+		async def search_groups_fallback(self, **kwargs):
+			raise AssertionError("database fallback should not run")
+
+	service = CommunitiesSearchService(repository=_Repo(), backend="postgres")
+	user = AuthenticatedUser(id=str(uuid4()), campus_id=CAMPUS)
+	response = await service.typeahead_groups(user, query="fil", limit=5)
+	assert response.backend == "memory"
+	assert [item.slug for item in response.items] == ["film"]
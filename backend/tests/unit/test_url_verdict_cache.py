@@ -0,0 +1,207 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.moderation.domain.safety_repository import InMemorySafetyRepository, UrlScanRecord
+from app.moderation.domain.thresholds import ModerationThresholds
+from app.moderation.domain.url_cache import (
+    CACHE_COALESCED,
+    CACHE_HIT_DOMAIN,
+    CACHE_HIT_LOCAL,
+    CACHE_HIT_REDIS,
+    CACHE_MISS,
+    UrlVerdictCache,
+    normalize_url,
+)
+from app.moderation.domain.url_reputation import UrlVerdict
+from app.moderation.infra.redis import RedisStreamClient
+from app.moderation.workers.url_scanner import UrlScannerWorker
+
+
+def _verdict(url: str, verdict: str = "clean", lists=(), etld1: str | None = None) -> UrlVerdict:
+    return UrlVerdict(
+        requested_url=url,
+        final_url=url,
+        etld_plus_one=etld1 or "example.com",
+        verdict=verdict,
+        lists=list(lists),
+        details={},
+        resolved_at=datetime.now(timezone.utc),
+    )
+
+
+class _SlowLoader:
+    def __init__(self, verdict: UrlVerdict, delay: float = 0.02) -> None:
+        self.verdict = verdict
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> UrlVerdict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.verdict
+
+
+def test_normalize_url_collapses_equivalent_spellings():
+    assert normalize_url("HTTPS://Example.COM:443#frag") == "https://example.com/"
+    assert normalize_url("http://example.com:8080/a?b=1") == "http://example.com:8080/a?b=1"
+    assert normalize_url("not a url") == "not a url"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load_then_hit_locally():
+    cache = UrlVerdictCache()
+    loader = _SlowLoader(_verdict("https://example.com/x"))
+    urls = ["https://example.com/x", "HTTPS://EXAMPLE.com/x", "https://example.com:443/x#top"] * 3
+
+    results = await asyncio.gather(*(cache.resolve(url, loader) for url in urls))
+
+    assert loader.calls == 1
+    outcomes = [outcome for _, outcome in results]
+    assert outcomes.count(CACHE_MISS) == 1 and outcomes.count(CACHE_COALESCED) == len(urls) - 1
+    assert (await cache.resolve("https://example.com/x", loader))[1] == CACHE_HIT_LOCAL
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_negative_verdicts_expire_sooner(fake_redis):
+    first = UrlVerdictCache(fake_redis, negative_ttl=timedelta(minutes=5))
+    second = UrlVerdictCache(fake_redis, negative_ttl=timedelta(minutes=5))
+    clean = _SlowLoader(_verdict("https://example.com/a"))
+    bad = _SlowLoader(_verdict("https://example.com/b", verdict="suspicious", lists=["shortener"]))
+
+    await first.resolve("https://example.com/a", clean)
+    await first.resolve("https://example.com/b", bad)
+    verdict, outcome = await second.resolve("https://example.com/a", clean)
+
+    assert outcome == CACHE_HIT_REDIS and verdict.verdict == "clean"
+    assert clean.calls == 1
+    ttls = sorted([await fake_redis.pttl(key) async for key in fake_redis.scan_iter("mod:url:v1:u:*")])
+    assert 0 < ttls[0] <= 5 * 60 * 1000 < ttls[1]
+
+
+@pytest.mark.asyncio
+async def test_listed_domain_verdict_covers_other_urls_on_the_domain(fake_redis):
+    first = UrlVerdictCache(fake_redis)
+    second = UrlVerdictCache(fake_redis)
+    loader = _SlowLoader(_verdict("https://evil.test/login", verdict="malicious", lists=["phishing"], etld1="evil.test"))
+    await first.resolve("https://evil.test/login", loader)
+
+    local, local_outcome = await first.resolve("https://cdn.evil.test/other", loader)
+    shared, shared_outcome = await second.resolve("https://www.evil.test/x", loader)
+
+    assert loader.calls == 1
+    assert (local_outcome, shared_outcome) == (CACHE_HIT_DOMAIN, CACHE_HIT_DOMAIN)
+    assert local.verdict == shared.verdict == "malicious"
+    assert shared.requested_url == "https://www.evil.test/x" and shared.final_url is None
+
+
+@pytest.mark.asyncio
+async def test_peer_process_waits_for_the_lock_holder(fake_redis):
+    holder = UrlVerdictCache(fake_redis)
+    peer = UrlVerdictCache(fake_redis, poll_ms=5)
+    slow = _SlowLoader(_verdict("https://example.com/v", verdict="suspicious", lists=["risky_tld"]), delay=0.05)
+    unused = _SlowLoader(_verdict("https://example.com/v"))
+
+    async def _peer():
+        await asyncio.sleep(0.01)
+        return await peer.resolve("https://example.com/v", unused)
+
+    (_, first), (verdict, second) = await asyncio.gather(holder.resolve("https://example.com/v", slow), _peer())
+
+    assert (first, second) == (CACHE_MISS, CACHE_COALESCED)
+    assert verdict.verdict == "suspicious" and unused.calls == 0
+
+
+class _Streams:
+    def __init__(self, entries) -> None:
+        self.entries = entries
+        self.added: list[dict] = []
+
+    async def xread(self, streams, count, block):
+        return [("scan:ingress:url", self.entries)]
+
+    async def xadd(self, stream, fields):
+        self.added.append(dict(fields))
+        return "0-1"
+
+
+class _CountingRepository(InMemorySafetyRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    async def get_recent_url_scan(self, final_url):
+        self.reads += 1
+        return await super().get_recent_url_scan(final_url)
+
+
+class _CountingClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def classify(self, url):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return _verdict(url, verdict="suspicious", lists=["shortener"], etld1="bit.ly")
+
+
+@pytest.mark.asyncio
+async def test_viral_link_burst_costs_one_read_and_one_classification():
+    entries = [(f"{index}-0", {"type": "url", "url": "https://bit.ly/viral", "subject_id": str(index)}) for index in range(20)]
+    streams = _Streams(entries)
+    repository = _CountingRepository()
+    client = _CountingClient()
+    worker = UrlScannerWorker(
+        redis=streams,
+        repository=repository,
+        client=client,
+        thresholds=ModerationThresholds.default(),
+    )
+
+    await worker.run_once()
+
+    assert (repository.reads, client.calls) == (1, 1)
+    assert len(streams.added) == 20 and worker.last_id == "19-0"
+    assert {json.loads(fields["signals"])["verdict"] for fields in streams.added} == {"suspicious"}
+
+
+@pytest.mark.asyncio
+async def test_postgres_rows_age_out_by_verdict():
+    repository = _CountingRepository()
+    two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
+    for record_id, (url, verdict) in enumerate((("https://a.test/", "clean"), ("https://b.test/", "malicious")), 1):
+        repository.url_scans[url] = UrlScanRecord(record_id, url, url, url.split("/")[2], verdict, {}, two_hours_ago)
+    client = _CountingClient()
+    worker = UrlScannerWorker(
+        redis=_Streams([]),
+        repository=repository,
+        client=client,
+        thresholds=ModerationThresholds.default(),
+        negative_ttl=timedelta(hours=1),
+    )
+
+    assert (await worker._lookup("https://a.test/")).verdict == "suspicious"
+    assert (await worker._lookup("https://b.test/")).verdict == "malicious"
+    assert client.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_scanner_shares_verdicts_through_the_stream_clients_redis(fake_redis):
+    def _worker(repository, client):
+        return UrlScannerWorker(
+            redis=RedisStreamClient(fake_redis),
+            repository=repository,
+            client=client,
+            thresholds=ModerationThresholds.default(),
+        )
+
+    first_repo, second_repo = _CountingRepository(), _CountingRepository()
+    client = _CountingClient()
+    first, second = _worker(first_repo, client), _worker(second_repo, client)
+    await first._verdicts().resolve("https://bit.ly/x", lambda: first._lookup("https://bit.ly/x"))
+    verdict, outcome = await second._verdicts().resolve("https://bit.ly/x", lambda: second._lookup("https://bit.ly/x"))
+
+    assert outcome == CACHE_HIT_REDIS and verdict.verdict == "suspicious"
+    assert (client.calls, second_repo.reads) == (1, 0)
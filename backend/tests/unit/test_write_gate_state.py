@@ -0,0 +1,110 @@
+import pytest
+from fastapi import HTTPException
+
+from app.moderation.domain.gate_state import GateStateCache
+from app.moderation.domain.reputation import InMemoryReputationRepository, ReputationBand, ReputationService
+from app.moderation.domain.restrictions import InMemoryRestrictionRepository, RestrictionService
+from app.moderation.domain.velocity import StaticVelocityConfig, VelocityService, VelocityWindow
+from app.moderation.middleware.write_gate_v2 import WriteContext, WriteGateV2
+
+
+class _CountingRedis:
+    """Counts round trips (single commands and pipeline executions)."""
+
+    def __init__(self, client) -> None:
+        self._client = client
+        self.round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        outer = self
+        pipe = self._client.pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def _execute(*exec_args, **exec_kwargs):
+            outer.round_trips += 1
+            return await execute(*exec_args, **exec_kwargs)
+
+        pipe.execute = _execute
+        return pipe
+
+    def __getattr__(self, item):
+        attr = getattr(self._client, item)
+        if not callable(attr):
+            return attr
+
+        async def _call(*args, **kwargs):
+            self.round_trips += 1
+            return await attr(*args, **kwargs)
+
+        return _call
+
+
+def _gate(redis, *, local_ttl: float = 60.0):
+    cache = GateStateCache(redis, local_ttl_seconds=local_ttl, redis_ttl_seconds=300)
+    reputation = ReputationService(repository=InMemoryReputationRepository(), gate_state=cache)
+    restrictions = RestrictionService(repository=InMemoryRestrictionRepository(), redis=redis, gate_state=cache)
+    velocity = VelocityService(
+        redis=redis,
+        config=StaticVelocityConfig(
+            {"message": [VelocityWindow(name="w10", seconds=10, limit=100, cooldown_minutes=1)]}
+        ),
+    )
+    gate = WriteGateV2(reputation=reputation, restrictions=restrictions, velocity=velocity, state_cache=cache)
+    return gate, cache, reputation, restrictions
+
+
+@pytest.mark.asyncio
+async def test_good_standing_write_costs_one_round_trip_after_warmup(fake_redis):
+    redis = _CountingRedis(fake_redis)
+    gate, _, _, _ = _gate(redis)
+
+    await gate.enforce(user_id="u1", surface="message", ctx=WriteContext(text="hi"))
+    redis.round_trips = 0
+    ctx = await gate.enforce(user_id="u1", surface="message", ctx=WriteContext(text="hi"))
+
+    assert redis.round_trips == 1
+    assert ctx.shadow is False
+
+
+@pytest.mark.asyncio
+async def test_shared_hash_serves_other_processes(fake_redis):
+    redis = _CountingRedis(fake_redis)
+    gate, _, _, _ = _gate(redis)
+    await gate.enforce(user_id="u1", surface="message", ctx=WriteContext())
+
+    other_gate, other_cache, _, _ = _gate(redis)
+    state, _ = await other_cache.fetch("u1")
+
+    assert state is not None
+    assert state.band is ReputationBand.WATCH
+    assert state.flags("message").cooldown_ttl is None
+
+
+@pytest.mark.asyncio
+async def test_restriction_change_invalidates_cached_state(fake_redis):
+    gate, cache, _, restrictions = _gate(fake_redis)
+    await gate.enforce(user_id="u1", surface="message", ctx=WriteContext())
+    assert cache.peek("u1") is not None
+
+    await restrictions.apply_cooldown(user_id="u1", scope="message", minutes=5, reason="manual")
+
+    assert cache.peek("u1") is None
+    with pytest.raises(HTTPException) as exc:
+        await gate.enforce(user_id="u1", surface="message", ctx=WriteContext())
+    assert exc.value.status_code == 429
+    assert exc.value.detail["code"] == "cooldown_active"
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_written_after_invalidation_is_ignored(fake_redis):
+    gate, cache, reputation, _ = _gate(fake_redis)
+    await gate.enforce(user_id="u1", surface="message", ctx=WriteContext())
+    stale, _ = await cache.fetch("u1")
+
+    await reputation.record_event(user_id="u1", surface="message", kind="report", delta=25)
+    await cache.store("u1", stale)
+    cache._local.clear()
+
+    assert (await cache.fetch("u1"))[0] is None
+    ctx = await gate.enforce(user_id="u1", surface="message", ctx=WriteContext())
+    assert ctx.shadow is True
@@ -23,14 +23,15 @@ async def test_award_xp_emits_xp_gained():
     mock_conn.transaction = MagicMock(return_value=mock_transaction)
     
     # Mock return values for DB queries
-    # 1. First fetchrow (insert into stats): return new totals
+    # 1. The award statement returns the new totals and the level before it
     # Simulate gaining 50 XP, total 50, level 1 (no level up as threshold for lvl 2 is 100)
-    mock_conn.fetchrow.return_value = {
+    mock_conn.fetch.return_value = [{
         "user_id": user_id,
         "total_xp": 50,
         "current_level": 1,
-        "last_updated_at": datetime.now()
-    }
+        "last_updated_at": datetime.now(),
+        "previous_level": 1,
+    }]
     
     # Mock sockets
     with patch("app.domain.xp.service.get_pool", new_callable=AsyncMock) as mock_get_pool:
@@ -66,12 +67,13 @@ async def test_award_xp_emits_level_up():
     mock_conn.transaction = MagicMock(return_value=mock_transaction)
     
     # Simulate Level Up
-    mock_conn.fetchrow.return_value = {
+    mock_conn.fetch.return_value = [{
         "user_id": user_id,
         "total_xp": 500,
-        "current_level": 1,
-        "last_updated_at": datetime.now()
-    }
+        "current_level": 3,
+        "last_updated_at": datetime.now(),
+        "previous_level": 1,
+    }]
     
     # Mock sockets
     with patch("app.domain.xp.service.get_pool", new_callable=AsyncMock) as mock_get_pool:
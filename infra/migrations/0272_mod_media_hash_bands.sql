@@ -0,0 +1,27 @@
+-- Multi-index hashing for near-duplicate media lookups.
+-- 64-bit perceptual hashes (phash/dhash/ahash) are split into four 16-bit
+-- bands. A hash within Hamming distance r of a query shares at least one band
+-- within r/4 bits, so lookups probe the band indexes instead of scanning the
+-- table. Bands stay NULL for hashes of other lengths (pdq, exact digests).
+BEGIN;
+
+ALTER TABLE mod_media_hash
+  ADD COLUMN IF NOT EXISTS band0 INTEGER,
+  ADD COLUMN IF NOT EXISTS band1 INTEGER,
+  ADD COLUMN IF NOT EXISTS band2 INTEGER,
+  ADD COLUMN IF NOT EXISTS band3 INTEGER;
+
+UPDATE mod_media_hash
+SET band0 = ('x' || substr(hash, 1, 4))::bit(16)::int,
+    band1 = ('x' || substr(hash, 5, 4))::bit(16)::int,
+    band2 = ('x' || substr(hash, 9, 4))::bit(16)::int,
+    band3 = ('x' || substr(hash, 13, 4))::bit(16)::int
+WHERE band0 IS NULL
+  AND hash ~ '^[0-9a-fA-F]{16}$';
+
+CREATE INDEX IF NOT EXISTS idx_mod_media_hash_band0 ON mod_media_hash (algo, band0) WHERE band0 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_mod_media_hash_band1 ON mod_media_hash (algo, band1) WHERE band1 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_mod_media_hash_band2 ON mod_media_hash (algo, band2) WHERE band2 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_mod_media_hash_band3 ON mod_media_hash (algo, band3) WHERE band3 IS NOT NULL;
+
+COMMIT;
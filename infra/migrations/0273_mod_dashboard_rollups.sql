@@ -0,0 +1,312 @@
+-- Incremental rollups behind the moderation admin dashboard.
+-- mod_metrics_gauge holds current backlog sizes per campus/severity
+-- ('open', 'escalated', 'pending_appeal'); mod_metrics_hourly holds per-campus
+-- hourly event counts. Statement-level triggers on mod_case, mod_report,
+-- mod_action and mod_appeal apply the delta of each statement (one upsert per
+-- campus/bucket, so batched enforcement writes stay cheap), and the
+-- moderation rollup reconciler periodically recomputes the gauges and recent
+-- buckets from the source tables to absorb any drift. Campus NULL is stored as
+-- 'unknown', matching what the dashboard already reports.
+BEGIN;
+
+-- Dashboard queries filter cases by campus; keep the column defined for fresh databases.
+ALTER TABLE mod_case ADD COLUMN IF NOT EXISTS campus_id UUID NULL;
+
+CREATE TABLE IF NOT EXISTS mod_metrics_gauge (
+  campus_key TEXT NOT NULL,
+  metric TEXT NOT NULL,
+  severity SMALLINT NOT NULL,
+  value BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (campus_key, metric, severity)
+);
+
+CREATE TABLE IF NOT EXISTS mod_metrics_hourly (
+  campus_key TEXT NOT NULL,
+  bucket TIMESTAMPTZ NOT NULL,
+  reports INTEGER NOT NULL DEFAULT 0,
+  cases_opened INTEGER NOT NULL DEFAULT 0,
+  cases_resolved INTEGER NOT NULL DEFAULT 0,
+  resolution_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+  actions_applied INTEGER NOT NULL DEFAULT 0,
+  appeals_received INTEGER NOT NULL DEFAULT 0,
+  appeals_accepted INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (campus_key, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_mod_metrics_hourly_bucket ON mod_metrics_hourly (bucket);
+
+-- SLA breaches depend on the clock, so they stay a query over the open backlog.
+CREATE INDEX IF NOT EXISTS idx_mod_case_open_age ON mod_case (severity, created_at) WHERE status = 'open';
+
+CREATE OR REPLACE FUNCTION mod_metrics_hour(ts TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT date_trunc('hour', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+$$;
+
+-- mod_case ------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION mod_metrics_cases_inserted()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT COALESCE(n.campus_id::text, 'unknown'), n.status, n.severity, COUNT(*)
+  FROM new_cases n
+  WHERE n.status IN ('open', 'escalated')
+  GROUP BY 1, 2, 3
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+
+  INSERT INTO mod_metrics_hourly AS h (campus_key, bucket, cases_opened)
+  SELECT COALESCE(n.campus_id::text, 'unknown'), mod_metrics_hour(n.created_at), COUNT(*)
+  FROM new_cases n
+  GROUP BY 1, 2
+  ON CONFLICT (campus_key, bucket) DO UPDATE SET cases_opened = h.cases_opened + EXCLUDED.cases_opened;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION mod_metrics_cases_updated()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT d.campus_key, d.metric, d.severity, SUM(d.delta)
+  FROM (
+    SELECT COALESCE(o.campus_id::text, 'unknown') AS campus_key, o.status AS metric, o.severity, -1 AS delta
+    FROM old_cases o
+    WHERE o.status IN ('open', 'escalated')
+    UNION ALL
+    SELECT COALESCE(n.campus_id::text, 'unknown'), n.status, n.severity, 1
+    FROM new_cases n
+    WHERE n.status IN ('open', 'escalated')
+  ) d
+  GROUP BY 1, 2, 3
+  HAVING SUM(d.delta) <> 0
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+
+  -- Pending appeals are bucketed by their case's campus/severity; move them
+  -- when the case is re-graded or re-homed.
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT d.campus_key, 'pending_appeal', d.severity, SUM(d.delta)
+  FROM (
+    SELECT COALESCE(o.campus_id::text, 'unknown') AS campus_key, o.severity, -1 AS delta
+    FROM old_cases o
+    JOIN new_cases n ON n.id = o.id
+    JOIN mod_appeal a ON a.case_id = o.id
+    WHERE a.status = 'pending'
+      AND (o.severity IS DISTINCT FROM n.severity OR o.campus_id IS DISTINCT FROM n.campus_id)
+    UNION ALL
+    SELECT COALESCE(n.campus_id::text, 'unknown'), n.severity, 1
+    FROM old_cases o
+    JOIN new_cases n ON n.id = o.id
+    JOIN mod_appeal a ON a.case_id = n.id
+    WHERE a.status = 'pending'
+      AND (o.severity IS DISTINCT FROM n.severity OR o.campus_id IS DISTINCT FROM n.campus_id)
+  ) d
+  GROUP BY 1, 2
+  HAVING SUM(d.delta) <> 0
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+
+  INSERT INTO mod_metrics_hourly AS h (campus_key, bucket, cases_resolved, resolution_seconds)
+  SELECT
+    COALESCE(n.campus_id::text, 'unknown'),
+    mod_metrics_hour(n.updated_at),
+    COUNT(*),
+    SUM(EXTRACT(EPOCH FROM (n.updated_at - n.created_at)))
+  FROM new_cases n
+  JOIN old_cases o ON o.id = n.id
+  WHERE n.status IN ('actioned', 'dismissed')
+    AND o.status NOT IN ('actioned', 'dismissed')
+  GROUP BY 1, 2
+  ON CONFLICT (campus_key, bucket) DO UPDATE
+    SET cases_resolved = h.cases_resolved + EXCLUDED.cases_resolved,
+        resolution_seconds = h.resolution_seconds + EXCLUDED.resolution_seconds;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION mod_metrics_cases_deleted()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT COALESCE(o.campus_id::text, 'unknown'), o.status, o.severity, -COUNT(*)
+  FROM old_cases o
+  WHERE o.status IN ('open', 'escalated')
+  GROUP BY 1, 2, 3
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_mod_case_metrics_insert ON mod_case;
+CREATE TRIGGER trg_mod_case_metrics_insert
+  AFTER INSERT ON mod_case
+  REFERENCING NEW TABLE AS new_cases
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_cases_inserted();
+
+DROP TRIGGER IF EXISTS trg_mod_case_metrics_update ON mod_case;
+CREATE TRIGGER trg_mod_case_metrics_update
+  AFTER UPDATE ON mod_case
+  REFERENCING OLD TABLE AS old_cases NEW TABLE AS new_cases
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_cases_updated();
+
+DROP TRIGGER IF EXISTS trg_mod_case_metrics_delete ON mod_case;
+CREATE TRIGGER trg_mod_case_metrics_delete
+  AFTER DELETE ON mod_case
+  REFERENCING OLD TABLE AS old_cases
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_cases_deleted();
+
+-- mod_report / mod_action (append-only) ----------------------------------------
+
+CREATE OR REPLACE FUNCTION mod_metrics_reports_inserted()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_hourly AS h (campus_key, bucket, reports)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), mod_metrics_hour(r.created_at), COUNT(*)
+  FROM new_reports r
+  JOIN mod_case c ON c.id = r.case_id
+  GROUP BY 1, 2
+  ON CONFLICT (campus_key, bucket) DO UPDATE SET reports = h.reports + EXCLUDED.reports;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_mod_report_metrics_insert ON mod_report;
+CREATE TRIGGER trg_mod_report_metrics_insert
+  AFTER INSERT ON mod_report
+  REFERENCING NEW TABLE AS new_reports
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_reports_inserted();
+
+CREATE OR REPLACE FUNCTION mod_metrics_actions_inserted()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_hourly AS h (campus_key, bucket, actions_applied)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), mod_metrics_hour(a.created_at), COUNT(*)
+  FROM new_actions a
+  JOIN mod_case c ON c.id = a.case_id
+  GROUP BY 1, 2
+  ON CONFLICT (campus_key, bucket) DO UPDATE SET actions_applied = h.actions_applied + EXCLUDED.actions_applied;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_mod_action_metrics_insert ON mod_action;
+CREATE TRIGGER trg_mod_action_metrics_insert
+  AFTER INSERT ON mod_action
+  REFERENCING NEW TABLE AS new_actions
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_actions_inserted();
+
+-- mod_appeal ----------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION mod_metrics_appeals_inserted()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), 'pending_appeal', c.severity, COUNT(*)
+  FROM new_appeals a
+  JOIN mod_case c ON c.id = a.case_id
+  WHERE a.status = 'pending'
+  GROUP BY 1, 3
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+
+  INSERT INTO mod_metrics_hourly AS h (campus_key, bucket, appeals_received)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), mod_metrics_hour(a.created_at), COUNT(*)
+  FROM new_appeals a
+  JOIN mod_case c ON c.id = a.case_id
+  GROUP BY 1, 2
+  ON CONFLICT (campus_key, bucket) DO UPDATE SET appeals_received = h.appeals_received + EXCLUDED.appeals_received;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION mod_metrics_appeals_updated()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), 'pending_appeal', c.severity, SUM(d.delta)
+  FROM (
+    SELECT o.case_id, -1 AS delta FROM old_appeals o WHERE o.status = 'pending'
+    UNION ALL
+    SELECT n.case_id, 1 FROM new_appeals n WHERE n.status = 'pending'
+  ) d
+  JOIN mod_case c ON c.id = d.case_id
+  GROUP BY 1, 3
+  HAVING SUM(d.delta) <> 0
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+
+  INSERT INTO mod_metrics_hourly AS h (campus_key, bucket, appeals_accepted)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), mod_metrics_hour(COALESCE(n.reviewed_at, now())), COUNT(*)
+  FROM new_appeals n
+  JOIN old_appeals o ON o.id = n.id
+  JOIN mod_case c ON c.id = n.case_id
+  WHERE n.status = 'accepted' AND o.status <> 'accepted'
+  GROUP BY 1, 2
+  ON CONFLICT (campus_key, bucket) DO UPDATE SET appeals_accepted = h.appeals_accepted + EXCLUDED.appeals_accepted;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION mod_metrics_appeals_deleted()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  -- Appeals removed by a cascading case delete no longer find their case;
+  -- the reconciler corrects those gauges.
+  INSERT INTO mod_metrics_gauge AS g (campus_key, metric, severity, value)
+  SELECT COALESCE(c.campus_id::text, 'unknown'), 'pending_appeal', c.severity, -COUNT(*)
+  FROM old_appeals a
+  JOIN mod_case c ON c.id = a.case_id
+  WHERE a.status = 'pending'
+  GROUP BY 1, 3
+  ON CONFLICT (campus_key, metric, severity) DO UPDATE SET value = g.value + EXCLUDED.value;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_mod_appeal_metrics_insert ON mod_appeal;
+CREATE TRIGGER trg_mod_appeal_metrics_insert
+  AFTER INSERT ON mod_appeal
+  REFERENCING NEW TABLE AS new_appeals
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_appeals_inserted();
+
+DROP TRIGGER IF EXISTS trg_mod_appeal_metrics_update ON mod_appeal;
+CREATE TRIGGER trg_mod_appeal_metrics_update
+  AFTER UPDATE ON mod_appeal
+  REFERENCING OLD TABLE AS old_appeals NEW TABLE AS new_appeals
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_appeals_updated();
+
+DROP TRIGGER IF EXISTS trg_mod_appeal_metrics_delete ON mod_appeal;
+CREATE TRIGGER trg_mod_appeal_metrics_delete
+  AFTER DELETE ON mod_appeal
+  REFERENCING OLD TABLE AS old_appeals
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION mod_metrics_appeals_deleted();
+
+COMMIT;
+
+-- Backfill: the first reconciler pass in each process rebuilds every hourly
+-- bucket (not just its recent window) while mod_metrics_hourly has no bucket
+-- older than that window but mod_case does.
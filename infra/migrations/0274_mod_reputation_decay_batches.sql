@@ -0,0 +1,18 @@
+-- Set-based reputation decay.
+-- The decay job walks decay candidates in user_id order, a page at a time,
+-- and records the last user_id of each committed page in mod_job_checkpoint
+-- so an interrupted pass resumes where it stopped. The partial index keeps the
+-- keyset walk on the (small) watch/risk/bad slice of mod_user_reputation.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS mod_job_checkpoint (
+    job TEXT PRIMARY KEY,
+    cursor TEXT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_mod_user_reputation_decay
+    ON mod_user_reputation(user_id, last_event_at)
+    WHERE band IN ('watch', 'risk', 'bad');
+
+COMMIT;
@@ -0,0 +1,35 @@
+-- Stored tsvector columns for the multi-search buckets.
+-- SearchService's people/rooms/posts buckets prefilter with @@ on these
+-- generated columns and with the % trigram operator, so the planner can use
+-- GIN index scans instead of a sequential scan that recomputes
+-- to_tsvector()/similarity() per row. The stored columns supersede the
+-- expression indexes from 0259.
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- PEOPLE: display name + bio
+ALTER TABLE users
+  ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    to_tsvector('english'::regconfig, coalesce(display_name, '') || ' ' || coalesce(bio, ''))
+  ) STORED;
+CREATE INDEX IF NOT EXISTS idx_users_search_tsv ON users USING gin (search_tsv);
+DROP INDEX IF EXISTS idx_users_bio_fts;
+
+-- ROOMS
+ALTER TABLE rooms
+  ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('english'::regconfig, coalesce(name, ''))) STORED;
+CREATE INDEX IF NOT EXISTS idx_rooms_search_tsv ON rooms USING gin (search_tsv);
+DROP INDEX IF EXISTS idx_rooms_name_fts;
+
+-- POSTS
+ALTER TABLE post
+  ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('english'::regconfig, coalesce(body, ''))) STORED;
+CREATE INDEX IF NOT EXISTS idx_posts_search_tsv ON post USING gin (search_tsv) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_posts_body_trgm ON post USING gin (body gin_trgm_ops) WHERE deleted_at IS NULL;
+DROP INDEX IF EXISTS idx_posts_fts;
+
+COMMIT;
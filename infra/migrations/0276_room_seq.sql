@@ -0,0 +1,20 @@
+-- Per-room sequence counters for room chat.
+-- RoomChatRepository.persist_message allocates the next seq with a single
+-- INSERT ... ON CONFLICT DO UPDATE ... RETURNING on a counter row instead of
+-- locking the newest room_messages row (ORDER BY seq DESC LIMIT 1 FOR UPDATE).
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS room_seq (
+  room_id UUID PRIMARY KEY REFERENCES rooms(id) ON DELETE CASCADE,
+  last_seq BIGINT NOT NULL
+);
+
+-- Seed counters for rooms that already have history so new messages continue
+-- after the existing tail.
+INSERT INTO room_seq (room_id, last_seq)
+SELECT room_id, MAX(seq)
+FROM room_messages
+GROUP BY room_id
+ON CONFLICT (room_id) DO UPDATE SET last_seq = GREATEST(room_seq.last_seq, EXCLUDED.last_seq);
+
+COMMIT;
@@ -0,0 +1,64 @@
+-- Per-user DM inbox projection.
+-- /chat/inbox serves the conversation roster from one indexed query instead
+-- of per-peer fan-out. ChatRepository.create_message upserts both
+-- participants' rows in the same statement that inserts the message; the
+-- recipient's unread_count is incremented there and recomputed from
+-- chat_messages when the client acknowledges delivery.
+-- The backfill only runs while chat_inbox is still empty, so re-applying this
+-- file does not rescan chat history.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS chat_inbox (
+  user_id UUID NOT NULL,
+  conversation_id TEXT NOT NULL REFERENCES chat_conversations(conversation_id) ON DELETE CASCADE,
+  peer_id UUID NOT NULL,
+  last_seq BIGINT NOT NULL,
+  last_message_id TEXT NOT NULL,
+  last_sender_id UUID NOT NULL,
+  last_body TEXT NOT NULL,
+  last_at TIMESTAMPTZ NOT NULL,
+  acked_seq BIGINT NOT NULL DEFAULT 0,
+  unread_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, conversation_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_inbox_user_recent
+  ON chat_inbox (user_id, last_at DESC, conversation_id DESC);
+
+-- Backfill from existing history. The delivery watermark is the best read
+-- marker available for old conversations.
+INSERT INTO chat_inbox (
+  user_id, conversation_id, peer_id, last_seq, last_message_id, last_sender_id,
+  last_body, last_at, acked_seq, unread_count
+)
+SELECT
+  p.user_id,
+  c.conversation_id,
+  p.peer_id,
+  last_msg.seq,
+  last_msg.message_id,
+  last_msg.sender_id,
+  LEFT(last_msg.body, 280),
+  last_msg.created_at,
+  COALESCE(d.delivered_seq, 0),
+  (
+    SELECT COUNT(*)
+    FROM chat_messages m
+    WHERE m.conversation_id = c.conversation_id
+      AND m.recipient_id = p.user_id
+      AND m.seq > COALESCE(d.delivered_seq, 0)
+  )
+FROM chat_conversations c
+CROSS JOIN LATERAL (VALUES (c.user_a, c.user_b), (c.user_b, c.user_a)) AS p(user_id, peer_id)
+JOIN LATERAL (
+  SELECT seq, message_id, sender_id, body, created_at
+  FROM chat_messages
+  WHERE conversation_id = c.conversation_id
+  ORDER BY seq DESC
+  LIMIT 1
+) AS last_msg ON TRUE
+LEFT JOIN chat_delivery d ON d.conversation_id = c.conversation_id AND d.user_id = p.user_id
+WHERE NOT EXISTS (SELECT 1 FROM chat_inbox)
+ON CONFLICT (user_id, conversation_id) DO NOTHING;
+
+COMMIT;
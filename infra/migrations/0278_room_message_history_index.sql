@@ -0,0 +1,17 @@
+-- Covering index for room message history.
+-- RoomChatRepository.fetch_messages reads history strictly by keyset on
+-- (room_id, seq). UNIQUE (room_id, seq) already provides that btree (scannable
+-- in both directions), so idx_room_messages_room_seq from 0003 only costs
+-- writes. Replace it with a covering index that carries the fixed-size message
+-- metadata so seq-range scans and gap checks can be served index-only. content
+-- is left in the heap: it can be up to 4000 characters, which would overflow
+-- the btree tuple size limit.
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_room_messages_room_seq_cover
+  ON room_messages (room_id, seq)
+  INCLUDE (id, sender_id, client_msg_id, kind, media_bytes, created_at);
+
+DROP INDEX IF EXISTS idx_room_messages_room_seq;
+
+COMMIT;
@@ -0,0 +1,49 @@
+-- Cold-storage segments for chat and room history.
+-- app.maintenance.cold_storage moves whole calendar months of messages older
+-- than CHAT_COLD_AFTER_DAYS out of chat_messages/room_messages into one
+-- compressed blob per conversation (or room) per month. History reads decode
+-- segments once a cursor crosses into that range, and the retention purge
+-- drops whole segments instead of deleting row by row. sender_ids lets the
+-- purge skip segments touching a user under legal hold, and lets account
+-- deletion find the segments a user sent messages in.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS chat_message_segments (
+  conversation_id TEXT NOT NULL REFERENCES chat_conversations(conversation_id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  first_seq BIGINT NOT NULL,
+  last_seq BIGINT NOT NULL,
+  message_count INTEGER NOT NULL,
+  sender_ids UUID[] NOT NULL,
+  codec TEXT NOT NULL,
+  payload BYTEA NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (conversation_id, month)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_message_segments_senders
+  ON chat_message_segments USING GIN (sender_ids);
+
+CREATE TABLE IF NOT EXISTS room_message_segments (
+  room_id UUID NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  first_seq BIGINT NOT NULL,
+  last_seq BIGINT NOT NULL,
+  message_count INTEGER NOT NULL,
+  sender_ids UUID[] NOT NULL,
+  codec TEXT NOT NULL,
+  payload BYTEA NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (room_id, month)
+);
+
+CREATE INDEX IF NOT EXISTS idx_room_message_segments_seq
+  ON room_message_segments (room_id, last_seq);
+CREATE INDEX IF NOT EXISTS idx_room_message_segments_senders
+  ON room_message_segments USING GIN (sender_ids);
+
+-- Payloads are already compressed; skip TOAST's pglz pass.
+ALTER TABLE chat_message_segments ALTER COLUMN payload SET STORAGE EXTERNAL;
+ALTER TABLE room_message_segments ALTER COLUMN payload SET STORAGE EXTERNAL;
+
+COMMIT;